@@ -10,9 +10,51 @@ from dotenv import load_dotenv
 import tkinter.messagebox as messagebox # 초기 설정 오류용
 import traceback
 import time # 타임아웃 값 확인용
+import threading
+import re
 
 import constants
 
+# --- 요청 취소 ---
+API_CANCELLED_MESSAGE = "오류: 사용자가 요청을 취소했습니다."
+
+class CancelToken:
+    """진행 중인 API 호출 취소 표시. cancel() 시 등록된 중단 함수(응답 스트림 닫기 등)를 즉시 호출."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._closers = []
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set(): return
+            self._event.set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            try: closer()
+            except Exception as e: print(f"WARN: API 요청 중단 중 오류 (무시): {e}")
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def add_closer(self, closer):
+        """취소 시 호출할 중단 함수 등록 (이미 취소됐으면 바로 호출)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._closers.append(closer)
+                return
+        closer()
+
+def _is_cancelled(cancel_token):
+    return cancel_token is not None and cancel_token.is_cancelled()
+
+def _emit_text(on_text, text):
+    """수신한 텍스트 조각을 호출자에게 전달 (미리보기용, 콜백 오류는 생성에 영향 없음)"""
+    if on_text is None or not text: return
+    try: on_text(text)
+    except Exception as e: print(f"WARN: API HANDLER: 텍스트 조각 전달 오류: {e}")
+
 # --- API 설정 ---
 def configure_gemini_api():
     """Gemini API 키를 로드하고 클라이언트 설정. 성공 시 True, 실패 시 False."""
@@ -215,22 +257,22 @@ def generate_prompt(novel_settings, chapter_arc_notes, scene_plot, length_option
 
 # --- API 호출 (공통 진입점 및 분기) ---
 
-def generate_webnovel_scene_api_call(api_type, model_name, prompt, system_prompt, temperature=constants.DEFAULT_TEMPERATURE):
-    """API 타입에 따라 적절한 생성 함수 호출"""
+def generate_webnovel_scene_api_call(api_type, model_name, prompt, system_prompt, temperature=constants.DEFAULT_TEMPERATURE, cancel_token=None, on_text=None):
+    """API 타입에 따라 적절한 생성 함수 호출 (cancel_token 취소 시 API_CANCELLED_MESSAGE 반환, on_text: 수신 조각마다 호출 - 작업 스레드)"""
     print(f"API HANDLER: Scene generation request received for API='{api_type}', Model='{model_name}'") # DEBUG
     if api_type == constants.API_TYPE_GEMINI:
-        return _generate_with_gemini(model_name, prompt, system_prompt, temperature)
+        return _generate_with_gemini(model_name, prompt, system_prompt, temperature, cancel_token, on_text)
     elif api_type == constants.API_TYPE_CLAUDE:
-        return _generate_with_claude(model_name, prompt, system_prompt, temperature)
+        return _generate_with_claude(model_name, prompt, system_prompt, temperature, cancel_token, on_text)
     elif api_type == constants.API_TYPE_GPT:
-        return _generate_with_gpt(model_name, prompt, system_prompt, temperature)
+        return _generate_with_gpt(model_name, prompt, system_prompt, temperature, cancel_token, on_text)
     else:
         msg = f"오류: 지원되지 않는 API 타입: {api_type}"
         print(f"❌ API HANDLER: {msg}")
         return msg, None # Return error message and None for token_info
 
-def generate_summary_api_call(api_type, model_name, text_to_summarize):
-    """API 타입에 따라 적절한 요약 함수 호출"""
+def generate_summary_api_call(api_type, model_name, text_to_summarize, cancel_token=None):
+    """API 타입에 따라 적절한 요약 함수 호출 (cancel_token 취소 시 API_CANCELLED_MESSAGE 반환)"""
     print(f"API HANDLER: Summary generation request received for API='{api_type}', Model='{model_name}'") # DEBUG
     if not text_to_summarize or not text_to_summarize.strip():
         print("ℹ️ API HANDLER: 요약할 내용 없음. 빈 요약 반환.")
@@ -251,21 +293,68 @@ def generate_summary_api_call(api_type, model_name, text_to_summarize):
         return msg, None
 
     if api_type == constants.API_TYPE_GEMINI:
-        return _generate_with_gemini(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE)
+        return _generate_with_gemini(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE, cancel_token)
     elif api_type == constants.API_TYPE_CLAUDE:
-        return _generate_with_claude(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE)
+        return _generate_with_claude(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE, cancel_token)
     elif api_type == constants.API_TYPE_GPT:
-        return _generate_with_gpt(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE)
+        return _generate_with_gpt(model_name, summary_user_prompt, summary_system_prompt, constants.SUMMARY_TEMPERATURE, cancel_token)
     else:
         msg = f"오류: 지원되지 않는 API 타입 (요약): {api_type}"
         print(f"❌ API HANDLER: {msg}")
         return msg, None # Return error message and None for token_info
 
+def generate_scene_plan_api_call(api_type, model_name, novel_settings, chapter_arc_notes, previous_scene_content, scene_count, cancel_token=None):
+    """챕터 아크 노트를 장면 플롯 scene_count개로 나누는 계획 요청 (한 번의 호출).
+    성공 시 (플롯 문자열 목록, 토큰 정보), 실패 시 (오류 메시지, 토큰 정보)"""
+    print(f"API HANDLER: Scene plan request received for API='{api_type}', Model='{model_name}', Scenes={scene_count}") # DEBUG
+    novel_setting_content = novel_settings.get(constants.NOVEL_MAIN_SETTINGS_KEY, "").strip()
+    chapter_notes_content = chapter_arc_notes.get(constants.CHAPTER_ARC_NOTES_KEY, "").strip()
+    if not chapter_notes_content:
+        return "오류: 챕터 아크 노트가 비어 있어 장면 계획을 만들 수 없습니다.", None
+
+    plan_system_prompt = "당신은 웹소설 챕터의 전개를 장면 단위로 설계하는 AI입니다. 요청한 형식만 출력하세요."
+    prompt_parts = []
+    has_previous = bool(previous_scene_content and previous_scene_content.strip())
+    if has_previous:
+        prompt_parts.append(f"**[이번 챕터 이전 내용]**\n{previous_scene_content}\n---")
+    if novel_setting_content:
+        prompt_parts.append(f"**[소설 전체 설정]**\n{novel_setting_content}\n---")
+    prompt_parts.append(f"**[이번 챕터 아크 노트]**\n{chapter_notes_content}\n---")
+    prompt_parts.append(f"""위 챕터 아크 노트의 전개를 {'이전 내용에 이어지는 ' if has_previous else ''}장면 {scene_count}개로 나누어 각 장면의 플롯을 작성해주세요.
+*   장면마다 핵심 사건, 등장인물, 장면의 끝(다음 장면으로 이어지는 지점)을 2~4문장으로 적어주세요.
+*   아래 형식으로 번호를 붙여 정확히 {scene_count}개만 출력하세요.
+
+1. (첫 번째 장면 플롯)
+2. (두 번째 장면 플롯)""")
+    plan_text, token_info = generate_webnovel_scene_api_call(api_type, model_name, "\n\n".join(prompt_parts), plan_system_prompt,
+                                                             constants.SCENE_PLAN_TEMPERATURE, cancel_token)
+    if not isinstance(plan_text, str) or plan_text.startswith("오류"):
+        return plan_text if isinstance(plan_text, str) else "오류: 장면 계획 응답 없음", token_info
+    plots = _parse_scene_plan(plan_text)
+    if not plots:
+        return "오류: 장면 계획 응답에서 장면 플롯을 찾지 못했습니다.", token_info
+    if len(plots) != scene_count:
+        print(f"WARN: API HANDLER: 요청한 장면 수({scene_count})와 계획된 장면 수({len(plots)})가 다릅니다.")
+    return plots[:scene_count], token_info
+
+def _parse_scene_plan(plan_text):
+    """'1. ...' / '2) ...' 형식의 번호 목록을 장면 플롯 목록으로 변환 (번호 없는 이어지는 줄은 앞 플롯에 붙임)"""
+    plots = []
+    for line in plan_text.splitlines():
+        stripped = line.strip().strip('*').strip()
+        if not stripped: continue
+        match = re.match(r'^(?:장면\s*)?(\d+)\s*[.)\]:]\s*(.*)$', stripped)
+        if match:
+            plots.append(match.group(2).strip().strip('*').strip())
+        elif plots:
+            plots[-1] = f"{plots[-1]}\n{stripped}".strip()
+    return [plot for plot in plots if plot]
+
 
 # --- API별 실제 호출 함수 ---
 
-def _generate_with_gemini(model_name, prompt, system_prompt, temperature):
-    """Gemini API를 사용하여 텍스트 생성"""
+def _generate_with_gemini(model_name, prompt, system_prompt, temperature, cancel_token=None, on_text=None):
+    """Gemini API를 사용하여 텍스트 생성 (스트리밍 수신, 취소 시 수신 중단)"""
     print(f"API HANDLER (Gemini): Calling model '{model_name}'...") # DEBUG
     token_info = {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
     error_message = None
@@ -292,13 +381,22 @@ def _generate_with_gemini(model_name, prompt, system_prompt, temperature):
         # Define request_timeout (consider making it configurable)
         request_timeout = 720 # Example: 12 minutes
 
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         start_time = time.time()
         response = model.generate_content(
             prompt,
             generation_config=generation_config,
             safety_settings=constants.SAFETY_SETTINGS, # Define SAFETY_SETTINGS in constants if needed, otherwise remove
-            request_options={'timeout': request_timeout}
+            request_options={'timeout': request_timeout},
+            stream=True # 조각 단위 수신: 취소 시 남은 응답을 받지 않고 중단
         )
+        for _chunk in response: # 다 받으면 response에 전체 결과가 합쳐짐
+            if _is_cancelled(cancel_token):
+                print("ℹ️ API HANDLER (Gemini): 요청 취소됨 (수신 중단).")
+                return API_CANCELLED_MESSAGE, token_info
+            if on_text is not None:
+                try: _emit_text(on_text, _chunk.text)
+                except (ValueError, AttributeError): pass # 차단/빈 조각 (최종 결과 처리에서 확인)
         end_time = time.time()
         print(f"✅ API HANDLER (Gemini): Response received ({end_time - start_time:.2f}s)")
 
@@ -379,6 +477,7 @@ def _generate_with_gemini(model_name, prompt, system_prompt, temperature):
             return error_message, token_info
 
     except google.api_core.exceptions.GoogleAPIError as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         # ... (keep existing detailed Gemini error handling) ...
         error_message = f"오류: Gemini API 호출 실패: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (Gemini): {error_message}")
@@ -390,14 +489,15 @@ def _generate_with_gemini(model_name, prompt, system_prompt, temperature):
         elif hasattr(e, 'message') and "API key not valid" in e.message: error_message = f"오류: Gemini API 키가 유효하지 않습니다. 키를 확인하세요.\n{e}"
         return error_message, token_info # Return error and token_info (might be 0)
     except Exception as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         error_message = f"오류: Gemini 생성 중 예상치 못한 문제 발생: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (Gemini): {error_message}")
         traceback.print_exc()
         return error_message, token_info # Return error and token_info (might be 0)
 
 
-def _generate_with_claude(model_name, prompt, system_prompt, temperature):
-    """Claude API를 사용하여 텍스트 생성"""
+def _generate_with_claude(model_name, prompt, system_prompt, temperature, cancel_token=None, on_text=None):
+    """Claude API를 사용하여 텍스트 생성 (스트리밍 수신, 취소 시 스트림을 닫아 요청 중단)"""
     print(f"API HANDLER (Claude): Calling model '{model_name}'...") # DEBUG
     token_info = {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
     api_key = os.getenv(constants.ANTHROPIC_API_KEY_ENV)
@@ -423,13 +523,22 @@ def _generate_with_claude(model_name, prompt, system_prompt, temperature):
         # Claude uses 'system' parameter for system prompt
         system_param = system_prompt if system_prompt and system_prompt.strip() else None
 
-        response = client.messages.create(
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
+        with client.messages.stream(
             model=model_name,
             max_tokens=max_tokens_to_generate,
             temperature=temp_value,
             system=system_param,
             messages=messages
-        )
+        ) as stream:
+            if cancel_token is not None: cancel_token.add_closer(stream.close)
+            for _text in stream.text_stream:
+                if _is_cancelled(cancel_token): break
+                _emit_text(on_text, _text)
+            if _is_cancelled(cancel_token):
+                print("ℹ️ API HANDLER (Claude): 요청 취소됨 (스트림 닫음).")
+                return API_CANCELLED_MESSAGE, token_info
+            response = stream.get_final_message()
 
         end_time = time.time()
         print(f"✅ API HANDLER (Claude): Response received ({end_time - start_time:.2f}s)")
@@ -469,6 +578,7 @@ def _generate_with_claude(model_name, prompt, system_prompt, temperature):
             return error_message, token_info # Return error and token_info
 
     except anthropic.APIError as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         # ... (keep existing detailed Claude error handling) ...
         error_message = f"오류: Claude API 호출 실패: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (Claude): {error_message}")
@@ -479,14 +589,15 @@ def _generate_with_claude(model_name, prompt, system_prompt, temperature):
         elif isinstance(e, anthropic.BadRequestError) and hasattr(e, 'message') and 'invalid system prompt' in e.message: error_message = f"오류: Claude 시스템 프롬프트 형식이 잘못되었습니다.\n{e}"
         return error_message, token_info # Return error and token_info
     except Exception as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         error_message = f"오류: Claude 생성 중 예상치 못한 문제 발생: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (Claude): {error_message}")
         traceback.print_exc()
         return error_message, token_info # Return error and token_info
 
 
-def _generate_with_gpt(model_name, prompt, system_prompt, temperature):
-    """OpenAI GPT API를 사용하여 텍스트 생성"""
+def _generate_with_gpt(model_name, prompt, system_prompt, temperature, cancel_token=None, on_text=None):
+    """OpenAI GPT API를 사용하여 텍스트 생성 (스트리밍 수신, 취소 시 스트림을 닫아 요청 중단)"""
     print(f"API HANDLER (GPT): Calling model '{model_name}'...") # DEBUG
     token_info = {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
     api_key = os.getenv(constants.OPENAI_API_KEY_ENV)
@@ -512,35 +623,51 @@ def _generate_with_gpt(model_name, prompt, system_prompt, temperature):
         print(f"🤖 API HANDLER (GPT): Calling model '{model_name}' (Temp: {temp_value:.2f})...")
         start_time = time.time()
 
-        response = client.chat.completions.create(
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
+        stream = client.chat.completions.create(
             model=model_name,
             temperature=temp_value,
-            messages=messages
+            messages=messages,
+            stream=True, # 조각 단위 수신: 취소 시 스트림을 닫아 생성 중단
+            stream_options={"include_usage": True} # 마지막 조각에 토큰 사용량 포함
             # max_tokens=max_tokens_to_generate # Uncomment if needed
         )
+        if cancel_token is not None: cancel_token.add_closer(stream.close)
+
+        # --- GPT Response Handling (스트림 조각 결합) ---
+        text_parts = []
+        received_choice = False
+        finish_reason = "UNKNOWN"
+        usage = None
+        for chunk in stream:
+            if _is_cancelled(cancel_token): break
+            if getattr(chunk, 'usage', None): usage = chunk.usage
+            if chunk.choices:
+                choice = chunk.choices[0]
+                received_choice = True
+                if choice.delta and choice.delta.content:
+                    text_parts.append(choice.delta.content)
+                    _emit_text(on_text, choice.delta.content)
+                if choice.finish_reason: finish_reason = choice.finish_reason
+        if _is_cancelled(cancel_token):
+            print("ℹ️ API HANDLER (GPT): 요청 취소됨 (스트림 닫음).")
+            return API_CANCELLED_MESSAGE, token_info
 
         end_time = time.time()
         print(f"✅ API HANDLER (GPT): Response received ({end_time - start_time:.2f}s)")
 
         # --- GPT Token Extraction ---
-        if hasattr(response, 'usage'):
+        if usage is not None:
             token_info = {
-                constants.INPUT_TOKEN_KEY: getattr(response.usage, 'prompt_tokens', 0),
-                constants.OUTPUT_TOKEN_KEY: getattr(response.usage, 'completion_tokens', 0) # OpenAI uses completion_tokens
+                constants.INPUT_TOKEN_KEY: getattr(usage, 'prompt_tokens', 0),
+                constants.OUTPUT_TOKEN_KEY: getattr(usage, 'completion_tokens', 0) # OpenAI uses completion_tokens
             }
             print(f"📊 GPT Tokens: Input={token_info[constants.INPUT_TOKEN_KEY]}, Output={token_info[constants.OUTPUT_TOKEN_KEY]}")
         else:
              print("⚠️ GPT Tokens: No usage info found in response.")
 
-        # --- GPT Response Handling ---
-        generated_text = None
-        finish_reason = "UNKNOWN"
-        if response.choices:
-             choice = response.choices[0]
-             if choice.message:
-                 generated_text = choice.message.content
-             finish_reason = choice.finish_reason
-             print(f"ℹ️ GPT Finish Reason: {finish_reason}")
+        generated_text = "".join(text_parts) if received_choice else None
+        print(f"ℹ️ GPT Finish Reason: {finish_reason}")
 
         if generated_text is not None: # Check for None, empty string is valid
             if finish_reason != 'stop': # Not a normal completion
@@ -560,10 +687,11 @@ def _generate_with_gpt(model_name, prompt, system_prompt, temperature):
             #    error_message = "오류 발생: 입력 또는 생성 내용이 콘텐츠 필터에 의해 차단되었습니다."
             # else:
             error_message = f"오류 발생: GPT API 응답에서 생성된 내용을 찾을 수 없습니다 (종료 사유: {finish_reason})."
-            print(f"❌ {error_message}. Full Response: {response}")
+            print(f"❌ {error_message}.")
             return error_message, token_info # Return error and token_info
 
     except openai.APIError as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         # ... (keep existing detailed GPT error handling) ...
         error_message = f"오류: GPT API 호출 실패: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (GPT): {error_message}")
@@ -579,6 +707,7 @@ def _generate_with_gpt(model_name, prompt, system_prompt, temperature):
 
         return error_message, token_info # Return error and token_info
     except Exception as e:
+        if _is_cancelled(cancel_token): return API_CANCELLED_MESSAGE, token_info
         error_message = f"오류: GPT 생성 중 예상치 못한 문제 발생: {e.__class__.__name__}: {e}"
         print(f"❌ API HANDLER (GPT): {error_message}")
         traceback.print_exc()
@@ -15,6 +15,13 @@ import constants
 import file_handler
 import api_handler # 이제 여러 API 함수 포함
 import gui_dialogs
+import storage_backend
+import search_index
+import novel_export
+import novel_import
+import worker_pools
+import ui_dispatch
+import generation_queue
 
 class AppCore:
     """애플리케이션 핵심 로직, 상태 관리, 백엔드 연동 클래스"""
@@ -28,6 +35,7 @@ class AppCore:
         self.system_prompt = self.config.get('system_prompt', constants.DEFAULT_SYSTEM_PROMPT)
         self.output_bg = self.config.get('output_bg_color', constants.DEFAULT_OUTPUT_BG)
         self.output_fg = self.config.get('output_fg_color', constants.DEFAULT_OUTPUT_FG)
+        file_handler.set_chapter_manifest_enabled(self.config.get(constants.CONFIG_USE_CHAPTER_MANIFEST_KEY, True))
 
         # === API 및 모델 관리 (다중 API 지원) ===
         if available_models_by_type is None or not isinstance(available_models_by_type, dict):
@@ -133,8 +141,11 @@ class AppCore:
         self._novel_settings_after_id = None
         self._arc_settings_after_id = None
 
-        self.is_generating = False # *** 이 플래그 사용 ***
+        self.generation_jobs = {} # 진행 중인 장면 생성: 챕터 경로(정규화) -> 작업 정보 (챕터당 하나, 다른 챕터/소설은 동시 진행)
         self.is_summarizing = False # *** 이 플래그 사용 ***
+        self.is_loading_item = False # 트리 항목 로드(파일 읽기) 진행 중
+        self.summary_cancel_token = None # 진행 중인 요약 요청의 취소 토큰
+        self._streamed_generation_token = None # 출력 패널에 스트리밍 미리보기를 표시 중인 생성 요청의 토큰
         self.start_time = 0
         self.timer_after_id = None
 
@@ -142,6 +153,32 @@ class AppCore:
         self.last_generation_settings_snapshot = None
         self.last_generation_previous_content = None
 
+        # 백그라운드 작업 스레드 풀 (api: AI 호출, io: 파일 읽기/검색, cpu: 압축/내보내기/가져오기)
+        self.pools = worker_pools.WorkerPools()
+        self._quit_after_jobs = False # '작업 완료 후 종료' 선택 시 True
+        self._shutting_down = False # 종료 준비(작업 마무리 대기) 시작 후 True
+        # 장면 생성 작업 대기열 (디스크 보관, set_gui_manager 이후 진행)
+        self.generation_queue = generation_queue.GenerationQueue(constants.BASE_SAVE_DIR)
+        self._queue_pump_after_id = None
+        self._bulk_file_job = None # 진행 중인 파일 일괄 작업 이름 (찾아 바꾸기, 저장소 복사 등; io 풀)
+        self._autopilot_planning = {} # 장면 계획 요청 중인 챕터 (생성 작업 키) -> 취소 토큰
+        self._summary_started_at = 0 # 자동 집필 보고용 요약 소요 시간 측정
+        self._summary_rerun_novel_dir = None # 요약 중 저장된 장면이 있으면 요약이 끝난 뒤 다시 요약
+        # UI 갱신 병합: 요청은 표시만 하고 이벤트 루프 한 턴에 한 번 적용 (트리 새로고침 -> 항목 선택 -> 위젯 상태)
+        self._ui_state_request = None # 마지막 update_ui_state 인자 (generating, novel, chapter, scene)
+        self._tree_refresh_pending = False
+        self._tree_select_pending = None
+        self._ui_flush_after_id = None
+        # 작업 스레드 -> 메인 스레드 UI 이벤트 대기열 (set_gui_manager에서 시작)
+        self.ui_dispatcher = ui_dispatch.UiDispatcher()
+        self._tree_load_generation = 0
+        self._tree_load_future = None
+
+        # 전문 검색 색인 (set_gui_manager에서 시작)
+        self.search_index = None
+        self._search_generation = 0
+        self._pending_search_highlight = None # (장면 경로, 줄 번호, 검색어): 로드 완료 후 해당 줄로 이동
+
         # Check if self can be printed here
         try:
             print(f"CORE: AppCore __init__ 완료. 객체 ID: {id(self)}")
@@ -154,6 +191,9 @@ class AppCore:
         """GuiManager 참조 설정 및 초기 UI 상태 업데이트"""
         self.gui_manager = gui_manager
         print("CORE: GuiManager 참조 설정됨.")
+        # 작업 스레드의 결과/알림은 UI 이벤트 대기열을 거쳐 메인 스레드에서 처리
+        self.ui_dispatcher.start(self.gui_manager.root)
+        file_handler.set_ui_dispatcher(self.ui_dispatcher.post)
         # 초기 데이터 로딩 및 UI 업데이트
         self.update_window_title()
         # 초기 상태 업데이트 (아무것도 로드되지 않음)
@@ -165,6 +205,24 @@ class AppCore:
 
         # 트리뷰 새로고침
         self.refresh_treeview_data()
+        # 남아있는 개별 장면 설정 파일을 챕터 매니페스트로 변환 (매니페스트 사용 시, 백그라운드)
+        self._submit_background_job(self.pools.io, "챕터 매니페스트 변환", file_handler.migrate_all_chapter_manifests, constants.BASE_SAVE_DIR)
+        # 오래된 챕터 자동 압축 보관 (설정 시, 백그라운드)
+        self._start_auto_archive_thread()
+        # 보존 기간이 지난 휴지통 항목 영구 삭제 (백그라운드)
+        self._start_trash_purge_thread()
+        # 전문 검색 색인 열기 및 변경분 동기화 (백그라운드)
+        self._start_search_index()
+        # 지난 종료 시 끝나지 않은 작업 알림 (창이 뜬 뒤 표시하고, 확인한 뒤에만 기록 삭제)
+        interrupted_jobs = file_handler.load_interrupted_jobs(constants.BASE_SAVE_DIR)
+        if interrupted_jobs:
+            print(f"CORE: 지난 종료 시 중단된 작업: {interrupted_jobs}")
+            self.ui_dispatcher.post(self._show_interrupted_jobs_notice, interrupted_jobs)
+        # 생성 작업 대기열 이어서 진행
+        waiting_count = self.generation_queue.count_waiting()
+        if waiting_count and not self.generation_queue.paused:
+            self.update_status_bar(f"📋 생성 대기열의 작업 {waiting_count}개를 이어서 진행합니다.")
+        self._pump_generation_queue()
 
     # --- API 및 모델 관련 핸들러 ---
     def handle_api_type_change(self, new_api_type):
@@ -276,13 +334,47 @@ class AppCore:
             self.gui_manager.update_status_bar(message)
 
     def update_ui_state(self, generating=None, novel_loaded=None, chapter_loaded=None, scene_loaded=None):
+        """UI 상태 갱신 요청: 바로 적용하지 않고 이벤트 루프 한 턴에 한 번만 적용.
+        같은 턴의 요청은 항목별로 병합 (None이 아닌 값은 나중 요청이 우선, None은 앞 요청 값 유지)"""
+        if not self.gui_manager: return
+        request = (generating, novel_loaded, chapter_loaded, scene_loaded)
+        if self._ui_state_request is not None:
+            request = tuple(new if new is not None else old for new, old in zip(request, self._ui_state_request))
+        self._ui_state_request = request
+        self._schedule_ui_flush()
+
+    def _schedule_ui_flush(self):
+        if self._ui_flush_after_id is not None: return
+        root = self.gui_manager.root if self.gui_manager else None
+        if root is None:
+            self._flush_ui_updates()
+            return
+        try: self._ui_flush_after_id = root.after_idle(self._flush_ui_updates)
+        except tk.TclError: self._ui_flush_after_id = None # 창이 닫힘
+
+    def _flush_ui_updates(self):
+        """병합된 UI 갱신 적용: 트리 새로고침, 항목 선택, 위젯 상태를 각각 최대 한 번"""
+        self._ui_flush_after_id = None
+        if not self.gui_manager: return
+        if self._tree_refresh_pending:
+            self._tree_refresh_pending = False
+            self._refresh_treeview_now()
+        if self._tree_select_pending is not None:
+            item_id, self._tree_select_pending = self._tree_select_pending, None
+            if self.gui_manager.treeview_panel:
+                self.gui_manager.treeview_panel.select_item(item_id)
+        if self._ui_state_request is not None:
+            request, self._ui_state_request = self._ui_state_request, None
+            self._apply_ui_state(*request)
+
+    def _apply_ui_state(self, generating=None, novel_loaded=None, chapter_loaded=None, scene_loaded=None):
          if self.gui_manager:
             is_gen = generating if generating is not None else self.is_generating
             is_sum = self.is_summarizing
             is_novel = novel_loaded if novel_loaded is not None else bool(self.current_novel_dir)
             is_chap = chapter_loaded if chapter_loaded is not None else bool(self.current_chapter_arc_dir)
             is_scene = scene_loaded if scene_loaded is not None else bool(self.current_scene_path)
-            is_busy = is_gen or is_sum # 생성 또는 요약 중이면 Busy
+            is_busy = is_gen or is_sum or self.is_loading_item or self._bulk_file_job is not None # 생성/요약, 항목 로드, 파일 일괄 작업 중이면 Busy
 
             # GuiManager에 모든 상태 전달
             self.gui_manager.set_ui_state(is_busy, is_novel, is_chap, is_scene)
@@ -354,28 +446,78 @@ class AppCore:
         self.update_ui_state() # 상태 업데이트 필요
 
     def refresh_treeview_data(self):
+        """트리뷰 새로고침 요청 (같은 이벤트 루프 턴의 여러 요청은 한 번으로 합침)"""
+        if not self.gui_manager: return
+        self._tree_refresh_pending = True
+        self._schedule_ui_flush()
+
+    def _refresh_treeview_now(self):
         if self.gui_manager and self.gui_manager.treeview_panel:
+            filter_text = self.gui_manager.treeview_panel.get_filter_text()
+            if filter_text:
+                self.handle_search_request(filter_text) # 검색 중이면 결과 목록을 다시 검색
+                return
             self.gui_manager.treeview_panel.refresh_tree()
             print("CORE: 트리뷰 새로고침 요청됨.")
 
     def select_treeview_item(self, item_id):
-        if self.gui_manager and self.gui_manager.treeview_panel:
-            self.gui_manager.treeview_panel.select_item(item_id)
+        """트리뷰 항목 선택 요청 (대기 중인 새로고침 뒤에 적용, 같은 턴에는 마지막 요청만)"""
+        if not self.gui_manager: return
+        self._tree_select_pending = item_id
+        self._schedule_ui_flush()
 
     # --- 핵심 로직 및 이벤트 핸들러 ---
     def handle_quit_request(self):
-        """애플리케이션 종료 요청 처리"""
+        """애플리케이션 종료 요청 처리 (진행 중인 AI 작업은 완료 후 종료 또는 취소 후 종료 선택)"""
         print("CORE: 종료 요청 수신.")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self._shutting_down: print("CORE: 이미 종료 준비 중."); return
+        interrupted_jobs = []
+        if self.generation_jobs or self.is_summarizing:
+            answer = False
+            if self.gui_manager:
+                answer = self.gui_manager.ask_yes_no_cancel("작업 진행 중", "AI 작업이 진행 중입니다.\n\n"
+                                                            "예: 작업이 끝나고 결과를 저장한 뒤 종료\n"
+                                                            "아니오: 작업을 취소하고 지금 종료\n"
+                                                            "취소: 종료하지 않음")
+            self._quit_after_jobs = bool(answer)
+            if answer is None: print("CORE: 사용자가 종료 취소."); return
+            if answer:
+                self.update_status_bar("⏳ 진행 중인 작업이 끝나면 프로그램을 종료합니다...")
+                return
+            kept_jobs = self._queue_interrupted_generations()
+            interrupted_jobs = [job_name for job_name in self.pools.api.pending_jobs() if not any(job_name.startswith(kept) for kept in kept_jobs)]
+            interrupted_jobs += [f"{kept} (생성 대기열에 일시 정지로 보관)" for kept in kept_jobs]
+            self.handle_cancel_request(cancel_all=True, requeue_queue_jobs=True)
+        self._quit_after_jobs = False
         if self._check_and_handle_unsaved_changes("프로그램 종료"):
             print("CORE: 변경사항 처리 완료. 프로그램 종료.")
-            if self.gui_manager and self.gui_manager.root:
-                self.gui_manager.root.destroy()
-            else:
-                sys.exit(0)
+            self._shutdown_background_work(interrupted_jobs, on_finished=self._close_app)
         else:
             print("CORE: 사용자가 종료 취소.")
 
+    def _close_app(self):
+        """종료 준비가 끝난 뒤 창 닫기 (창이 없으면 프로세스 종료)"""
+        if self.gui_manager and self.gui_manager.root:
+            self.gui_manager.root.destroy()
+        else:
+            sys.exit(0)
+
+    def _queue_interrupted_generations(self):
+        """종료하며 취소할 일반 생성 작업(대기열 밖)의 입력을 생성 대기열에 일시 정지 상태로 보관 (다음 실행 때 재개).
+        보관한 작업 이름 목록 반환."""
+        kept_jobs = []
+        for job in self.generation_jobs.values():
+            if job.get("queue_job_id") or not job.get("scene_settings"): continue
+            added = self.generation_queue.add_jobs([{
+                "kind": generation_queue.KIND_NEW_SCENE if job["is_new_scene"] else generation_queue.KIND_REGENERATE,
+                "novel_name": job["novel_name"], "chapter_folder": os.path.basename(job["chapter_dir"]),
+                "scene_number": job["scene_number"], "api_type": job.get("api_type") or self.current_api_type,
+                "scene_settings": dict(job["scene_settings"])}])
+            self.generation_queue.pause_job(added[0]["id"])
+            kept_jobs.append(job["name"])
+        if kept_jobs: print(f"CORE: 중단할 생성 작업 {len(kept_jobs)}개를 생성 대기열에 보관.")
+        return kept_jobs
+
     def handle_new_novel_request(self):
         """'새 소설' 버튼 클릭 처리"""
         print("CORE: 새 소설 요청 처리 시작...")
@@ -439,6 +581,7 @@ class AppCore:
         if not self.current_novel_dir or not self.current_novel_name:
             self.gui_manager.show_message("error", "오류", f"{action}을 진행할 소설이 로드되지 않았습니다.")
             return
+        if self._warn_if_read_only(action): return
         if not self._check_and_handle_unsaved_changes(action): return
 
         dialog_result = gui_dialogs.show_new_chapter_folder_dialog(self.gui_manager.root, self.current_novel_name)
@@ -509,6 +652,7 @@ class AppCore:
         if not self.current_chapter_arc_dir:
             self.gui_manager.show_message("error", "오류", f"{action}을 진행할 챕터 폴더가 로드되지 않았습니다.")
             return
+        if self._warn_if_read_only(action): return
         if not os.path.isdir(self.current_chapter_arc_dir):
              self.gui_manager.show_message("error", "오류", f"현재 로드된 챕터 폴더를 찾을 수 없습니다:\n{self.current_chapter_arc_dir}")
              self.clear_all_ui_state(); self.refresh_treeview_data(); return
@@ -519,8 +663,11 @@ class AppCore:
              return
 
         current_gui_plot = self.gui_manager.settings_panel.get_scene_plot() if self.gui_manager.settings_panel else ""
-        scene_plot_from_dialog = gui_dialogs.show_scene_plot_dialog(self.gui_manager.root, current_plot=current_gui_plot, title="🎬 새 장면에 사용할 플롯 입력")
-        if scene_plot_from_dialog is None: print(f"CORE: {action} 취소됨 (Dialog)."); return
+        plot_result = gui_dialogs.show_scene_plot_dialog(self.gui_manager.root, current_plot=current_gui_plot, title="🎬 새 장면에 사용할 플롯 입력",
+                                                         candidate_choices=self._get_candidate_model_choices(),
+                                                         default_choice=(self.current_api_type, self.selected_model))
+        if plot_result is None: print(f"CORE: {action} 취소됨 (Dialog)."); return
+        scene_plot_from_dialog = plot_result["plot"]
         if self.gui_manager.settings_panel: self.gui_manager.settings_panel.set_scene_plot(scene_plot_from_dialog)
 
         try:
@@ -548,6 +695,10 @@ class AppCore:
         gui_scene_gen_settings = self._get_settings_from_gui(read_novel_settings=False, read_chapter_arc_settings=False, read_scene_settings=True)
         gui_scene_gen_settings[constants.SCENE_PLOT_KEY] = scene_plot_from_dialog
 
+        if plot_result["candidate_count"] > 1:
+            self._start_candidate_generation(novel_settings_for_gen, arc_notes_for_gen, gui_scene_gen_settings, previous_content_str,
+                                             target_chapter_dir, next_scene_num, True, plot_result["candidate_count"], plot_result["candidate_models"])
+            return
         self._start_generation_thread_internal(
             api_type=self.current_api_type,
             novel_settings=novel_settings_for_gen,
@@ -564,6 +715,7 @@ class AppCore:
         print("CORE: 장면 재생성 요청 처리 시작...")
         action = "장면 재생성"
         if self.check_busy_and_warn(): return
+        if self._warn_if_read_only(action): return
         target_scene_path = self.current_scene_path
         if not target_scene_path or not os.path.isfile(target_scene_path):
             self.gui_manager.show_message("error", "오류", f"{action}할 장면이 로드되지 않았거나 파일을 찾을 수 없습니다.")
@@ -584,8 +736,11 @@ class AppCore:
         loaded_plot = self.current_loaded_scene_settings.get(constants.SCENE_PLOT_KEY, "")
         initial_plot_for_dialog = loaded_plot if loaded_plot else current_gui_plot
 
-        scene_plot_from_dialog = gui_dialogs.show_scene_plot_dialog(self.gui_manager.root, current_plot=initial_plot_for_dialog, title="🔄 재생성할 장면 플롯 확인/수정")
-        if scene_plot_from_dialog is None: print(f"CORE: {action} 취소됨 (Dialog)."); return
+        plot_result = gui_dialogs.show_scene_plot_dialog(self.gui_manager.root, current_plot=initial_plot_for_dialog, title="🔄 재생성할 장면 플롯 확인/수정",
+                                                         candidate_choices=self._get_candidate_model_choices(),
+                                                         default_choice=(self.current_api_type, self.selected_model))
+        if plot_result is None: print(f"CORE: {action} 취소됨 (Dialog)."); return
+        scene_plot_from_dialog = plot_result["plot"]
         if self.gui_manager.settings_panel: self.gui_manager.settings_panel.set_scene_plot(scene_plot_from_dialog)
 
         scene_display = os.path.basename(target_scene_path)
@@ -607,6 +762,10 @@ class AppCore:
         gui_scene_gen_settings = self._get_settings_from_gui(read_novel_settings=False, read_chapter_arc_settings=False, read_scene_settings=True)
         gui_scene_gen_settings[constants.SCENE_PLOT_KEY] = scene_plot_from_dialog
 
+        if plot_result["candidate_count"] > 1:
+            self._start_candidate_generation(novel_settings, arc_notes, gui_scene_gen_settings, prev_content_for_regen,
+                                             target_chapter_dir, target_scene_num, False, plot_result["candidate_count"], plot_result["candidate_models"])
+            return
         self._start_generation_thread_internal(
             api_type=self.current_api_type,
             novel_settings=novel_settings,
@@ -622,6 +781,7 @@ class AppCore:
         """'변경 저장' 버튼 클릭 처리"""
         print("CORE: 변경 저장 요청 처리 시작...")
         if self.check_busy_and_warn(): return # Check before proceeding
+        if self._warn_if_read_only("변경 저장"): return
 
         # Check modification flags
         unsaved_output = self.output_text_modified
@@ -719,6 +879,11 @@ class AppCore:
                  print(f"CORE ERROR: 장면 번호 가져오기 실패 ({self.current_scene_path}). 설정 저장 불가.")
                  error_occurred = True
 
+        # 5. 장면 버전 기록 (내용 또는 장면 설정이 저장된 경우, 디스크 상태 기준)
+        if not error_occurred and self.current_scene_path and (unsaved_output or unsaved_chapter_scene_opts):
+            scene_num = self._get_scene_number_from_path(self.current_scene_path)
+            if scene_num > 0: file_handler.record_scene_version(os.path.dirname(self.current_scene_path), scene_num)
+
         # --- 최종 처리 ---
         if saved_something and not error_occurred:
              context_name = "[?]"
@@ -783,13 +948,11 @@ class AppCore:
         is_scene = 'scene' in tags
 
         # Update UI state based on selection type, passing the determined busy state
-        if self.gui_manager:
-            self.gui_manager.set_ui_state(
-                is_busy=busy_now, # 확인된 상태 전달
-                novel_loaded=(is_novel or is_chapter or is_scene),
-                chapter_loaded=(is_chapter or is_scene), # Chapter is considered loaded if a scene within it is selected
-                scene_loaded=is_scene
-            )
+        self.update_ui_state(
+            novel_loaded=(is_novel or is_chapter or is_scene),
+            chapter_loaded=(is_chapter or is_scene), # Chapter is considered loaded if a scene within it is selected
+            scene_loaded=is_scene
+        )
 
         # Update status bar message conditionally (only if not busy)
         if not busy_now:
@@ -829,9 +992,9 @@ class AppCore:
 
 
     def handle_tree_load_request(self, item_id, tags):
-        """트리뷰 아이템 더블클릭 (로드) 처리"""
+        """트리뷰 아이템 더블클릭 (로드) 처리. 파일 읽기는 I/O 작업 스레드에서 수행하고 가장 최근 요청의 결과만 적용."""
         print(f"CORE: 트리뷰 로드 요청: ID='{item_id}', Tags={tags}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(ignore_loading=True, ignore_generation=True): return # 로드 중 다른 항목 선택, 생성 중 다른 챕터로 이동은 허용
         if not self._check_and_handle_unsaved_changes("다른 항목 로드"): return
 
         is_novel = 'novel' in tags
@@ -841,9 +1004,9 @@ class AppCore:
         try:
             if is_scene:
                 scene_path = item_id # Path to XXX.txt
-                if not scene_path or not isinstance(scene_path, str) or not os.path.isfile(scene_path):
+                if not scene_path or not isinstance(scene_path, str) or not file_handler.path_is_file(scene_path):
                      self.gui_manager.show_message("error", "로드 오류", f"선택된 장면 파일 경로가 유효하지 않습니다:\n{scene_path}\n목록을 새로고침합니다.")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 chapter_dir = os.path.dirname(scene_path)
                 novel_dir = os.path.dirname(chapter_dir)
@@ -852,162 +1015,234 @@ class AppCore:
 
                 if scene_num < 0:
                      self.gui_manager.show_message("error", "로드 오류", f"장면 번호 확인 실패:\n{scene_path}")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 print(f"CORE: 장면 로드 시도: '{os.path.basename(scene_path)}' (챕터: '{os.path.basename(chapter_dir)}', 소설: '{novel_name}')")
 
-                if not os.path.isdir(chapter_dir) or not os.path.isdir(novel_dir):
+                if not file_handler.path_is_dir(chapter_dir) or not file_handler.path_is_dir(novel_dir):
                      self.gui_manager.show_message("error", "로드 오류", f"장면의 상위 폴더 경로가 유효하지 않습니다.\n목록을 새로고침합니다.")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 # --- Scene Load ---
                 preserve_novel = (self.current_novel_dir and os.path.normpath(self.current_novel_dir) == os.path.normpath(novel_dir))
                 preserve_chapter = (self.current_chapter_arc_dir and os.path.normpath(self.current_chapter_arc_dir) == os.path.normpath(chapter_dir))
+                cached_novel_settings = self.current_novel_settings if preserve_novel else None
+                cached_chapter_arc_settings = self.current_loaded_chapter_arc_settings if preserve_chapter else None
 
                 self.clear_output_panel()
-                if not preserve_chapter: self.clear_chapter_arc_and_scene_fields()
-                if not preserve_novel: self.clear_settings_panel_novel_fields()
-
-                # Load Novel Settings
-                loaded_novel_settings = self.current_novel_settings if preserve_novel else file_handler.load_novel_settings(novel_dir)
-                if not preserve_novel:
-                     self.current_novel_name = novel_name
-                     self.current_novel_dir = novel_dir
-                     print(f"CORE: 새 소설 설정 로드: {novel_name}")
-
-                # Load Chapter Arc Settings
-                loaded_chapter_arc_settings = self.current_loaded_chapter_arc_settings if preserve_chapter else file_handler.load_chapter_settings(chapter_dir)
-                if not preserve_chapter:
-                     self.current_chapter_arc_dir = chapter_dir
-                     print(f"CORE: 새 챕터 아크 설정 로드: {os.path.basename(chapter_dir)}")
-
-                # Load Scene Settings and Content
-                print(f"CORE: 장면 설정 및 내용 로드: {os.path.basename(scene_path)}")
-                loaded_scene_settings = file_handler.load_scene_settings(chapter_dir, scene_num)
-                scene_content = file_handler.load_scene_content(chapter_dir, scene_num)
-
-                # === 모델 유효성 검사 및 조정 ===
-                saved_model = loaded_scene_settings.get('selected_model')
-                if saved_model and saved_model in self.available_models:
-                    # 저장된 모델이 현재 API에서 유효하면 사용
-                    if saved_model != self.selected_model:
-                         print(f"CORE INFO: 로드된 장면 설정에서 모델 변경: {self.selected_model} -> {saved_model}")
-                         self.handle_model_change(saved_model) # AppCore 상태 업데이트
-                else:
-                    # 저장된 모델이 없거나 현재 API에서 유효하지 않으면 현재 세션 모델 유지
-                    print(f"CORE INFO: 로드된 장면 모델('{saved_model}') 사용 불가 또는 없음. 현재 세션 모델('{self.selected_model}') 유지.")
-                    loaded_scene_settings['selected_model'] = self.selected_model # 로드된 설정에 현재 모델 반영
-                # === 모델 유효성 검사 끝 ===
-
-                # Update state
-                self.current_scene_path = scene_path
-
-                # Populate UI (로드된/조정된 데이터 사용)
-                self.populate_settings_panel(loaded_novel_settings, loaded_chapter_arc_settings, loaded_scene_settings)
-                self.display_output_content(scene_content, loaded_scene_settings.get(constants.TOKEN_INFO_KEY))
-                self.update_window_title()
-
-                # 로드 시에는 재생성 컨텍스트 업데이트 필요: 해당 장면 이전까지의 내용 로드
-                print(f"CORE: 재생성 컨텍스트 업데이트용 이전 내용 로드 중 (챕터: '{os.path.basename(chapter_dir)}', 기준: {scene_num}화)")
-                prev_content_for_regen_context = file_handler.load_previous_scenes_in_chapter(chapter_dir, scene_num)
-                self.last_generation_previous_content = prev_content_for_regen_context if prev_content_for_regen_context is not None else ""
-                # self.last_generation_settings_snapshot 은 로드 시에는 초기화하는 것이 나을 수 있음.
-                # 또는 로드된 설정으로 업데이트. 여기서는 일단 None으로.
-                self.last_generation_settings_snapshot = None
-
+                self.current_scene_path = None
+                if not preserve_chapter: self.clear_chapter_arc_and_scene_fields(); self.current_chapter_arc_dir = None
+                if not preserve_novel: self.clear_settings_panel_novel_fields(); self.current_novel_name = None; self.current_novel_dir = None
+
+                def _read_scene():
+                    # I/O 작업 스레드에서 실행: 파일 읽기만 수행 (UI/상태 변경 금지)
+                    return {
+                        'novel': cached_novel_settings if cached_novel_settings is not None else file_handler.load_novel_settings(novel_dir),
+                        'chapter': cached_chapter_arc_settings if cached_chapter_arc_settings is not None else file_handler.load_chapter_settings(chapter_dir),
+                        'scene': file_handler.load_scene_settings(chapter_dir, scene_num),
+                        'content': file_handler.load_scene_content(chapter_dir, scene_num),
+                        'previous': file_handler.load_previous_scenes_in_chapter(chapter_dir, scene_num),
+                    }
+
+                def _apply_scene(data):
+                    loaded_novel_settings = data['novel']
+                    loaded_chapter_arc_settings = data['chapter']
+                    loaded_scene_settings = data['scene']
+                    self.current_novel_name = novel_name
+                    self.current_novel_dir = novel_dir
+                    self.current_chapter_arc_dir = chapter_dir
+                    if not preserve_novel: print(f"CORE: 새 소설 설정 로드: {novel_name}")
+                    if not preserve_chapter: print(f"CORE: 새 챕터 아크 설정 로드: {os.path.basename(chapter_dir)}")
+
+                    # === 모델 유효성 검사 및 조정 ===
+                    saved_model = loaded_scene_settings.get('selected_model')
+                    if saved_model and saved_model in self.available_models:
+                        # 저장된 모델이 현재 API에서 유효하면 사용
+                        if saved_model != self.selected_model:
+                             print(f"CORE INFO: 로드된 장면 설정에서 모델 변경: {self.selected_model} -> {saved_model}")
+                             self.handle_model_change(saved_model) # AppCore 상태 업데이트
+                    else:
+                        # 저장된 모델이 없거나 현재 API에서 유효하지 않으면 현재 세션 모델 유지
+                        print(f"CORE INFO: 로드된 장면 모델('{saved_model}') 사용 불가 또는 없음. 현재 세션 모델('{self.selected_model}') 유지.")
+                        loaded_scene_settings['selected_model'] = self.selected_model # 로드된 설정에 현재 모델 반영
+                    # === 모델 유효성 검사 끝 ===
+
+                    # Update state
+                    self.current_scene_path = scene_path
+
+                    # Populate UI (로드된/조정된 데이터 사용)
+                    self.populate_settings_panel(loaded_novel_settings, loaded_chapter_arc_settings, loaded_scene_settings)
+                    self.display_output_content(data['content'], loaded_scene_settings.get(constants.TOKEN_INFO_KEY))
+                    self.update_window_title()
+
+                    # 로드 시에는 재생성 컨텍스트 업데이트 필요: 해당 장면 이전까지의 내용 (작업 스레드에서 미리 읽음)
+                    self.last_generation_previous_content = data['previous'] if data['previous'] is not None else ""
+                    # self.last_generation_settings_snapshot 은 로드 시에는 초기화하는 것이 나을 수 있음.
+                    # 또는 로드된 설정으로 업데이트. 여기서는 일단 None으로.
+                    self.last_generation_settings_snapshot = None
+
+                    ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
+                    status_suffix = " (설정 로드됨)" # 설정 파일은 항상 존재하거나 생성되므로
+                    self.update_ui_status_and_state(f"✅ [{self.current_novel_name}] {ch_str} - {scene_num:03d} 장면 불러옴{status_suffix}.",
+                                                    generating=False, novel_loaded=True, chapter_loaded=True, scene_loaded=True)
 
                 ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
-                status_suffix = " (설정 로드됨)" # 설정 파일은 항상 존재하거나 생성되므로
-                self.update_ui_status_and_state(f"✅ [{self.current_novel_name}] {ch_str} - {scene_num:03d} 장면 불러옴{status_suffix}.",
-                                                generating=False, novel_loaded=True, chapter_loaded=True, scene_loaded=True)
+                self._start_tree_load(f"[{novel_name}] {ch_str} - {scene_num:03d} 장면", _read_scene, _apply_scene, item_id)
 
             elif is_chapter:
                 chapter_dir = item_id
-                if not chapter_dir or not isinstance(chapter_dir, str) or not os.path.isdir(chapter_dir):
+                if not chapter_dir or not isinstance(chapter_dir, str) or not file_handler.path_is_dir(chapter_dir):
                      self.gui_manager.show_message("error", "로드 오류", f"선택된 챕터 폴더 경로가 유효하지 않습니다:\n{chapter_dir}\n목록을 새로고침합니다.")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 novel_dir = os.path.dirname(chapter_dir)
                 novel_name = os.path.basename(novel_dir)
                 print(f"CORE: 챕터 폴더 로드 시도: '{os.path.basename(chapter_dir)}' (소설: '{novel_name}')")
 
-                if not os.path.isdir(novel_dir):
+                if not file_handler.path_is_dir(novel_dir):
                      self.gui_manager.show_message("error", "로드 오류", f"챕터 폴더의 상위 소설 폴더를 찾을 수 없습니다:\n{novel_dir}\n목록을 새로고침합니다.")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 preserve_novel = (self.current_novel_dir and os.path.normpath(self.current_novel_dir) == os.path.normpath(novel_dir))
+                cached_novel_settings = self.current_novel_settings if preserve_novel else None
 
                 self.clear_output_panel()
                 self.clear_chapter_arc_and_scene_fields()
                 self.current_scene_path = None
+                self.current_chapter_arc_dir = None
                 self.current_loaded_scene_settings = {}
                 self.last_generation_previous_content = None
                 self.last_generation_settings_snapshot = None
-                if not preserve_novel: self.clear_settings_panel_novel_fields()
+                if not preserve_novel: self.clear_settings_panel_novel_fields(); self.current_novel_name = None; self.current_novel_dir = None
 
-                loaded_novel_settings = self.current_novel_settings if preserve_novel else file_handler.load_novel_settings(novel_dir)
-                if not preserve_novel:
-                     self.current_novel_name = novel_name
-                     self.current_novel_dir = novel_dir
-                     print(f"CORE: 새 소설 설정 로드: {novel_name}")
+                def _read_chapter():
+                    return {
+                        'novel': cached_novel_settings if cached_novel_settings is not None else file_handler.load_novel_settings(novel_dir),
+                        'chapter': file_handler.load_chapter_settings(chapter_dir),
+                    }
 
-                print(f"CORE: 챕터 아크 설정 로드: {os.path.basename(chapter_dir)}")
-                loaded_chapter_arc_settings = file_handler.load_chapter_settings(chapter_dir)
+                def _apply_chapter(data):
+                    self.current_novel_name = novel_name
+                    self.current_novel_dir = novel_dir
+                    if not preserve_novel: print(f"CORE: 새 소설 설정 로드: {novel_name}")
+                    print(f"CORE: 챕터 아크 설정 로드: {os.path.basename(chapter_dir)}")
+                    self.current_chapter_arc_dir = chapter_dir
 
-                self.current_chapter_arc_dir = chapter_dir
+                    self.populate_settings_panel(data['novel'], data['chapter'], None)
+                    self.update_window_title()
 
-                self.populate_settings_panel(loaded_novel_settings, loaded_chapter_arc_settings, None)
-                self.update_window_title()
+                    ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
+                    status_suffix = " (아크 노트 로드됨)" # 설정 파일은 항상 존재하거나 생성됨
+                    self.update_ui_status_and_state(f"✅ [{self.current_novel_name}] {ch_str} 폴더 로드됨{status_suffix}. '새 장면' 가능.",
+                                                    generating=False, novel_loaded=True, chapter_loaded=True, scene_loaded=False)
 
-                ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
-                status_suffix = " (아크 노트 로드됨)" # 설정 파일은 항상 존재하거나 생성됨
-                self.update_ui_status_and_state(f"✅ [{self.current_novel_name}] {ch_str} 폴더 로드됨{status_suffix}. '새 장면' 가능.",
-                                                generating=False, novel_loaded=True, chapter_loaded=True, scene_loaded=False)
+                self._start_tree_load(f"[{novel_name}] {self._get_chapter_number_str_from_folder(chapter_dir)}", _read_chapter, _apply_chapter, item_id)
 
             elif is_novel:
                 novel_name = item_id
                 novel_dir = os.path.join(constants.BASE_SAVE_DIR, novel_name)
                 print(f"CORE: 소설 로드 시도: {novel_name}")
 
-                if not os.path.isdir(novel_dir):
+                if not file_handler.path_is_dir(novel_dir):
                      self.gui_manager.show_message("error", "로드 오류", f"소설 폴더를 찾을 수 없습니다:\n{novel_dir}")
-                     self.clear_all_ui_state(); self.refresh_treeview_data(); return
+                     self._cancel_tree_load(); self.clear_all_ui_state(); self.refresh_treeview_data(); return
 
                 self.clear_all_ui_state()
 
-                loaded_novel_settings = file_handler.load_novel_settings(novel_dir)
+                def _read_novel():
+                    return {'novel': file_handler.load_novel_settings(novel_dir)}
 
-                self.current_novel_name = novel_name
-                self.current_novel_dir = novel_dir
-                self.current_chapter_arc_dir = None
-                self.current_scene_path = None
-                self.current_loaded_chapter_arc_settings = {}
-                self.current_loaded_scene_settings = {}
-                self.last_generation_previous_content = None
-                self.last_generation_settings_snapshot = None
+                def _apply_novel(data):
+                    self.current_novel_name = novel_name
+                    self.current_novel_dir = novel_dir
+                    self.current_chapter_arc_dir = None
+                    self.current_scene_path = None
+                    self.current_loaded_chapter_arc_settings = {}
+                    self.current_loaded_scene_settings = {}
+                    self.last_generation_previous_content = None
+                    self.last_generation_settings_snapshot = None
 
-                self.populate_settings_panel(loaded_novel_settings, None, None)
-                self.update_window_title()
-                self.update_ui_status_and_state(f"✅ 소설 '{novel_name}' 로드됨. '새 챕터 폴더' 또는 트리뷰에서 챕터/장면 선택 가능.",
-                                                generating=False, novel_loaded=True, chapter_loaded=False, scene_loaded=False)
+                    self.populate_settings_panel(data['novel'], None, None)
+                    self.update_window_title()
+                    self.update_ui_status_and_state(f"✅ 소설 '{novel_name}' 로드됨. '새 챕터 폴더' 또는 트리뷰에서 챕터/장면 선택 가능.",
+                                                    generating=False, novel_loaded=True, chapter_loaded=False, scene_loaded=False)
+
+                self._start_tree_load(f"소설 '{novel_name}'", _read_novel, _apply_novel, item_id)
 
             else:
                 print(f"CORE WARN: 알 수 없는 타입의 트리 아이템 로드 시도: {item_id}")
+                self._cancel_tree_load()
                 self.clear_all_ui_state()
                 self.update_status_bar("알 수 없는 항목입니다.")
+                self.select_treeview_item(item_id)
 
-            self.select_treeview_item(item_id)
+        except Exception as e:
+            print(f"CORE ERROR: 항목 로드 중 오류: {e}")
+            traceback.print_exc()
+            self._cancel_tree_load()
+            self.gui_manager.show_message("error", "로드 오류", f"항목 로드 중 오류 발생:\n{e}")
+            self.clear_all_ui_state()
 
+    def _start_tree_load(self, description, read_func, apply_func, item_id):
+        """트리 항목 읽기를 I/O 작업 스레드에 제출. 세대 번호로 가장 최근 요청의 결과만 메인 스레드에서 적용."""
+        self._tree_load_generation += 1
+        generation = self._tree_load_generation
+        if self._tree_load_future is not None:
+            self._tree_load_future.cancel() # 아직 시작 안 된 이전 요청은 취소 (실행 중이면 결과만 무시됨)
+
+        self.is_loading_item = True
+        if self.gui_manager.output_panel:
+            self.gui_manager.output_panel.show_loading_message(f"⏳ {description} 불러오는 중...")
+        self.update_status_bar(f"⏳ {description} 불러오는 중...")
+        self.update_ui_state()
+
+        future = self._submit_background_job(self.pools.io, f"{description} 불러오기", read_func)
+        if future is None:
+            self.is_loading_item = False
+            self.update_ui_state()
+            return
+        self._tree_load_future = future
+
+        def _on_done(done_future):
+            # 작업 스레드에서 호출됨 -> 메인 스레드로 전달 (같은 프레임에 끝난 이전 로드는 최신 것으로 대체)
+            self.ui_dispatcher.post(self._finish_tree_load, generation, done_future, apply_func, item_id, key="tree_load")
+        future.add_done_callback(_on_done)
+
+    def _finish_tree_load(self, generation, future, apply_func, item_id):
+        """I/O 작업 완료 후 메인 스레드에서 결과 적용 (더 최근 요청이 있으면 무시)"""
+        if generation != self._tree_load_generation or future.cancelled():
+            print(f"CORE: 이전 로드 결과 무시 (요청 #{generation}, 최신 #{self._tree_load_generation})")
+            return
+        self._tree_load_future = None
+        self.is_loading_item = False
+        highlight = self._pending_search_highlight
+        self._pending_search_highlight = None
+        self._streamed_generation_token = None # 생성 중인 챕터로 돌아오면 미리보기를 처음부터 다시 표시
+        try:
+            apply_func(future.result())
+            self.select_treeview_item(item_id)
+            if highlight and highlight[0] == item_id and self.gui_manager.output_panel:
+                self.gui_manager.output_panel.highlight_search_hit(highlight[1], highlight[2])
         except Exception as e:
             print(f"CORE ERROR: 항목 로드 중 오류: {e}")
             traceback.print_exc()
             self.gui_manager.show_message("error", "로드 오류", f"항목 로드 중 오류 발생:\n{e}")
             self.clear_all_ui_state()
 
+    def _cancel_tree_load(self):
+        """진행 중인 트리 항목 로드 무효화 (결과 적용 안 함)"""
+        self._tree_load_generation += 1
+        if self._tree_load_future is not None:
+            self._tree_load_future.cancel()
+            self._tree_load_future = None
+        if self.is_loading_item:
+            self.is_loading_item = False
+            self.update_ui_state()
+
     def handle_rename_chapter_request(self, chapter_path):
         """챕터 폴더 이름 변경 요청 처리"""
         print(f"CORE: 챕터 폴더 이름 변경 요청: {chapter_path}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(target=chapter_path): return # Check before proceeding
         if not chapter_path or not isinstance(chapter_path, str) or not os.path.isdir(chapter_path):
             self.gui_manager.show_message("error", "오류", f"변경할 챕터 폴더 경로가 유효하지 않습니다:\n{chapter_path}")
             self.refresh_treeview_data(); return
@@ -1058,7 +1293,7 @@ class AppCore:
     def handle_delete_chapter_request(self, chapter_path):
         """챕터 폴더 삭제 요청 처리"""
         print(f"CORE: 챕터 폴더 삭제 요청: {chapter_path}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(target=chapter_path): return # Check before proceeding
         if not chapter_path or not isinstance(chapter_path, str):
             self.gui_manager.show_message("error", "오류", f"삭제할 챕터 폴더 경로 정보가 유효하지 않습니다:\n{chapter_path}")
             self.refresh_treeview_data(); return
@@ -1068,7 +1303,7 @@ class AppCore:
         try: novel_name_of_deleted = os.path.basename(os.path.dirname(chapter_path))
         except Exception: novel_name_of_deleted = "?"
 
-        del_msg = f"챕터 폴더 '{chapter_name_display}' ({chapter_folder_name})을(를) 삭제하시겠습니까?\n\n⚠️ 경고: 폴더 내 모든 장면과 설정이 영구 삭제되며 복구할 수 없습니다!"
+        del_msg = f"챕터 폴더 '{chapter_name_display}' ({chapter_folder_name})을(를) 삭제하시겠습니까?\n\n{self._get_trash_notice()}"
         was_current_chapter_or_scene = False
         if self.current_chapter_arc_dir and os.path.normpath(chapter_path) == os.path.normpath(self.current_chapter_arc_dir):
              was_current_chapter_or_scene = True
@@ -1120,10 +1355,43 @@ class AppCore:
             self.gui_manager.show_message("error", "삭제 오류", f"챕터 폴더 삭제 중 오류 발생:\n{message}")
             self.refresh_treeview_data()
 
+    def handle_scene_history_request(self, scene_path):
+        """장면 버전 기록 대화상자 표시 및 선택한 버전 복원"""
+        print(f"CORE: 장면 버전 기록 요청: {scene_path}")
+        if self.check_busy_and_warn(target=scene_path): return
+        if not self.gui_manager: return
+        if not scene_path or not file_handler.path_is_file(scene_path):
+            self.gui_manager.show_message("error", "오류", "장면 파일 경로가 유효하지 않습니다.")
+            return
+        chapter_dir = os.path.dirname(scene_path)
+        scene_num = self._get_scene_number_from_path(scene_path)
+        if scene_num < 1:
+            self.gui_manager.show_message("error", "오류", f"장면 번호 확인 실패: {scene_path}")
+            return
+        versions = file_handler.list_scene_versions(chapter_dir, scene_num)
+        if not versions:
+            self.gui_manager.show_message("info", "버전 기록", "이 장면에 기록된 버전이 없습니다.\n(장면을 생성하거나 저장하면 버전이 기록됩니다.)")
+            return
+
+        ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
+        restore_index = gui_dialogs.show_scene_history_dialog(
+            self.gui_manager.root, f"[{self.current_novel_name or os.path.basename(os.path.dirname(chapter_dir))}] {ch_str} - {scene_num:03d} 장면",
+            versions, lambda index_a, index_b: file_handler.diff_scene_versions(chapter_dir, scene_num, index_a, index_b))
+        if restore_index is None: return
+
+        if scene_path == self.current_scene_path and not self._check_and_handle_unsaved_changes("버전 복원"): return
+        success, message = file_handler.restore_scene_version(chapter_dir, scene_num, restore_index)
+        if not success:
+            self.gui_manager.show_message("error", "버전 복원 실패", message)
+            return
+        self.update_status_bar(f"🕘 {message}")
+        if scene_path == self.current_scene_path:
+            self.handle_tree_load_request(scene_path, ('scene',)) # 복원된 내용/설정 다시 로드
+
     def handle_delete_scene_request(self, scene_path):
         """장면 파일 삭제 요청 처리"""
         print(f"CORE: 장면 삭제 요청: {scene_path}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(target=scene_path): return # Check before proceeding
         if not scene_path or not isinstance(scene_path, str):
              self.gui_manager.show_message("error", "오류", "삭제할 장면 경로 정보가 유효하지 않습니다.")
              self.refresh_treeview_data(); return
@@ -1142,7 +1410,7 @@ class AppCore:
              self.gui_manager.show_message("error", "오류", f"장면 번호 확인 실패: {scene_path}")
              return
 
-        del_msg = f"장면 '{scene_name_display}' ({scene_filename})을(를) 삭제하시겠습니까?\n(in {chapter_name})\n\n⚠️ 경고: 이 작업은 복구할 수 없습니다!"
+        del_msg = f"장면 '{scene_name_display}' ({scene_filename})을(를) 삭제하시겠습니까?\n(in {chapter_name})\n\n{self._get_trash_notice()}"
         was_current_scene = False
         if scene_path == self.current_scene_path:
              was_current_scene = True
@@ -1187,7 +1455,7 @@ class AppCore:
     def handle_rename_novel_request(self, novel_name):
         """소설 이름 변경 요청 처리"""
         print(f"CORE: 소설 이름 변경 요청: {novel_name}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(target=os.path.join(constants.BASE_SAVE_DIR, novel_name)): return # Check before proceeding
         if not novel_name or not isinstance(novel_name, str):
             self.gui_manager.show_message("error", "오류", f"변경할 소설 이름 정보가 유효하지 않습니다: '{novel_name}'")
             self.refresh_treeview_data(); return
@@ -1236,10 +1504,38 @@ class AppCore:
         else:
             self.gui_manager.show_message("error", "이름 변경 실패", message)
 
+    def handle_fork_novel_request(self, novel_name):
+        """소설 포크 요청 처리 (변경되지 않은 파일은 원본과 공유)"""
+        print(f"CORE: 소설 포크 요청: {novel_name}")
+        if self.check_busy_and_warn(target=os.path.join(constants.BASE_SAVE_DIR, novel_name)): return
+        if not novel_name or not isinstance(novel_name, str):
+            self.gui_manager.show_message("error", "오류", f"포크할 소설 이름 정보가 유효하지 않습니다: '{novel_name}'")
+            self.refresh_treeview_data(); return
+
+        source_path = os.path.join(constants.BASE_SAVE_DIR, novel_name)
+        if file_handler.is_pack_path(source_path) or not os.path.isdir(source_path):
+            self.gui_manager.show_message("error", "오류", f"포크할 소설 폴더를 찾을 수 없습니다:\n{source_path}\n(소설 팩은 포크할 수 없습니다.)")
+            return
+        # 로드된 소설이면 미저장 변경사항을 먼저 처리해야 포크에 반영됨
+        if self.current_novel_dir and os.path.normpath(source_path) == os.path.normpath(self.current_novel_dir):
+            if not self._check_and_handle_unsaved_changes("소설 포크"): return
+
+        new_name_input = gui_dialogs.show_rename_dialog(self.gui_manager.root, "소설 포크",
+                                                       f"'{novel_name}'에서 갈라져 나올 새 소설 이름 입력:", f"{novel_name}_fork")
+        if new_name_input is None: print("CORE: 소설 포크 취소됨."); return
+
+        success, message, new_path = file_handler.fork_novel(source_path, new_name_input)
+        if success:
+            self.update_status_bar(f"🍴 {message}")
+            self.refresh_treeview_data()
+            self.select_treeview_item(os.path.basename(new_path))
+        else:
+            self.gui_manager.show_message("error", "포크 실패", message)
+
     def handle_delete_novel_request(self, novel_name):
         """소설 삭제 요청 처리"""
         print(f"CORE: 소설 삭제 요청: {novel_name}")
-        if self.check_busy_and_warn(): return # Check before proceeding
+        if self.check_busy_and_warn(target=os.path.join(constants.BASE_SAVE_DIR, novel_name)): return # Check before proceeding
         if not novel_name or not isinstance(novel_name, str):
             self.gui_manager.show_message("error", "오류", f"삭제할 소설 이름 정보가 유효하지 않습니다: '{novel_name}'")
             self.refresh_treeview_data(); return
@@ -1250,7 +1546,7 @@ class AppCore:
 
         was_loaded = (self.current_novel_dir and os.path.normpath(novel_path) == os.path.normpath(self.current_novel_dir))
 
-        del_msg = f"소설 '{novel_name}'을(를) 삭제하시겠습니까?\n\n⚠️ 경고: 소설 폴더 내 모든 챕터 폴더와 파일이 영구 삭제되며 복구할 수 없습니다!"
+        del_msg = f"소설 '{novel_name}'을(를) 삭제하시겠습니까?\n\n{self._get_trash_notice()}"
         if was_loaded:
             del_msg += "\n\n(현재 로드된 소설입니다. 삭제 시 작업 내용이 초기화됩니다.)"
             # Check all potentially unsaved changes if deleting loaded novel
@@ -1290,15 +1586,22 @@ class AppCore:
         if self.check_busy_and_warn(): return # Check before scheduling save
         if not self.current_novel_dir: return
 
-        print("CORE DEBUG: 소설 설정 변경 감지됨. 저장 예약.")
-        self.novel_settings_modified_flag = True
-        self.update_ui_state() # Update save button state etc.
-
         if self._novel_settings_after_id and self.gui_manager and self.gui_manager.root:
             try: self.gui_manager.root.after_cancel(self._novel_settings_after_id)
             except Exception: pass
             self._novel_settings_after_id = None
 
+        # 수정 여부는 저장된 내용과의 해시 비교로 결정 (원래대로 되돌리면 저장 안 함)
+        novel_text = self.gui_manager.settings_panel.get_novel_settings() if self.gui_manager and self.gui_manager.settings_panel else None
+        if novel_text is not None and file_handler.is_novel_settings_unchanged(self.current_novel_dir, {constants.NOVEL_MAIN_SETTINGS_KEY: novel_text}):
+            self.novel_settings_modified_flag = False
+            self.update_ui_state()
+            return
+
+        print("CORE DEBUG: 소설 설정 변경 감지됨. 저장 예약.")
+        self.novel_settings_modified_flag = True
+        self.update_ui_state() # Update save button state etc.
+
         if self.gui_manager and self.gui_manager.root:
             save_delay_ms = 1500
             self._novel_settings_after_id = self.gui_manager.root.after(save_delay_ms, self._save_current_novel_settings)
@@ -1309,17 +1612,26 @@ class AppCore:
         if self.check_busy_and_warn(): return # Check before scheduling save
         if not self.current_chapter_arc_dir: return
 
+        if self._arc_settings_after_id and self.gui_manager and self.gui_manager.root:
+            try: self.gui_manager.root.after_cancel(self._arc_settings_after_id)
+            except Exception: pass
+            self._arc_settings_after_id = None
+
+        # 수정 여부는 저장된 내용과의 해시 비교로 결정 (원래대로 되돌리면 저장 안 함)
+        arc_widget = self.gui_manager.settings_panel.widgets.get('chapter_arc_notes_text') if self.gui_manager and self.gui_manager.settings_panel else None
+        if arc_widget and arc_widget.winfo_exists():
+            arc_text = arc_widget.get("1.0", "end-1c").strip()
+            if file_handler.is_chapter_settings_unchanged(self.current_chapter_arc_dir, {constants.CHAPTER_ARC_NOTES_KEY: arc_text}):
+                self.arc_settings_modified_flag = False
+                self.update_ui_state()
+                return
+
         print("CORE DEBUG: 챕터 아크 노트 변경 감지됨. 저장 예약.")
         self.arc_settings_modified_flag = True
         # Also trigger combined flag in SettingsPanel
         self._trigger_chapter_settings_modified_in_gui()
         # self.update_ui_state() is called within _trigger...
 
-        if self._arc_settings_after_id and self.gui_manager and self.gui_manager.root:
-            try: self.gui_manager.root.after_cancel(self._arc_settings_after_id)
-            except Exception: pass
-            self._arc_settings_after_id = None
-
         if self.gui_manager and self.gui_manager.root:
             save_delay_ms = 1500
             self._arc_settings_after_id = self.gui_manager.root.after(save_delay_ms, self._save_current_chapter_arc_settings)
@@ -1334,11 +1646,12 @@ class AppCore:
              # Check internal Tk modified flag as well
              output_widget = self.gui_manager.output_panel.widgets.get('output_text') if self.gui_manager and self.gui_manager.output_panel else None
              if output_widget and output_widget.edit_modified():
-                 self.output_text_modified = True
+                 content = self.gui_manager.output_panel.get_content()
+                 # 수정 여부는 마지막으로 읽거나 쓴 장면 파일과의 해시 비교로 결정 (되돌리면 자동 해제)
+                 scene_num = self._get_scene_number_from_path(self.current_scene_path)
+                 self.output_text_modified = not file_handler.is_scene_content_unchanged(os.path.dirname(self.current_scene_path), scene_num, content)
                  self.update_ui_state()
-                 if self.gui_manager and self.gui_manager.output_panel:
-                     content = self.gui_manager.output_panel.get_content()
-                     self.gui_manager.output_panel.update_char_count_display(content)
+                 self.gui_manager.output_panel.update_char_count_display(content)
                  # Reset Tk flag after handling
                  output_widget.edit_modified(False)
 
@@ -1531,14 +1844,941 @@ class AppCore:
             traceback.print_exc()
             if self.gui_manager: self.gui_manager.show_message("error", "폴더 열기 오류", f"폴더를 여는 중 오류 발생:\n{e}")
 
+    # --- 저장소 가져오기/내보내기 ---
+    def handle_export_sqlite_request(self):
+        """모든 소설을 SQLite DB 파일로 내보내기 (기존 DB의 같은 소설은 덮어씀)"""
+        if self.check_busy_and_warn(target=constants.BASE_SAVE_DIR): return
+        if not self.gui_manager: return
+        if not self._check_and_handle_unsaved_changes("SQLite DB 내보내기"): return
+
+        db_path = gui_dialogs.show_save_file_dialog(self.gui_manager.root, "SQLite DB로 내보내기", ".db",
+                                                    constants.SQLITE_DB_FILETYPES, constants.SQLITE_DB_DEFAULT_FILENAME)
+        if not db_path: print("CORE: SQLite 내보내기 취소됨."); return
+
+        self._run_storage_copy(lambda: storage_backend.FolderStorage(constants.BASE_SAVE_DIR),
+                               lambda: storage_backend.SQLiteStorage(db_path),
+                               skip_existing=False, action_desc="SQLite 내보내기", refresh_tree=False)
+
+    def handle_import_sqlite_request(self):
+        """SQLite DB 파일의 소설들을 폴더 구조로 가져오기 (이미 있는 소설, 이름이 경로로 쓸 수 없는 소설은 건너뜀)"""
+        if self.check_busy_and_warn(target=constants.BASE_SAVE_DIR): return
+        if not self.gui_manager: return
+
+        db_path = gui_dialogs.show_open_file_dialog(self.gui_manager.root, "SQLite DB에서 가져오기", constants.SQLITE_DB_FILETYPES)
+        if not db_path: print("CORE: SQLite 가져오기 취소됨."); return
+
+        self._run_storage_copy(lambda: storage_backend.SQLiteStorage(db_path),
+                               lambda: storage_backend.FolderStorage(constants.BASE_SAVE_DIR),
+                               skip_existing=True, action_desc="SQLite 가져오기", refresh_tree=True)
+
+    def _run_storage_copy(self, open_source, open_target, skip_existing, action_desc, refresh_tree):
+        """저장소 생성 함수를 받아 저장소 간 복사를 io 풀에서 실행 (끝날 때까지 다른 편집/저장 작업은 대기)"""
+        self._bulk_file_job = action_desc
+        self.update_status_bar(f"⏳ {action_desc} 중...")
+        self.update_ui_state()
+
+        def _copy_thread():
+            opened = []
+            try:
+                source = open_source(); opened.append(source)
+                target = open_target(); opened.append(target)
+                success, message = storage_backend.copy_novels(source, target, skip_existing=skip_existing)
+            except Exception as e:
+                print(f"CORE ERROR: {action_desc} 실패: {e}")
+                traceback.print_exc()
+                success, message = False, f"{action_desc} 중 오류 발생:\n{e}"
+            finally:
+                for storage in opened: storage.close()
+            self.ui_dispatcher.post(self._finish_storage_copy, success, message, action_desc, refresh_tree)
+        if self._submit_background_job(self.pools.io, action_desc, _copy_thread) is None:
+            self._bulk_file_job = None
+            self.update_ui_state()
+
+    def _finish_storage_copy(self, success, message, action_desc, refresh_tree):
+        """저장소 복사 결과 표시 (메인 스레드)"""
+        self._bulk_file_job = None
+        self.update_ui_state()
+        if refresh_tree: self.refresh_treeview_data()
+        if not self.gui_manager: return
+        if success:
+            self.update_status_bar(f"✅ {action_desc} 완료.")
+            self.gui_manager.show_message("info", f"{action_desc} 완료", message)
+        else:
+            self.update_status_bar(f"❌ {action_desc} 실패.")
+            self.gui_manager.show_message("error", f"{action_desc} 실패", message)
+
+    def handle_export_novel_pack_request(self):
+        """현재 소설을 단일 소설 팩(.novelpack) 파일로 내보내기"""
+        if self.check_busy_and_warn(): return
+        if not self.gui_manager: return
+        if not self.current_novel_dir or not self.current_novel_name:
+            self.gui_manager.show_message("info", "소설 팩 내보내기", "먼저 내보낼 소설을 로드해주세요.")
+            return
+        if self._is_current_novel_read_only():
+            self.gui_manager.show_message("info", "소설 팩 내보내기", "이미 소설 팩으로 열린 소설입니다.")
+            return
+        if not self._check_and_handle_unsaved_changes("소설 팩 내보내기"): return
+
+        pack_path = gui_dialogs.show_save_file_dialog(self.gui_manager.root, "소설 팩으로 내보내기", constants.NOVEL_PACK_EXTENSION,
+                                                      constants.NOVEL_PACK_FILETYPES, self.current_novel_name + constants.NOVEL_PACK_EXTENSION,
+                                                      initial_dir=os.path.realpath(constants.BASE_SAVE_DIR))
+        if not pack_path: print("CORE: 소설 팩 내보내기 취소됨."); return
+
+        self.update_status_bar("⏳ 소설 팩 내보내기 중...")
+        self.gui_manager.root.update_idletasks()
+        success, message = file_handler.export_novel_pack(self.current_novel_dir, pack_path)
+        if success:
+            self.update_status_bar(f"✅ {message}")
+            self.refresh_treeview_data() # 저장 폴더 안에 만든 팩은 트리뷰에 표시됨
+        else:
+            self.update_status_bar("❌ 소설 팩 내보내기 실패.")
+            self.gui_manager.show_message("error", "소설 팩 내보내기 실패", message)
+
+    def handle_export_manuscript_request(self):
+        """현재 소설을 TXT / Markdown / EPUB 원고 파일로 내보내기 (형식은 파일 확장자로 결정, 백그라운드 실행)"""
+        if self.check_busy_and_warn(): return
+        if not self.gui_manager: return
+        if not self.current_novel_dir or not self.current_novel_name:
+            self.gui_manager.show_message("info", "원고 내보내기", "먼저 내보낼 소설을 로드해주세요.")
+            return
+        if not self._check_and_handle_unsaved_changes("원고 내보내기"): return
+
+        output_path = gui_dialogs.show_save_file_dialog(self.gui_manager.root, "원고 내보내기 (TXT / Markdown / EPUB)", ".txt",
+                                                        constants.EXPORT_FILETYPES, self.current_novel_name + ".txt")
+        if not output_path: print("CORE: 원고 내보내기 취소됨."); return
+        if not novel_export.get_export_format(output_path):
+            self.gui_manager.show_message("error", "원고 내보내기", "지원하지 않는 형식입니다.\n파일 확장자를 .txt, .md, .epub 중 하나로 지정해주세요.")
+            return
+
+        novel_dir = self.current_novel_dir
+        self.update_status_bar(f"⏳ 원고 내보내기 중... ({os.path.basename(output_path)})")
+
+        def _export_thread():
+            success, message = novel_export.export_novel(novel_dir, output_path)
+            self.ui_dispatcher.post(self._finish_manuscript_export, success, message)
+        self._submit_background_job(self.pools.cpu, f"원고 내보내기: {os.path.basename(output_path)}", _export_thread)
+
+    def handle_import_manuscript_request(self):
+        """기존 원고(단일 텍스트 파일 또는 챕터 폴더)를 새 소설로 일괄 가져오기 (백그라운드 실행)"""
+        if self.check_busy_and_warn(): return
+        if not self.gui_manager: return
+        options = gui_dialogs.show_import_manuscript_dialog(self.gui_manager.root)
+        if not options: print("CORE: 원고 가져오기 취소됨."); return
+
+        self.update_status_bar(f"⏳ 원고 가져오기 중... ({os.path.basename(os.path.normpath(options['source']))})")
+
+        def _import_thread():
+            success, message, novel_dir = novel_import.import_manuscript(options["source"], options["name"],
+                                                                         options["chapter_pattern"], options["scene_separator"])
+            self.ui_dispatcher.post(self._finish_manuscript_import, success, message, novel_dir, options["summarize"])
+        self._submit_background_job(self.pools.cpu, f"원고 가져오기: {options['name'] or os.path.basename(os.path.normpath(options['source']))}", _import_thread)
+
+    def _finish_manuscript_import(self, success, message, novel_dir, summarize):
+        """원고 가져오기 결과 처리 (메인 스레드): 새 소설 선택, 요청 시 줄거리 요약 시작"""
+        if not self.gui_manager: return
+        if not success:
+            self.update_status_bar("❌ 원고 가져오기 실패.")
+            self.gui_manager.show_message("error", "원고 가져오기 실패", message)
+            return
+        self.update_status_bar(f"📥 {message}")
+        self.refresh_treeview_data()
+        if self._check_if_busy_status() or not self._check_and_handle_unsaved_changes("가져온 소설 열기"):
+            return # 작업 중이면 트리뷰에 추가만 하고 열지 않음
+        self.select_treeview_item(os.path.basename(novel_dir))
+        if summarize:
+            # 요약 결과는 로드된 소설에만 반영되므로 선택(로드) 후 시작
+            self.gui_manager.root.after_idle(self._trigger_summary_generation, novel_dir)
+
+    def _finish_manuscript_export(self, success, message):
+        """원고 내보내기 결과 표시 (메인 스레드)"""
+        if not self.gui_manager: return
+        if success:
+            self.update_status_bar(f"✅ {message.splitlines()[0]}")
+            if "\n" in message: self.gui_manager.show_message("warning", "원고 내보내기 완료", message)
+        else:
+            self.update_status_bar("❌ 원고 내보내기 실패.")
+            self.gui_manager.show_message("error", "원고 내보내기 실패", message)
+
+    def handle_find_replace_request(self):
+        """현재 소설 전체 찾아 바꾸기 (미리보기 후 적용, 마지막 한 번은 되돌리기 가능)"""
+        if self.check_busy_and_warn(target=self.current_novel_dir): return
+        if not self.gui_manager: return
+        if not self.current_novel_dir or not self.current_novel_name:
+            self.gui_manager.show_message("info", "찾아 바꾸기", "먼저 소설을 로드해주세요.")
+            return
+        if self._warn_if_read_only("찾아 바꾸기"): return
+        if not self._check_and_handle_unsaved_changes("찾아 바꾸기"): return
+        novel_dir = self.current_novel_dir
+
+        def _preview(find_text, on_done):
+            def _preview_thread():
+                # 검색 색인이 최신이면 후보 파일만 읽고, 아니면 소설 전체를 병렬로 읽음
+                candidates = None
+                if self.search_index and self.search_index.is_synced():
+                    candidates = self.search_index.candidate_paths(find_text, novel_dir)
+                rows = file_handler.preview_novel_replace(novel_dir, find_text, candidates)
+                self.ui_dispatcher.post(_show_rows, rows)
+            def _show_rows(rows):
+                for row in rows:
+                    row["label"] = self._describe_replace_target(row["path"], row["kind"])
+                on_done(rows)
+            if self._submit_background_job(self.pools.io, f"찾아 바꾸기 미리보기: {find_text}", _preview_thread) is None:
+                on_done([])
+
+        result = gui_dialogs.show_find_replace_dialog(self.gui_manager.root, self.current_novel_name, _preview)
+        if not result: print("CORE: 찾아 바꾸기 취소됨."); return
+        find_text, replace_text, paths = result
+        self._start_bulk_text_change("찾아 바꾸기", "찾아 바꾸기 실패", file_handler.replace_in_novel, novel_dir, find_text, replace_text, paths)
+
+    def handle_undo_replace_request(self):
+        """현재 소설의 마지막 찾아 바꾸기 되돌리기"""
+        if self.check_busy_and_warn(target=self.current_novel_dir): return
+        if not self.gui_manager: return
+        if not self.current_novel_dir:
+            self.gui_manager.show_message("info", "찾아 바꾸기 되돌리기", "먼저 소설을 로드해주세요.")
+            return
+        last_replace = file_handler.get_last_novel_replace(self.current_novel_dir)
+        if not last_replace:
+            self.gui_manager.show_message("info", "찾아 바꾸기 되돌리기", "되돌릴 찾아 바꾸기 기록이 없습니다.")
+            return
+        replaced_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(last_replace["created_at"]))
+        if not self.gui_manager.ask_yes_no("찾아 바꾸기 되돌리기",
+                                           f"'{last_replace['find']}' -> '{last_replace['replace']}' ({replaced_at}, 파일 {last_replace['file_count']}개)\n"
+                                           f"찾아 바꾸기를 되돌리시겠습니까?\n(이후 다시 편집된 파일은 건너뜁니다.)"):
+            return
+        if not self._check_and_handle_unsaved_changes("찾아 바꾸기 되돌리기"): return
+
+        self._start_bulk_text_change("찾아 바꾸기 되돌리기", "되돌리기 실패", file_handler.undo_last_novel_replace, self.current_novel_dir)
+
+    def handle_token_totals_request(self):
+        """현재 소설의 토큰 사용량 합계 표시"""
+        if not self.gui_manager: return
+        if not self.current_novel_name:
+            self.gui_manager.show_message("info", "토큰 사용량", "먼저 소설을 선택해주세요.")
+            return
+        totals = storage_backend.FolderStorage(constants.BASE_SAVE_DIR).get_token_totals(self.current_novel_name)
+        input_tokens = totals[constants.INPUT_TOKEN_KEY]; output_tokens = totals[constants.OUTPUT_TOKEN_KEY]
+        self.gui_manager.show_message("info", "토큰 사용량",
+                                      f"[{self.current_novel_name}] 장면 {totals['scenes']:,}개\n"
+                                      f"입력 토큰: {input_tokens:,}\n출력 토큰: {output_tokens:,}\n"
+                                      f"합계: {input_tokens + output_tokens:,}")
+
+    def handle_archive_chapter_request(self, chapter_path):
+        """챕터 압축 보관 요청 처리 (장면 텍스트를 zstd로 압축)"""
+        print(f"CORE: 챕터 압축 보관 요청: {chapter_path}")
+        if self.check_busy_and_warn(target=chapter_path): return
+        if not self.gui_manager: return
+        if not file_handler.is_compression_available():
+            self.gui_manager.show_message("warning", "압축 불가", "'zstandard' 라이브러리가 설치되어 있지 않습니다.\n(pip install zstandard)")
+            return
+        if not chapter_path or not file_handler.path_is_dir(chapter_path) or file_handler.is_pack_path(chapter_path):
+            self.gui_manager.show_message("error", "오류", "압축할 챕터 폴더 경로가 유효하지 않습니다.")
+            return
+        # 현재 챕터의 미저장 변경사항은 먼저 처리 (압축 후 저장 시 자동 해제되므로 순서만 보장)
+        if self.current_chapter_arc_dir == chapter_path or (self.current_scene_path and os.path.dirname(self.current_scene_path) == chapter_path):
+            if not self._check_and_handle_unsaved_changes("챕터 압축 보관"): return
+
+        self.update_status_bar("⏳ 챕터 압축 보관 중...")
+        self.gui_manager.root.update_idletasks()
+        success, message = file_handler.archive_chapter(chapter_path, self.config.get(constants.CONFIG_ARCHIVE_USE_DICTIONARY_KEY, True))
+        if success:
+            self.update_status_bar(f"🗜️ {message}")
+        else:
+            self.update_status_bar("❌ 챕터 압축 보관 실패.")
+            self.gui_manager.show_message("error", "압축 보관 실패", message)
+        self.refresh_treeview_data()
+
+    def handle_unarchive_chapter_request(self, chapter_path):
+        """압축 보관된 챕터를 일반 텍스트로 복원"""
+        print(f"CORE: 챕터 압축 해제 요청: {chapter_path}")
+        if self.check_busy_and_warn(target=chapter_path): return
+        if not self.gui_manager: return
+        if not chapter_path or not file_handler.is_chapter_archived(chapter_path):
+            self.gui_manager.show_message("info", "압축 해제", "압축 보관된 챕터가 아닙니다.")
+            return
+
+        self.update_status_bar("⏳ 챕터 압축 해제 중...")
+        self.gui_manager.root.update_idletasks()
+        success, message = file_handler.unarchive_chapter(chapter_path)
+        if success:
+            self.update_status_bar(f"✅ {message}")
+        else:
+            self.update_status_bar("❌ 챕터 압축 해제 실패.")
+            self.gui_manager.show_message("error", "압축 해제 실패", message)
+        self.refresh_treeview_data()
+
+    def handle_create_branch_request(self, scene_path):
+        """선택한 장면부터 새 브랜치 생성 (이전 장면들은 기존 브랜치와 공유)"""
+        print(f"CORE: 브랜치 생성 요청: {scene_path}")
+        if self.check_busy_and_warn(target=os.path.dirname(scene_path)): return
+        if not self.gui_manager: return
+        if not scene_path or not file_handler.path_is_file(scene_path) or file_handler.is_pack_path(scene_path):
+            self.gui_manager.show_message("error", "오류", "브랜치를 만들 장면 경로가 유효하지 않습니다.")
+            return
+        chapter_dir = os.path.dirname(scene_path)
+        scene_num = self._get_scene_number_from_path(scene_path)
+        if scene_num < 1:
+            self.gui_manager.show_message("error", "오류", f"장면 번호 확인 실패: {scene_path}")
+            return
+        if not self._check_and_handle_unsaved_changes("브랜치 생성"): return
+
+        branch_name = gui_dialogs.show_rename_dialog(self.gui_manager.root, "새 브랜치",
+                                                     f"{scene_num:03d} 장면부터 갈라질 새 브랜치 이름 입력:\n({scene_num - 1}장면까지는 공유, 이후 장면은 새 브랜치에서 새로 작성)",
+                                                     f"branch_{scene_num:03d}")
+        if branch_name is None: print("CORE: 브랜치 생성 취소됨."); return
+
+        success, message = file_handler.create_chapter_branch(chapter_dir, branch_name, scene_num - 1)
+        if not success:
+            self.gui_manager.show_message("error", "브랜치 생성 실패", message)
+            return
+        self._after_branch_change(chapter_dir, message)
+
+    def handle_branch_dialog_request(self, chapter_dir):
+        """챕터 브랜치 대화상자 표시 및 전환/삭제 처리"""
+        print(f"CORE: 챕터 브랜치 관리 요청: {chapter_dir}")
+        if self.check_busy_and_warn(target=chapter_dir): return
+        if not self.gui_manager: return
+        active_branch, branches = file_handler.list_chapter_branches(chapter_dir)
+        if not branches:
+            self.gui_manager.show_message("info", "브랜치", "이 챕터에는 브랜치가 없습니다.\n(장면 메뉴의 '이 장면부터 새 브랜치...'로 만들 수 있습니다.)")
+            return
+        result = gui_dialogs.show_branch_dialog(self.gui_manager.root, self._get_chapter_number_str_from_folder(chapter_dir), active_branch, branches,
+                                                self._get_trash_notice())
+        if not result: return
+        action, branch_name = result
+
+        if action == "switch":
+            if branch_name == active_branch: return
+            if not self._check_and_handle_unsaved_changes("브랜치 전환"): return
+            success, message = file_handler.switch_chapter_branch(chapter_dir, branch_name)
+        else:
+            success, message = file_handler.delete_chapter_branch(chapter_dir, branch_name)
+        if not success:
+            self.gui_manager.show_message("error", "브랜치 작업 실패", message)
+            return
+        self._after_branch_change(chapter_dir, message)
+
+    def handle_search_request(self, query):
+        """트리뷰 검색창 처리: 빈 검색어면 전체 트리, 아니면 색인 검색 결과만 표시 (검색은 I/O 작업 스레드에서, 최근 검색어 우선)"""
+        if not self.gui_manager or not self.gui_manager.treeview_panel: return
+        query = (query or "").strip()
+        self._search_generation += 1
+        generation = self._search_generation
+        if not query:
+            self.gui_manager.treeview_panel.refresh_tree()
+            return
+        if self.search_index is None:
+            self.update_status_bar("❌ 검색 색인을 사용할 수 없습니다.")
+            return
+
+        started = time.perf_counter()
+        future = self._submit_background_job(self.pools.io, f"검색: {query}", self.search_index.search, query)
+        if future is None: return
+
+        def _on_done(done_future):
+            self.ui_dispatcher.post(self._finish_search, generation, query, done_future, started, key="search")
+        future.add_done_callback(_on_done)
+
+    def _finish_search(self, generation, query, future, started):
+        """검색 완료 후 메인 스레드에서 결과 표시 (더 최근 검색이 있으면 무시)"""
+        if generation != self._search_generation or future.cancelled(): return
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"CORE ERROR: 검색 중 오류: {e}")
+            traceback.print_exc()
+            self.update_status_bar(f"❌ 검색 오류: {e}")
+            return
+        self.gui_manager.treeview_panel.show_search_results(results)
+        line_count = sum(len(result["hits"]) for result in results)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.update_status_bar(f"🔍 '{query}': {len(results)}개 항목, {line_count}줄 일치 ({elapsed_ms:.0f}ms)")
+
+    def handle_search_hit_request(self, item_id, tags, line_no, query):
+        """검색 결과 줄 더블클릭: 해당 항목을 로드하고, 장면이면 그 줄로 이동해 검색어 강조"""
+        print(f"CORE: 검색 결과 이동 요청: {item_id} ({line_no}번째 줄)")
+        if 'scene' in tags:
+            if item_id == self.current_scene_path and not self.is_loading_item:
+                if self.gui_manager.output_panel:
+                    self.gui_manager.output_panel.highlight_search_hit(line_no, query)
+                return
+            self._pending_search_highlight = (item_id, line_no, query)
+        self.handle_tree_load_request(item_id, tags)
+
+    def handle_trash_request(self):
+        """휴지통 대화상자 표시 및 복원/영구 삭제 처리"""
+        if self.check_busy_and_warn(): return
+        if not self.gui_manager: return
+        items = file_handler.list_trash_items(constants.BASE_SAVE_DIR)
+        retention_days = self.config.get(constants.CONFIG_TRASH_RETENTION_DAYS_KEY, constants.DEFAULT_TRASH_RETENTION_DAYS)
+        result = gui_dialogs.show_trash_dialog(self.gui_manager.root, items, retention_days)
+        if not result: return
+        action, item_id = result
+
+        if action == "restore":
+            success, message = file_handler.restore_trash_item(constants.BASE_SAVE_DIR, item_id)
+            if success:
+                self.update_status_bar(f"♻️ {message}")
+                self.refresh_treeview_data()
+            else:
+                self.gui_manager.show_message("error", "복원 실패", message)
+        elif action in ("purge", "empty"):
+            item_ids = [item_id] if action == "purge" else None
+            self.update_status_bar("⏳ 휴지통 영구 삭제 중...")
+
+            def _purge_thread():
+                count = file_handler.purge_trash(constants.BASE_SAVE_DIR, item_ids=item_ids)
+                self.ui_dispatcher.post(self.update_status_bar, f"🗑️ 휴지통 항목 {count}개 영구 삭제 완료.")
+            self._submit_background_job(self.pools.io, "휴지통 영구 삭제", _purge_thread)
+
+    def handle_queue_new_scenes_request(self, chapter_dir):
+        """챕터의 새 장면 여러 개를 생성 작업 대기열에 추가 (장면 번호는 기존/대기 중인 장면 뒤로 이어서 배정)"""
+        print(f"CORE: 장면 일괄 생성 대기열 추가 요청: {chapter_dir}")
+        if not self.gui_manager: return
+        if not self._check_queue_target_writable(chapter_dir): return
+        novel_name = os.path.basename(os.path.dirname(chapter_dir))
+        chapter_folder = os.path.basename(chapter_dir)
+        try:
+            start_number = max(file_handler.get_next_scene_number(chapter_dir),
+                               self.generation_queue.next_new_scene_number(novel_name, chapter_folder))
+        except Exception as e:
+            self.gui_manager.show_message("error", "오류", f"다음 장면 번호 확인 중 오류 발생:\n{e}")
+            return
+        running_job = self._get_generation_job(chapter_dir)
+        if running_job and running_job["is_new_scene"]: start_number = max(start_number, running_job["scene_number"] + 1)
+
+        plots = gui_dialogs.show_queue_scenes_dialog(self.gui_manager.root, self._get_chapter_number_str_from_folder(chapter_dir), start_number)
+        if not plots: print("CORE: 장면 일괄 생성 대기열 추가 취소됨 (Dialog)."); return
+
+        # 길이/온도/모델은 현재 설정 패널 값 사용
+        gui_scene_settings = self._get_settings_from_gui(read_novel_settings=False, read_chapter_arc_settings=False, read_scene_settings=True)
+        job_inputs = []
+        for offset, plot in enumerate(plots):
+            scene_settings = dict(gui_scene_settings)
+            scene_settings[constants.SCENE_PLOT_KEY] = plot
+            job_inputs.append({"kind": generation_queue.KIND_NEW_SCENE, "novel_name": novel_name, "chapter_folder": chapter_folder,
+                               "scene_number": start_number + offset, "api_type": self.current_api_type, "scene_settings": scene_settings})
+        self.generation_queue.add_jobs(job_inputs)
+        self.update_status_bar(f"📋 생성 대기열에 장면 {len(plots)}개 추가됨 ({start_number:03d} ~ {start_number + len(plots) - 1:03d}).")
+        self._pump_generation_queue()
+
+    def handle_queue_regenerate_request(self, scene_path):
+        """장면 재생성을 생성 작업 대기열에 추가 (플롯은 확인/수정, 나머지 설정은 해당 장면의 저장된 값)"""
+        print(f"CORE: 재생성 대기열 추가 요청: {scene_path}")
+        if not self.gui_manager: return
+        chapter_dir = os.path.dirname(scene_path)
+        scene_number = self._get_scene_number_from_path(scene_path)
+        if scene_number < 1:
+            self.gui_manager.show_message("error", "오류", f"재생성할 장면 번호 확인 실패: {scene_path}")
+            return
+        if not self._check_queue_target_writable(chapter_dir): return
+        scene_settings = file_handler.load_scene_settings(chapter_dir, scene_number)
+        plot = gui_dialogs.show_scene_plot_dialog(self.gui_manager.root, current_plot=scene_settings.get(constants.SCENE_PLOT_KEY, ""),
+                                                  title="📋 재생성 대기열에 추가할 장면 플롯 확인/수정")
+        if plot is None: print("CORE: 재생성 대기열 추가 취소됨 (Dialog)."); return
+
+        job_settings = {key: scene_settings[key] for key in constants.SCENE_SETTING_KEYS_TO_SAVE
+                        if key in scene_settings and key not in (constants.TOKEN_INFO_KEY, constants.QUEUE_JOB_ID_KEY)}
+        job_settings[constants.SCENE_PLOT_KEY] = plot
+        added = self.generation_queue.add_jobs([{"kind": generation_queue.KIND_REGENERATE, "novel_name": os.path.basename(os.path.dirname(chapter_dir)),
+                                                 "chapter_folder": os.path.basename(chapter_dir), "scene_number": scene_number,
+                                                 "api_type": self.current_api_type, "scene_settings": job_settings}])
+        self.update_status_bar(f"📋 생성 대기열에 추가됨: {generation_queue.describe_job(added[0])}")
+        self._pump_generation_queue()
+
+    def handle_chapter_autopilot_request(self, chapter_dir):
+        """챕터 자동 집필: 챕터 아크 노트로 장면 플롯을 계획(AI 호출 1회)하고, 확인/수정한 플롯을 대기열 실행으로 추가"""
+        print(f"CORE: 챕터 자동 집필 요청: {chapter_dir}")
+        if not self.gui_manager: return
+        if not self._check_queue_target_writable(chapter_dir): return
+        chapter_key = self._generation_job_key(chapter_dir)
+        chapter_label = self._get_chapter_number_str_from_folder(chapter_dir)
+        novel_name = os.path.basename(os.path.dirname(chapter_dir))
+        chapter_folder = os.path.basename(chapter_dir)
+        if chapter_key in self._autopilot_planning:
+            self.gui_manager.show_message("info", "작업 중", "이 챕터의 장면 계획을 만드는 중입니다."); return
+        if self._get_generation_job(chapter_dir) or any(job["novel_name"] == novel_name and job["chapter_folder"] == chapter_folder
+                                                        for job in self.generation_queue.active_jobs()):
+            self.gui_manager.show_message("info", "작업 중", f"{chapter_label}에 진행 중이거나 대기 중인 생성 작업이 있습니다.\n작업이 끝난 뒤 다시 시도해주세요.")
+            return
+        is_current_chapter = bool(self.current_chapter_arc_dir) and self._generation_job_key(self.current_chapter_arc_dir) == chapter_key
+        if is_current_chapter and self.arc_settings_modified_flag:
+            self.gui_manager.show_message("info", "저장 필요", "챕터 아크 노트의 변경 내용을 먼저 저장해주세요.\n(계획은 저장된 노트를 기준으로 만듭니다)")
+            return
+        try: start_number = file_handler.get_next_scene_number(chapter_dir)
+        except Exception as e:
+            self.gui_manager.show_message("error", "오류", f"다음 장면 번호 확인 중 오류 발생:\n{e}"); return
+
+        options = gui_dialogs.show_autopilot_dialog(self.gui_manager.root, chapter_label, start_number)
+        if not options: print("CORE: 챕터 자동 집필 취소됨 (Dialog)."); return
+
+        chapter_arc_notes = file_handler.load_chapter_settings(chapter_dir)
+        if not chapter_arc_notes.get(constants.CHAPTER_ARC_NOTES_KEY, "").strip():
+            self.gui_manager.show_message("info", "입력 필요", "챕터 아크 노트가 비어 있습니다.\n노트를 작성한 뒤 다시 시도해주세요.")
+            return
+        api_type = self.current_api_type
+        thread_args = (api_type, self.selected_model, file_handler.load_novel_settings(os.path.dirname(chapter_dir)), chapter_arc_notes,
+                       file_handler.load_previous_scenes_in_chapter(chapter_dir, start_number), options["scene_count"],
+                       chapter_dir, start_number, options)
+        cancel_token = api_handler.CancelToken()
+        self._autopilot_planning[chapter_key] = cancel_token
+        if self._submit_background_job(self.pools.api, f"장면 계획: {novel_name}/{chapter_folder}", self._run_scene_plan_in_thread, *thread_args, cancel_token,
+                                       priority=worker_pools.PRIORITY_INTERACTIVE, slot_key=api_type) is None:
+            self._autopilot_planning.pop(chapter_key, None)
+            return
+        self.update_status_bar(f"⏳ {chapter_label} 장면 {options['scene_count']}개 계획 중...")
+        self.update_ui_state() # 취소 버튼 활성화
+
+    def is_planning_scenes(self):
+        """자동 집필 장면 계획 요청이 진행 중인지 (취소 버튼 상태용)"""
+        return bool(self._autopilot_planning)
+
+    def _run_scene_plan_in_thread(self, api_type, model_name, novel_settings, chapter_arc_notes, previous_content, scene_count, chapter_dir, start_number, options, cancel_token):
+        """백그라운드 스레드: 자동 집필 장면 계획 API 호출 (cancel_token 취소 시 요청 중단)"""
+        started = time.time()
+        try:
+            plan_result, token_data = api_handler.generate_scene_plan_api_call(api_type, model_name, novel_settings, chapter_arc_notes, previous_content, scene_count, cancel_token)
+        except Exception as e:
+            print(f"CORE THREAD: ❌ 장면 계획 스레드 오류: {e}")
+            traceback.print_exc()
+            plan_result = f"오류: 장면 계획 중 내부 오류 ({e})"
+        self.ui_dispatcher.post(self._process_autopilot_plan, chapter_dir, start_number, options, api_type, plan_result, time.time() - started, cancel_token)
+
+    def _process_autopilot_plan(self, chapter_dir, start_number, options, api_type, plan_result, plan_seconds, cancel_token):
+        """장면 계획 결과 처리 (메인 스레드): 플롯 확인/수정 후 대기열 실행 추가"""
+        chapter_key = self._generation_job_key(chapter_dir)
+        if cancel_token.is_cancelled() or self._autopilot_planning.get(chapter_key) is not cancel_token:
+            print(f"CORE: 취소된 장면 계획 결과 무시 ({os.path.basename(chapter_dir)}).")
+            return
+        del self._autopilot_planning[chapter_key]
+        self.update_ui_state()
+        if not self.gui_manager or not self.gui_manager.root: return
+        chapter_label = self._get_chapter_number_str_from_folder(chapter_dir)
+        if not isinstance(plan_result, list):
+            print(f"CORE ERROR: 장면 계획 실패: {plan_result}")
+            self.update_status_bar(f"⚠️ {chapter_label} 장면 계획 실패.")
+            self.gui_manager.show_message("error", "장면 계획 실패", str(plan_result))
+            return
+        print(f"CORE: 장면 계획 완료: 장면 {len(plan_result)}개 ({plan_seconds:.1f}초)")
+        # 계획 확인 체크포인트: 생성 전에 플롯을 검토/수정
+        plots = gui_dialogs.show_queue_scenes_dialog(self.gui_manager.root, chapter_label, start_number, initial_plots=plan_result,
+                                                     title_prefix="🤖 자동 집필 계획 확인")
+        if not plots: print("CORE: 자동 집필 계획 취소됨 (Dialog)."); self.update_status_bar("자동 집필 취소됨."); return
+        if not os.path.isdir(chapter_dir): self.gui_manager.show_message("error", "오류", "챕터 폴더를 찾을 수 없습니다."); return
+        start_number = max(start_number, file_handler.get_next_scene_number(chapter_dir)) # 계획 확인 중 추가된 장면 뒤로
+
+        novel_name = os.path.basename(os.path.dirname(chapter_dir))
+        chapter_folder = os.path.basename(chapter_dir)
+        gui_scene_settings = self._get_settings_from_gui(read_novel_settings=False, read_chapter_arc_settings=False, read_scene_settings=True)
+        job_inputs = []
+        for offset, plot in enumerate(plots):
+            scene_settings = dict(gui_scene_settings)
+            scene_settings[constants.SCENE_PLOT_KEY] = plot
+            job_inputs.append({"kind": generation_queue.KIND_NEW_SCENE, "novel_name": novel_name, "chapter_folder": chapter_folder,
+                               "scene_number": start_number + offset, "api_type": api_type, "scene_settings": scene_settings})
+        self.generation_queue.add_run(novel_name, chapter_folder, job_inputs, options["checkpoint_every"], plan_seconds)
+        checkpoint_str = f", 장면 {options['checkpoint_every']}개마다 확인" if options["checkpoint_every"] else ""
+        self.update_status_bar(f"🤖 {chapter_label} 자동 집필 시작: 장면 {len(plots)}개 ({start_number:03d} ~ {start_number + len(plots) - 1:03d}, 계획 {plan_seconds:.1f}초{checkpoint_str}).")
+        self._pump_generation_queue()
+
+    def _record_autopilot_progress(self, queue_job_id, success, generate_seconds, save_seconds):
+        """자동 집필 실행에 속한 작업이면 단계별 시간 기록, 체크포인트에서 다음 장면 일시 정지 (finish_job 이후 호출)"""
+        job = self.generation_queue.get(queue_job_id)
+        run = self.generation_queue.get_run(job.get("run_id")) if job else None
+        if not run: return
+        self.generation_queue.record_run_timing(run["id"], "generate", generate_seconds)
+        if save_seconds is not None: self.generation_queue.record_run_timing(run["id"], "save", save_seconds)
+        checkpoint_every = run.get("checkpoint_every", 0)
+        if not success or checkpoint_every <= 0: return
+        done_count = sum(1 for run_job in self.generation_queue.get_run_jobs(run["id"]) if run_job["state"] == generation_queue.STATE_DONE)
+        if done_count % checkpoint_every == 0 and self.generation_queue.pause_next_in_run(run["id"]):
+            self.update_status_bar(f"⏸ 자동 집필 체크포인트: 장면 {done_count}개 완료. '생성 작업 대기열'에서 다음 플롯을 확인/수정한 뒤 재개하세요.")
+
+    def _report_finished_autopilot_runs(self):
+        """모든 작업이 끝난 자동 집필 실행의 단계별 소요 시간 보고 (요약이 남아 있으면 끝난 뒤 보고)"""
+        if self.is_summarizing or self._summary_rerun_novel_dir: return
+        for run in list(self.generation_queue.runs):
+            if run.get("reported") or not self.generation_queue.is_run_finished(run["id"]): continue
+            self.generation_queue.mark_run_reported(run["id"]) # 보고 중 다시 불려도 한 번만 표시
+            run_jobs = self.generation_queue.get_run_jobs(run["id"])
+            done_count = sum(1 for job in run_jobs if job["state"] == generation_queue.STATE_DONE)
+            timings = run["timings"]
+            generate_times = timings.get("generate", [])
+            generate_avg = sum(generate_times) / len(generate_times) if generate_times else 0
+            wall_seconds = run.get("finished_at", time.time()) - run["created_at"]
+            chapter_label = self._get_chapter_number_str_from_folder(run["chapter_folder"])
+            report = (f"[{run['novel_name']}] {chapter_label} 자동 집필 완료\n"
+                      f"장면: 완료 {done_count}개 / 실패·취소 {len(run_jobs) - done_count}개\n\n"
+                      f"계획: {sum(timings.get('plan', [])):.1f}초\n"
+                      f"생성: 총 {sum(generate_times):.1f}초 (장면당 평균 {generate_avg:.1f}초, {len(generate_times)}회)\n"
+                      f"저장: 총 {sum(timings.get('save', [])):.2f}초\n"
+                      f"요약: 총 {sum(timings.get('summary', [])):.1f}초 (생성과 겹쳐 진행)\n"
+                      f"전체 경과: {wall_seconds:.1f}초 (계획 확인·체크포인트 대기 포함)")
+            print(f"CORE: 자동 집필 보고:\n{report}")
+            if self.gui_manager: self.gui_manager.show_message("info", "🤖 자동 집필 완료", report)
+
+    def handle_generation_queue_request(self):
+        """생성 작업 대기열 대화상자 표시 (순서 변경/일시 정지/재개/취소)"""
+        if not self.gui_manager: return
+        gui_dialogs.show_generation_queue_dialog(self.gui_manager.root, self._apply_generation_queue_action)
+
+    def _apply_generation_queue_action(self, action, job_id, value=None):
+        """대기열 대화상자 동작 처리. (행 목록, 대기열 일시 정지 여부) 반환."""
+        queue = self.generation_queue
+        if action in ("pause", "cancel"):
+            running_job = next((job for job in self.generation_jobs.values() if job.get("queue_job_id") == job_id), None)
+            if running_job: # 실행 중이면 생성 중단 (늦게 도착한 결과는 버림)
+                running_job["cancel_token"].cancel()
+                self.generation_jobs.pop(self._generation_job_key(running_job["chapter_dir"]), None)
+                if self.current_chapter_arc_dir and self._generation_job_key(self.current_chapter_arc_dir) == self._generation_job_key(running_job["chapter_dir"]):
+                    self._restore_output_after_cancel(running_job)
+                self._update_generation_markers()
+                self._stop_timer_if_idle()
+                self.update_ui_state()
+            if action == "pause": queue.pause_job(job_id)
+            else: queue.cancel_job(job_id)
+        elif action == "resume": queue.resume_job(job_id)
+        elif action in ("up", "down"): queue.move_job(job_id, -1 if action == "up" else 1)
+        elif action == "clear": queue.clear_finished()
+        elif action == "toggle_queue": queue.set_paused(not queue.paused)
+        elif action == "edit_plot" and value is not None: queue.set_job_plot(job_id, value)
+        if action != "refresh": self._pump_generation_queue()
+        rows = [{"id": job["id"], "label": generation_queue.describe_job(job),
+                 "state": generation_queue.STATE_LABELS.get(job["state"], job["state"]),
+                 "attempts": job.get("attempts", 0), "error": job.get("last_error", ""),
+                 "plot": (job.get("scene_settings") or {}).get(constants.SCENE_PLOT_KEY, ""),
+                 "editable": job["state"] in (generation_queue.STATE_QUEUED, generation_queue.STATE_PAUSED, generation_queue.STATE_FAILED)}
+                for job in queue.jobs]
+        return rows, queue.paused
+
+    def _check_queue_target_writable(self, chapter_dir):
+        """대기열에 추가할 수 있는 챕터인지 확인 (소설 팩 아님, 창작 모델 선택됨). 불가하면 안내 후 False."""
+        if file_handler.is_pack_path(chapter_dir):
+            self.gui_manager.show_message("info", "읽기 전용", "소설 팩은 읽기 전용입니다.\n장면 생성을 대기열에 추가할 수 없습니다.")
+            return False
+        if not self.selected_model:
+            self.gui_manager.show_message("error", "모델 오류", f"현재 API 타입({self.current_api_type.capitalize()})에 사용할 창작 모델이 선택되지 않았습니다.")
+            return False
+        return True
+
+    def _get_queue_job_chapter_dir(self, job):
+        return os.path.join(constants.BASE_SAVE_DIR, job["novel_name"], job["chapter_folder"])
+
+    def _is_queue_job_blocked(self, job):
+        """대기열 작업을 지금 시작할 수 없는지 (같은 챕터에서 생성 중, 또는 로드된 챕터에 저장하지 않은 변경 있음)"""
+        chapter_dir = self._get_queue_job_chapter_dir(job)
+        if self._get_generation_job(chapter_dir): return True
+        is_current_chapter = bool(self.current_chapter_arc_dir) and self._generation_job_key(self.current_chapter_arc_dir) == self._generation_job_key(chapter_dir)
+        # 결과 표시가 편집 중인 내용을 덮어쓰지 않도록 저장할 때까지 대기
+        return is_current_chapter and (self.output_text_modified or self.arc_settings_modified_flag or self.is_loading_item)
+
+    def _pump_generation_queue(self):
+        """생성 작업 대기열에서 지금 시작할 수 있는 작업을 동시 생성 상한까지 시작 (메인 스레드).
+        바로 시작할 수 없는 작업이 남아 있으면 잠시 뒤 다시 확인."""
+        if not self.gui_manager or not self.gui_manager.root: return
+        if self._queue_pump_after_id:
+            try: self.gui_manager.root.after_cancel(self._queue_pump_after_id)
+            except Exception: pass
+            self._queue_pump_after_id = None
+        if self._quit_after_jobs or self._shutting_down: return # 종료 대기 중에는 새 작업을 시작하지 않음 (다음 실행 때 이어서)
+        # 요약 중에도 시작: 장면 k의 요약과 장면 k+1의 생성을 겹쳐 진행 (API 풀이 요약을 일괄 생성보다 먼저 배정)
+        for job in self.generation_queue.get_runnable(self._is_queue_job_blocked):
+            if len(self.generation_jobs) >= self._max_concurrent_generations(): break
+            self._start_queue_job(job)
+        self._report_finished_autopilot_runs()
+        if self.generation_queue.count_waiting() and not self.generation_queue.paused:
+            self._queue_pump_after_id = self.gui_manager.root.after(constants.GENERATION_QUEUE_POLL_MS, self._pump_generation_queue)
+
+    def _start_queue_job(self, job):
+        """대기열 작업 하나를 일반 장면 생성 경로로 시작 (소설/챕터 설정과 이전 장면은 파일에서 다시 읽음)"""
+        job_id = job["id"]
+        chapter_dir = self._get_queue_job_chapter_dir(job)
+        scene_number = job["scene_number"]
+        is_new_scene = job["kind"] == generation_queue.KIND_NEW_SCENE
+        scene_path = os.path.join(chapter_dir, f"{scene_number:03d}.txt")
+        label = generation_queue.describe_job(job)
+
+        error = None
+        if not os.path.isdir(chapter_dir): error = "챕터 폴더를 찾을 수 없습니다."
+        elif is_new_scene and os.path.isfile(scene_path):
+            if file_handler.load_scene_settings(chapter_dir, scene_number).get(constants.QUEUE_JOB_ID_KEY) == job_id:
+                # 지난 실행에서 이 작업이 저장까지 끝났지만 완료 기록 전에 종료된 경우 (장면 설정에 작업 ID가 남아 있음)
+                print(f"CORE: 대기열 작업 이미 저장됨, 완료 처리: {label}")
+                self.generation_queue.mark_started(job_id)
+                self.generation_queue.finish_job(job_id, True)
+                return
+            self.generation_queue.renumber_new_scenes(job["novel_name"], job["chapter_folder"], file_handler.get_next_scene_number(chapter_dir))
+            scene_number = job["scene_number"]
+            label = generation_queue.describe_job(job)
+            print(f"CORE: 같은 번호의 장면이 먼저 만들어져 대기열 장면 번호 재배정: {label}")
+        elif is_new_scene and scene_number > 1 and not os.path.isfile(os.path.join(chapter_dir, f"{scene_number - 1:03d}.txt")):
+            error = f"이전 장면({scene_number - 1:03d})이 없습니다."
+        elif not is_new_scene and not os.path.isfile(scene_path): error = "재생성할 장면 파일을 찾을 수 없습니다."
+        self.generation_queue.mark_started(job_id)
+        if error:
+            print(f"CORE WARN: 대기열 작업 시작 불가 ({label}): {error}")
+            self.generation_queue.finish_job(job_id, False, error, retry=False)
+            self.update_status_bar_conditional(f"⚠️ 대기열 작업 실패: {label} - {error}")
+            return
+
+        novel_dir = os.path.dirname(chapter_dir)
+        previous_content = file_handler.load_previous_scenes_in_chapter(chapter_dir, scene_number)
+        if is_new_scene and self.current_chapter_arc_dir and self._generation_job_key(self.current_chapter_arc_dir) == self._generation_job_key(chapter_dir):
+            # 로드된 챕터에 새 장면: '새 장면' 버튼과 같이 출력 패널을 비우고 생성 결과를 표시
+            self.clear_output_panel()
+            self.current_scene_path = None
+            self.current_loaded_scene_settings = {}
+        print(f"CORE: 대기열 작업 시작: {label} (시도 {job['attempts']}회째)")
+        started = self._start_generation_thread_internal(
+            api_type=job.get("api_type") or self.current_api_type,
+            novel_settings=file_handler.load_novel_settings(novel_dir),
+            chapter_arc_notes=file_handler.load_chapter_settings(chapter_dir),
+            scene_specific_settings=dict(job.get("scene_settings") or {}),
+            previous_scene_content=previous_content,
+            target_chapter_arc_dir=chapter_dir,
+            target_scene_number=scene_number,
+            is_new_scene=is_new_scene,
+            queue_job_id=job_id
+        )
+        if not started:
+            self.generation_queue.finish_job(job_id, False, "생성을 시작하지 못했습니다.")
+
     # --- 내부 헬퍼 및 스레드 관련 ---
+    def _submit_background_job(self, pool, job_name, fn, *args, priority=None, slot_key=None):
+        """작업 풀에 백그라운드 작업 제출. 대기열이 가득 찼거나 종료 중이면 알리고 None 반환.
+        API 풀은 priority(worker_pools.PRIORITY_*)와 slot_key(API 타입)로 시작 순서와 제공자별 동시 호출 수 조정."""
+        try:
+            return pool.submit(job_name, fn, *args, priority=priority, slot_key=slot_key)
+        except worker_pools.PoolFullError as e:
+            print(f"CORE WARN: {e} ({job_name})")
+            self.update_status_bar(f"⚠️ 대기 중인 작업이 많아 '{job_name}'을(를) 시작하지 못했습니다. 잠시 후 다시 시도해주세요.")
+        except RuntimeError as e:
+            print(f"CORE WARN: 작업 제출 실패 ({job_name}): {e}")
+        return None
+
+    def _show_interrupted_jobs_notice(self, interrupted_jobs):
+        """지난 종료 시 끝나지 않은 작업 알림. 사용자가 확인한 뒤 기록 삭제 (도중에 종료되면 다음 실행에 다시 알림)."""
+        if not self.gui_manager: return
+        more = f" 외 {len(interrupted_jobs) - 2}개" if len(interrupted_jobs) > 2 else ""
+        self.update_status_bar(f"⚠️ 지난 종료 시 끝나지 않은 작업: {', '.join(interrupted_jobs[:2])}{more}")
+        job_lines = "\n".join(f"- {job}" for job in interrupted_jobs)
+        self.gui_manager.show_message("warning", "중단된 작업", f"지난 종료 시 끝나지 않은 작업이 있습니다:\n{job_lines}")
+        file_handler.clear_interrupted_jobs(constants.BASE_SAVE_DIR)
+
+    def _shutdown_background_work(self, interrupted_jobs=(), on_finished=None):
+        """종료 준비: 작업 풀 정리 (실행 중인 작업은 제한 시간까지 대기), 대기 중인 저장 기록, 끝나지 않은 작업 기록.
+        기다리는 일은 별도 스레드가 하고 메인 루프는 계속 돌아 그동안 도착한 작업 결과를 처리 (창도 응답).
+        모두 끝나면 on_finished() 호출 (창이 없으면 이 자리에서 기다린 뒤 호출)."""
+        self._shutting_down = True
+        self._bulk_file_job = "프로그램 종료 준비" # 다른 편집/저장 작업 차단
+        self._cancel_tree_load()
+        for cancel_token in self._autopilot_planning.values(): cancel_token.cancel() # 계획 결과는 확인 창이 필요하므로 버림
+        self._autopilot_planning.clear()
+        outcome = {"unfinished": []}
+
+        def _wait_for_workers():
+            try:
+                outcome["unfinished"] = self.pools.shutdown(constants.WORKER_SHUTDOWN_TIMEOUT_S)
+                file_handler.flush_pending_writes(constants.WRITE_BEHIND_FLUSH_TIMEOUT_S) # 대기 중인 자동 저장 기록
+            except Exception as e:
+                print(f"CORE ERROR: 종료 준비 중 오류: {e}")
+                traceback.print_exc()
 
-    def _check_if_busy_status(self):
-        """내부 상태 확인: 현재 생성 또는 요약 작업 중인지 순수하게 확인"""
+        root = self.gui_manager.root if self.gui_manager else None
+        if not root:
+            _wait_for_workers()
+            self._finish_shutdown(interrupted_jobs, outcome["unfinished"], on_finished)
+            return
+        if self.pools.pending_jobs(): self.update_status_bar("⏳ 백그라운드 작업 마무리 중...")
+        self.gui_manager.suppress_dialogs = True # 종료 중 도착한 결과의 알림 창이 종료를 막지 않도록
+        self.update_ui_state()
+        waiter = threading.Thread(target=_wait_for_workers, name="novel-shutdown", daemon=True)
+        waiter.start()
+
+        def _poll_waiter():
+            if waiter.is_alive():
+                root.after(constants.SHUTDOWN_POLL_MS, _poll_waiter)
+                return
+            self._finish_shutdown(interrupted_jobs, outcome["unfinished"], on_finished)
+        _poll_waiter()
+
+    def _finish_shutdown(self, interrupted_jobs, unfinished, on_finished):
+        """종료 준비 마무리 (메인 스레드): 작업이 마지막으로 보낸 결과 처리, 끝나지 않은 작업 기록, 자원 정리"""
+        self.ui_dispatcher.run_pending() # 풀 종료 직전에 도착한 결과(장면 저장 등)까지 처리
+        file_handler.flush_pending_writes(constants.WRITE_BEHIND_SYNC_TIMEOUT_S) # 결과 처리 중 생긴 저장
+        # io 풀(항목 읽기/검색/휴지통 정리)은 기록하지 않음: 남는 결과가 없고 휴지통 정리는 다음 실행 때 다시 수행됨
+        jobs = list(interrupted_jobs)
+        for pool_name, job_name, state in unfinished:
+            print(f"CORE WARN: 종료 시 끝나지 않은 작업 ({pool_name}, {state}): {job_name}")
+            if pool_name != "io" and job_name not in jobs: jobs.append(job_name)
+        if jobs: file_handler.save_interrupted_jobs(constants.BASE_SAVE_DIR, jobs)
+        file_handler.close_all_novel_packs()
+        if self.search_index: self.search_index.close()
+        self.ui_dispatcher.stop()
+        if on_finished: on_finished()
+
+    def _resume_pending_quit(self):
+        """'작업 완료 후 종료'를 선택한 경우, 진행 중인 AI 작업이 모두 끝나면 종료 진행"""
+        if not self._quit_after_jobs or self.generation_jobs or self.is_summarizing: return
+        if self.gui_manager and self.gui_manager.root:
+            self.gui_manager.root.after_idle(self.handle_quit_request)
+
+    def _describe_replace_target(self, path, kind):
+        """찾아 바꾸기 미리보기에 표시할 항목 이름"""
+        if kind == "novel_settings": return "⚙️ 소설 설정"
+        chapter_dir = path if os.path.isdir(path) else os.path.dirname(path)
+        ch_str = self._get_chapter_number_str_from_folder(chapter_dir)
+        if kind == "scene": return f"🎬 {ch_str} - {self._get_scene_number_from_path(path):03d} 장면"
+        if kind == "chapter_settings": return f"⚙️ {ch_str} 챕터 아크"
+        return f"⚙️ {ch_str} 장면 플롯"
+
+    def _start_bulk_text_change(self, description, error_title, func, *args):
+        """여러 파일을 한 번에 바꾸는 작업을 io 풀에서 실행 (끝날 때까지 다른 편집/저장 작업은 대기).
+        func(*args) -> (성공 여부, 메시지, 바뀐 경로 목록)"""
+        self._bulk_file_job = description
+        self.update_status_bar(f"⏳ {description} 중...")
+        self.update_ui_state()
+
+        def _bulk_thread():
+            try: success, message, changed_paths = func(*args)
+            except Exception as e:
+                traceback.print_exc()
+                success, message, changed_paths = False, f"오류: {description} 중 예외 발생:\n{e}", []
+            self.ui_dispatcher.post(self._after_bulk_text_change, success, message, changed_paths, error_title)
+        if self._submit_background_job(self.pools.io, description, _bulk_thread) is None:
+            self._bulk_file_job = None
+            self.update_ui_state()
+
+    def _after_bulk_text_change(self, success, message, changed_paths, error_title):
+        """여러 파일을 한 번에 바꾼 뒤 결과 알림 및 현재 로드된 항목 다시 로드 (메인 스레드)"""
+        self._bulk_file_job = None
+        self.update_ui_state()
+        if success:
+            self.update_status_bar(f"🔁 {message.splitlines()[0]}")
+            if "\n" in message: self.gui_manager.show_message("info", "찾아 바꾸기", message)
+        else:
+            self.update_status_bar(f"❌ {error_title}.")
+            self.gui_manager.show_message("error", error_title, message)
+        if not changed_paths: return
+        # 화면에 표시 중인 내용/설정이 파일과 달라지지 않도록 현재 항목 다시 로드
+        if self.current_scene_path:
+            self.handle_tree_load_request(self.current_scene_path, ('scene',))
+        elif self.current_chapter_arc_dir:
+            self.handle_tree_load_request(self.current_chapter_arc_dir, ('chapter',))
+        elif self.current_novel_name:
+            self.handle_tree_load_request(self.current_novel_name, ('novel',))
+        self.refresh_treeview_data()
+
+    def _after_branch_change(self, chapter_dir, message):
+        """브랜치 생성/전환/삭제 후 트리 갱신 및 현재 장면 상태 정리"""
+        self.update_status_bar(f"🌿 {message}")
+        if self.current_scene_path and os.path.dirname(self.current_scene_path) == chapter_dir:
+            if file_handler.path_is_file(self.current_scene_path):
+                self.handle_tree_load_request(self.current_scene_path, ('scene',)) # 활성 브랜치의 내용으로 다시 로드
+            else:
+                self.clear_output_panel()
+                self.current_scene_path = None
+        self.refresh_treeview_data()
+        self.update_ui_state()
+
+
+    def _get_trash_notice(self):
+        """삭제 확인 메시지용 휴지통 안내 문구"""
+        retention_days = self.config.get(constants.CONFIG_TRASH_RETENTION_DAYS_KEY, constants.DEFAULT_TRASH_RETENTION_DAYS)
+        return f"🗑️ 휴지통으로 이동되며 {retention_days}일 후 완전히 삭제됩니다.\n(그 전까지 '저장소 > 휴지통'에서 복원 가능)"
+
+    def _start_search_index(self):
+        """전문 검색 색인 열기 (실패해도 검색만 비활성화)"""
+        try:
+            self.search_index = search_index.SearchIndex(constants.BASE_SAVE_DIR)
+            self.search_index.start()
+        except Exception as e:
+            print(f"CORE WARN: 검색 색인 열기 실패 (검색 비활성화): {e}")
+            traceback.print_exc()
+            self.search_index = None
+
+    def _start_trash_purge_thread(self):
+        """보존 기간이 지난 휴지통 항목을 백그라운드에서 영구 삭제한 뒤, 참조가 없어진 버전 기록 내용 정리"""
+        retention_days = self.config.get(constants.CONFIG_TRASH_RETENTION_DAYS_KEY, constants.DEFAULT_TRASH_RETENTION_DAYS)
+
+        def _purge_thread():
+            file_handler.purge_trash(constants.BASE_SAVE_DIR, retention_days)
+            file_handler.collect_history_garbage(constants.BASE_SAVE_DIR)
+        self._submit_background_job(self.pools.io, "휴지통 정리", _purge_thread)
+
+    def _start_auto_archive_thread(self):
+        """설정된 기간 이상 수정되지 않은 챕터를 백그라운드에서 압축 보관"""
+        days = self.config.get(constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY, 0)
+        if not days or not file_handler.is_compression_available(): return
+        use_dictionary = self.config.get(constants.CONFIG_ARCHIVE_USE_DICTIONARY_KEY, True)
+
+        def _archive_thread():
+            archived = file_handler.auto_archive_cold_chapters(constants.BASE_SAVE_DIR, days, use_dictionary)
+            if archived:
+                self.ui_dispatcher.post(self.refresh_treeview_data, key="refresh_tree")
+
+        print(f"CORE: 자동 압축 보관 작업 시작 ({days}일 이상 미수정 챕터)")
+        self._submit_background_job(self.pools.cpu, "오래된 챕터 자동 압축 보관", _archive_thread)
+
+    def _is_current_novel_read_only(self):
+        """현재 로드된 소설이 읽기 전용 소설 팩인지 확인"""
+        return bool(self.current_novel_dir) and file_handler.is_pack_path(self.current_novel_dir)
+
+    def _warn_if_read_only(self, action_description):
+        """읽기 전용 소설 팩이면 안내 후 True 반환"""
+        if not self._is_current_novel_read_only(): return False
+        if self.gui_manager:
+            self.gui_manager.show_message("info", "읽기 전용", f"소설 팩은 읽기 전용입니다.\n{action_description}을(를) 할 수 없습니다.")
+        return True
+
+    @property
+    def is_generating(self):
+        """현재 로드된 챕터를 대상으로 한 장면 생성이 진행 중인지 (다른 챕터/소설의 생성은 UI를 막지 않음)"""
+        return self._get_generation_job(getattr(self, 'current_chapter_arc_dir', None)) is not None
+
+    def _generation_job_key(self, path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _get_generation_job(self, chapter_dir):
+        """챕터를 대상으로 진행 중인 생성 작업 (없으면 None)"""
+        jobs = getattr(self, 'generation_jobs', None)
+        if not jobs or not chapter_dir: return None
+        return jobs.get(self._generation_job_key(chapter_dir))
+
+    def _find_generation_jobs_under(self, path):
+        """경로(저장 폴더/소설/챕터/장면)와 겹치는 진행 중인 생성 작업 목록"""
+        if not path or not self.generation_jobs: return []
+        target = self._generation_job_key(path)
+        found = []
+        for key, job in self.generation_jobs.items():
+            try: overlaps = os.path.commonpath([key, target]) in (key, target)
+            except ValueError: overlaps = False # 다른 드라이브
+            if overlaps: found.append(job)
+        return found
+
+    def _max_concurrent_generations(self):
+        """동시 장면 생성 상한 (config 값, 요약용 API 스레드 하나는 남김)"""
+        configured = self.config.get(constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY, constants.DEFAULT_MAX_CONCURRENT_GENERATIONS)
+        return max(1, min(configured, constants.API_WORKER_COUNT - 1))
+
+    def _update_generation_markers(self):
+        """생성 중인 소설/챕터/장면 노드에 트리뷰 상태 표시"""
+        if not self.gui_manager or not self.gui_manager.treeview_panel: return
+        item_ids = set()
+        for job in self.generation_jobs.values():
+            item_ids.add(os.path.basename(job["novel_dir"]))
+            item_ids.add(job["chapter_dir"])
+            if not job["is_new_scene"]: item_ids.add(job["scene_path"])
+        self.gui_manager.treeview_panel.set_generating_items(item_ids)
+
+    def _check_if_busy_status(self, ignore_loading=False, ignore_generation=False):
+        """내부 상태 확인: 현재 챕터의 생성/요약 작업 또는 항목 로드 중인지 순수하게 확인"""
         # Check if flags exist before accessing
-        generating = getattr(self, 'is_generating', False)
+        generating = getattr(self, 'is_generating', False) and not ignore_generation
         summarizing = getattr(self, 'is_summarizing', False)
-        return generating or summarizing
+        loading = getattr(self, 'is_loading_item', False) and not ignore_loading
+        bulk_changing = getattr(self, '_bulk_file_job', None) is not None
+        return generating or summarizing or loading or bulk_changing
 
     # --- 추가된 공개 메소드 ---
     def is_busy(self):
@@ -1546,9 +2786,23 @@ class AppCore:
         return self._check_if_busy_status()
     # --- 추가 끝 ---
 
-    def check_busy_and_warn(self):
-        """상태 확인 및 사용자 알림: 현재 작업 중인지 확인하고, 그렇다면 경고 메시지 표시"""
-        busy = self._check_if_busy_status() # 내부 상태 확인 함수 호출
+    def check_busy_and_warn(self, ignore_loading=False, target=None, ignore_generation=False):
+        """상태 확인 및 사용자 알림: 현재 작업 중인지 확인하고, 그렇다면 경고 메시지 표시.
+        target(경로) 지정 시 그 소설/챕터/장면에서 진행 중인 생성 작업(다른 챕터 포함)과도 충돌 확인."""
+        busy = self._check_if_busy_status(ignore_loading, ignore_generation) # 내부 상태 확인 함수 호출
+        if busy and self._bulk_file_job:
+            if self.gui_manager: self.gui_manager.show_message("info", "작업 중", f"'{self._bulk_file_job}' 작업이 진행 중입니다.\n완료 후 다시 시도해주세요.")
+            return busy
+        if not busy and target:
+            conflicting_jobs = self._find_generation_jobs_under(target)
+            if conflicting_jobs:
+                if self.gui_manager:
+                    job_names = "\n".join(job["name"] for job in conflicting_jobs[:3])
+                    self.gui_manager.show_message("info", "작업 중", f"이 항목에서 장면 생성이 진행 중입니다:\n{job_names}\n완료 후 다시 시도해주세요.")
+                return True
+        if busy and self.gui_manager and not self.is_summarizing and (ignore_generation or not self.is_generating):
+            self.gui_manager.show_message("info", "불러오는 중", "항목을 불러오는 중입니다.\n잠시 후 다시 시도해주세요.")
+            return busy
         if busy and self.gui_manager:
             # --- 디버깅 로그는 유지하거나 필요에 따라 제거 ---
             try:
@@ -1636,7 +2890,11 @@ class AppCore:
         prompt_lines.append("\n('아니오' 선택 시 변경사항을 버리고 진행합니다.)")
         save_prompt_msg = "\n".join(prompt_lines)
 
-        resp = self.gui_manager.ask_yes_no_cancel("저장 확인", save_prompt_msg, icon='warning')
+        if self._is_current_novel_read_only():
+            print("CORE: 읽기 전용 소설 팩 - 저장되지 않은 변경사항 버림.")
+            resp = False
+        else:
+            resp = self.gui_manager.ask_yes_no_cancel("저장 확인", save_prompt_msg, icon='warning')
 
         if resp is True: # 저장 (Yes)
             print(f"CORE: '{action_description}' 전 저장 선택됨.")
@@ -1705,6 +2963,7 @@ class AppCore:
         self._novel_settings_after_id = None # Timer ID reset
         if not self.current_novel_dir: return True # Nothing to save if no novel loaded
         if not self.novel_settings_modified_flag: return True # Nothing changed
+        if self._is_current_novel_read_only(): print("CORE: 읽기 전용 소설 팩 - 소설 설정 자동 저장 건너뜀."); return False
 
         print(f"CORE: 소설 설정 자동 저장 시도: {self.current_novel_name}")
         try:
@@ -1714,8 +2973,8 @@ class AppCore:
             novel_key = constants.NOVEL_MAIN_SETTINGS_KEY
             settings_to_save = {novel_key: current_gui_novel_settings_text}
 
-            print(f"CORE: 소설 설정 파일 저장 시도 ({self.current_novel_dir})...")
-            if file_handler.save_novel_settings(self.current_novel_dir, settings_to_save):
+            print(f"CORE: 소설 설정 파일 저장 예약 ({self.current_novel_dir})...")
+            if file_handler.queue_save_novel_settings(self.current_novel_dir, settings_to_save): # 지연 쓰기 (UI 스레드 차단 없음)
                 self.current_novel_settings[novel_key] = current_gui_novel_settings_text
                 status_msg = f"✅ [{self.current_novel_name}] 소설 설정 자동 저장됨."
                 self.gui_manager.update_status_bar_conditional(status_msg) # Only if not showing important msg
@@ -1741,6 +3000,7 @@ class AppCore:
         if not self.current_chapter_arc_dir: return True # Nothing to save if no chapter loaded
         # Check specific flag for arc notes modification
         if not self.arc_settings_modified_flag: return True
+        if self._is_current_novel_read_only(): print("CORE: 읽기 전용 소설 팩 - 아크 노트 자동 저장 건너뜀."); return False
 
         print(f"CORE: 챕터 아크 노트 자동 저장 시도: {os.path.basename(self.current_chapter_arc_dir)}")
         try:
@@ -1752,8 +3012,8 @@ class AppCore:
             arc_key = constants.CHAPTER_ARC_NOTES_KEY
             settings_to_save = {arc_key: current_gui_arc_notes}
 
-            print(f"CORE: 챕터 아크 설정 파일 저장 시도 ({self.current_chapter_arc_dir})...")
-            if file_handler.save_chapter_settings(self.current_chapter_arc_dir, settings_to_save):
+            print(f"CORE: 챕터 아크 설정 파일 저장 예약 ({self.current_chapter_arc_dir})...")
+            if file_handler.queue_save_chapter_settings(self.current_chapter_arc_dir, settings_to_save): # 지연 쓰기 (UI 스레드 차단 없음)
                 self.current_loaded_chapter_arc_settings[arc_key] = current_gui_arc_notes
                 ch_str = self._get_chapter_number_str_from_folder(self.current_chapter_arc_dir)
                 status_msg = f"✅ [{self.current_novel_name}] {ch_str} 아크 노트 자동 저장됨."
@@ -1785,12 +3045,14 @@ class AppCore:
             self.gui_manager.show_message("error", "자동 저장 오류", f"챕터 아크 노트 자동 저장 중 오류 발생:\n{e}")
             return False
 
-    def _start_generation_thread_internal(self, api_type, novel_settings, chapter_arc_notes, scene_specific_settings, previous_scene_content, target_chapter_arc_dir, target_scene_number, is_new_scene):
-        """장면 생성 스레드 시작 및 UI 상태 관리 (API 타입 인자 추가)"""
+    def _start_generation_thread_internal(self, api_type, novel_settings, chapter_arc_notes, scene_specific_settings, previous_scene_content, target_chapter_arc_dir, target_scene_number, is_new_scene, queue_job_id=None):
+        """장면 생성 스레드 시작 및 UI 상태 관리. 시작하면 True.
+        queue_job_id: 생성 작업 대기열에서 시작한 경우 해당 작업 ID (결과 처리 시 대기열에 기록)"""
         # Note: This internal function assumes the caller already did the busy check.
-        if self._check_if_busy_status(): # Double check internally, but don't warn
+        if self._get_generation_job(target_chapter_arc_dir) or (self.is_summarizing and not queue_job_id): # Double check internally, but don't warn
              print("CORE WARN: 생성 요청 무시됨 (이미 작업 진행 중 - 내부 확인).")
              return
+        if self._warn_if_generation_limit_reached(queue_job_id): return
         if not novel_settings or not chapter_arc_notes or not scene_specific_settings or not target_chapter_arc_dir or target_scene_number < 1:
              msg = "생성 시작 실패: 필수 설정 정보 누락 (소설/챕터/장면 플롯/타겟)."
              if self.gui_manager: self.gui_manager.show_message("error", "오류", msg)
@@ -1807,7 +3069,7 @@ class AppCore:
             length_option = scene_specific_settings.get('length', constants.LENGTH_OPTIONS[0])
             temperature_val = scene_specific_settings.get('temperature', constants.DEFAULT_TEMPERATURE)
             # 모델 이름은 scene_specific_settings 또는 self.selected_model 사용
-            current_api_type = self.current_api_type # Read from self
+            current_api_type = api_type # 대기열 작업은 추가할 때의 API 타입 사용
             # Use model from scene settings if valid, otherwise use current session model
             session_model = self.selected_model
             model_from_settings = scene_specific_settings.get('selected_model')
@@ -1860,10 +3122,11 @@ class AppCore:
             scene_settings_snapshot[constants.SCENE_PLOT_KEY] = plot_for_prompt
 
 
-            # 스레드 인자에 API 타입 추가
+            # 스레드 인자에 API 타입 및 취소 토큰 추가
+            cancel_token = api_handler.CancelToken()
             thread_args = (current_api_type, prompt_text, model_name_to_use, system_prompt_val, temperature_val,
                            target_chapter_arc_dir, target_scene_number, scene_settings_snapshot,
-                           is_new_scene, previous_scene_content)
+                           is_new_scene, previous_scene_content, cancel_token)
             action_desc = "새 장면" if is_new_scene else "장면 재생성"
             print(f"CORE INFO: {action_desc} 스레드 시작 준비: API={current_api_type}, Model={model_name_to_use}, Temp={temperature_val:.2f}, Target={os.path.basename(target_chapter_arc_dir)}/{target_scene_number:03d}.txt")
 
@@ -1879,21 +3142,184 @@ class AppCore:
                 self.gui_manager.show_message("error", "생성 준비 오류", f"생성을 시작하는 중 문제가 발생했습니다:\n{e}")
              return
 
-        self.is_generating = True
-        self.output_text_modified = False # Reset flags before generation
-        self.arc_settings_modified_flag = False
-        if self.gui_manager and self.gui_manager.settings_panel:
-             self.gui_manager.settings_panel.reset_chapter_modified_flag()
-        if self.gui_manager and self.gui_manager.output_panel:
-             self.gui_manager.output_panel.reset_modified_flag()
+        job_key, job_name = self._register_generation_job(target_chapter_arc_dir, target_scene_number, is_new_scene, cancel_token, queue_job_id,
+                                                          api_type=current_api_type, scene_settings=scene_settings_snapshot)
 
-        self.update_ui_state(generating=True, scene_loaded=(not is_new_scene)) # Scene is loaded if regenerating
+        priority = worker_pools.PRIORITY_BULK if queue_job_id else worker_pools.PRIORITY_INTERACTIVE
+        if self._submit_background_job(self.pools.api, job_name, self._run_generation_in_thread, *thread_args,
+                                       priority=priority, slot_key=current_api_type) is None:
+            self.generation_jobs.pop(job_key, None)
+            self._update_generation_markers()
+            self._stop_timer_if_idle()
+            self.update_ui_state(generating=False)
+            return False
+        return True
+
+    def _warn_if_generation_limit_reached(self, queue_job_id=None):
+        """동시 생성 상한에 도달했으면 안내 후 True.
+        대화형 요청은 대화형 작업끼리만 상한 적용 (일괄 작업이 자리를 차지해도 밀리지 않음, 실제 호출 순서는 API 풀이 조정)"""
+        max_jobs = self._max_concurrent_generations()
+        counted_jobs = self.generation_jobs.values() if queue_job_id else [job for job in self.generation_jobs.values() if not job.get("queue_job_id")]
+        if len(counted_jobs) < max_jobs: return False
+        msg = (f"동시에 진행할 수 있는 장면 생성은 최대 {max_jobs}개입니다.\n"
+               f"다른 챕터의 생성이 끝난 뒤 다시 시도해주세요.\n(config.json의 '{constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY}' 값으로 조정)")
+        if self.gui_manager: self.gui_manager.show_message("info", "작업 중", msg)
+        else: print(f"CORE WARN: {msg}")
+        return True
+
+    def _register_generation_job(self, target_chapter_arc_dir, target_scene_number, is_new_scene, cancel_token, queue_job_id=None, candidates=None,
+                                 api_type=None, scene_settings=None):
+        """생성 작업을 등록하고 UI 상태(타이머, 트리뷰 표시) 반영. (작업 키, 작업 이름) 반환.
+        candidates: 후보 여러 개 생성 시 후보별 상태 목록
+        api_type/scene_settings: 생성 입력 (종료 시 중단되면 생성 대기열에 보관하는 데 사용)"""
+        job_key = self._generation_job_key(target_chapter_arc_dir)
+        target_novel_dir = os.path.dirname(target_chapter_arc_dir)
+        target_novel_name = os.path.basename(target_novel_dir)
+        job_name = f"장면 {'생성' if is_new_scene else '재생성'}: {target_novel_name}/{os.path.basename(target_chapter_arc_dir)}/{target_scene_number:03d}"
+        self.generation_jobs[job_key] = {
+            "name": job_name, "novel_dir": target_novel_dir, "novel_name": target_novel_name, "queue_job_id": queue_job_id,
+            "chapter_dir": target_chapter_arc_dir, "scene_number": target_scene_number,
+            "scene_path": os.path.join(target_chapter_arc_dir, f"{target_scene_number:03d}.txt"),
+            "is_new_scene": is_new_scene, "cancel_token": cancel_token, "started": time.time(),
+            "preview_parts": [], # 스트리밍 미리보기 (다른 챕터를 보다가 돌아왔을 때 복원용)
+            "candidates": candidates, "api_type": api_type, "scene_settings": scene_settings,
+        }
+        if self.is_generating: # 현재 로드된 챕터 대상 (대기열에서 시작한 다른 챕터 작업은 편집 상태를 건드리지 않음)
+            self.output_text_modified = False # Reset flags before generation
+            self.arc_settings_modified_flag = False
+            if self.gui_manager and self.gui_manager.settings_panel:
+                 self.gui_manager.settings_panel.reset_chapter_modified_flag()
+            if self.gui_manager and self.gui_manager.output_panel:
+                 self.gui_manager.output_panel.reset_modified_flag()
+            self.update_ui_state(generating=True, scene_loaded=(not is_new_scene)) # Scene is loaded if regenerating
+        else:
+            self.update_ui_state()
         self.start_timer("⏳ AI 생성 준비 중...")
+        self._update_generation_markers()
+        return job_key, job_name
+
+    def _get_candidate_model_choices(self):
+        """후보 생성에 쓸 수 있는 (API 타입, 모델) 목록 (사용 가능한 모든 제공자)"""
+        return [(api_type, model_name) for api_type in constants.SUPPORTED_API_TYPES
+                for model_name in self.available_models_by_type.get(api_type, [])]
+
+    def _start_candidate_generation(self, novel_settings, chapter_arc_notes, scene_specific_settings, previous_scene_content,
+                                    target_chapter_arc_dir, target_scene_number, is_new_scene, candidate_count, candidate_models):
+        """같은 프롬프트로 장면 후보 여러 개를 동시에 생성 (모델은 candidate_models를 번갈아 사용).
+        후보 비교 창에서 고른 후보만 장면으로 저장하고, 나머지 완료된 후보는 버전 기록에 보관."""
+        if self._get_generation_job(target_chapter_arc_dir) or self.is_summarizing:
+            print("CORE WARN: 후보 생성 요청 무시됨 (이미 작업 진행 중 - 내부 확인)."); return
+        if self._warn_if_generation_limit_reached(): return
+        plot_for_prompt = scene_specific_settings.get(constants.SCENE_PLOT_KEY, "")
+        length_option = scene_specific_settings.get('length', constants.LENGTH_OPTIONS[0])
+        temperature_val = scene_specific_settings.get('temperature', constants.DEFAULT_TEMPERATURE)
+        try:
+            prompt_text = api_handler.generate_prompt(novel_settings, chapter_arc_notes, plot_for_prompt, length_option, previous_scene_content)
+            if not prompt_text: raise ValueError("프롬프트 생성 실패.")
+        except Exception as e:
+            print(f"CORE ERROR: 후보 생성 준비 중 오류: {e}")
+            traceback.print_exc()
+            if self.gui_manager: self.gui_manager.show_message("error", "생성 준비 오류", f"생성을 시작하는 중 문제가 발생했습니다:\n{e}")
+            return
 
-        thread = threading.Thread(target=self._run_generation_in_thread, args=thread_args, daemon=True)
-        thread.start()
+        base_snapshot = {key: scene_specific_settings[key] for key in constants.SCENE_SETTING_KEYS_TO_SAVE
+                         if key in scene_specific_settings and key not in (constants.TOKEN_INFO_KEY, constants.QUEUE_JOB_ID_KEY)}
+        base_snapshot.update({'temperature': temperature_val, 'length': length_option, constants.SCENE_PLOT_KEY: plot_for_prompt})
+        candidates = []
+        for index in range(candidate_count):
+            api_type, model_name = candidate_models[index % len(candidate_models)]
+            candidates.append({"api_type": api_type, "model": model_name, "state": "running", "content": "", "preview_parts": [],
+                               "token_info": None, "elapsed": 0, "cancel_token": api_handler.CancelToken(),
+                               "snapshot": dict(base_snapshot, selected_model=model_name)})
+        cancel_token = api_handler.CancelToken() # 작업 전체 취소 시 모든 후보 요청 중단
+        for candidate in candidates: cancel_token.add_closer(candidate["cancel_token"].cancel)
+        job_key, job_name = self._register_generation_job(target_chapter_arc_dir, target_scene_number, is_new_scene, cancel_token, candidates=candidates,
+                                                          api_type=self.current_api_type, scene_settings=base_snapshot)
+        print(f"CORE INFO: 장면 후보 {candidate_count}개 동시 생성 시작: {', '.join(c['api_type'] + '/' + c['model'] for c in candidates)}")
+
+        for index, candidate in enumerate(candidates):
+            if self._submit_background_job(self.pools.api, f"{job_name} (후보 {index + 1})", self._run_candidate_in_thread,
+                                           cancel_token, index, candidate["api_type"], prompt_text, candidate["model"], self.system_prompt,
+                                           temperature_val, candidate["cancel_token"],
+                                           priority=worker_pools.PRIORITY_INTERACTIVE, slot_key=candidate["api_type"]) is None:
+                candidate.update(state="error", content="오류: 후보 생성을 시작하지 못했습니다.")
+        if all(candidate["state"] == "error" for candidate in candidates):
+            self.handle_cancel_request(); return
+
+        ch_str = self._get_chapter_number_str_from_folder(target_chapter_arc_dir)
+        chosen_index = gui_dialogs.show_scene_candidates_dialog(self.gui_manager.root, f"🎲 장면 후보 비교 - {ch_str} {target_scene_number:03d}",
+                                                                lambda: self._get_candidate_rows(cancel_token))
+        job = self._get_generation_job(target_chapter_arc_dir)
+        if job is None or job["cancel_token"] is not cancel_token: return # 비교 중 다른 곳에서 취소됨
+        if chosen_index is None or candidates[chosen_index]["state"] != "done":
+            print("CORE: 장면 후보 선택 취소됨.")
+            self.handle_cancel_request(); return
+
+        chosen = candidates[chosen_index]
+        for candidate in candidates:
+            if candidate is not chosen: candidate["cancel_token"].cancel() # 아직 생성 중인 후보는 중단
+        # 선택하지 않은 후보를 먼저 기록해 선택한 후보가 최신 버전이 되도록 함
+        kept_count = 0
+        for candidate in candidates:
+            if candidate is chosen or candidate["state"] != "done": continue
+            snapshot = dict(candidate["snapshot"]); snapshot[constants.TOKEN_INFO_KEY] = candidate["token_info"] or {}
+            if file_handler.record_scene_version(target_chapter_arc_dir, target_scene_number, candidate["content"], snapshot): kept_count += 1
+        print(f"CORE: 장면 후보 {chosen_index + 1} 선택 ({chosen['api_type']}/{chosen['model']}), 나머지 {kept_count}개 버전 기록에 보관.")
+        self._process_generation_result(chosen["content"], chosen["token_info"], target_chapter_arc_dir, target_scene_number,
+                                        chosen["snapshot"], is_new_scene, False, previous_scene_content, cancel_token)
+
+    def _run_candidate_in_thread(self, job_cancel_token, index, api_type, prompt, model_name, system_prompt, temperature, cancel_token):
+        """백그라운드 스레드: 장면 후보 하나 생성 (수신 조각은 후보 비교 창 미리보기로 전달)"""
+        started = time.time()
+        try:
+            on_text = lambda text: self.ui_dispatcher.post_text(("candidate_stream", id(cancel_token)),
+                                                                lambda joined: self._append_candidate_stream(job_cancel_token, index, joined), text)
+            api_result, token_data = api_handler.generate_webnovel_scene_api_call(api_type, model_name, prompt, system_prompt, temperature, cancel_token, on_text)
+        except Exception as e:
+            print(f"CORE THREAD: ❌ 장면 후보 {index + 1} 생성 오류: {e}")
+            traceback.print_exc()
+            api_result, token_data = f"오류 발생: {e}", None
+        self.ui_dispatcher.post(self._process_candidate_result, job_cancel_token, index, api_result, token_data, time.time() - started)
+
+    def _find_candidate(self, job_cancel_token, index):
+        job = next((job for job in self.generation_jobs.values() if job["cancel_token"] is job_cancel_token), None)
+        if job is None or not job.get("candidates") or job_cancel_token.is_cancelled(): return None
+        candidate = job["candidates"][index]
+        return None if candidate["cancel_token"].is_cancelled() else candidate
+
+    def _append_candidate_stream(self, job_cancel_token, index, text):
+        candidate = self._find_candidate(job_cancel_token, index)
+        if candidate and candidate["state"] == "running": candidate["preview_parts"].append(text)
+
+    def _process_candidate_result(self, job_cancel_token, index, result_data, token_data, elapsed):
+        """장면 후보 결과 기록 (메인 스레드). 표시는 후보 비교 창이 주기적으로 갱신."""
+        candidate = self._find_candidate(job_cancel_token, index)
+        if candidate is None:
+            print(f"CORE: 취소된 장면 후보 {index + 1} 결과 무시."); return
+        content = result_data.strip() if isinstance(result_data, str) else "오류: 잘못된 데이터 타입 수신"
+        is_error = not content or content.startswith("오류")
+        candidate.update(state="error" if is_error else "done", content=content or "오류: AI가 빈 내용을 생성했습니다.",
+                         token_info=token_data if isinstance(token_data, dict) else None, elapsed=elapsed)
+        print(f"CORE: 장면 후보 {index + 1} {'실패' if is_error else '완료'} ({candidate['api_type']}/{candidate['model']}, {elapsed:.1f}초)")
+
+    def _get_candidate_rows(self, job_cancel_token):
+        """후보 비교 창 표시용 행 목록 (작업이 취소됐으면 None)"""
+        job = next((job for job in self.generation_jobs.values() if job["cancel_token"] is job_cancel_token), None)
+        if job is None or job_cancel_token.is_cancelled(): return None
+        rows = []
+        for index, candidate in enumerate(job["candidates"]):
+            if candidate["state"] == "done":
+                state = f"✅ 완료 ({len(candidate['content']):,}자, {candidate['elapsed']:.1f}초)"
+                text = candidate["content"]
+            elif candidate["state"] == "error":
+                state = "❌ 실패"; text = candidate["content"]
+            else:
+                state = f"⏳ 생성 중... ({time.time() - job['started']:.0f}초)"; text = "".join(candidate["preview_parts"])
+            rows.append({"label": f"후보 {index + 1} · {candidate['api_type'].capitalize()} / {candidate['model']}", "state": state, "text": text,
+                         "running": candidate["state"] == "running", "selectable": candidate["state"] == "done"})
+        return rows
 
-    def _run_generation_in_thread(self, api_type, prompt, model_name, system_prompt, temperature, target_chapter_dir, target_scene_number, settings_snapshot, is_new_scene, previous_content):
+    def _run_generation_in_thread(self, api_type, prompt, model_name, system_prompt, temperature, target_chapter_dir, target_scene_number, settings_snapshot, is_new_scene, previous_content, cancel_token=None):
         """백그라운드 스레드: API 호출 수행 (API 타입 인자 추가)"""
         result_content = None; token_data = None; is_api_call_error = False; error_message_detail = ""
         thread_id = threading.get_ident()
@@ -1902,8 +3328,11 @@ class AppCore:
 
         try:
             # API 핸들러 호출 시 API 타입 전달
+            # 수신 조각은 프레임 단위로 합쳐 출력 패널에 미리보기로 표시
+            on_text = lambda text: self.ui_dispatcher.post_text(("generation_stream", id(cancel_token)),
+                                                                lambda joined: self._append_generation_stream(cancel_token, joined), text)
             api_result, token_data = api_handler.generate_webnovel_scene_api_call(
-                api_type, model_name, prompt, system_prompt, temperature
+                api_type, model_name, prompt, system_prompt, temperature, cancel_token, on_text
             )
             if isinstance(api_result, str) and api_result.startswith("오류"):
                 is_api_call_error = True; error_message_detail = api_result; result_content = api_result
@@ -1917,21 +3346,47 @@ class AppCore:
             traceback.print_exc()
             result_content = f"오류 발생: {error_message_detail}"; is_api_call_error = True; token_data = None
         finally:
-            if self.gui_manager and self.gui_manager.root and self.gui_manager.root.winfo_exists():
-                self.gui_manager.root.after(0, self._process_generation_result,
-                                            result_content, token_data, target_chapter_dir, target_scene_number,
-                                            settings_snapshot, is_new_scene, is_api_call_error,
-                                            previous_content)
-            else: print(f"CORE THREAD {thread_id}: GUI 루트 없음. 결과 처리 불가.")
-
-    def _process_generation_result(self, result_data, token_data, target_chapter_dir, target_scene_number, settings_snapshot, is_new_scene, is_error, previous_content):
-        """장면 생성 결과 처리 (메인 스레드에서 실행)"""
+            self.ui_dispatcher.post(self._process_generation_result,
+                                    result_content, token_data, target_chapter_dir, target_scene_number,
+                                    settings_snapshot, is_new_scene, is_api_call_error,
+                                    previous_content, cancel_token)
+
+    def _append_generation_stream(self, cancel_token, text):
+        """생성 중 수신한 텍스트 조각을 모으고, 현재 로드된 챕터의 요청이면 출력 패널에 이어 표시 (메인 스레드)"""
+        job = next((job for job in self.generation_jobs.values() if job["cancel_token"] is cancel_token), None)
+        if cancel_token is None or job is None: return
+        job["preview_parts"].append(text)
+        if self._get_generation_job(self.current_chapter_arc_dir) is not job: return # 다른 챕터: 모으기만
+        if not self.gui_manager or not self.gui_manager.output_panel: return
+        if self._streamed_generation_token is not cancel_token: # 첫 조각(또는 챕터 복귀): 지금까지 받은 내용으로 새로 표시
+            self._streamed_generation_token = cancel_token
+            self.gui_manager.output_panel.display_content("")
+            self.gui_manager.output_panel.update_token_display(None)
+            self.gui_manager.output_panel.append_streamed_text("".join(job["preview_parts"]))
+            return
+        self.gui_manager.output_panel.append_streamed_text(text)
+
+    def _process_generation_result(self, result_data, token_data, target_chapter_dir, target_scene_number, settings_snapshot, is_new_scene, is_error, previous_content, cancel_token=None):
+        """장면 생성 결과 처리 (메인 스레드에서 실행).
+        현재 로드된 챕터의 결과는 화면에 표시하고, 다른 챕터/소설의 결과는 화면을 건드리지 않고 저장만 함."""
         action_desc = "재생성" if not is_new_scene else "생성"
         target_file_str = f"{os.path.basename(target_chapter_dir)}/{target_scene_number:03d}"
+        job = self._get_generation_job(target_chapter_dir)
+        if cancel_token is not None and (cancel_token.is_cancelled() or job is None or job["cancel_token"] is not cancel_token):
+            # 취소된(또는 이미 다른 요청으로 대체된) 요청의 늦은 결과: 로드된 장면을 건드리지 않고 버림
+            print(f"CORE: 취소된 장면 {action_desc} 결과 무시 (Target: {target_file_str}).")
+            return
         print(f"CORE: 장면 {action_desc} 결과 처리 시작 (Target: {target_file_str}, IsError: {is_error})...")
 
-        self.stop_timer()
-        self.is_generating = False
+        is_foreground = job is not None and self.is_generating and self._get_generation_job(self.current_chapter_arc_dir) is job
+        queue_job_id = job.get("queue_job_id") if job is not None else None
+        if job is not None:
+            self.generation_jobs.pop(self._generation_job_key(target_chapter_dir), None)
+        else: # 토큰 없이 호출된 경우: 현재 소설 기준
+            job = {"novel_dir": self.current_novel_dir, "novel_name": self.current_novel_name, "started": 0}
+            is_foreground = True
+        self._update_generation_markers()
+        self._stop_timer_if_idle()
 
         if not self.gui_manager or not self.gui_manager.root or not self.gui_manager.root.winfo_exists():
              print("CORE WARN: 결과 처리 중단 - GUI 없음.")
@@ -1940,111 +3395,189 @@ class AppCore:
         generated_content = result_data if isinstance(result_data, str) else "오류: 잘못된 데이터 타입 수신"
         generated_content = generated_content.strip()
         final_token_info = token_data if isinstance(token_data, dict) else {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
+        job_novel_dir = job["novel_dir"]; job_novel_name = job["novel_name"]
+        # 다른 챕터의 결과는 어느 챕터인지 알 수 있도록 상태 메시지에 위치 표시
+        location_prefix = "" if is_foreground else f"[{job_novel_name}] {self._get_chapter_number_str_from_folder(target_chapter_dir)} - {target_scene_number:03d}: "
 
-        # Display generated content (or error message)
-        self.display_output_content(generated_content, final_token_info)
+        # Display generated content (or error message) - 현재 챕터의 결과만
+        if is_foreground:
+            self.display_output_content(generated_content, final_token_info)
 
         status_message = ""
         saved_scene_path = None # Store the path of the successfully saved scene file
         novel_dir_for_summary = None
+        generate_seconds = time.time() - job["started"] if job.get("started") else 0
+        save_seconds = None # 자동 집필 보고용 저장 소요 시간
 
         if not is_error and generated_content:
             char_count_str = f"{len(generated_content):,}자"
             elapsed_time_str = ""
-            if self.start_time > 0:
-                elapsed_time = time.time() - self.start_time; elapsed_time_str = f"{elapsed_time:.1f}초"
-                self.start_time = 0
+            if job.get("started"):
+                elapsed_time = time.time() - job["started"]; elapsed_time_str = f"{elapsed_time:.1f}초"
             time_str_display = f" ({elapsed_time_str})" if elapsed_time_str else ""
 
             # Check required context info again before saving
-            if not target_chapter_dir or target_scene_number < 1 or not self.current_novel_dir or not self.current_novel_name:
-                 status_message = f"⚠️ 생성 성공, 저장 실패 (내부 정보 부족!). ({char_count_str}{time_str_display})"
+            if not target_chapter_dir or target_scene_number < 1 or not job_novel_dir or not job_novel_name:
+                 status_message = f"⚠️ {location_prefix}생성 성공, 저장 실패 (내부 정보 부족!). ({char_count_str}{time_str_display})"
                  print("CORE ERROR: 결과 저장 실패 - 필수 컨텍스트 정보 부족.")
-                 self.last_generation_settings_snapshot = None; self.last_generation_previous_content = None
+                 if is_foreground:
+                     self.last_generation_settings_snapshot = None; self.last_generation_previous_content = None
                  novel_dir_for_summary = None
             else:
                  print(f"CORE: 생성된 장면 내용 저장 시도: {target_file_str}.txt")
+                 save_started = time.time()
                  saved_content_path = file_handler.save_scene_content(target_chapter_dir, target_scene_number, generated_content)
 
                  if saved_content_path:
                      # Add token info to the settings snapshot before saving
                      snapshot_with_tokens = settings_snapshot.copy()
                      snapshot_with_tokens[constants.TOKEN_INFO_KEY] = final_token_info
+                     snapshot_with_tokens[constants.QUEUE_JOB_ID_KEY] = queue_job_id or "" # 재시작 시 완료 여부 확인용
 
                      print(f"CORE: 장면 설정(스냅샷+토큰) 저장 시도: {target_file_str}_settings.json")
                      if file_handler.save_scene_settings(target_chapter_dir, target_scene_number, snapshot_with_tokens):
+                         file_handler.record_scene_version(target_chapter_dir, target_scene_number, generated_content, snapshot_with_tokens)
+                         save_seconds = time.time() - save_started
                          saved_scene_path = saved_content_path # Store path to the .txt file
                          ch_str = self._get_chapter_number_str_from_folder(target_chapter_dir)
-                         status_message = f"✅ [{self.current_novel_name}] {ch_str} - {target_scene_number:03d} 장면 {action_desc} 완료! ({char_count_str}{time_str_display})"
+                         status_message = f"✅ [{job_novel_name}] {ch_str} - {target_scene_number:03d} 장면 {action_desc} 완료! ({char_count_str}{time_str_display})"
                          print(f"CORE: 장면 {action_desc} 성공 및 저장 완료: {saved_scene_path}")
 
-                         # Update current state to reflect the newly generated/saved scene
-                         self.current_chapter_arc_dir = target_chapter_dir # Ensure chapter dir is current
-                         self.current_scene_path = saved_scene_path
-                         self.current_loaded_scene_settings = snapshot_with_tokens.copy() # Update loaded scene settings
+                         if is_foreground:
+                             # Update current state to reflect the newly generated/saved scene
+                             self.current_chapter_arc_dir = target_chapter_dir # Ensure chapter dir is current
+                             self.current_scene_path = saved_scene_path
+                             self.current_loaded_scene_settings = snapshot_with_tokens.copy() # Update loaded scene settings
 
-                         # Update regeneration context
-                         # previous_content는 이제 해당 챕터의 모든 이전 장면 내용임
-                         self.last_generation_settings_snapshot = settings_snapshot.copy() # 스냅샷은 그대로
-                         self.last_generation_previous_content = previous_content # 결합된 이전 내용 저장
+                             # Update regeneration context
+                             # previous_content는 이제 해당 챕터의 모든 이전 장면 내용임
+                             self.last_generation_settings_snapshot = settings_snapshot.copy() # 스냅샷은 그대로
+                             self.last_generation_previous_content = previous_content # 결합된 이전 내용 저장
 
-                         # Re-populate settings panel with potentially updated scene settings
-                         self.populate_settings_panel(self.current_novel_settings, self.current_loaded_chapter_arc_settings, self.current_loaded_scene_settings)
+                             # Re-populate settings panel with potentially updated scene settings
+                             self.populate_settings_panel(self.current_novel_settings, self.current_loaded_chapter_arc_settings, self.current_loaded_scene_settings)
 
-                         self.refresh_treeview_data()
-                         self.select_treeview_item(saved_scene_path)
+                             self.refresh_treeview_data()
+                             self.select_treeview_item(saved_scene_path)
+                         else:
+                             self.refresh_treeview_data() # 새 장면 노드만 반영, 현재 선택은 유지
 
-                         novel_dir_for_summary = self.current_novel_dir # Trigger summary for the novel
+                         novel_dir_for_summary = job_novel_dir # Trigger summary for the novel
 
                      else: # Scene content saved, but settings snapshot failed
-                         status_message = f"⚠️ 내용 저장됨, 장면 설정 저장 실패. ({char_count_str}{time_str_display})"
+                         status_message = f"⚠️ {location_prefix}내용 저장됨, 장면 설정 저장 실패. ({char_count_str}{time_str_display})"
                          print(f"CORE ERROR: 장면 설정 저장 실패: {target_file_str}_settings.json")
-                         # Keep scene loaded, but settings might be inconsistent
-                         self.current_chapter_arc_dir = target_chapter_dir
-                         self.current_scene_path = saved_content_path
-                         self.current_loaded_scene_settings = {} # Clear loaded settings as save failed
+                         if is_foreground:
+                             # Keep scene loaded, but settings might be inconsistent
+                             self.current_chapter_arc_dir = target_chapter_dir
+                             self.current_scene_path = saved_content_path
+                             self.current_loaded_scene_settings = {} # Clear loaded settings as save failed
+                         else: self.refresh_treeview_data()
                          novel_dir_for_summary = None
 
                  else: # Scene content save failed
-                     status_message = f"⚠️ 생성 성공, 내용 저장 실패. ({char_count_str}{time_str_display})"
+                     status_message = f"⚠️ {location_prefix}생성 성공, 내용 저장 실패. ({char_count_str}{time_str_display})"
                      print(f"CORE ERROR: 장면 내용 저장 실패: {target_file_str}.txt")
-                     # Clear scene state as content save failed
-                     self.current_scene_path = None; self.current_loaded_scene_settings = {}
+                     if is_foreground:
+                         # Clear scene state as content save failed
+                         self.current_scene_path = None; self.current_loaded_scene_settings = {}
                      self.refresh_treeview_data()
                      novel_dir_for_summary = None
 
         else: # API call resulted in an error or empty content
              if not generated_content and not is_error: # Empty content but no error
-                  status_message = "⚠️ AI가 빈 내용을 생성했습니다. 플롯이나 설정을 확인하세요."
+                  status_message = f"⚠️ {location_prefix}AI가 빈 내용을 생성했습니다. 플롯이나 설정을 확인하세요."
                   print(f"CORE WARN: 빈 내용 생성됨 (Target: {target_file_str})")
              else: # Actual error
-                  status_message = generated_content # Contains the error message
-                  print(f"CORE ERROR: 장면 {action_desc} 실패 - {status_message}")
-
-             self.last_generation_settings_snapshot = None # Clear context on error/empty
-             self.last_generation_previous_content = None
-
-             # Keep chapter loaded, clear scene state if it was a new scene attempt
-             if is_new_scene:
-                 self.current_scene_path = None
-                 self.current_loaded_scene_settings = {}
-                 self.refresh_treeview_data() # Show that new scene wasn't created
-             # If regenerating, keep the current scene loaded but show error
+                  status_message = f"{location_prefix}{generated_content}" # Contains the error message
+                  print(f"CORE ERROR: 장면 {action_desc} 실패 - {generated_content}")
+
+             if is_foreground:
+                 self.last_generation_settings_snapshot = None # Clear context on error/empty
+                 self.last_generation_previous_content = None
+
+                 # Keep chapter loaded, clear scene state if it was a new scene attempt
+                 if is_new_scene:
+                     self.current_scene_path = None
+                     self.current_loaded_scene_settings = {}
+                     self.refresh_treeview_data() # Show that new scene wasn't created
+                 # If regenerating, keep the current scene loaded but show error
              novel_dir_for_summary = None
 
         # Final UI state update
-        final_scene_loaded = bool(saved_scene_path or (not is_new_scene and self.current_scene_path))
+        if is_foreground:
+            final_scene_loaded = bool(saved_scene_path or (not is_new_scene and self.current_scene_path))
+        else:
+            final_scene_loaded = bool(self.current_scene_path)
         final_novel_loaded = bool(self.current_novel_dir) # novel_loaded 상태 추가
-        self.update_ui_status_and_state(status_message, generating=False, novel_loaded=final_novel_loaded, chapter_loaded=bool(self.current_chapter_arc_dir), scene_loaded=final_scene_loaded) # novel_loaded 전달
+        self.update_ui_status_and_state(status_message, generating=self.is_generating, novel_loaded=final_novel_loaded, chapter_loaded=bool(self.current_chapter_arc_dir), scene_loaded=final_scene_loaded) # novel_loaded 전달
         if status_message.startswith("✅") and self.gui_manager:
              self.gui_manager.schedule_status_clear(status_message, 5000)
 
-        # Trigger summary if appropriate
-        if novel_dir_for_summary:
+        # Trigger summary if appropriate (요약은 로드된 소설의 설정에만 반영되므로 현재 소설일 때만)
+        if novel_dir_for_summary and self.current_novel_dir and os.path.normpath(novel_dir_for_summary) == os.path.normpath(self.current_novel_dir):
              self._trigger_summary_generation(novel_dir_for_summary)
 
+        if queue_job_id:
+            self.generation_queue.finish_job(queue_job_id, bool(saved_scene_path), "" if saved_scene_path else status_message)
+            self._record_autopilot_progress(queue_job_id, bool(saved_scene_path), generate_seconds, save_seconds)
         print(f"CORE: 장면 {action_desc} 결과 처리 완료.")
+        self._resume_pending_quit()
+        self._pump_generation_queue()
+
 
+    def handle_cancel_request(self, cancel_all=False, requeue_queue_jobs=False):
+        """진행 중인 AI 생성/요약 취소: API 요청을 중단하고 작업 상태를 즉시 해제 (늦게 도착한 결과는 버림).
+        기본은 현재 챕터의 생성만 취소, cancel_all이면 다른 챕터/소설의 생성도 모두 취소.
+        대기열에서 시작한 작업은 일시 정지 (requeue_queue_jobs면 다음 실행 때 이어서 하도록 대기 상태로)."""
+        cancelled = []
+        if cancel_all: jobs_to_cancel = list(self.generation_jobs.values())
+        else:
+            foreground_job = self._get_generation_job(self.current_chapter_arc_dir)
+            jobs_to_cancel = [foreground_job] if foreground_job else []
+        foreground_key = self._generation_job_key(self.current_chapter_arc_dir) if self.current_chapter_arc_dir else None
+        for job in jobs_to_cancel:
+            job["cancel_token"].cancel()
+            self.generation_jobs.pop(self._generation_job_key(job["chapter_dir"]), None)
+            if self._generation_job_key(job["chapter_dir"]) == foreground_key: self._restore_output_after_cancel(job)
+            if job.get("queue_job_id"):
+                if requeue_queue_jobs: self.generation_queue.requeue_job(job["queue_job_id"])
+                else: self.generation_queue.pause_job(job["queue_job_id"])
+        if jobs_to_cancel:
+            cancelled.append("장면 생성" if len(jobs_to_cancel) == 1 else f"장면 생성 {len(jobs_to_cancel)}개")
+            self._update_generation_markers()
+        # 장면 계획: 현재 챕터의 계획, 현재 챕터에 취소할 작업이 없으면 (다른 챕터에서 시작한) 모든 계획
+        if cancel_all or (not jobs_to_cancel and foreground_key not in self._autopilot_planning): plan_keys = list(self._autopilot_planning)
+        else: plan_keys = [foreground_key] if foreground_key in self._autopilot_planning else []
+        for key in plan_keys:
+            self._autopilot_planning.pop(key).cancel()
+        if plan_keys: cancelled.append("장면 계획")
+        if self.is_summarizing:
+            if self.summary_cancel_token: self.summary_cancel_token.cancel()
+            self.summary_cancel_token = None
+            self.is_summarizing = False
+            self._summary_rerun_novel_dir = None # 취소한 요약을 끝난 뒤 다시 시작하지 않음
+            cancelled.append("줄거리 요약")
+        if not cancelled: return
+        print(f"CORE: 작업 취소됨: {', '.join(cancelled)}")
+        self._stop_timer_if_idle()
+        status_message = f"⛔ {', '.join(cancelled)} 취소됨."
+        self.update_ui_status_and_state(status_message, generating=False, novel_loaded=bool(self.current_novel_dir),
+                                        chapter_loaded=bool(self.current_chapter_arc_dir), scene_loaded=bool(self.current_scene_path))
+        if self.gui_manager: self.gui_manager.schedule_status_clear(status_message, 3000)
+        self._resume_pending_quit()
+        self._pump_generation_queue()
+
+    def _restore_output_after_cancel(self, job):
+        """취소된 현재 챕터 생성의 스트리밍 미리보기를 걷어냄: 재생성이면 저장된 장면 내용을 다시 표시, 새 장면이면 비움
+        (잘린 미리보기가 편집 내용으로 남아 원래 장면을 덮어쓰지 않도록)"""
+        if self._streamed_generation_token is job["cancel_token"]: self._streamed_generation_token = None
+        current_scene_number = self._get_scene_number_from_path(self.current_scene_path) if self.current_scene_path else -1
+        if not job["is_new_scene"] and current_scene_number == job["scene_number"]:
+            content = file_handler.load_scene_content(job["chapter_dir"], job["scene_number"])
+            self.display_output_content(content or "", self.current_loaded_scene_settings.get(constants.TOKEN_INFO_KEY))
+        elif job["is_new_scene"] and not self.current_scene_path:
+            self.clear_output_panel()
 
     def start_timer(self, initial_message="⏳ 작업 중..."):
         """타이머 시작 및 상태 표시줄 업데이트 시작"""
@@ -2064,18 +3597,31 @@ class AppCore:
             except Exception: pass
             self.timer_after_id = None
 
+    def _stop_timer_if_idle(self):
+        """진행 중인 생성/요약 작업이 하나도 없을 때만 타이머 중지"""
+        if self.generation_jobs or self.is_summarizing: return
+        self.stop_timer()
+        self.start_time = 0
+
     def _update_timer_display(self):
-        """타이머 상태 표시줄 업데이트 (주기적 호출)"""
+        """타이머 상태 표시줄 업데이트 (주기적 호출). 현재 챕터의 생성 > 요약 > 다른 챕터의 생성 순으로 표시."""
         if not self.gui_manager or not self.gui_manager.root: return
-        if self.is_generating or self.is_summarizing:
-            elapsed_time = time.time() - self.start_time if self.start_time > 0 else 0
-            spinner_icons = ["◐", "◓", "◑", "◒"]
-            icon = spinner_icons[int(elapsed_time * 2.5) % len(spinner_icons)]
-            status_prefix = "⏳ AI 생성 중..." if self.is_generating else "⏳ 이전 줄거리 요약 중..."
-            self.update_status_bar(f"{icon} {status_prefix} ({elapsed_time:.1f}초)")
-            if self.gui_manager.root.winfo_exists():
-                 self.timer_after_id = self.gui_manager.root.after(150, self._update_timer_display)
-            else: self.timer_after_id = None
+        self.timer_after_id = None
+        if not (self.generation_jobs or self.is_summarizing): return
+        foreground_job = self._get_generation_job(self.current_chapter_arc_dir)
+        if foreground_job:
+            status_prefix = "⏳ AI 생성 중..."; started = foreground_job["started"]
+        elif self.is_summarizing:
+            status_prefix = "⏳ 이전 줄거리 요약 중..."; started = self.start_time
+        else:
+            status_prefix = f"⏳ 다른 챕터에서 장면 생성 중 ({len(self.generation_jobs)}개)..."
+            started = min(job["started"] for job in self.generation_jobs.values())
+        elapsed_time = time.time() - started if started > 0 else 0
+        spinner_icons = ["◐", "◓", "◑", "◒"]
+        icon = spinner_icons[int(elapsed_time * 2.5) % len(spinner_icons)]
+        self.update_status_bar(f"{icon} {status_prefix} ({elapsed_time:.1f}초)")
+        if self.gui_manager.root.winfo_exists():
+             self.timer_after_id = self.gui_manager.root.after(150, self._update_timer_display)
 
 
     # --- Summary Logic ---
@@ -2093,24 +3639,29 @@ class AppCore:
             if self.gui_manager: self.gui_manager.schedule_status_clear(f"⚠️ {current_api.capitalize()} 요약 모델 미설정", 3000)
             return
         if not novel_dir or not os.path.isdir(novel_dir): return
-        if self.is_summarizing: print("CORE INFO: 이미 요약 작업 진행 중."); return
-        if self.is_generating: print("CORE INFO: 생성 작업 중. 요약 건너뜀."); return
+        if self.is_summarizing: # 진행 중인 요약에는 방금 저장된 장면이 빠져 있으므로 끝난 뒤 다시 요약
+            print("CORE INFO: 이미 요약 작업 진행 중. 완료 후 다시 요약."); self._summary_rerun_novel_dir = novel_dir; return
+        # 대기열 작업(자동 집필 등)은 요약과 겹쳐 진행, 직접 요청한 생성만 기다림
+        if any(not job.get("queue_job_id") for job in self._find_generation_jobs_under(novel_dir)):
+            print("CORE INFO: 이 소설에서 생성 작업 중. 요약 건너뜀."); return
 
         print(f"CORE: 소설 '{os.path.basename(novel_dir)}' 줄거리 요약 생성 시작 (API: {current_api}, Model: {summary_model_for_current_api})...")
         self.is_summarizing = True
+        self._summary_started_at = time.time()
+        self.summary_cancel_token = api_handler.CancelToken()
         self.start_timer("⏳ 이전 줄거리 요약 중...")
         self.update_ui_state()
 
-        # 스레드 인자에 API 타입과 모델 전달
-        thread_args = (current_api, summary_model_for_current_api, novel_dir)
-        summary_thread = threading.Thread(
-            target=self._run_summary_in_thread,
-            args=thread_args,
-            daemon=True
-        )
-        summary_thread.start()
+        # 작업 인자에 API 타입, 모델, 취소 토큰 전달
+        thread_args = (current_api, summary_model_for_current_api, novel_dir, self.summary_cancel_token)
+        if self._submit_background_job(self.pools.api, f"줄거리 요약: {os.path.basename(novel_dir)}", self._run_summary_in_thread, *thread_args,
+                                       priority=worker_pools.PRIORITY_SUMMARY, slot_key=current_api) is None:
+            self.is_summarizing = False
+            self.summary_cancel_token = None
+            self._stop_timer_if_idle()
+            self.update_ui_state()
 
-    def _run_summary_in_thread(self, api_type, model_name, novel_dir):
+    def _run_summary_in_thread(self, api_type, model_name, novel_dir, cancel_token=None):
         """백그라운드 스레드: 전체 장면 읽고 요약 API 호출 (API 타입 인자 추가)"""
         summary_result = None; error_detail = None; token_data = None; thread_id = threading.get_ident()
         print(f"CORE THREAD {thread_id}: 요약 작업 시작 (API: {api_type}, Model: {model_name}, Novel: {os.path.basename(novel_dir)})...")
@@ -2123,7 +3674,7 @@ class AppCore:
             else:
                 print(f"CORE THREAD {thread_id}: 총 {len(all_content):,}자 내용 요약 {api_type.upper()} API 호출...")
                 # API 핸들러 호출 시 API 타입 전달
-                summary_api_result, token_data = api_handler.generate_summary_api_call(api_type, model_name, all_content)
+                summary_api_result, token_data = api_handler.generate_summary_api_call(api_type, model_name, all_content, cancel_token)
                 if isinstance(summary_api_result, str) and summary_api_result.startswith("오류"):
                     print(f"CORE THREAD {thread_id}: ❌ 요약 {api_type.upper()} API 호출 실패: {summary_api_result}")
                     error_detail = summary_api_result; summary_result = None
@@ -2134,15 +3685,20 @@ class AppCore:
             error_detail = f"요약 스레드 {thread_id} 내부 오류: {e}"; print(f"CORE THREAD {thread_id}: ❌ {error_detail}")
             traceback.print_exc(); summary_result = None
         finally:
-            if self.gui_manager and self.gui_manager.root and self.gui_manager.root.winfo_exists():
-                self.gui_manager.root.after(0, self._process_summary_result, novel_dir, summary_result, error_detail)
-            else: print(f"CORE THREAD {thread_id}: GUI 루트 없음. 요약 결과 처리 불가.")
+            self.ui_dispatcher.post(self._process_summary_result, novel_dir, summary_result, error_detail, cancel_token)
 
-    def _process_summary_result(self, novel_dir, summary_text, error_detail):
+    def _process_summary_result(self, novel_dir, summary_text, error_detail, cancel_token=None):
         """요약 결과 처리 (메인 스레드에서 실행)"""
+        if cancel_token is not None and (cancel_token.is_cancelled() or cancel_token is not self.summary_cancel_token):
+            print(f"CORE: 취소된 요약 결과 무시 ({os.path.basename(novel_dir)}).")
+            return
         print(f"CORE: 요약 결과 처리 시작 ({os.path.basename(novel_dir)})...")
         self.is_summarizing = False
-        self.stop_timer()
+        self.summary_cancel_token = None
+        self._stop_timer_if_idle()
+        summary_seconds = time.time() - self._summary_started_at
+        for run in self.generation_queue.get_open_runs(os.path.basename(novel_dir)):
+            self.generation_queue.record_run_timing(run["id"], "summary", summary_seconds)
 
         if not self.gui_manager or not self.gui_manager.settings_panel:
              print("CORE WARN: 요약 결과 처리 실패 - GUI 없음"); self.update_ui_state(); return
@@ -2197,6 +3753,11 @@ class AppCore:
              self.update_status_bar_conditional("⚠️ 이전 줄거리 요약 실패 (결과 없음).")
 
         self.update_ui_state()
+        rerun_novel_dir, self._summary_rerun_novel_dir = self._summary_rerun_novel_dir, None
+        if rerun_novel_dir and self.current_novel_dir and os.path.normpath(rerun_novel_dir) == os.path.normpath(self.current_novel_dir):
+            self._trigger_summary_generation(rerun_novel_dir)
+        self._resume_pending_quit()
+        self._pump_generation_queue()
 
     # --- 내부 유틸리티 함수 ---
     def _get_chapter_number_from_folder(self, folder_path_or_name):
@@ -17,6 +17,123 @@ CHAPTER_SETTINGS_FILENAME = "chapter_settings.json" # 챕터 아크 전체 설
 # --- 장면 (Scene/파일) 레벨 ---
 SCENE_FILENAME_FORMAT = "{:03d}.txt"
 SCENE_SETTINGS_FILENAME_FORMAT = "{:03d}_settings.json"
+# 챕터 매니페스트: 챕터 내 모든 장면 설정을 하나의 파일에 보관 (XXX_settings.json 대체)
+CHAPTER_MANIFEST_FILENAME = "chapter_manifest.json"
+CHAPTER_MANIFEST_VERSION = 1
+
+# --- 저장소 (SQLite 가져오기/내보내기) ---
+SQLITE_DB_DEFAULT_FILENAME = "novels.db"
+SQLITE_DB_FILETYPES = [("SQLite DB", "*.db *.sqlite"), ("모든 파일", "*.*")]
+
+# --- 소설 팩 (단일 파일 아카이브, 읽기 전용) ---
+NOVEL_PACK_EXTENSION = ".novelpack"
+NOVEL_PACK_FILETYPES = [("소설 팩", "*.novelpack"), ("모든 파일", "*.*")]
+
+# --- 원고 내보내기 (TXT / Markdown / EPUB) ---
+EXPORT_FORMAT_TXT = "txt"
+EXPORT_FORMAT_MARKDOWN = "md"
+EXPORT_FORMAT_EPUB = "epub"
+EXPORT_FORMAT_EXTENSIONS = {".txt": EXPORT_FORMAT_TXT, ".md": EXPORT_FORMAT_MARKDOWN, ".markdown": EXPORT_FORMAT_MARKDOWN, ".epub": EXPORT_FORMAT_EPUB}
+EXPORT_FILETYPES = [("텍스트", "*.txt"), ("Markdown", "*.md"), ("EPUB 전자책", "*.epub")]
+EXPORT_SCENE_SEPARATOR = "* * *" # 장면 구분선 (TXT/Markdown)
+EXPORT_WRITE_BUFFER_SIZE = 1024 * 1024 # 출력 파일 쓰기 버퍼 (바이트)
+EXPORT_EPUB_LANGUAGE = "ko"
+EXPORT_EPUB_COMPRESS_LEVEL = 6
+
+# --- 원고 가져오기 (단일 텍스트 파일 / 챕터 폴더) ---
+# 챕터 제목 줄: '## 제목', '제 3 화 ...', '3화: ...', 'Chapter 3 ...' (이름 있는 그룹 'title'이 있으면 그 부분을 제목으로 사용)
+IMPORT_CHAPTER_PATTERN_DEFAULT = r"^[ \t]*(?:#{1,2}[ \t]+\S.*|제[ \t]*\d+[ \t]*[화장](?:[ \t.:].*)?|\d+[ \t]*[화장](?:[ \t.:].*)?|Chapter[ \t]+\d+(?:[ \t.:].*)?)$"
+# 장면 구분 줄: '* * *', '---', '===', '###'
+IMPORT_SCENE_SEPARATOR_DEFAULT = r"^[ \t]*(?:\*[ \t]*\*[ \t]*\*|-{3,}|={3,}|#{3})[ \t]*$"
+IMPORT_SOURCE_EXTENSIONS = (".txt", ".md", ".markdown")
+IMPORT_SOURCE_FILETYPES = [("텍스트 원고", "*.txt *.md *.markdown"), ("모든 파일", "*.*")]
+IMPORT_SOURCE_ENCODINGS = ("utf-8-sig", "cp949") # 원고 파일 인코딩 시도 순서
+IMPORT_WRITE_WORKERS = 8 # 챕터 병렬 기록 스레드 수
+IMPORT_CHAPTER_TITLE_MAX_CHARS = 40 # 챕터 폴더명에 넣는 제목 최대 글자 수
+
+# --- 챕터 압축 보관 (zstd) ---
+CHAPTER_ARCHIVE_MARKER_FILENAME = ".archived.json" # 챕터 폴더 내 압축 보관 표시 파일
+COMPRESSION_DICT_FILENAME = ".compression_dict.zstd" # 소설 폴더 내 zstd 압축 사전
+COMPRESSION_DICT_SIZE = 112640 # 압축 사전 크기 (바이트)
+COMPRESSION_DICT_MIN_SAMPLES = 8 # 사전 학습에 필요한 최소 장면 수
+ZSTD_COMPRESSION_LEVEL = 10
+
+# --- 작업 스레드 풀 (API / 파일 I/O / CPU) ---
+API_WORKER_COUNT = 4 # AI 생성/요약 호출 스레드 수 (동시 장면 생성은 최대 이 값 - 1, 나머지 하나는 요약용)
+DEFAULT_MAX_CONCURRENT_GENERATIONS = 2 # 서로 다른 챕터에서 동시에 진행할 수 있는 장면 생성 수 (config로 조정)
+API_QUEUE_SIZE = 4 # 실행 대기 가능한 백그라운드 API 작업 수 (초과 시 거절, 대화형 요청은 제한 없음)
+API_INTERACTIVE_RESERVED_SLOTS = 1 # 요약/일괄 작업이 쓰지 않고 새 장면/재생성 요청용으로 비워 두는 호출 자리 (제공자별, 전체)
+API_PRIORITY_AGING_S = 60 # 이 시간만큼 기다린 작업은 우선순위 한 단계 상승 (일괄 작업이 밀리기만 하지 않도록)
+IO_WORKER_COUNT = 2 # 트리 항목 로드 등 백그라운드 파일 읽기 스레드 수
+IO_QUEUE_SIZE = 32
+CPU_WORKER_COUNT = max(1, min(4, (os.cpu_count() or 2) - 1)) # 압축/내보내기/가져오기 등 계산 위주 작업
+CPU_QUEUE_SIZE = 16
+WORKER_SHUTDOWN_TIMEOUT_S = 10 # 종료 시 실행 중인 작업을 기다리는 최대 시간
+SHUTDOWN_POLL_MS = 100 # 종료 준비 중 작업 마무리 확인 간격 (그동안 창은 계속 응답)
+INTERRUPTED_JOBS_FILENAME = ".interrupted_jobs.json" # 종료 시 끝나지 않은 작업 기록 (저장 폴더 내)
+
+# --- 생성 작업 대기열 (디스크 보관, 재시작 후 이어서 진행) ---
+GENERATION_QUEUE_FILENAME = ".generation_queue.json" # 저장 폴더 내
+GENERATION_QUEUE_MAX_ATTEMPTS = 3 # 자동 재시도를 포함한 작업당 최대 시도 횟수
+GENERATION_QUEUE_RETRY_DELAY_S = 30 # 실패 후 재시도까지 대기 (시도 횟수만큼 늘어남)
+GENERATION_QUEUE_POLL_MS = 5000 # 바로 시작할 수 없는 작업이 남아 있을 때 다시 확인하는 간격
+GENERATION_QUEUE_PLOT_SEPARATOR = "---" # 일괄 추가 시 장면 플롯 구분 줄
+
+# --- 챕터 자동 집필 (계획 -> 장면 생성/요약을 겹쳐 진행) ---
+AUTOPILOT_DEFAULT_SCENE_COUNT = 5
+AUTOPILOT_MAX_SCENE_COUNT = 30
+SCENE_PLAN_TEMPERATURE = 0.7 # 장면 플롯 계획 호출 온도
+
+# --- 장면 후보 여러 개 동시 생성 ---
+SCENE_CANDIDATE_MAX_COUNT = 4 # 한 번에 생성할 수 있는 후보 수 (API 스레드 수 이하)
+SCENE_CANDIDATE_POLL_MS = 300 # 후보 비교 창 갱신 간격
+
+# --- UI 이벤트 전달 (작업 스레드 -> 메인 스레드) ---
+UI_DISPATCH_INTERVAL_MS = 30 # 대기열을 비우는 간격 (이 간격 안에 쌓인 이벤트/텍스트 조각은 합쳐서 처리)
+
+# --- 지연 쓰기 ---
+WRITE_BEHIND_DELAY_MS = 200 # 지연 쓰기: 여러 저장을 모아 한 번에 기록하기 전 대기 시간
+WRITE_BEHIND_FLUSH_TIMEOUT_S = 10 # 종료 시 대기열 비우기 최대 대기 시간
+WRITE_BEHIND_SYNC_TIMEOUT_S = 3 # 작업 중(UI 스레드) 대기열 비우기/진행 중인 쓰기 최대 대기 시간
+
+# --- 이전 장면 블록 캐시 (생성 프롬프트용) ---
+PREVIOUS_SCENE_CACHE_MAX_CHARS = 4_000_000 # 캐시에 담아 두는 장면 내용 총 글자 수 (넘으면 가장 오래 안 쓴 장면부터 제거)
+
+# --- 휴지통 ---
+TRASH_DIR_NAME = ".trash" # 저장 폴더 내 휴지통 폴더 (트리뷰에 표시 안 됨)
+TRASH_MANIFEST_FILENAME = "trash_manifest.json"
+TRASH_MANIFEST_VERSION = 1
+DEFAULT_TRASH_RETENTION_DAYS = 7 # 휴지통 항목 자동 영구 삭제까지의 기간
+
+# --- 트리뷰 항목 상태 표시 ---
+TREE_GENERATING_BADGE = " ⏳" # 장면 생성 작업이 진행 중인 소설/챕터/장면 노드 뒤에 붙는 표시
+
+# --- 챕터 브랜치 ---
+BRANCHES_DIR_NAME = ".branches" # 챕터 폴더 내 비활성 브랜치 보관 폴더
+BRANCHES_MANIFEST_FILENAME = "branches.json"
+BRANCHES_MANIFEST_VERSION = 1
+BRANCH_SCENE_SETTINGS_FILENAME = "scene_settings.json" # 보관된 브랜치의 장면 설정
+DEFAULT_BRANCH_NAME = "main" # 첫 분기 시 기존 장면들이 속하는 브랜치
+
+# --- 장면 버전 기록 ---
+HISTORY_DIR_NAME = ".history" # 소설 폴더(내용 보관소) 및 챕터 폴더(버전 목록) 내 기록 폴더
+SCENE_VERSION_LIST_FILENAME_FORMAT = "{:03d}.json"
+SCENE_VERSION_LIST_VERSION = 1
+SCENE_VERSION_HISTORY_LIMIT = 500 # 장면당 최대 버전 수 (0 = 무제한)
+HISTORY_GC_MIN_AGE_S = 3600 # 기록 정리 시 이보다 최근에 저장/재사용된 보관소 내용은 참조가 없어도 남김 (저장 중인 내용 보호)
+
+# --- 전문 검색 색인 ---
+SEARCH_INDEX_FILENAME = ".search_index.db" # 저장 폴더 내 검색 색인 DB (트리뷰에 표시 안 됨)
+SEARCH_INDEX_VERSION = 1
+SEARCH_MAX_LINE_HITS = 500 # 검색 결과로 표시할 최대 줄 수
+SEARCH_SNIPPET_LENGTH = 60 # 검색 결과 줄 미리보기 최대 길이
+SEARCH_FILTER_DELAY_MS = 300 # 검색창 입력 후 검색 시작까지 대기 시간
+SEARCH_HIT_HIGHLIGHT_BG = "#FFE58F" # 검색 결과 줄로 이동 시 검색어 강조 색
+
+# --- 소설 전체 찾아 바꾸기 ---
+REPLACE_JOURNAL_FILENAME = "replace_journal.json" # 소설 .history 폴더 내 마지막 찾아 바꾸기 기록 (되돌리기용)
+REPLACE_JOURNAL_VERSION = 1
+REPLACE_READ_WORKERS = 8 # 검색 색인이 없을 때 병렬로 파일을 읽는 스레드 수
 
 ICON_FILE = "novel_icon.ico"  # 아이콘 파일 이름
 
@@ -26,6 +143,8 @@ API_TYPE_GEMINI = "gemini"
 API_TYPE_CLAUDE = "claude"
 API_TYPE_GPT = "gpt"
 SUPPORTED_API_TYPES = [API_TYPE_GEMINI, API_TYPE_CLAUDE, API_TYPE_GPT]
+# API 제공자별 동시 호출 수 상한 (API 작업 풀의 우선순위 스케줄러가 적용)
+API_PROVIDER_MAX_CONCURRENT_CALLS = {API_TYPE_GEMINI: 4, API_TYPE_CLAUDE: 3, API_TYPE_GPT: 3}
 
 # API 키 환경 변수 이름
 GOOGLE_API_KEY_ENV = "GOOGLE_API_KEY"
@@ -64,6 +183,11 @@ CONFIG_API_TYPE_KEY = 'selected_api_type' # config.json 에 저장될 마지막
 CONFIG_MODEL_KEY = 'selected_model' # config.json 에 저장될 마지막 사용 모델 키
 # --- New Key ---
 CONFIG_ASK_KEYS_KEY = 'ask_for_missing_keys_on_startup' # 시작 시 누락된 키 확인 여부
+CONFIG_USE_CHAPTER_MANIFEST_KEY = 'use_chapter_manifest' # 장면 설정을 챕터 매니페스트에 저장할지 여부
+CONFIG_AUTO_ARCHIVE_DAYS_KEY = 'auto_archive_cold_chapter_days' # N일 이상 미수정 챕터 자동 압축 (0=사용 안 함)
+CONFIG_ARCHIVE_USE_DICTIONARY_KEY = 'archive_use_dictionary' # 압축 시 소설별 학습 사전 사용 여부
+CONFIG_TRASH_RETENTION_DAYS_KEY = 'trash_retention_days' # 휴지통 보존 기간 (일, 0=시작 시 바로 비움)
+CONFIG_MAX_CONCURRENT_GENERATIONS_KEY = 'max_concurrent_generations' # 동시 장면 생성 작업 수 상한 (1 이상)
 
 # 1. 소설 전체 레벨 (novel_settings.json 에 저장)
 NOVEL_MAIN_SETTINGS_KEY = 'novel_settings'
@@ -87,8 +211,11 @@ TOKEN_INFO_KEY = 'token_info'
 INPUT_TOKEN_KEY = 'input_tokens'
 OUTPUT_TOKEN_KEY = 'output_tokens'
 
-# XXX_settings.json 에 저장될 키 목록 (장면 플롯 + GUI 옵션 + 토큰 정보)
-SCENE_SETTING_KEYS_TO_SAVE = SCENE_SPECIFIC_SETTINGS + GUI_OTHER_SETTINGS + [TOKEN_INFO_KEY]
+# 6. 생성 작업 대기열로 만든 장면이면 그 작업 ID (재시작 시 저장까지 끝난 작업인지 확인용)
+QUEUE_JOB_ID_KEY = 'queue_job_id'
+
+# XXX_settings.json 에 저장될 키 목록 (장면 플롯 + GUI 옵션 + 토큰 정보 + 대기열 작업 ID)
+SCENE_SETTING_KEYS_TO_SAVE = SCENE_SPECIFIC_SETTINGS + GUI_OTHER_SETTINGS + [TOKEN_INFO_KEY, QUEUE_JOB_ID_KEY]
 
 # GUI에 표시되고 상호작용하는 모든 설정 관련 키 (소설 + 챕터 아크 + 장면 플롯 + GUI 기타)
 ALL_SETTING_KEYS_IN_GUI = NOVEL_LEVEL_SETTINGS + CHAPTER_LEVEL_SETTINGS + SCENE_SPECIFIC_SETTINGS + GUI_OTHER_SETTINGS
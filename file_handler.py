@@ -10,10 +10,52 @@ import re
 from dotenv import load_dotenv, set_key, find_dotenv
 import traceback
 import shutil
+import threading
 import tkinter as tk
 from tkinter import messagebox, simpledialog
+import time
+import hashlib
+import mmap
+import concurrent.futures
+import collections
+import difflib
+import uuid
+try: import zstandard # 챕터 압축 보관용 (선택)
+except ImportError: zstandard = None
 
 import constants # 다른 모듈의 상수 임포트
+import novel_pack # 읽기 전용 소설 팩(.novelpack)
+
+# --- 오류 알림 (작업 스레드 안전) ---
+_ui_dispatcher = None # func -> 메인 스레드에서 실행하도록 예약하는 함수 (AppCore가 등록)
+
+def set_ui_dispatcher(dispatcher):
+    """작업 스레드에서 발생한 오류 대화상자를 메인 스레드로 전달할 함수 등록."""
+    global _ui_dispatcher
+    _ui_dispatcher = dispatcher
+
+def _show_error(title, message):
+    """오류 대화상자 표시. 작업 스레드에서 호출되면 등록된 디스패처로 메인 스레드에 전달."""
+    if threading.current_thread() is threading.main_thread():
+        messagebox.showerror(title, message, parent=None)
+    elif _ui_dispatcher is not None:
+        _ui_dispatcher(lambda: messagebox.showerror(title, message, parent=None))
+    else:
+        print(f"ERROR: {title}: {message}")
+
+# --- 파일 변경 알림 (검색 색인 등) ---
+_content_change_listeners = [] # path -> None (파일 저장/삭제, 폴더 이동/삭제 시 호출)
+
+def add_content_change_listener(listener):
+    """저장 폴더 내 파일/폴더 변경 시 호출할 함수 등록 (인자: 변경된 경로)."""
+    if listener not in _content_change_listeners:
+        _content_change_listeners.append(listener)
+
+def _notify_content_change(*paths):
+    for listener in list(_content_change_listeners):
+        for path in paths:
+            try: listener(path)
+            except Exception as e: print(f"WARN: 파일 변경 알림 처리 오류 ({path}): {e}")
 
 # --- API 키 확인 및 저장 함수 ---
 
@@ -323,7 +365,12 @@ def load_config():
         f"{constants.SUMMARY_MODEL_KEY_PREFIX}{constants.API_TYPE_GPT}": constants.DEFAULT_SUMMARY_MODEL_GPT,
         'output_bg_color': constants.DEFAULT_OUTPUT_BG,
         'output_fg_color': constants.DEFAULT_OUTPUT_FG,
-        constants.CONFIG_ASK_KEYS_KEY: True # --- 추가된 설정 키 ---
+        constants.CONFIG_ASK_KEYS_KEY: True, # --- 추가된 설정 키 ---
+        constants.CONFIG_USE_CHAPTER_MANIFEST_KEY: True,
+        constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY: 0, # 0 = 자동 압축 보관 사용 안 함
+        constants.CONFIG_ARCHIVE_USE_DICTIONARY_KEY: True,
+        constants.CONFIG_TRASH_RETENTION_DAYS_KEY: constants.DEFAULT_TRASH_RETENTION_DAYS,
+        constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY: constants.DEFAULT_MAX_CONCURRENT_GENERATIONS
     }
     config_path = constants.CONFIG_FILE
     try:
@@ -352,6 +399,20 @@ def load_config():
             if not isinstance(config_data.get(constants.CONFIG_ASK_KEYS_KEY), bool):
                 print(f"WARN: 전역 설정 '{constants.CONFIG_ASK_KEYS_KEY}' 타입 오류 수정 -> True")
                 config_data[constants.CONFIG_ASK_KEYS_KEY] = True; updated = True
+            if not isinstance(config_data.get(constants.CONFIG_USE_CHAPTER_MANIFEST_KEY), bool):
+                print(f"WARN: 전역 설정 '{constants.CONFIG_USE_CHAPTER_MANIFEST_KEY}' 타입 오류 수정 -> True")
+                config_data[constants.CONFIG_USE_CHAPTER_MANIFEST_KEY] = True; updated = True
+            if not isinstance(config_data.get(constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY), int) or config_data[constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY] < 0:
+                print(f"WARN: 전역 설정 '{constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY}' 값 오류 수정 -> 0")
+                config_data[constants.CONFIG_AUTO_ARCHIVE_DAYS_KEY] = 0; updated = True
+            if not isinstance(config_data.get(constants.CONFIG_ARCHIVE_USE_DICTIONARY_KEY), bool):
+                config_data[constants.CONFIG_ARCHIVE_USE_DICTIONARY_KEY] = True; updated = True
+            if not isinstance(config_data.get(constants.CONFIG_TRASH_RETENTION_DAYS_KEY), int) or config_data[constants.CONFIG_TRASH_RETENTION_DAYS_KEY] < 0:
+                print(f"WARN: 전역 설정 '{constants.CONFIG_TRASH_RETENTION_DAYS_KEY}' 값 오류 수정 -> {constants.DEFAULT_TRASH_RETENTION_DAYS}")
+                config_data[constants.CONFIG_TRASH_RETENTION_DAYS_KEY] = constants.DEFAULT_TRASH_RETENTION_DAYS; updated = True
+            if not isinstance(config_data.get(constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY), int) or config_data[constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY] < 1:
+                print(f"WARN: 전역 설정 '{constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY}' 값 오류 수정 -> {constants.DEFAULT_MAX_CONCURRENT_GENERATIONS}")
+                config_data[constants.CONFIG_MAX_CONCURRENT_GENERATIONS_KEY] = constants.DEFAULT_MAX_CONCURRENT_GENERATIONS; updated = True
 
             if updated:
                 if save_config(config_data): print("ℹ️ 기본값 추가/수정 후 전역 설정 파일 저장됨.")
@@ -416,8 +477,7 @@ def save_config(config_data):
         if config_dir and not os.path.exists(config_dir):
             os.makedirs(config_dir, exist_ok=True)
 
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+        _atomic_write_json(config_path, config_data)
         print(f"✅ 전역 설정 저장 완료: {config_path}")
         return True
     except Exception as e:
@@ -432,13 +492,21 @@ def load_novel_settings(novel_dir):
     settings_file = os.path.join(novel_dir, constants.NOVEL_SETTINGS_FILENAME)
     default_settings = {key: "" for key in constants.NOVEL_LEVEL_SETTINGS}
 
+    pack, _ = _get_pack_for_path(novel_dir)
+    if pack:
+        novel_data = _read_pack_json(pack, constants.NOVEL_SETTINGS_FILENAME)
+        return {key: novel_data.get(key, default_settings[key]) for key in constants.NOVEL_LEVEL_SETTINGS}
+
+    pending_data = _get_pending_json_write(settings_file) # 아직 기록 대기 중인 최신 내용 우선
+    if pending_data is not None:
+        return {key: pending_data.get(key, default_settings[key]) for key in constants.NOVEL_LEVEL_SETTINGS}
+
     if not os.path.exists(settings_file):
         print(f"ℹ️ 소설 설정 파일 없음: {settings_file}. 기본값 반환.")
         return default_settings.copy()
 
     try:
-        with open(settings_file, 'r', encoding='utf-8') as f:
-            novel_data = json.load(f)
+        novel_data = json.loads(_read_text_remember_hash(settings_file))
         print(f"✅ 소설 설정 로드: {settings_file}")
 
         if not isinstance(novel_data, dict):
@@ -453,12 +521,12 @@ def load_novel_settings(novel_dir):
 
     except json.JSONDecodeError as e:
         print(f"❌ 소설 설정 파일 JSON 디코딩 오류 ({settings_file}): {e}")
-        messagebox.showerror("설정 파일 오류", f"소설 설정 파일({os.path.basename(settings_file)}) 형식 오류.", parent=None) # Parent can be None for background errors
+        _show_error("설정 파일 오류", f"소설 설정 파일({os.path.basename(settings_file)}) 형식 오류.") # Parent can be None for background errors
         return default_settings.copy()
     except Exception as e:
         print(f"❌ 소설 설정 로드 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("소설 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}", parent=None)
+        _show_error("소설 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}")
         return default_settings.copy()
 
 def save_novel_settings(novel_dir, settings_data):
@@ -466,17 +534,22 @@ def save_novel_settings(novel_dir, settings_data):
     settings_file = os.path.join(novel_dir, constants.NOVEL_SETTINGS_FILENAME)
     # 저장할 데이터는 NOVEL_SETTING_KEYS_TO_SAVE 에 정의된 키만 포함
     data_to_save = {key: settings_data.get(key, "") for key in constants.NOVEL_SETTING_KEYS_TO_SAVE}
+    if is_pack_path(novel_dir):
+        _reject_pack_write(novel_dir, "소설 설정")
+        return False
 
     try:
-        os.makedirs(novel_dir, exist_ok=True) # 폴더 존재 확인 및 생성
-        with open(settings_file, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+        _discard_pending_write(settings_file, wait_in_flight=True) # 대기/기록 중인 자동 저장보다 이 저장이 최신
+        if is_file_content_unchanged(settings_file, _serialize_json(data_to_save)):
+            print(f"ℹ️ 소설 설정 변경 없음 (쓰기 건너뜀): {settings_file}")
+            return True
+        _atomic_write_json(settings_file, data_to_save)
         print(f"✅ 소설 설정 저장: {settings_file}")
         return True
     except Exception as e:
         print(f"❌ 소설 설정 저장 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("소설 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}", parent=None)
+        _show_error("소설 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}")
         return False
 
 # --- 챕터 (Arc) 설정 로드/저장 ---
@@ -486,13 +559,21 @@ def load_chapter_settings(chapter_dir):
     # 챕터 아크 노트만 포함 (실제로는 CHAPTER_LEVEL_SETTINGS에 정의된 모든 키)
     default_settings = {key: "" for key in constants.CHAPTER_LEVEL_SETTINGS}
 
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    if pack:
+        chapter_data = _read_pack_json(pack, f"{chapter_name}/{constants.CHAPTER_SETTINGS_FILENAME}")
+        return {key: chapter_data.get(key, default_settings[key]) for key in constants.CHAPTER_LEVEL_SETTINGS}
+
+    pending_data = _get_pending_json_write(settings_file) # 아직 기록 대기 중인 최신 내용 우선
+    if pending_data is not None:
+        return {key: pending_data.get(key, default_settings[key]) for key in constants.CHAPTER_LEVEL_SETTINGS}
+
     if not os.path.exists(settings_file):
         print(f"ℹ️ 챕터 아크 설정 파일 없음: {settings_file}. 기본값 반환.")
         return default_settings.copy()
 
     try:
-        with open(settings_file, 'r', encoding='utf-8') as f:
-            chapter_data = json.load(f)
+        chapter_data = json.loads(_read_text_remember_hash(settings_file))
         print(f"✅ 챕터 아크 설정 로드: {settings_file}")
 
         if not isinstance(chapter_data, dict):
@@ -507,12 +588,12 @@ def load_chapter_settings(chapter_dir):
 
     except json.JSONDecodeError as e:
         print(f"❌ 챕터 아크 설정 파일 JSON 디코딩 오류 ({settings_file}): {e}")
-        messagebox.showerror("설정 파일 오류", f"챕터 아크 설정 파일({os.path.basename(settings_file)}) 형식 오류.", parent=None)
+        _show_error("설정 파일 오류", f"챕터 아크 설정 파일({os.path.basename(settings_file)}) 형식 오류.")
         return default_settings.copy()
     except Exception as e:
         print(f"❌ 챕터 아크 설정 로드 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("챕터 아크 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}", parent=None)
+        _show_error("챕터 아크 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}")
         return default_settings.copy()
 
 def save_chapter_settings(chapter_dir, settings_data):
@@ -520,131 +601,579 @@ def save_chapter_settings(chapter_dir, settings_data):
     settings_file = os.path.join(chapter_dir, constants.CHAPTER_SETTINGS_FILENAME)
     # 저장할 데이터는 CHAPTER_SETTING_KEYS_TO_SAVE 에 정의된 키만 포함
     data_to_save = {key: settings_data.get(key, "") for key in constants.CHAPTER_SETTING_KEYS_TO_SAVE}
+    if is_pack_path(chapter_dir):
+        _reject_pack_write(chapter_dir, "챕터 아크 설정")
+        return False
 
     try:
-        os.makedirs(chapter_dir, exist_ok=True)
-        with open(settings_file, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+        _discard_pending_write(settings_file, wait_in_flight=True) # 대기/기록 중인 자동 저장보다 이 저장이 최신
+        if is_file_content_unchanged(settings_file, _serialize_json(data_to_save)):
+            print(f"ℹ️ 챕터 아크 설정 변경 없음 (쓰기 건너뜀): {settings_file}")
+            return True
+        _atomic_write_json(settings_file, data_to_save)
         print(f"✅ 챕터 아크 설정 저장: {settings_file}")
         return True
     except Exception as e:
         print(f"❌ 챕터 아크 설정 저장 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("챕터 아크 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}", parent=None)
+        _show_error("챕터 아크 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}")
         return False
 
-# --- 장면 (Scene) 설정 로드/저장 ---
-def load_scene_settings(chapter_dir, scene_number):
-    """특정 장면의 설정(XXX_settings.json) 로드."""
-    settings_filename = constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_number)
-    settings_file = os.path.join(chapter_dir, settings_filename)
+# --- 파일 내용 해시 (변경 없는 쓰기 건너뛰기) ---
+# 마지막으로 읽거나 쓴 내용의 해시를 파일 크기/수정 시각과 함께 기억. 외부에서 파일이 바뀌면 stat이 달라져 무효화됨.
+_file_hashes = {} # 정규화 경로 -> (sha256, st_mtime_ns, st_size)
+_file_hash_lock = threading.Lock()
+
+def _serialize_json(data):
+    """JSON 파일 저장 형식 (해시 비교와 실제 쓰기에 공용)."""
+    return json.dumps(data, ensure_ascii=False, indent=4)
+
+def _content_hash(text):
+    return hashlib.sha256((text or "").encode('utf-8', errors='replace')).hexdigest()
+
+def _remember_file_hash(file_path, text):
+    """파일의 현재 내용 해시 기억 (읽기/쓰기 직후 호출)."""
+    try: stat = os.stat(file_path)
+    except OSError: return
+    with _file_hash_lock:
+        _file_hashes[os.path.normcase(os.path.abspath(file_path))] = (_content_hash(text), stat.st_mtime_ns, stat.st_size)
+
+def _read_text_remember_hash(file_path):
+    """텍스트 파일을 읽고 내용 해시를 기억. 오류 시 예외 전파."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    _remember_file_hash(file_path, text)
+    return text
+
+def is_file_content_unchanged(file_path, text):
+    """파일이 마지막으로 읽거나 쓴 뒤 그대로이고 내용이 text와 같으면 True."""
+    with _file_hash_lock:
+        cached = _file_hashes.get(os.path.normcase(os.path.abspath(file_path)))
+    if cached is None: return False
+    try: stat = os.stat(file_path)
+    except OSError: return False
+    return cached[1] == stat.st_mtime_ns and cached[2] == stat.st_size and cached[0] == _content_hash(text)
+
+def is_novel_settings_unchanged(novel_dir, settings_data):
+    """소설 설정이 저장된(또는 저장 대기 중인) 내용과 같은지 확인."""
+    settings_file = os.path.join(novel_dir, constants.NOVEL_SETTINGS_FILENAME)
+    data_to_save = {key: settings_data.get(key, "") for key in constants.NOVEL_SETTING_KEYS_TO_SAVE}
+    pending_data = _get_pending_json_write(settings_file)
+    if pending_data is not None: return pending_data == data_to_save
+    return is_file_content_unchanged(settings_file, _serialize_json(data_to_save))
+
+def is_chapter_settings_unchanged(chapter_dir, settings_data):
+    """챕터 아크 설정이 저장된(또는 저장 대기 중인) 내용과 같은지 확인."""
+    settings_file = os.path.join(chapter_dir, constants.CHAPTER_SETTINGS_FILENAME)
+    data_to_save = {key: settings_data.get(key, "") for key in constants.CHAPTER_SETTING_KEYS_TO_SAVE}
+    pending_data = _get_pending_json_write(settings_file)
+    if pending_data is not None: return pending_data == data_to_save
+    return is_file_content_unchanged(settings_file, _serialize_json(data_to_save))
+
+def is_scene_content_unchanged(chapter_dir, scene_number, content):
+    """장면 내용이 마지막으로 읽거나 쓴 파일 내용과 같은지 확인."""
+    return is_file_content_unchanged(os.path.join(chapter_dir, constants.SCENE_FILENAME_FORMAT.format(scene_number)), content)
+
+# --- 원자적 JSON 쓰기 ---
+_archive_lock = threading.RLock() # 장면 파일 쓰기와 압축/해제(읽기 -> 교체) 간 충돌 방지
+
+def _atomic_write_json(file_path, data):
+    """임시 파일에 기록 후 os.replace로 교체하여 JSON 파일을 원자적으로 저장. 실패 시 예외 전파."""
+    dir_path = os.path.dirname(file_path) or "."
+    os.makedirs(dir_path, exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    text = _serialize_json(data)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        _remember_file_hash(file_path, text)
+        _notify_content_change(file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+
+def _atomic_write_text(file_path, text, sync=True):
+    """텍스트 파일을 원자적으로 저장 (텍스트 모드 쓰기와 동일한 줄바꿈 변환). 실패 시 예외 전파.
+    압축 보관과 같은 잠금 사용: 보관 중인 장면 파일을 옛 내용의 압축본이 덮어쓰지 않도록.
+    sync=False: fsync는 호출자가 여러 파일을 쓴 뒤 한꺼번에 수행 (_fsync_files)."""
+    dir_path = os.path.dirname(file_path) or "."
+    os.makedirs(dir_path, exist_ok=True)
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with _archive_lock:
+            with open(tmp_path, 'w', encoding='utf-8', errors='replace') as f:
+                f.write(text)
+                f.flush()
+                if sync: os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        _remember_file_hash(file_path, text)
+        _notify_content_change(file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
 
-    # 장면 설정의 기본값 구조
-    default_settings = {
+def _fsync_files(file_paths):
+    """sync=False로 기록한 파일들을 한꺼번에 디스크에 반영 (실패는 무시, 폴더 fsync는 별도)."""
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try: os.fsync(fd)
+            finally: os.close(fd)
+        except OSError as e:
+            print(f"WARN: fsync 실패 ({file_path}): {e}")
+
+def _fsync_directory(dir_path):
+    """이름 변경 결과를 디스크에 반영하도록 폴더 fsync (지원하지 않는 OS는 무시)."""
+    if os.name == 'nt': return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+        try: os.fsync(fd)
+        finally: os.close(fd)
+    except OSError:
+        pass
+
+# --- 지연 쓰기 (write-behind) ---
+# 자동 저장은 UI 스레드에서 바로 쓰지 않고 대기열에 넣음. 같은 파일에 대한 반복 저장은 최신 내용 하나로 합쳐지고,
+# 기록 스레드가 짧은 대기 후 모인 파일들을 한 번에(그룹 커밋) 원자적으로 기록함.
+_pending_writes = {} # 정규화 경로 -> (원래 경로, 'json' | 'text', 데이터)
+_write_condition = threading.Condition()
+_writes_in_progress = 0
+_writes_in_flight = {} # 정규화 경로 -> 기록 스레드가 꺼내 기록 중인 쓰기 수
+_writer_thread = None
+
+def _pending_write_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+def _get_pending_json_write(file_path):
+    """기록 대기 중인 JSON 내용 사본 반환 (없으면 None)."""
+    with _write_condition:
+        pending = _pending_writes.get(_pending_write_key(file_path))
+    if pending and pending[1] == 'json':
+        return dict(pending[2])
+    return None
+
+def _discard_pending_write(file_path, wait_in_flight=False):
+    """같은 파일의 대기 중인 쓰기 제거 (오래된 내용이 나중에 덮어쓰지 않도록).
+    wait_in_flight: 동기 저장 직전용. 기록 스레드가 이미 꺼낸 같은 파일의 쓰기가 끝날 때까지도 대기 (시간 제한 있음)."""
+    key = _pending_write_key(file_path)
+    deadline = time.time() + constants.WRITE_BEHIND_SYNC_TIMEOUT_S
+    with _write_condition:
+        _pending_writes.pop(key, None)
+        while wait_in_flight and _writes_in_flight.get(key):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                print(f"WARN: 진행 중인 지연 쓰기 대기 시간 초과: {file_path}")
+                break
+            _write_condition.wait(remaining)
+
+def queue_file_write(file_path, data, kind='json'):
+    """파일 쓰기를 지연 쓰기 대기열에 추가 (같은 파일은 최신 내용만 유지)."""
+    global _writer_thread
+    if is_file_content_unchanged(file_path, _serialize_json(data) if kind == 'json' else data):
+        _discard_pending_write(file_path) # 디스크 내용과 같음 -> 대기 중인 이전 쓰기도 불필요
+        return
+    with _write_condition:
+        _pending_writes[_pending_write_key(file_path)] = (file_path, kind, data)
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_write_behind_loop, name="write-behind", daemon=True)
+            _writer_thread.start()
+        _write_condition.notify_all()
+
+def _write_behind_loop():
+    global _writes_in_progress
+    while True:
+        with _write_condition:
+            while not _pending_writes:
+                _write_condition.wait()
+        time.sleep(constants.WRITE_BEHIND_DELAY_MS / 1000) # 짧은 시간 동안 추가 저장을 모음 (그룹 커밋)
+        with _write_condition:
+            batch_keys = list(_pending_writes)
+            batch = [_pending_writes[key] for key in batch_keys]
+            _pending_writes.clear()
+            _writes_in_progress += 1
+            for key in batch_keys: _writes_in_flight[key] = _writes_in_flight.get(key, 0) + 1
+        try:
+            _commit_write_batch(batch)
+        finally:
+            with _write_condition:
+                _writes_in_progress -= 1
+                for key in batch_keys:
+                    _writes_in_flight[key] -= 1
+                    if not _writes_in_flight[key]: del _writes_in_flight[key]
+                _write_condition.notify_all()
+
+def _commit_write_batch(batch):
+    """대기열에서 꺼낸 파일들을 원자적으로 기록하고, 폴더별로 한 번씩 fsync."""
+    written_dirs = set()
+    for file_path, kind, data in batch:
+        try:
+            if kind == 'json': _atomic_write_json(file_path, data)
+            else: _atomic_write_text(file_path, data)
+            written_dirs.add(os.path.dirname(file_path) or ".")
+            print(f"✅ 지연 쓰기 완료: {file_path}")
+        except Exception as e:
+            print(f"❌ 지연 쓰기 실패 ({file_path}): {e}")
+            traceback.print_exc()
+            _show_error("자동 저장 오류", f"파일({os.path.basename(file_path)}) 저장 오류:\n{e}")
+    for dir_path in written_dirs:
+        _fsync_directory(dir_path)
+
+def flush_pending_writes(timeout=constants.WRITE_BEHIND_SYNC_TIMEOUT_S):
+    """대기 중인 지연 쓰기가 모두 기록될 때까지 대기 (UI 스레드에서도 호출되므로 기본 시간 제한 있음). 시간 내 완료 시 True."""
+    deadline = time.time() + timeout if timeout is not None else None
+    with _write_condition:
+        while _pending_writes or _writes_in_progress:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                break # 기록 스레드 없음 (아래에서 직접 기록)
+            remaining = deadline - time.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                print("WARN: 지연 쓰기 대기열 비우기 시간 초과.")
+                return False
+            _write_condition.wait(remaining)
+        leftover = list(_pending_writes.values())
+        _pending_writes.clear()
+    if leftover:
+        _commit_write_batch(leftover)
+    return True
+
+def queue_save_novel_settings(novel_dir, settings_data):
+    """소설 설정 저장을 지연 쓰기 대기열에 추가 (자동 저장용). 대기열 추가 시 True."""
+    if is_pack_path(novel_dir):
+        _reject_pack_write(novel_dir, "소설 설정")
+        return False
+    data_to_save = {key: settings_data.get(key, "") for key in constants.NOVEL_SETTING_KEYS_TO_SAVE}
+    queue_file_write(os.path.join(novel_dir, constants.NOVEL_SETTINGS_FILENAME), data_to_save)
+    return True
+
+def queue_save_chapter_settings(chapter_dir, settings_data):
+    """챕터 아크 설정 저장을 지연 쓰기 대기열에 추가 (자동 저장용). 대기열 추가 시 True."""
+    if is_pack_path(chapter_dir):
+        _reject_pack_write(chapter_dir, "챕터 아크 설정")
+        return False
+    data_to_save = {key: settings_data.get(key, "") for key in constants.CHAPTER_SETTING_KEYS_TO_SAVE}
+    queue_file_write(os.path.join(chapter_dir, constants.CHAPTER_SETTINGS_FILENAME), data_to_save)
+    return True
+
+# --- 장면 설정 정규화 ---
+def _get_default_scene_settings():
+    """장면 설정의 기본값 구조 반환 (매 호출마다 새 객체)."""
+    return {
         constants.SCENE_PLOT_KEY: "",
         'temperature': constants.DEFAULT_TEMPERATURE,
         'length': constants.LENGTH_OPTIONS[0] if constants.LENGTH_OPTIONS else "중간", # 안전 장치
         'selected_model': "", # 로드 시 AppCore의 현재 모델 또는 config 모델 사용
-        constants.TOKEN_INFO_KEY: {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
+        constants.TOKEN_INFO_KEY: {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0},
+        constants.QUEUE_JOB_ID_KEY: ""
     }
 
+def normalize_scene_settings(settings_data):
+    """장면 설정 dict를 SCENE_SETTING_KEYS_TO_SAVE 기준으로 정리/보정한 새 dict 반환 (로드/저장 공용)."""
+    normalized = _get_default_scene_settings()
+    if not isinstance(settings_data, dict):
+        return normalized
+    # LENGTH_OPTIONS가 비어있는 경우 대비
+    default_length = normalized['length']
+
+    for key in constants.SCENE_SETTING_KEYS_TO_SAVE:
+        if key == constants.TOKEN_INFO_KEY:
+            token_info = settings_data.get(key, {})
+            input_tokens = 0; output_tokens = 0
+            if isinstance(token_info, dict):
+                try: input_tokens = int(token_info.get(constants.INPUT_TOKEN_KEY, 0))
+                except (ValueError, TypeError): pass
+                try: output_tokens = int(token_info.get(constants.OUTPUT_TOKEN_KEY, 0))
+                except (ValueError, TypeError): pass
+            normalized[key] = {constants.INPUT_TOKEN_KEY: input_tokens, constants.OUTPUT_TOKEN_KEY: output_tokens}
+        elif key in settings_data:
+            # 간단한 타입/값 보정
+            if key == 'temperature':
+                try: normalized[key] = max(0.0, min(2.0, float(settings_data[key])))
+                except (ValueError, TypeError): normalized[key] = constants.DEFAULT_TEMPERATURE
+            elif key == 'length':
+                normalized[key] = settings_data[key] if settings_data[key] in constants.LENGTH_OPTIONS else default_length
+            elif key == 'selected_model':
+                normalized[key] = settings_data[key] if isinstance(settings_data[key], str) else ""
+            else:
+                normalized[key] = settings_data[key]
+        # 누락된 키는 기본값 유지 (정의되지 않은 다른 키는 저장 안 함)
+
+    return normalized
+
+# --- 챕터 매니페스트 (장면 설정 통합 파일) ---
+_chapter_manifest_enabled = True
+_manifest_lock = threading.RLock() # 매니페스트 읽기-수정-쓰기 보호
+_legacy_scene_settings_pattern = re.compile(r"^(\d+)_settings\.json$", re.IGNORECASE)
+
+def set_chapter_manifest_enabled(enabled):
+    """장면 설정을 챕터 매니페스트에 저장할지 여부 설정 (config의 use_chapter_manifest)."""
+    global _chapter_manifest_enabled
+    _chapter_manifest_enabled = bool(enabled)
+    print(f"ℹ️ 챕터 매니페스트 사용: {'예' if _chapter_manifest_enabled else '아니오'}")
+
+def is_chapter_manifest_enabled():
+    """챕터 매니페스트 사용 여부 반환."""
+    return _chapter_manifest_enabled
+
+def _get_chapter_manifest_path(chapter_dir):
+    return os.path.join(chapter_dir, constants.CHAPTER_MANIFEST_FILENAME)
+
+def _new_chapter_manifest():
+    return {"version": constants.CHAPTER_MANIFEST_VERSION, "scenes": {}}
+
+def _read_chapter_manifest_file(chapter_dir, quarantine_corrupt=False):
+    """매니페스트 파일 읽기. 파일이 없거나 읽을 수 없으면 None.
+    quarantine_corrupt: 손상된 파일을 .corrupt로 옮겨둠 (새 매니페스트로 덮어쓰기 직전의 쓰기 경로에서만 사용)."""
+    manifest_path = _get_chapter_manifest_path(chapter_dir)
+    if not os.path.isfile(manifest_path):
+        return None
+    try:
+        manifest = json.loads(_read_text_remember_hash(manifest_path))
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("scenes"), dict):
+            raise ValueError("매니페스트 구조 오류 ('scenes' 객체 없음)")
+        return manifest
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"❌ 챕터 매니페스트 형식 오류 ({manifest_path}): {e}")
+        if not quarantine_corrupt:
+            return None
+        backup_path = manifest_path + ".corrupt"
+        try:
+            os.replace(manifest_path, backup_path)
+            print(f"WARN: 손상된 매니페스트를 '{os.path.basename(backup_path)}'(으)로 이동함.")
+        except OSError as move_err:
+            print(f"ERROR: 손상된 매니페스트 이동 실패: {move_err}")
+        return None
+    except OSError as e:
+        print(f"❌ 챕터 매니페스트 읽기 오류 ({manifest_path}): {e}")
+        return None
+
+def _write_chapter_manifest_file(chapter_dir, manifest):
+    """매니페스트를 원자적으로 저장. 성공 시 True."""
+    manifest_path = _get_chapter_manifest_path(chapter_dir)
+    try:
+        manifest["version"] = constants.CHAPTER_MANIFEST_VERSION
+        if is_file_content_unchanged(manifest_path, _serialize_json(manifest)):
+            return True # 변경 없음 (쓰기 건너뜀)
+        _atomic_write_json(manifest_path, manifest)
+        return True
+    except Exception as e:
+        print(f"❌ 챕터 매니페스트 저장 중 오류 ({manifest_path}): {e}")
+        traceback.print_exc()
+        return False
+
+def _scan_legacy_scene_settings(chapter_dir):
+    """챕터 폴더 내 개별 장면 설정 파일(XXX_settings.json) 목록을 {장면 번호: 경로}로 반환."""
+    legacy_files = {}
+    try:
+        with os.scandir(chapter_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    match = _legacy_scene_settings_pattern.match(entry.name)
+                    if match:
+                        legacy_files[int(match.group(1))] = entry.path
+    except OSError as e:
+        print(f"ERROR: 장면 설정 파일 목록 읽기 오류 ({chapter_dir}): {e}")
+    return legacy_files
+
+def _merge_legacy_scene_settings(chapter_dir, manifest):
+    """남아있는 개별 장면 설정 파일 내용을 manifest에 덮어씀 (메모리에서만). 병합한 파일 경로 목록 반환."""
+    merged_paths = []
+    for scene_num, legacy_path in sorted(_scan_legacy_scene_settings(chapter_dir).items()):
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                scene_data = json.load(f)
+            if not isinstance(scene_data, dict):
+                print(f"WARN: 장면 설정 파일 내용이 JSON 객체가 아님 (병합 제외): {os.path.basename(legacy_path)}")
+                continue
+            manifest["scenes"][str(scene_num)] = normalize_scene_settings(scene_data)
+            merged_paths.append(legacy_path)
+        except Exception as e:
+            print(f"WARN: 장면 설정 파일 읽기 실패 (병합 제외): {os.path.basename(legacy_path)} - {e}")
+    return merged_paths
+
+def migrate_chapter_manifest(chapter_dir):
+    """
+    개별 장면 설정 파일(XXX_settings.json)을 챕터 매니페스트로 병합하고 원본 파일을 삭제합니다.
+    개별 파일이 매니페스트 항목보다 우선합니다. 매니페스트 dict 반환 (저장 실패 시 None).
+    읽기 함수는 파일을 바꾸지 않으므로, 시작 시 일괄 변환(migrate_all_chapter_manifests)과 설정 저장 시에만 호출됩니다.
+    """
+    with _manifest_lock:
+        # 손상된 매니페스트는 새로 쓰기 전에 .corrupt로 보관 (덮어써서 잃지 않도록)
+        manifest = _read_chapter_manifest_file(chapter_dir, quarantine_corrupt=True) or _new_chapter_manifest()
+        migrated_paths = _merge_legacy_scene_settings(chapter_dir, manifest)
+
+        if not migrated_paths:
+            return manifest
+        if not _write_chapter_manifest_file(chapter_dir, manifest):
+            return None
+
+        for legacy_path in migrated_paths:
+            try: os.remove(legacy_path)
+            except OSError as e: print(f"WARN: 마이그레이션된 장면 설정 파일 삭제 실패 (무시): {os.path.basename(legacy_path)} - {e}")
+        print(f"✅ 챕터 매니페스트 마이그레이션: '{os.path.basename(chapter_dir)}' 장면 설정 {len(migrated_paths)}개 병합")
+        return manifest
+
+def load_chapter_manifest(chapter_dir):
+    """챕터 매니페스트 로드 (읽기 전용). 개별 설정 파일이 남아있으면 메모리에서만 병합 (파일 변환은 migrate_chapter_manifest)."""
+    if not os.path.isdir(chapter_dir):
+        return _new_chapter_manifest()
+    with _manifest_lock:
+        manifest = _read_chapter_manifest_file(chapter_dir) or _new_chapter_manifest()
+        _merge_legacy_scene_settings(chapter_dir, manifest)
+        return manifest
+
+def migrate_all_chapter_manifests(base_dir):
+    """저장 폴더 내 모든 챕터의 개별 장면 설정 파일을 매니페스트로 변환 (매니페스트 사용 시). 변환한 챕터 수 반환."""
+    if not _chapter_manifest_enabled or not os.path.isdir(base_dir):
+        return 0
+    migrated = 0
+    try:
+        with os.scandir(base_dir) as novel_entries:
+            novel_dirs = [entry.path for entry in novel_entries if entry.is_dir() and not entry.name.startswith('.')]
+        for novel_dir in novel_dirs:
+            with os.scandir(novel_dir) as chapter_entries:
+                chapter_dirs = [entry.path for entry in chapter_entries if entry.is_dir() and not entry.name.startswith('.')]
+            for chapter_dir in chapter_dirs:
+                if not _scan_legacy_scene_settings(chapter_dir): continue
+                if migrate_chapter_manifest(chapter_dir) is not None: migrated += 1
+    except OSError as e:
+        print(f"WARN: 챕터 매니페스트 변환 스캔 중 오류: {e}")
+    return migrated
+
+def load_chapter_scene_settings_all(chapter_dir):
+    """챕터 내 모든 장면 설정을 {장면 번호(int): 설정 dict}로 반환. 매니페스트 사용 시 파일 한 번 읽기."""
+    all_settings = {}
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    if pack:
+        scenes = _read_pack_json(pack, f"{chapter_name}/{constants.CHAPTER_MANIFEST_FILENAME}").get("scenes", {})
+        return {int(key): normalize_scene_settings(entry) for key, entry in scenes.items() if str(key).isdigit()}
+
+    if _chapter_manifest_enabled:
+        # 매니페스트 한 번 읽기 (남아있는 개별 설정 파일은 메모리에서 병합)
+        manifest = load_chapter_manifest(chapter_dir)
+        for key, entry in manifest.get("scenes", {}).items():
+            if str(key).isdigit():
+                all_settings[int(key)] = normalize_scene_settings(entry)
+        return all_settings
+
+    # 매니페스트 미사용: 기존 매니페스트 항목 위에 개별 파일 내용을 덮어씀
+    if not os.path.isdir(chapter_dir):
+        return all_settings
+    manifest = _read_chapter_manifest_file(chapter_dir)
+    if manifest:
+        for key, entry in manifest["scenes"].items():
+            if str(key).isdigit():
+                all_settings[int(key)] = normalize_scene_settings(entry)
+    for scene_num in _scan_legacy_scene_settings(chapter_dir):
+        all_settings[scene_num] = load_scene_settings(chapter_dir, scene_num)
+    return all_settings
+
+def _remove_scene_from_manifest(chapter_dir, scene_number):
+    """매니페스트에서 장면 항목 제거. 제거할 항목이 없거나 성공 시 True."""
+    with _manifest_lock:
+        manifest = _read_chapter_manifest_file(chapter_dir)
+        if not manifest or str(scene_number) not in manifest["scenes"]:
+            return True
+        del manifest["scenes"][str(scene_number)]
+        if _write_chapter_manifest_file(chapter_dir, manifest):
+            print(f"✅ 챕터 매니페스트에서 장면 {scene_number} 설정 제거")
+            return True
+        return False
+
+# --- 장면 (Scene) 설정 로드/저장 ---
+def load_scene_settings(chapter_dir, scene_number):
+    """특정 장면의 설정 로드 (챕터 매니페스트 또는 XXX_settings.json)."""
+    settings_filename = constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_number)
+    settings_file = os.path.join(chapter_dir, settings_filename)
+
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    if pack:
+        scenes = _read_pack_json(pack, f"{chapter_name}/{constants.CHAPTER_MANIFEST_FILENAME}").get("scenes", {})
+        return normalize_scene_settings(scenes.get(str(scene_number)))
+
+    if _chapter_manifest_enabled:
+        manifest = load_chapter_manifest(chapter_dir)
+        scene_entry = manifest.get("scenes", {}).get(str(scene_number))
+        if scene_entry is None:
+            print(f"ℹ️ 장면 {scene_number} 설정 없음 (매니페스트: {os.path.basename(chapter_dir)}). 기본값 반환.")
+            return _get_default_scene_settings()
+        print(f"✅ 장면 설정 로드 (매니페스트): {os.path.basename(chapter_dir)} / 장면 {scene_number}")
+        return normalize_scene_settings(scene_entry)
+
     if not os.path.exists(settings_file):
+        # 매니페스트 미사용 중이라도 기존 매니페스트 항목이 있으면 사용
+        manifest = _read_chapter_manifest_file(chapter_dir) if os.path.isdir(chapter_dir) else None
+        if manifest and str(scene_number) in manifest["scenes"]:
+            print(f"✅ 장면 설정 로드 (기존 매니페스트): {os.path.basename(chapter_dir)} / 장면 {scene_number}")
+            return normalize_scene_settings(manifest["scenes"][str(scene_number)])
         print(f"ℹ️ 장면 설정 파일 없음: {settings_file}. 기본값 반환.")
-        return default_settings.copy()
+        return _get_default_scene_settings()
 
     try:
-        with open(settings_file, 'r', encoding='utf-8') as f:
-            scene_data = json.load(f)
+        scene_data = json.loads(_read_text_remember_hash(settings_file))
         print(f"✅ 장면 설정 로드: {settings_file}")
 
         if not isinstance(scene_data, dict):
             print(f"❌ 장면 설정 파일 내용이 JSON 객체가 아님. 기본값 반환.")
-            return default_settings.copy()
-
-        # 로드된 데이터와 기본값을 병합하여 최종 데이터 구성
-        final_data = default_settings.copy()
-        final_data.update(scene_data) # 로드된 값으로 덮어쓰기
-
-        # 간단한 유효성 검사 및 조정
-        try: final_data['temperature'] = max(0.0, min(2.0, float(final_data['temperature'])))
-        except (ValueError, TypeError): final_data['temperature'] = constants.DEFAULT_TEMPERATURE
-        # LENGTH_OPTIONS가 비어있는 경우 대비
-        default_length = constants.LENGTH_OPTIONS[0] if constants.LENGTH_OPTIONS else "중간"
-        if final_data.get('length') not in constants.LENGTH_OPTIONS: final_data['length'] = default_length
-
-        # 토큰 정보 구조 및 타입 검사
-        loaded_token_info = final_data.get(constants.TOKEN_INFO_KEY, {})
-        if not isinstance(loaded_token_info, dict):
-            final_data[constants.TOKEN_INFO_KEY] = {constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
-        else:
-            try: final_data[constants.TOKEN_INFO_KEY][constants.INPUT_TOKEN_KEY] = int(loaded_token_info.get(constants.INPUT_TOKEN_KEY, 0))
-            except (ValueError, TypeError): final_data[constants.TOKEN_INFO_KEY][constants.INPUT_TOKEN_KEY] = 0
-            try: final_data[constants.TOKEN_INFO_KEY][constants.OUTPUT_TOKEN_KEY] = int(loaded_token_info.get(constants.OUTPUT_TOKEN_KEY, 0))
-            except (ValueError, TypeError): final_data[constants.TOKEN_INFO_KEY][constants.OUTPUT_TOKEN_KEY] = 0
+            return _get_default_scene_settings()
 
         # 로드된 모델 유효성 검사는 AppCore에서 수행
-        if 'selected_model' not in final_data:
-            final_data['selected_model'] = "" # 모델 정보가 없으면 빈 문자열
-
-        return final_data
+        return normalize_scene_settings(scene_data)
 
     except json.JSONDecodeError as e:
         print(f"❌ 장면 설정 파일 JSON 디코딩 오류 ({settings_file}): {e}")
-        messagebox.showerror("설정 파일 오류", f"장면 설정 파일({os.path.basename(settings_file)}) 형식 오류.", parent=None)
-        return default_settings.copy()
+        _show_error("설정 파일 오류", f"장면 설정 파일({os.path.basename(settings_file)}) 형식 오류.")
+        return _get_default_scene_settings()
     except Exception as e:
         print(f"❌ 장면 설정 로드 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("장면 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}", parent=None)
-        return default_settings.copy()
+        _show_error("장면 설정 로드 오류", f"파일({os.path.basename(settings_file)}) 로드 오류:\n{e}")
+        return _get_default_scene_settings()
 
 def save_scene_settings(chapter_dir, scene_number, settings_data):
-    """특정 장면의 설정(XXX_settings.json) 저장."""
+    """특정 장면의 설정 저장 (챕터 매니페스트 또는 XXX_settings.json, 원자적 쓰기)."""
     settings_filename = constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_number)
     settings_file = os.path.join(chapter_dir, settings_filename)
     # 저장할 데이터는 SCENE_SETTING_KEYS_TO_SAVE 에 정의된 키만 포함
-    data_to_save = {}
-    # LENGTH_OPTIONS가 비어있는 경우 대비
-    default_length = constants.LENGTH_OPTIONS[0] if constants.LENGTH_OPTIONS else "중간"
+    data_to_save = normalize_scene_settings(settings_data)
+    if is_pack_path(chapter_dir):
+        _reject_pack_write(chapter_dir, "장면 설정")
+        return False
 
-    for key in constants.SCENE_SETTING_KEYS_TO_SAVE:
-        if key == constants.TOKEN_INFO_KEY:
-            token_info = settings_data.get(key, {})
-            input_tokens = 0; output_tokens = 0
-            if isinstance(token_info, dict):
-                try: input_tokens = int(token_info.get(constants.INPUT_TOKEN_KEY, 0))
-                except (ValueError, TypeError): pass
-                try: output_tokens = int(token_info.get(constants.OUTPUT_TOKEN_KEY, 0))
-                except (ValueError, TypeError): pass
-            data_to_save[key] = {constants.INPUT_TOKEN_KEY: input_tokens, constants.OUTPUT_TOKEN_KEY: output_tokens}
-        elif key in settings_data:
-            # 간단한 타입/값 보정
-            if key == 'temperature':
-                try: data_to_save[key] = max(0.0, min(2.0, float(settings_data[key])))
-                except (ValueError, TypeError): data_to_save[key] = constants.DEFAULT_TEMPERATURE
-            elif key == 'length':
-                data_to_save[key] = settings_data[key] if settings_data[key] in constants.LENGTH_OPTIONS else default_length
-            else:
-                data_to_save[key] = settings_data[key]
-        else:
-            # 기본값 처리 (저장 시 누락된 경우)
-            if key == constants.SCENE_PLOT_KEY: data_to_save[key] = ""
-            elif key == 'temperature': data_to_save[key] = constants.DEFAULT_TEMPERATURE
-            elif key == 'length': data_to_save[key] = default_length
-            elif key == 'selected_model': data_to_save[key] = ""
-            # TOKEN_INFO_KEY는 위에서 처리되므로 else에서 제외됨
-            # 정의되지 않은 다른 키는 저장 안 함 (None 대신 키 자체를 제외)
+    if _chapter_manifest_enabled:
+        with _manifest_lock:
+            os.makedirs(chapter_dir, exist_ok=True)
+            # 쓰기 전에 남아있는 개별 설정 파일을 모두 매니페스트로 변환 (다른 장면 설정이 옛 파일에만 남지 않도록)
+            manifest = migrate_chapter_manifest(chapter_dir)
+            if manifest is None:
+                _show_error("장면 설정 저장 오류", f"챕터 매니페스트({constants.CHAPTER_MANIFEST_FILENAME}) 변환 오류.")
+                return False
+            manifest["scenes"][str(scene_number)] = data_to_save
+            if not _write_chapter_manifest_file(chapter_dir, manifest):
+                _show_error("장면 설정 저장 오류", f"챕터 매니페스트({constants.CHAPTER_MANIFEST_FILENAME}) 저장 오류.")
+                return False
+            # 매니페스트가 최신이므로 남아있는 개별 파일 제거 (로드 시 덮어쓰기 방지)
+            if os.path.isfile(settings_file):
+                try: os.remove(settings_file)
+                except OSError as e: print(f"WARN: 개별 장면 설정 파일 삭제 실패 (무시): {settings_filename} - {e}")
+        print(f"✅ 장면 설정 저장 (매니페스트): {os.path.basename(chapter_dir)} / 장면 {scene_number}")
+        return True
 
     try:
-        os.makedirs(chapter_dir, exist_ok=True)
-        with open(settings_file, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+        if is_file_content_unchanged(settings_file, _serialize_json(data_to_save)):
+            print(f"ℹ️ 장면 설정 변경 없음 (쓰기 건너뜀): {settings_file}")
+            return True
+        _atomic_write_json(settings_file, data_to_save)
         print(f"✅ 장면 설정 저장: {settings_file}")
         return True
     except Exception as e:
         print(f"❌ 장면 설정 저장 중 오류 ({settings_file}): {e}")
         traceback.print_exc()
-        messagebox.showerror("장면 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}", parent=None)
+        _show_error("장면 설정 저장 오류", f"파일({os.path.basename(settings_file)}) 저장 오류:\n{e}")
         return False
 
 # --- 다음 챕터/장면 번호 계산 ---
@@ -713,23 +1242,32 @@ def save_scene_content(chapter_dir, scene_number, content):
     """장면 내용(XXX.txt) 저장."""
     content_filename = constants.SCENE_FILENAME_FORMAT.format(scene_number)
     content_filepath = os.path.join(chapter_dir, content_filename)
+    if is_pack_path(chapter_dir):
+        _reject_pack_write(chapter_dir, "장면 내용")
+        return None
+    if is_file_content_unchanged(content_filepath, content if content is not None else ""):
+        print(f"ℹ️ 장면 내용 변경 없음 (쓰기 건너뜀): {content_filepath}")
+        return content_filepath
     try:
-        os.makedirs(chapter_dir, exist_ok=True)
-        # content가 None일 경우 빈 문자열로 처리
-        content_to_write = content if content is not None else ""
-        with open(content_filepath, "w", encoding="utf-8", errors='replace') as f:
-            f.write(content_to_write)
+        with _archive_lock: # 해제 확인과 쓰기 사이에 다시 압축되지 않도록
+            # 압축 보관된 챕터는 편집/재생성 시 자동 해제 (다시 활성 챕터가 됨)
+            if is_chapter_archived(chapter_dir):
+                print(f"ℹ️ 압축 보관된 챕터에 쓰기 -> 자동 압축 해제: {os.path.basename(chapter_dir)}")
+                unarchive_chapter(chapter_dir)
+            # content가 None일 경우 빈 문자열로 처리
+            content_to_write = content if content is not None else ""
+            _atomic_write_text(content_filepath, content_to_write)
         print(f"✅ 장면 내용 저장: {content_filepath}")
         return content_filepath
     except OSError as e:
         print(f"❌ 장면 내용 저장 오류 (OSError, {content_filepath}): {e}")
         traceback.print_exc()
-        messagebox.showerror("파일 저장 오류", f"장면 내용 파일 쓰기 오류:\n{e}", parent=None)
+        _show_error("파일 저장 오류", f"장면 내용 파일 쓰기 오류:\n{e}")
         return None
     except Exception as e:
         print(f"❌ 장면 내용 저장 중 오류 ({content_filepath}): {e}")
         traceback.print_exc()
-        messagebox.showerror("파일 저장 오류", f"장면 내용 파일 쓰기 중 오류:\n{e}", parent=None)
+        _show_error("파일 저장 오류", f"장면 내용 파일 쓰기 중 오류:\n{e}")
         return None
 
 def load_scene_content(chapter_dir, scene_number):
@@ -738,19 +1276,24 @@ def load_scene_content(chapter_dir, scene_number):
     content_filepath = os.path.join(chapter_dir, content_filename)
     content = "" # 기본값 빈 문자열
 
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    if pack:
+        content = pack.read_text(f"{chapter_name}/{content_filename}")
+        return content if content is not None else ""
+
     if not os.path.isfile(content_filepath):
          print(f"ℹ️ 장면 내용 파일 없음: {content_filepath}")
          return "" # 파일 없으면 빈 문자열 반환
 
     try:
-        with open(content_filepath, "r", encoding="utf-8", errors='replace') as f:
-            content = f.read()
+        content = _read_scene_file_text(content_filepath)
+        _remember_file_hash(content_filepath, content)
         print(f"✅ 장면 내용 로드: {content_filepath}")
         return content
     except Exception as e:
         print(f"❌ 장면 내용 로드 중 오류 ({content_filepath}): {e}")
         traceback.print_exc()
-        messagebox.showerror("파일 읽기 오류", f"장면 내용 파일 읽기 중 오류:\n{e}", parent=None)
+        _show_error("파일 읽기 오류", f"장면 내용 파일 읽기 중 오류:\n{e}")
         return "" # 오류 시 빈 문자열 반환
 
 # --- 파일명 정리 ---
@@ -797,6 +1340,7 @@ def sanitize_filename(name):
 def rename_chapter_folder(old_chapter_path, new_chapter_title_input):
     """챕터 폴더 이름 변경 (내부 파일명은 유지). 성공 시 (True, 메시지, 새 경로), 실패 시 (False, 메시지, None) 반환."""
     print(f"🔄 챕터 이름 변경 시도: '{os.path.basename(old_chapter_path)}' -> Title: '{new_chapter_title_input}'")
+    flush_pending_writes() # 대기 중인 자동 저장이 옛 경로에 다시 기록되지 않도록 먼저 반영
     if not isinstance(old_chapter_path, str) or not os.path.isdir(old_chapter_path):
         msg = f"오류: 원본 챕터 폴더 경로 유효하지 않음:\n'{old_chapter_path}'"
         print(f"❌ {msg}")
@@ -834,6 +1378,7 @@ def rename_chapter_folder(old_chapter_path, new_chapter_title_input):
 
     try:
         os.rename(old_chapter_path, new_chapter_path)
+        _notify_content_change(old_chapter_path, new_chapter_path)
         msg = f"챕터 이름이 '{new_folder_name}'(으)로 변경됨."
         print(f"✅ {msg}")
         return True, msg, new_chapter_path
@@ -851,6 +1396,7 @@ def rename_chapter_folder(old_chapter_path, new_chapter_title_input):
 def rename_novel_folder(old_novel_path, new_novel_name_input):
     """소설 폴더 이름 변경. 성공 시 (True, 메시지, 새 경로), 실패 시 (False, 메시지, None) 반환."""
     print(f"🔄 소설 이름 변경 시도: '{os.path.basename(old_novel_path)}' -> '{new_novel_name_input}'")
+    flush_pending_writes() # 대기 중인 자동 저장이 옛 경로에 다시 기록되지 않도록 먼저 반영
     if not isinstance(old_novel_path, str) or not os.path.isdir(old_novel_path):
         msg = f"오류: 원본 소설 폴더 경로 유효하지 않음:\n'{old_novel_path}'"
         print(f"❌ {msg}")
@@ -881,6 +1427,7 @@ def rename_novel_folder(old_novel_path, new_novel_name_input):
 
     try:
         os.rename(old_novel_path, new_novel_path)
+        _notify_content_change(old_novel_path, new_novel_path)
         msg = f"소설 이름이 '{new_name}'(으)로 변경됨."
         print(f"✅ {msg}")
         return True, msg, new_novel_path
@@ -895,10 +1442,122 @@ def rename_novel_folder(old_novel_path, new_novel_name_input):
         traceback.print_exc()
         return False, msg, None
 
+# --- 소설 포크 (공유 파일 기반 복제) ---
+def _link_or_copy_file(source_path, target_path):
+    """하드링크로 파일 공유 (지원하지 않는 파일시스템이면 복사). 'link' 또는 'copy' 반환.
+    저장은 모두 임시 파일 + os.replace 방식이므로, 공유된 파일에 처음 쓰는 순간 해당 파일만 분리됨."""
+    try:
+        os.link(source_path, target_path)
+        return 'link'
+    except (OSError, AttributeError, NotImplementedError):
+        shutil.copy2(source_path, target_path)
+        return 'copy'
+
+def fork_novel(source_novel_dir, new_novel_name_input):
+    """소설을 새 이름으로 포크 (장면/설정/버전 기록 파일을 하드링크로 공유).
+    성공 시 (True, 메시지, 새 경로), 실패 시 (False, 메시지, None) 반환."""
+    print(f"🍴 소설 포크 시도: '{os.path.basename(source_novel_dir)}' -> '{new_novel_name_input}'")
+    if is_pack_path(source_novel_dir):
+        return False, "오류: 읽기 전용 소설 팩은 포크할 수 없습니다.", None
+    if not isinstance(source_novel_dir, str) or not os.path.isdir(source_novel_dir):
+        return False, f"오류: 원본 소설 폴더 경로 유효하지 않음:\n'{source_novel_dir}'", None
+    new_name = sanitize_filename(new_novel_name_input)
+    if not new_name:
+        return False, f"오류: 유효한 소설 이름 아님 (정리 후 빈 문자열, 입력: '{new_novel_name_input}')", None
+    new_novel_path = os.path.join(os.path.dirname(source_novel_dir), new_name)
+    if os.path.exists(new_novel_path):
+        return False, f"오류: 대상 소설 폴더 '{new_name}' 이미 존재.", None
+
+    flush_pending_writes() # 대기 중인 자동 저장을 원본에 먼저 반영
+    counts = {'link': 0, 'copy': 0}
+    try:
+        for dir_path, dir_names, file_names in os.walk(source_novel_dir):
+            target_dir = os.path.join(new_novel_path, os.path.relpath(dir_path, source_novel_dir))
+            os.makedirs(target_dir, exist_ok=True)
+            for file_name in file_names:
+                if file_name.endswith(".tmp"): continue # 기록 중인 임시 파일 제외
+                counts[_link_or_copy_file(os.path.join(dir_path, file_name), os.path.join(target_dir, file_name))] += 1
+    except Exception as e:
+        shutil.rmtree(new_novel_path, ignore_errors=True) # 부분 생성된 포크 정리
+        msg = f"오류: 소설 포크 중 오류 발생:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg, None
+
+    _notify_content_change(new_novel_path)
+    msg = f"'{new_name}'(으)로 포크 완료 (공유 {counts['link']}개, 복사 {counts['copy']}개 파일)."
+    print(f"✅ {msg}")
+    return True, msg, new_novel_path
+
+# --- 원고 일괄 가져오기 (새 소설 생성) ---
+def _write_new_file(file_path, text):
+    """새 파일 기록 + fsync (가져오기 임시 폴더 전용, 텍스트 모드 줄바꿈 변환)."""
+    with open(file_path, 'w', encoding='utf-8', errors='replace') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _write_imported_chapter(chapter_dir, chapter_settings, scene_texts):
+    """가져온 챕터 하나 기록: 장면 파일, 챕터 아크 설정, 장면 설정(매니페스트 또는 개별 파일). 장면 수 반환."""
+    os.makedirs(chapter_dir)
+    scene_settings = {}
+    for scene_num, scene_text in enumerate(scene_texts, 1):
+        _write_new_file(os.path.join(chapter_dir, constants.SCENE_FILENAME_FORMAT.format(scene_num)), scene_text)
+        scene_settings[scene_num] = normalize_scene_settings(None)
+    _write_new_file(os.path.join(chapter_dir, constants.CHAPTER_SETTINGS_FILENAME),
+                    _serialize_json({key: chapter_settings.get(key, "") for key in constants.CHAPTER_SETTING_KEYS_TO_SAVE}))
+    if _chapter_manifest_enabled:
+        manifest = _new_chapter_manifest()
+        manifest["scenes"] = {str(num): data for num, data in scene_settings.items()}
+        _write_new_file(_get_chapter_manifest_path(chapter_dir), _serialize_json(manifest))
+    else:
+        for scene_num, data in scene_settings.items():
+            _write_new_file(os.path.join(chapter_dir, constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_num)), _serialize_json(data))
+    _fsync_directory(chapter_dir)
+    return len(scene_texts)
+
+def create_novel_from_chapters(novel_dir, novel_settings, chapters):
+    """
+    가져온 원고로 새 소설 폴더 생성. chapters: [(챕터 폴더명, 챕터 아크 설정 dict, [장면 텍스트])].
+    숨김 임시 폴더에 챕터들을 병렬로 기록한 뒤 한 번에 이름 변경 (중간 실패 시 흔적 없음).
+    성공 시 (True, 메시지, 소설 경로), 실패 시 (False, 메시지, None) 반환.
+    """
+    novel_name = os.path.basename(os.path.normpath(novel_dir))
+    if os.path.exists(novel_dir):
+        return False, f"오류: 같은 이름의 소설 ('{novel_name}')이 이미 존재합니다.", None
+    if not chapters:
+        return False, "오류: 가져올 장면이 없습니다.", None
+
+    base_dir = os.path.dirname(novel_dir) or "."
+    staging_dir = os.path.join(base_dir, f".import_{novel_name}.{os.getpid()}.tmp") # 점으로 시작 -> 트리뷰/검색 색인 제외
+    try:
+        os.makedirs(staging_dir)
+        _write_new_file(os.path.join(staging_dir, constants.NOVEL_SETTINGS_FILENAME),
+                        _serialize_json({key: novel_settings.get(key, "") for key in constants.NOVEL_SETTING_KEYS_TO_SAVE}))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=constants.IMPORT_WRITE_WORKERS) as executor:
+            futures = [executor.submit(_write_imported_chapter, os.path.join(staging_dir, folder_name), chapter_settings, scene_texts)
+                       for folder_name, chapter_settings, scene_texts in chapters]
+            scene_count = sum(future.result() for future in futures)
+        _fsync_directory(staging_dir)
+        os.rename(staging_dir, novel_dir)
+        _fsync_directory(base_dir)
+    except Exception as e:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        msg = f"오류: 원고 가져오기 기록 실패:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg, None
+
+    _notify_content_change(novel_dir) # 검색 색인 등은 새 소설 폴더 전체를 한 번에 갱신
+    msg = f"'{novel_name}' 가져오기 완료 (챕터 {len(chapters)}개, 장면 {scene_count}개)."
+    print(f"✅ {msg}")
+    return True, msg, novel_dir
+
 # --- 폴더/파일 삭제 ---
 def delete_chapter_folder(chapter_path):
     """챕터 폴더와 내부 모든 파일(장면, 설정 등) 삭제. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
     print(f"🗑️ 챕터 폴더 삭제 시도: '{chapter_path}'")
+    flush_pending_writes() # 대기 중인 자동 저장이 옛 경로에 다시 기록되지 않도록 먼저 반영
     if not isinstance(chapter_path, str):
         return False, f"오류: 잘못된 경로 타입: {type(chapter_path)}"
 
@@ -913,8 +1572,9 @@ def delete_chapter_folder(chapter_path):
 
     chapter_name = os.path.basename(chapter_path)
     try:
-        shutil.rmtree(chapter_path)
-        msg = f"'{chapter_name}' 챕터 폴더 삭제 완료."
+        # 즉시 휴지통으로 이동 (이름 변경만 수행, 실제 삭제는 보존 기간 후 백그라운드에서)
+        _move_to_trash(chapter_path, "chapter", os.path.dirname(os.path.dirname(chapter_path)))
+        msg = f"'{chapter_name}' 챕터 폴더를 휴지통으로 이동했습니다."
         print(f"✅ {msg}")
         return True, msg
     except OSError as e:
@@ -931,6 +1591,7 @@ def delete_chapter_folder(chapter_path):
 def delete_novel_folder(novel_path):
     """소설 폴더와 하위 모든 챕터 폴더/파일 삭제. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
     print(f"🗑️ 소설 폴더 삭제 시도: '{novel_path}'")
+    flush_pending_writes() # 대기 중인 자동 저장이 옛 경로에 다시 기록되지 않도록 먼저 반영
     if not isinstance(novel_path, str):
         return False, f"오류: 잘못된 경로 타입: {type(novel_path)}"
 
@@ -938,15 +1599,19 @@ def delete_novel_folder(novel_path):
         msg = f"정보: 삭제할 소설 폴더 없음 (이미 삭제됨?): '{os.path.basename(novel_path)}'"
         print(f"ℹ️ {msg}")
         return True, msg
-    if not os.path.isdir(novel_path):
+    is_pack_file = os.path.isfile(novel_path) and novel_path.lower().endswith(constants.NOVEL_PACK_EXTENSION)
+    if not os.path.isdir(novel_path) and not is_pack_file:
         msg = f"오류: 삭제 대상이 폴더가 아님: '{os.path.basename(novel_path)}'"
         print(f"❌ {msg}")
         return False, msg
 
     novel_name = os.path.basename(novel_path)
     try:
-        shutil.rmtree(novel_path)
-        msg = f"'{novel_name}' 소설 삭제 완료."
+        if is_pack_file:
+            close_novel_pack(novel_path)
+        # 즉시 휴지통으로 이동 (이름 변경만 수행, 실제 삭제는 보존 기간 후 백그라운드에서)
+        _move_to_trash(novel_path, "pack" if is_pack_file else "novel", os.path.dirname(novel_path))
+        msg = f"'{novel_name}' 소설을 휴지통으로 이동했습니다."
         print(f"✅ {msg}")
         return True, msg
     except OSError as e:
@@ -960,14 +1625,40 @@ def delete_novel_folder(novel_path):
         traceback.print_exc()
         return False, msg
 
+def replace_novel_folder(staged_path, novel_path):
+    """새로 쓴 소설 폴더(staged_path)로 기존 소설 폴더 교체 (기존 폴더는 휴지통으로). 저장소 복사의 덮어쓰기용.
+    성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환 (실패 시 기존 소설은 그대로)."""
+    flush_pending_writes() # 대기 중인 자동 저장이 옮기기 전 경로에 다시 기록되지 않도록 먼저 반영
+    novel_name = os.path.basename(novel_path)
+    if not os.path.isdir(staged_path):
+        return False, f"오류: 교체할 새 소설 폴더가 없습니다: '{os.path.basename(staged_path)}'"
+    try:
+        if os.path.exists(novel_path):
+            _move_to_trash(novel_path, "novel", os.path.dirname(novel_path))
+        os.replace(staged_path, novel_path)
+        _notify_content_change(staged_path, novel_path)
+        msg = f"'{novel_name}' 소설을 새로 복사한 내용으로 교체했습니다."
+        print(f"✅ {msg}")
+        return True, msg
+    except OSError as e:
+        msg = f"오류: '{novel_name}' 교체 실패 (파일 사용 중/권한 문제?):\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg
+
 def delete_scene_files(chapter_dir, scene_number):
-    """특정 장면의 텍스트 파일(XXX.txt)과 설정 파일(XXX_settings.json) 삭제."""
+    """특정 장면의 텍스트 파일(XXX.txt)을 버전 목록과 함께 휴지통으로 옮기고 설정(XXX_settings.json 및 매니페스트 항목) 삭제.
+    장면 설정은 휴지통 목록에 기록되어 복원 시 되살아남."""
     if not isinstance(scene_number, int) or scene_number < 0: # 정수형 및 0 이상 확인
          msg = f"장면 파일 삭제 실패: 유효하지 않은 장면 번호 ({scene_number}, 타입: {type(scene_number)})."
          print(f"❌ {msg}")
-         messagebox.showerror("삭제 오류", msg, parent=None)
+         _show_error("삭제 오류", msg)
          return False
 
+    if is_pack_path(chapter_dir):
+        _reject_pack_write(chapter_dir, "장면 삭제")
+        return False
+
     txt_filename = constants.SCENE_FILENAME_FORMAT.format(scene_number)
     settings_filename = constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_number)
     txt_filepath = os.path.join(chapter_dir, txt_filename)
@@ -979,11 +1670,16 @@ def delete_scene_files(chapter_dir, scene_number):
 
     print(f"🗑️ 장면 파일 삭제 시도: 챕터 '{os.path.basename(chapter_dir)}', 장면 번호 {scene_number}")
 
-    # Delete text file
+    # 장면 내용 파일을 휴지통으로 이동 (버전 목록과 설정도 함께 보관)
     try:
         if os.path.isfile(txt_filepath):
-            os.remove(txt_filepath)
-            print(f"✅ 장면 내용 파일 삭제 완료: {txt_filename}")
+            flush_pending_writes() # 대기 중인 자동 저장이 옮긴 뒤 다시 기록되지 않도록 먼저 반영
+            scene_settings = load_scene_settings(chapter_dir, scene_number)
+            with _trash_lock, _history_lock:
+                _move_to_trash(txt_filepath, "scene", os.path.dirname(os.path.dirname(chapter_dir)),
+                               extras=[_get_scene_version_list_path(chapter_dir, scene_number)],
+                               info_extra={"scene_number": scene_number, "scene_settings": scene_settings})
+            print(f"✅ 장면 내용 파일 휴지통으로 이동 완료: {txt_filename}")
             deleted_txt = True
         else:
             print(f"ℹ️ 장면 내용 파일 없음 (삭제 건너뜀): {txt_filename}")
@@ -1016,9 +1712,18 @@ def delete_scene_files(chapter_dir, scene_number):
         error_occurred = True
         last_error_msg = f"장면 설정 파일({settings_filename}) 삭제 중 예상 못한 오류:\n{e}"
 
+    # 매니페스트 항목 제거
+    if not _remove_scene_from_manifest(chapter_dir, scene_number):
+        error_occurred = True
+        last_error_msg = f"챕터 매니페스트에서 장면 {scene_number} 설정 제거 중 오류."
+
+    # 휴지통으로 옮기지 못한 버전 목록 제거 (같은 번호로 새 장면 생성 시 기록이 섞이지 않도록. 남은 내용은 기록 정리 때 삭제)
+    _remove_scene_version_list(chapter_dir, scene_number)
+    _notify_content_change(txt_filepath, settings_filepath)
+
     if error_occurred:
         # 오류 발생 시 사용자에게 알림 (마지막 오류 메시지 표시)
-        messagebox.showerror("파일 삭제 오류", last_error_msg, parent=None)
+        _show_error("파일 삭제 오류", last_error_msg)
 
     # 성공 조건: 오류가 발생하지 않았고, 최소한 하나의 파일이 삭제되었거나 원래 없었음.
     # 즉, 작업 후 두 파일이 모두 존재하지 않으면 성공으로 간주 (단, 오류가 없었어야 함).
@@ -1034,95 +1739,147 @@ def delete_scene_files(chapter_dir, scene_number):
     return final_success
 
 
+# --- 장면 순회 (스트리밍) ---
+# 소설 전체를 한 번에 메모리에 올리지 않고 챕터/장면 순서대로 하나씩 읽어 넘겨줌 (팩 포함).
+def _make_number_filter(number_filter):
+    """번호 필터 정규화: None(전체), 번호 모음(set/range/list 등), 또는 번호 -> bool 함수."""
+    if number_filter is None: return lambda num: True
+    if callable(number_filter): return number_filter
+    allowed = set(number_filter)
+    return lambda num: num in allowed
+
+def iter_chapter_dirs(novel_dir, chapter_filter=None):
+    """소설 내 (챕터 번호, 챕터 폴더 경로)를 챕터 번호순으로 생성. 폴더 목록 읽기 오류는 예외 전파."""
+    accept = _make_number_filter(chapter_filter)
+    pack, _ = _get_pack_for_path(novel_dir)
+    if pack:
+        for chap_num, chapter_name, _scenes in _list_pack_chapters(pack):
+            if accept(chap_num): yield chap_num, os.path.join(novel_dir, chapter_name)
+        return
+    chapters = []
+    with os.scandir(novel_dir) as entries:
+        for entry in entries:
+            match = _pack_chapter_pattern.match(entry.name) if entry.is_dir() else None
+            if match and accept(int(match.group(1))):
+                chapters.append((int(match.group(1)), entry.path))
+    chapters.sort(key=lambda x: x[0])
+    yield from chapters
+
+def iter_chapter_scene_files(chapter_dir, scene_filter=None):
+    """챕터 내 (장면 번호, 장면 파일 경로)를 번호순으로 생성 (내용은 읽지 않음). 폴더 목록 읽기 오류는 예외 전파."""
+    accept = _make_number_filter(scene_filter)
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    if pack:
+        for scene_num in pack.list_scenes(chapter_name):
+            if accept(scene_num): yield scene_num, os.path.join(chapter_dir, constants.SCENE_FILENAME_FORMAT.format(scene_num))
+        return
+    scenes = []
+    with os.scandir(chapter_dir) as entries:
+        for entry in entries:
+            match = _archive_scene_file_pattern.match(entry.name) if entry.is_file() else None
+            if match and accept(int(match.group(1))):
+                scenes.append((int(match.group(1)), entry.path))
+    scenes.sort(key=lambda x: x[0])
+    yield from scenes
+
+def iter_chapter_scenes(chapter_dir, scene_filter=None, use_mmap=False):
+    """
+    챕터 내 (장면 번호, 장면 파일 경로, 내용)을 번호순으로 하나씩 읽어 생성. 읽기 실패한 장면의 내용은 None.
+    use_mmap=True 이면 일반 장면은 mmap 위의 memoryview(UTF-8 원본 바이트)로 넘겨주며, 다음 항목으로 넘어가면 무효화됨
+    (보관하려면 bytes()/str로 복사). 압축 보관 장면과 팩 장면은 해제된 텍스트(str).
+    """
+    pack, chapter_name = _get_pack_for_path(chapter_dir)
+    for scene_num, scene_path in iter_chapter_scene_files(chapter_dir, scene_filter):
+        if pack:
+            yield scene_num, scene_path, pack.read_text(f"{chapter_name}/{os.path.basename(scene_path)}") or ""
+            continue
+        if not use_mmap:
+            try:
+                scene_content = _read_scene_file_text(scene_path)
+            except Exception as e:
+                print(f"WARN: 장면 파일 읽기 실패 ({os.path.basename(scene_path)}): {e}")
+                scene_content = None
+            yield scene_num, scene_path, scene_content
+            continue
+        try:
+            scene_file = open(scene_path, 'rb')
+        except OSError as e:
+            print(f"WARN: 장면 파일 열기 실패 ({os.path.basename(scene_path)}): {e}")
+            yield scene_num, scene_path, None
+            continue
+        mapped = view = None
+        try:
+            try:
+                if os.fstat(scene_file.fileno()).st_size == 0:
+                    view = memoryview(b"")
+                else:
+                    mapped = mmap.mmap(scene_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    if mapped[:len(_ZSTD_FRAME_MAGIC)] == _ZSTD_FRAME_MAGIC: # 압축 보관 장면은 해제 후 텍스트로
+                        view = _decode_scene_bytes(mapped[:], os.path.dirname(chapter_dir))
+                    else:
+                        view = memoryview(mapped)
+            except Exception as e:
+                print(f"WARN: 장면 파일 읽기 실패 ({os.path.basename(scene_path)}): {e}")
+            yield scene_num, scene_path, view
+        finally:
+            if isinstance(view, memoryview): view.release()
+            if mapped is not None:
+                try: mapped.close()
+                except BufferError: pass # 호출자가 파생 뷰를 아직 쥐고 있으면 GC에 맡김
+            scene_file.close()
+
+def iter_novel_scenes(novel_dir, chapter_filter=None, scene_filter=None, use_mmap=False):
+    """
+    소설 전체의 (챕터 번호, 장면 번호, 장면 파일 경로, 내용)을 챕터/장면 순서대로 하나씩 생성.
+    목록을 읽을 수 없는 챕터는 경고 후 건너뜀. 내용 형식은 iter_chapter_scenes와 동일.
+    """
+    for chap_num, chapter_dir in iter_chapter_dirs(novel_dir, chapter_filter):
+        try:
+            for scene_num, scene_path, scene_content in iter_chapter_scenes(chapter_dir, scene_filter, use_mmap):
+                yield chap_num, scene_num, scene_path, scene_content
+        except OSError as e:
+            print(f"WARN: 챕터 {chap_num} ({os.path.basename(chapter_dir)})의 장면 목록 읽기 실패: {e}")
+
 # --- 모든 장면 내용 읽기 (요약용) ---
 def get_all_chapter_scene_contents(novel_dir):
     """
     특정 소설 폴더 내의 모든 챕터 폴더에서 모든 장면(.txt) 파일을 읽어
     챕터 번호 및 장면 번호 순서대로 정렬된 하나의 문자열로 반환합니다.
+    (장면은 iter_novel_scenes로 하나씩 읽어 결합 블록만 보관)
     """
-    all_contents_list = []
-    # Match 'Chapter_XXX' or 'Chapter_XXX_Title'
-    chapter_folder_pattern = re.compile(r"^Chapter_(\d+)(?:_.*)?$", re.IGNORECASE)
-    scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
-    found_chapters = [] # (chap_num, chapter_dir_path) 저장
-
-    if not os.path.isdir(novel_dir):
+    if not is_pack_path(novel_dir) and not os.path.isdir(novel_dir):
         print(f"ERROR: 모든 내용 읽기 실패 - 소설 경로 없음: {novel_dir}")
         return ""
 
-    try:
-        # 1. Scan for CHAPTER DIRECTORIES
-        with os.scandir(novel_dir) as novel_entries:
-            for entry in novel_entries:
-                if entry.is_dir():
-                    match = chapter_folder_pattern.match(entry.name)
-                    if match and match.group(1).isdigit():
-                        try:
-                            chap_num = int(match.group(1))
-                            found_chapters.append((chap_num, entry.path))
-                        except ValueError:
-                            print(f"WARN: 챕터 폴더 숫자 변환 오류 (무시): {entry.name}")
-
-        if not found_chapters:
-            print(f"INFO: 요약을 위한 챕터 폴더 없음 ({os.path.basename(novel_dir)}).")
-            return ""
-
-        # 2. Sort chapters by chapter number
-        found_chapters.sort(key=lambda x: x[0])
+    all_contents_list = []
+    chapter_combined_content = []
+    current_chap_num = None
+    total_scenes_read = 0
 
-        # 3. Read scene content files from WITHIN each chapter directory
-        total_scenes_read = 0
-        for chap_num, chapter_path in found_chapters:
-            found_scenes = [] # (scene_num, scene_file_path) 저장
-            try:
-                with os.scandir(chapter_path) as chapter_entries:
-                    for entry in chapter_entries:
-                        if entry.is_file():
-                            match = scene_file_pattern.match(entry.name)
-                            if match and match.group(1).isdigit():
-                                try:
-                                    scene_num = int(match.group(1))
-                                    found_scenes.append((scene_num, entry.path))
-                                except ValueError:
-                                    print(f"WARN: 장면 파일 숫자 변환 오류 (무시): {entry.name} in {os.path.basename(chapter_path)}")
-            except OSError as e:
-                print(f"WARN: 챕터 {chap_num} ({os.path.basename(chapter_path)})의 장면 목록 읽기 실패: {e}")
-                continue # 다음 챕터로 넘어감
+    def _flush_chapter():
+        if chapter_combined_content:
+            all_contents_list.append(f"### {current_chap_num}화 내용 시작 ###\n" + "\n\n".join(chapter_combined_content) + f"\n### {current_chap_num}화 내용 끝 ###")
+            chapter_combined_content.clear()
 
-            if not found_scenes:
-                # 장면 파일이 없는 챕터는 건너뛰거나 표시할 수 있음
-                print(f"INFO: 챕터 {chap_num} ({os.path.basename(chapter_path)})에 장면 파일 없음.")
+    try:
+        for chap_num, scene_num, scene_path, scene_content in iter_novel_scenes(novel_dir):
+            if chap_num != current_chap_num:
+                _flush_chapter()
+                current_chap_num = chap_num
+            if scene_content is None:
+                # 오류 발생 시에도 구분자 추가하여 알려줌
+                chapter_combined_content.append(f"--- 장면 {scene_num} (읽기 오류) ---")
                 continue
-
-            # Sort scenes by scene number
-            found_scenes.sort(key=lambda x: x[0])
-
-            # Append scene contents for this chapter
-            chapter_combined_content = []
-            scenes_read_in_chapter = 0
-            for scene_num, scene_path in found_scenes:
-                scene_content = ""
-                try:
-                    with open(scene_path, "r", encoding="utf-8", errors='replace') as f:
-                        scene_content = f.read().strip()
-                    # 비어있지 않은 내용만 추가하고 구분자 추가
-                    if scene_content:
-                         # 구분자 명확하게 추가
-                         chapter_combined_content.append(f"--- 장면 {scene_num} 시작 ---\n{scene_content}\n--- 장면 {scene_num} 끝 ---")
-                         scenes_read_in_chapter += 1
-                    else:
-                         print(f"INFO: 장면 파일 비어있음 ({os.path.basename(scene_path)}). 요약에서 제외.")
-                except Exception as e:
-                    print(f"WARN: 장면 파일 읽기 실패 ({os.path.basename(scene_path)}): {e}")
-                    # 오류 발생 시에도 구분자 추가하여 알려줌
-                    chapter_combined_content.append(f"--- 장면 {scene_num} (읽기 오류) ---")
-
-            # Combine scenes for the current chapter and add to the main list if content exists
-            if chapter_combined_content:
-                 all_contents_list.append(f"### {chap_num}화 내용 시작 ###\n" + "\n\n".join(chapter_combined_content) + f"\n### {chap_num}화 내용 끝 ###")
-                 total_scenes_read += scenes_read_in_chapter
-
-        print(f"✅ 총 {len(found_chapters)}개 챕터, {total_scenes_read}개 장면의 내용 결합 완료 ({os.path.basename(novel_dir)}).")
+            scene_content = scene_content.strip()
+            if scene_content:
+                chapter_combined_content.append(f"--- 장면 {scene_num} 시작 ---\n{scene_content}\n--- 장면 {scene_num} 끝 ---")
+                total_scenes_read += 1
+        _flush_chapter()
+
+        if not all_contents_list:
+            print(f"INFO: 요약할 장면 내용 없음 ({os.path.basename(novel_dir)}).")
+            return ""
+        print(f"✅ 총 {len(all_contents_list)}개 챕터, {total_scenes_read}개 장면의 내용 결합 완료 ({os.path.basename(novel_dir)}).")
         # 각 챕터 내용을 두 줄 개행으로 구분하여 합침
         return "\n\n".join(all_contents_list)
 
@@ -1136,6 +1893,34 @@ def get_all_chapter_scene_contents(novel_dir):
         return ""
 
 # --- 이전 장면 내용 읽기 (특정 챕터 내) ---
+# 장면 파일별 결합 블록 캐시 (LRU): 경로 -> ((mtime_ns, 크기), 블록). 브랜치 간 공유 구간 장면은 한 번만 읽고 재사용.
+# 총 글자 수가 PREVIOUS_SCENE_CACHE_MAX_CHARS를 넘으면 가장 오래 안 쓴 장면부터 제거.
+_previous_scene_block_cache = collections.OrderedDict()
+_previous_scene_block_cache_chars = 0
+_previous_scene_block_lock = threading.Lock()
+
+def _get_previous_scene_block(scene_num, scene_path):
+    """이전 장면 블록 반환 (파일이 그대로면 캐시 사용). 빈 장면은 빈 문자열."""
+    global _previous_scene_block_cache_chars
+    stat_result = os.stat(scene_path)
+    file_signature = (stat_result.st_mtime_ns, stat_result.st_size)
+    with _previous_scene_block_lock:
+        cached = _previous_scene_block_cache.get(scene_path)
+        if cached and cached[0] == file_signature:
+            _previous_scene_block_cache.move_to_end(scene_path)
+            return cached[1]
+    scene_content = _read_scene_file_text(scene_path).strip()
+    block = f"--- {scene_num} 장면 내용 시작 ---\n{scene_content}\n--- {scene_num} 장면 내용 끝 ---" if scene_content else ""
+    with _previous_scene_block_lock:
+        replaced = _previous_scene_block_cache.pop(scene_path, None)
+        if replaced: _previous_scene_block_cache_chars -= len(replaced[1])
+        _previous_scene_block_cache[scene_path] = (file_signature, block)
+        _previous_scene_block_cache_chars += len(block)
+        while _previous_scene_block_cache_chars > constants.PREVIOUS_SCENE_CACHE_MAX_CHARS and len(_previous_scene_block_cache) > 1:
+            _, (_, evicted_block) = _previous_scene_block_cache.popitem(last=False)
+            _previous_scene_block_cache_chars -= len(evicted_block)
+    return block
+
 def load_previous_scenes_in_chapter(chapter_dir, current_scene_number):
     """
     특정 챕터 폴더 내에서 주어진 current_scene_number '이전'의 모든 장면(.txt) 내용을 읽어
@@ -1146,49 +1931,30 @@ def load_previous_scenes_in_chapter(chapter_dir, current_scene_number):
         print(f"ℹ️ 이전 장면 읽기 건너뜀 (현재 장면 번호: {current_scene_number}).")
         return "" # 첫 장면이거나 유효하지 않은 번호
 
+    previous_scene_filter = lambda scene_num: 0 < scene_num < current_scene_number
     previous_contents_list = []
-    scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
-    found_scenes = [] # (scene_num, scene_file_path) 저장
+
+    if is_pack_path(chapter_dir):
+        for scene_num, _scene_path, scene_content in iter_chapter_scenes(chapter_dir, previous_scene_filter):
+            scene_content = (scene_content or "").strip()
+            if scene_content:
+                previous_contents_list.append(f"--- {scene_num} 장면 내용 시작 ---\n{scene_content}\n--- {scene_num} 장면 내용 끝 ---")
+        return "\n\n".join(previous_contents_list)
 
     if not os.path.isdir(chapter_dir):
         print(f"ERROR: 이전 장면 읽기 실패 - 챕터 경로 없음: {chapter_dir}")
         return "" # 오류 시 빈 문자열 반환
 
-    target_scene_num_exclusive = current_scene_number
-
     try:
-        # 1. Scan for scene files matching the pattern
-        with os.scandir(chapter_dir) as chapter_entries:
-            for entry in chapter_entries:
-                if entry.is_file():
-                    match = scene_file_pattern.match(entry.name)
-                    if match and match.group(1).isdigit():
-                        try:
-                            scene_num = int(match.group(1))
-                            # 현재 생성할 장면 번호 '미만'인 장면만 포함
-                            if 0 < scene_num < target_scene_num_exclusive:
-                                found_scenes.append((scene_num, entry.path))
-                        except ValueError:
-                             print(f"WARN: 이전 장면 스캔 중 파일명 숫자 변환 오류 (무시): {entry.name}")
-
-        if not found_scenes:
-            print(f"INFO: 이전 장면 없음 ({os.path.basename(chapter_dir)}, 기준: {target_scene_num_exclusive}화 미만).")
-            return ""
-
-        # 2. Sort scenes by scene number
-        found_scenes.sort(key=lambda x: x[0])
-
-        # 3. Read and combine content
+        scenes_found = 0
         scenes_read = 0
-        for scene_num, scene_path in found_scenes:
-            scene_content = ""
+        for scene_num, scene_path in iter_chapter_scene_files(chapter_dir, previous_scene_filter):
+            scenes_found += 1
             try:
-                with open(scene_path, "r", encoding="utf-8", errors='replace') as f:
-                    scene_content = f.read().strip()
-                # 비어있지 않은 내용만 추가하고 구분자 추가
-                if scene_content:
-                    # 구분자를 명확하게 추가 (예: 장면 번호 명시)
-                    previous_contents_list.append(f"--- {scene_num} 장면 내용 시작 ---\n{scene_content}\n--- {scene_num} 장면 내용 끝 ---")
+                scene_block = _get_previous_scene_block(scene_num, scene_path)
+                # 비어있지 않은 내용만 추가 (구분자에 장면 번호 명시)
+                if scene_block:
+                    previous_contents_list.append(scene_block)
                     scenes_read += 1
                 else:
                     print(f"INFO: 이전 장면 파일 비어있음 ({os.path.basename(scene_path)}). 내용에 포함 안 함.")
@@ -1196,6 +1962,10 @@ def load_previous_scenes_in_chapter(chapter_dir, current_scene_number):
                 print(f"WARN: 이전 장면 파일 읽기 실패 ({os.path.basename(scene_path)}): {e}")
                 previous_contents_list.append(f"--- {scene_num} 장면 (읽기 오류) ---") # 오류 발생 표시
 
+        if not scenes_found:
+            print(f"INFO: 이전 장면 없음 ({os.path.basename(chapter_dir)}, 기준: {current_scene_number}화 미만).")
+            return ""
+
         print(f"✅ 챕터 '{os.path.basename(chapter_dir)}'의 이전 {scenes_read}개 장면 내용 결합 완료.")
         # 여러 장면 내용을 명확한 구분자와 함께 하나의 문자열로 반환
         return "\n\n".join(previous_contents_list)
@@ -1209,4 +1979,1169 @@ def load_previous_scenes_in_chapter(chapter_dir, current_scene_number):
         traceback.print_exc()
         return "" # 오류 시 빈 문자열
 
+# --- 소설 팩 (.novelpack, 읽기 전용) ---
+# 팩 파일 경로 자체를 소설 폴더처럼 취급: '<팩 경로>/Chapter_XXX/NNN.txt'
+_open_novel_packs = {} # 정규화된 팩 경로 -> NovelPack
+_novel_pack_lock = threading.Lock()
+_pack_chapter_pattern = re.compile(r"^Chapter_(\d+)(?:_.*)?$", re.IGNORECASE)
+
+def open_novel_pack(pack_path):
+    """소설 팩을 읽기 전용으로 열기 (이미 열린 팩은 재사용). 실패 시 None."""
+    key = os.path.normcase(os.path.abspath(pack_path))
+    with _novel_pack_lock:
+        pack = _open_novel_packs.get(key)
+        if pack is not None:
+            return pack
+        try:
+            pack = novel_pack.NovelPack(pack_path)
+        except (OSError, ValueError, novel_pack.NovelPackError) as e:
+            print(f"❌ 소설 팩 열기 실패 ({pack_path}): {e}")
+            return None
+        _open_novel_packs[key] = pack
+        print(f"✅ 소설 팩 열림 (읽기 전용): {pack_path}")
+        return pack
+
+def close_novel_pack(pack_path):
+    """열린 소설 팩 닫기 (열려있지 않으면 무시)."""
+    key = os.path.normcase(os.path.abspath(pack_path))
+    with _novel_pack_lock:
+        pack = _open_novel_packs.pop(key, None)
+    if pack is not None:
+        pack.close()
+        print(f"ℹ️ 소설 팩 닫힘: {pack_path}")
+
+def close_all_novel_packs():
+    """열린 모든 소설 팩 닫기 (종료 시)."""
+    with _novel_pack_lock:
+        packs = list(_open_novel_packs.values())
+        _open_novel_packs.clear()
+    for pack in packs:
+        pack.close()
+
+def _split_pack_path(path):
+    """경로가 소설 팩 내부를 가리키면 (팩 파일 경로, 팩 내부 상대 경로) 반환, 아니면 (None, None)."""
+    if not isinstance(path, str) or constants.NOVEL_PACK_EXTENSION not in path.lower():
+        return None, None
+    parts = os.path.normpath(path).split(os.sep)
+    for i, part in enumerate(parts):
+        if part.lower().endswith(constants.NOVEL_PACK_EXTENSION):
+            return os.sep.join(parts[:i + 1]), "/".join(parts[i + 1:])
+    return None, None
+
+def is_pack_path(path):
+    """경로가 소설 팩(또는 그 내부)을 가리키는지 여부."""
+    pack_file, _ = _split_pack_path(path)
+    return pack_file is not None
+
+def _get_pack_for_path(path):
+    """(열린 NovelPack, 팩 내부 상대 경로) 반환. 팩 경로가 아니거나 열기 실패 시 (None, None)."""
+    pack_file, rel_path = _split_pack_path(path)
+    if pack_file is None or not os.path.isfile(pack_file):
+        return None, None
+    pack = open_novel_pack(pack_file)
+    return (pack, rel_path) if pack else (None, None)
+
+def _read_pack_json(pack, entry_name):
+    """팩 항목 JSON 읽기. 없거나 형식 오류 시 빈 dict."""
+    try:
+        data = pack.read_json(entry_name)
+        return data if isinstance(data, dict) else {}
+    except (ValueError, UnicodeDecodeError) as e:
+        print(f"❌ 소설 팩 항목 JSON 오류 ({entry_name}): {e}")
+        return {}
+
+def _list_pack_chapters(pack):
+    """팩 내 [(챕터 번호, 챕터 폴더명, [장면 번호])] 목록 (챕터 번호순)."""
+    chapters = []
+    for chapter_name in pack.list_chapters():
+        match = _pack_chapter_pattern.match(chapter_name)
+        if match:
+            chapters.append((int(match.group(1)), chapter_name, pack.list_scenes(chapter_name)))
+    chapters.sort(key=lambda x: x[0])
+    return chapters
+
+def _reject_pack_write(path, target_desc):
+    """소설 팩에 대한 쓰기 시도 거부 알림."""
+    pack_file, _ = _split_pack_path(path)
+    msg = f"소설 팩은 읽기 전용입니다. {target_desc}을(를) 저장할 수 없습니다.\n({os.path.basename(pack_file or path)})"
+    print(f"❌ {msg}")
+    _show_error("읽기 전용", msg)
+
+def path_is_dir(path):
+    """os.path.isdir 대체 (소설 팩 및 팩 내부 챕터도 폴더로 취급)."""
+    pack, rel_path = _get_pack_for_path(path)
+    if pack:
+        return rel_path == "" or rel_path in pack.list_chapters()
+    return os.path.isdir(path)
+
+def path_is_file(path):
+    """os.path.isfile 대체 (소설 팩 내부 항목 포함)."""
+    pack, rel_path = _get_pack_for_path(path)
+    if pack:
+        return bool(rel_path) and pack.has_entry(rel_path)
+    return os.path.isfile(path)
+
+def list_novel_pack_contents(pack_path):
+    """소설 팩 내용 [(챕터 번호, 챕터 폴더명, [장면 번호])] 반환 (트리뷰용). 열기 실패 시 빈 목록."""
+    pack = open_novel_pack(pack_path)
+    return _list_pack_chapters(pack) if pack else []
+
+def export_novel_pack(novel_dir, pack_path):
+    """소설 폴더를 단일 소설 팩 파일로 내보내기. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    flush_pending_writes()
+    if is_pack_path(novel_dir):
+        return False, "오류: 이미 소설 팩으로 열린 소설입니다."
+    if not os.path.isdir(novel_dir):
+        return False, f"오류: 소설 폴더 없음: '{novel_dir}'"
+
+    novel_name = os.path.basename(os.path.normpath(novel_dir))
+    close_novel_pack(pack_path) # 같은 경로의 팩이 열려있으면 교체 전에 닫기
+    writer = None
+    try:
+        writer = novel_pack.NovelPackWriter(pack_path, novel_name)
+        writer.add_json(constants.NOVEL_SETTINGS_FILENAME, load_novel_settings(novel_dir))
+
+        chapters = []
+        with os.scandir(novel_dir) as entries:
+            for entry in entries:
+                match = _pack_chapter_pattern.match(entry.name) if entry.is_dir() else None
+                if match: chapters.append((int(match.group(1)), entry.name, entry.path))
+        chapters.sort(key=lambda x: x[0])
+
+        scene_count = 0
+        scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
+        for _, chapter_name, chapter_dir in chapters:
+            writer.add_json(f"{chapter_name}/{constants.CHAPTER_SETTINGS_FILENAME}", load_chapter_settings(chapter_dir))
+            all_scene_settings = load_chapter_scene_settings_all(chapter_dir)
+            writer.add_json(f"{chapter_name}/{constants.CHAPTER_MANIFEST_FILENAME}",
+                            {"version": constants.CHAPTER_MANIFEST_VERSION,
+                             "scenes": {str(num): data for num, data in all_scene_settings.items()}})
+            with os.scandir(chapter_dir) as entries:
+                scene_numbers = sorted(int(m.group(1)) for m in (scene_file_pattern.match(e.name) for e in entries if e.is_file()) if m)
+            for scene_num in scene_numbers:
+                scene_filename = constants.SCENE_FILENAME_FORMAT.format(scene_num)
+                writer.add_text(f"{chapter_name}/{scene_filename}", _read_scene_file_text(os.path.join(chapter_dir, scene_filename)))
+                scene_count += 1
+
+        writer.close()
+        msg = f"'{novel_name}' 소설 팩 내보내기 완료 (챕터 {len(chapters)}개, 장면 {scene_count}개)."
+        print(f"✅ {msg} -> {pack_path}")
+        return True, msg
+    except Exception as e:
+        if writer: writer.abort()
+        msg = f"오류: 소설 팩 내보내기 실패:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg
+
+# --- 챕터 압축 보관 (zstd) ---
+# 압축 보관된 장면 파일은 이름(NNN.txt)을 유지한 채 zstd 프레임으로 저장되며, 읽을 때 자동 해제됨.
+_ZSTD_FRAME_MAGIC = b"\x28\xb5\x2f\xfd"
+_compression_dict_cache = {} # 소설 폴더 -> (사전 파일 mtime, ZstdCompressionDict)
+_archive_scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
+
+def is_compression_available():
+    """zstandard 라이브러리 사용 가능 여부."""
+    return zstandard is not None
+
+def is_chapter_archived(chapter_dir):
+    """챕터가 압축 보관 상태인지 (보관 표시 파일 존재 여부)."""
+    return isinstance(chapter_dir, str) and os.path.isfile(os.path.join(chapter_dir, constants.CHAPTER_ARCHIVE_MARKER_FILENAME))
+
+def _get_compression_dict(novel_dir):
+    """소설별 압축 사전 로드 (mtime 기준 캐시). 없으면 None."""
+    dict_path = os.path.join(novel_dir, constants.COMPRESSION_DICT_FILENAME)
+    if zstandard is None or not os.path.isfile(dict_path):
+        return None
+    key = os.path.normcase(os.path.abspath(novel_dir))
+    mtime = os.path.getmtime(dict_path)
+    cached = _compression_dict_cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(dict_path, 'rb') as f:
+        dict_data = zstandard.ZstdCompressionDict(f.read())
+    _compression_dict_cache[key] = (mtime, dict_data)
+    return dict_data
+
+def _decode_scene_bytes(data, novel_dir):
+    """장면 파일 바이트를 텍스트로 변환 (zstd 프레임이면 해제, 줄바꿈은 텍스트 모드와 동일하게 정규화)."""
+    if data.startswith(_ZSTD_FRAME_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("압축 보관된 장면입니다. 'zstandard' 라이브러리를 설치해야 읽을 수 있습니다.")
+        dict_data = None
+        if zstandard.get_frame_parameters(data).dict_id:
+            dict_data = _get_compression_dict(novel_dir)
+            if dict_data is None:
+                raise RuntimeError(f"압축 사전 파일({constants.COMPRESSION_DICT_FILENAME})이 없어 장면을 해제할 수 없습니다.")
+        decompressor = zstandard.ZstdDecompressor(dict_data=dict_data) if dict_data else zstandard.ZstdDecompressor()
+        data = decompressor.decompress(data)
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+def _read_scene_file_text(scene_path):
+    """장면 파일 읽기 (압축 보관 여부와 무관하게 텍스트 반환). 오류 시 예외 전파."""
+    with open(scene_path, 'rb') as f:
+        data = f.read()
+    return _decode_scene_bytes(data, os.path.dirname(os.path.dirname(scene_path)))
+
+def read_scene_file_text(scene_path):
+    """장면 파일 텍스트 읽기 (압축 보관 장면 포함, 검색 색인 등 외부 모듈용). 오류 시 예외 전파."""
+    return _read_scene_file_text(scene_path)
+
+def _replace_file_bytes_keep_mtime(file_path, data):
+    """파일 내용을 원자적으로 교체하되 수정 시각은 유지 (자동 보관 기준 보존)."""
+    stat = os.stat(file_path)
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        os.utime(file_path, (stat.st_atime, stat.st_mtime))
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+
+def _list_chapter_scene_files(chapter_dir):
+    """챕터 폴더 내 장면 파일 경로 목록 (번호순)."""
+    return [path for _, path in iter_chapter_scene_files(chapter_dir)]
+
+def train_novel_compression_dictionary(novel_dir):
+    """소설 전체 장면으로 zstd 압축 사전 학습 및 저장. 이미 있으면 재사용 (기존 압축 파일 보호). 성공 시 True."""
+    if zstandard is None: return False
+    dict_path = os.path.join(novel_dir, constants.COMPRESSION_DICT_FILENAME)
+    if os.path.isfile(dict_path): return True
+
+    samples = []
+    try:
+        with os.scandir(novel_dir) as entries:
+            chapter_dirs = [entry.path for entry in entries if entry.is_dir() and _pack_chapter_pattern.match(entry.name)]
+        for chapter_dir in chapter_dirs:
+            for scene_path in _list_chapter_scene_files(chapter_dir):
+                samples.append(_read_scene_file_text(scene_path).encode('utf-8'))
+        if len(samples) < constants.COMPRESSION_DICT_MIN_SAMPLES:
+            print(f"ℹ️ 압축 사전 학습 건너뜀: 장면 수 부족 ({len(samples)}/{constants.COMPRESSION_DICT_MIN_SAMPLES})")
+            return False
+        dict_data = zstandard.train_dictionary(constants.COMPRESSION_DICT_SIZE, samples)
+        tmp_path = dict_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(dict_data.as_bytes())
+        os.replace(tmp_path, dict_path)
+        print(f"✅ 압축 사전 학습 완료: {os.path.basename(novel_dir)} (장면 {len(samples)}개)")
+        return True
+    except Exception as e:
+        print(f"WARN: 압축 사전 학습 실패 (사전 없이 압축): {e}")
+        return False
+
+def archive_chapter(chapter_dir, use_dictionary=True):
+    """챕터의 장면 텍스트를 zstd로 압축 보관. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    if zstandard is None:
+        return False, "오류: 'zstandard' 라이브러리가 설치되어 있지 않아 압축할 수 없습니다."
+    if is_pack_path(chapter_dir) or not os.path.isdir(chapter_dir):
+        return False, f"오류: 압축할 챕터 폴더가 유효하지 않습니다: '{chapter_dir}'"
+
+    chapter_name = os.path.basename(chapter_dir)
+    novel_dir = os.path.dirname(chapter_dir)
+    try:
+        # 사전 학습(소설 전체 읽기)은 잠금 밖에서: 그동안 장면 저장이 막히지 않도록
+        dict_data = None
+        if use_dictionary and train_novel_compression_dictionary(novel_dir):
+            dict_data = _get_compression_dict(novel_dir)
+        compressor = zstandard.ZstdCompressor(level=constants.ZSTD_COMPRESSION_LEVEL, dict_data=dict_data) if dict_data \
+            else zstandard.ZstdCompressor(level=constants.ZSTD_COMPRESSION_LEVEL)
+
+        original_bytes = compressed_bytes = 0
+        for scene_path in _list_chapter_scene_files(chapter_dir):
+            # 파일마다 읽기 -> 압축 -> 교체를 잠금 안에서 수행 (그 사이 저장된 내용을 옛 압축본이 덮어쓰지 않도록)
+            with _archive_lock:
+                if not os.path.isfile(scene_path): continue # 그 사이 삭제됨
+                with open(scene_path, 'rb') as f:
+                    data = f.read()
+                if data.startswith(_ZSTD_FRAME_MAGIC): continue # 이미 압축됨
+                compressed = compressor.compress(data)
+                _replace_file_bytes_keep_mtime(scene_path, compressed)
+            original_bytes += len(data); compressed_bytes += len(compressed)
+
+        with _archive_lock:
+            _atomic_write_json(os.path.join(chapter_dir, constants.CHAPTER_ARCHIVE_MARKER_FILENAME),
+                               {"archived_at": time.time(), "dictionary": dict_data is not None})
+        msg = f"'{chapter_name}' 압축 보관 완료 ({original_bytes:,} -> {compressed_bytes:,} 바이트)."
+        print(f"✅ {msg}")
+        return True, msg
+    except Exception as e:
+        msg = f"오류: '{chapter_name}' 압축 중 오류 발생:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg
+
+def unarchive_chapter(chapter_dir):
+    """압축 보관된 챕터의 장면 텍스트를 일반 텍스트로 복원. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    chapter_name = os.path.basename(chapter_dir)
+    with _archive_lock:
+        try:
+            restored = 0
+            for scene_path in _list_chapter_scene_files(chapter_dir):
+                with open(scene_path, 'rb') as f:
+                    data = f.read()
+                if not data.startswith(_ZSTD_FRAME_MAGIC): continue
+                text = _decode_scene_bytes(data, os.path.dirname(chapter_dir))
+                _replace_file_bytes_keep_mtime(scene_path, text.replace('\n', os.linesep).encode('utf-8'))
+                restored += 1
+            marker_path = os.path.join(chapter_dir, constants.CHAPTER_ARCHIVE_MARKER_FILENAME)
+            if os.path.exists(marker_path): os.remove(marker_path)
+            msg = f"'{chapter_name}' 압축 해제 완료 (장면 {restored}개)."
+            print(f"✅ {msg}")
+            return True, msg
+        except Exception as e:
+            msg = f"오류: '{chapter_name}' 압축 해제 중 오류 발생:\n{e}"
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg
+
+def auto_archive_cold_chapters(base_dir, days, use_dictionary=True):
+    """days일 이상 수정되지 않은 챕터를 자동 압축 보관. 보관한 챕터 경로 목록 반환."""
+    if zstandard is None or not days or days <= 0 or not os.path.isdir(base_dir):
+        return []
+    cutoff = time.time() - days * 86400
+    archived = []
+    try:
+        with os.scandir(base_dir) as novel_entries:
+            novel_dirs = [entry.path for entry in novel_entries if entry.is_dir() and not entry.name.startswith('.')]
+        for novel_dir in novel_dirs:
+            with os.scandir(novel_dir) as chapter_entries:
+                chapter_dirs = [entry.path for entry in chapter_entries if entry.is_dir() and _pack_chapter_pattern.match(entry.name)]
+            for chapter_dir in chapter_dirs:
+                if is_chapter_archived(chapter_dir): continue
+                with os.scandir(chapter_dir) as entries:
+                    mtimes = [entry.stat().st_mtime for entry in entries if entry.is_file()]
+                if not mtimes or max(mtimes) > cutoff: continue
+                success, _ = archive_chapter(chapter_dir, use_dictionary)
+                if success: archived.append(chapter_dir)
+    except OSError as e:
+        print(f"WARN: 자동 압축 보관 스캔 중 오류: {e}")
+    if archived:
+        print(f"✅ 자동 압축 보관: 챕터 {len(archived)}개 ({days}일 이상 미수정)")
+    return archived
+
+# --- 휴지통 (즉시 이동 + 지연 삭제) ---
+# <저장 폴더>/.trash/<항목 ID>/<원래 이름> 으로 이동하고, 목록은 .trash/trash_manifest.json 에 기록.
+_trash_lock = threading.RLock()
+
+def _get_trash_dir(base_dir):
+    return os.path.join(base_dir, constants.TRASH_DIR_NAME)
+
+def _load_trash_manifest(base_dir):
+    manifest_path = os.path.join(_get_trash_dir(base_dir), constants.TRASH_MANIFEST_FILENAME)
+    if os.path.isfile(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict) and isinstance(manifest.get("items"), dict):
+                return manifest
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"WARN: 휴지통 목록 로드 실패 (새로 생성): {e}")
+    return {"version": constants.TRASH_MANIFEST_VERSION, "items": {}}
+
+def _save_trash_manifest(base_dir, manifest):
+    _atomic_write_json(os.path.join(_get_trash_dir(base_dir), constants.TRASH_MANIFEST_FILENAME), manifest)
+
+def _move_to_trash(path, kind, base_dir, extras=(), info_extra=None):
+    """항목을 휴지통으로 이동 (같은 드라이브 내 이름 변경이므로 크기와 무관하게 즉시 완료). 실패 시 예외 전파.
+    extras: 함께 옮길 부속 파일 경로 (항목의 상위 폴더 기준 상대 경로로 보관, 예: 장면의 버전 목록).
+    info_extra: 휴지통 목록에 함께 기록할 값 (예: 장면 설정)."""
+    with _trash_lock:
+        item_id = f"{int(time.time() * 1000)}_{uuid.uuid4().hex}" # 삭제 시각 순 정렬 + 다른 항목과 겹치지 않는 ID
+        item_dir = os.path.join(_get_trash_dir(base_dir), item_id)
+        os.makedirs(item_dir, exist_ok=False) # 혹시 겹치면 다른 항목을 덮지 않고 실패
+        os.replace(path, os.path.join(item_dir, os.path.basename(path)))
+        _notify_content_change(path)
+        moved_extras = []
+        for extra_path in extras:
+            if not os.path.isfile(extra_path): continue
+            relative = os.path.relpath(extra_path, os.path.dirname(path))
+            try:
+                os.makedirs(os.path.dirname(os.path.join(item_dir, relative)), exist_ok=True)
+                os.replace(extra_path, os.path.join(item_dir, relative))
+                moved_extras.append(relative)
+            except OSError as e:
+                print(f"WARN: 휴지통으로 부속 파일 이동 실패 ({extra_path}): {e}")
+        manifest = _load_trash_manifest(base_dir)
+        manifest["items"][item_id] = {
+            "kind": kind, "name": os.path.basename(path),
+            "original_path": os.path.relpath(path, base_dir), "deleted_at": time.time(),
+            **({"extras": moved_extras} if moved_extras else {}), **(info_extra or {}),
+        }
+        _save_trash_manifest(base_dir, manifest)
+
+def list_trash_items(base_dir):
+    """휴지통 항목 목록 (최근 삭제 순). 각 항목에 'id' 포함."""
+    with _trash_lock:
+        items = _load_trash_manifest(base_dir)["items"]
+    return sorted(({"id": item_id, **info} for item_id, info in items.items()), key=lambda item: item.get("deleted_at", 0), reverse=True)
+
+def restore_trash_item(base_dir, item_id):
+    """휴지통 항목을 원래 위치로 복원. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    with _trash_lock:
+        manifest = _load_trash_manifest(base_dir)
+        info = manifest["items"].get(item_id)
+        if not info:
+            return False, "휴지통에서 항목을 찾을 수 없습니다."
+        source_path = os.path.join(_get_trash_dir(base_dir), item_id, info["name"])
+        target_path = os.path.join(base_dir, info["original_path"])
+        if not os.path.exists(source_path):
+            del manifest["items"][item_id]; _save_trash_manifest(base_dir, manifest)
+            return False, f"'{info['name']}'의 휴지통 데이터가 없습니다. (이미 삭제됨)"
+        if os.path.exists(target_path):
+            return False, f"원래 위치에 같은 이름의 항목이 이미 있습니다:\n{info['original_path']}\n먼저 이름을 변경하거나 삭제해주세요."
+        if not os.path.isdir(os.path.dirname(target_path)):
+            parent_hint = "챕터" if info.get("kind") == "scene" else "소설"
+            return False, f"복원할 위치의 상위 폴더가 없습니다:\n{os.path.dirname(info['original_path'])}\n({parent_hint}을(를) 먼저 복원해주세요.)"
+        try:
+            with _history_lock: # 장면 버전 목록도 함께 되돌림
+                os.replace(source_path, target_path)
+                for relative in info.get("extras", []):
+                    extra_target = os.path.join(os.path.dirname(target_path), relative)
+                    if os.path.exists(extra_target):
+                        print(f"WARN: 같은 이름의 파일이 있어 부속 파일 복원 건너뜀: {extra_target}")
+                        continue
+                    os.makedirs(os.path.dirname(extra_target), exist_ok=True)
+                    os.replace(os.path.join(_get_trash_dir(base_dir), item_id, relative), extra_target)
+            _notify_content_change(target_path)
+            shutil.rmtree(os.path.join(_get_trash_dir(base_dir), item_id), ignore_errors=True)
+            del manifest["items"][item_id]
+            _save_trash_manifest(base_dir, manifest)
+        except OSError as e:
+            print(f"❌ 휴지통 복원 실패 ({info['name']}): {e}")
+            return False, f"'{info['name']}' 복원 중 오류 발생:\n{e}"
+    if info.get("kind") == "scene" and isinstance(info.get("scene_settings"), dict):
+        save_scene_settings(os.path.dirname(target_path), info["scene_number"], info["scene_settings"])
+    elif info.get("kind") == "branch":
+        _restore_trashed_branch_entry(os.path.dirname(os.path.dirname(target_path)), info["name"], info.get("branch_info") or {})
+    msg = f"'{info['name']}'을(를) 복원했습니다."
+    print(f"✅ {msg}")
+    return True, msg
+
+def purge_trash(base_dir, retention_days=None, item_ids=None):
+    """휴지통 항목 영구 삭제. item_ids 지정 시 해당 항목만, 아니면 보존 기간(일)이 지난 항목만 (None이면 전부).
+    삭제한 항목 수 반환. 오래 걸릴 수 있으므로 백그라운드 스레드에서 호출 권장."""
+    with _trash_lock:
+        manifest = _load_trash_manifest(base_dir)
+        cutoff = time.time() - retention_days * 86400 if retention_days is not None else None
+        targets = [item_id for item_id, info in manifest["items"].items()
+                   if (item_ids is None or item_id in item_ids) and (cutoff is None or info.get("deleted_at", 0) <= cutoff)]
+        # 목록에서 먼저 제거 (삭제 중 복원 방지), 실제 파일 삭제는 잠금 밖에서
+        for item_id in targets: del manifest["items"][item_id]
+        if targets: _save_trash_manifest(base_dir, manifest)
+    for item_id in targets:
+        shutil.rmtree(os.path.join(_get_trash_dir(base_dir), item_id), ignore_errors=True)
+    if targets:
+        print(f"✅ 휴지통 영구 삭제: {len(targets)}개 항목")
+    return len(targets)
+
+# --- 중단된 작업 기록 (종료 시 끝나지 않은 백그라운드 작업) ---
+def save_interrupted_jobs(base_dir, jobs):
+    """종료 시 끝나지 않은 작업 설명 목록을 기록 (다음 실행 때 알림용). 성공 시 True."""
+    try:
+        _atomic_write_json(os.path.join(base_dir, constants.INTERRUPTED_JOBS_FILENAME),
+                           {"saved_at": time.time(), "jobs": list(jobs)})
+        print(f"ℹ️ 중단된 작업 {len(jobs)}개 기록됨.")
+        return True
+    except Exception as e:
+        print(f"❌ 중단된 작업 기록 실패: {e}")
+        return False
+
+def load_interrupted_jobs(base_dir):
+    """이전 실행에서 기록된 중단 작업 목록 읽기 (없으면 빈 목록). 기록은 알림을 보인 뒤 clear_interrupted_jobs로 삭제."""
+    jobs_path = os.path.join(base_dir, constants.INTERRUPTED_JOBS_FILENAME)
+    if not os.path.isfile(jobs_path): return []
+    try:
+        with open(jobs_path, 'r', encoding='utf-8') as f:
+            jobs = json.load(f).get("jobs", [])
+    except (json.JSONDecodeError, OSError, AttributeError) as e:
+        print(f"WARN: 중단된 작업 기록 로드 실패: {e}")
+        jobs = []
+    return [str(job) for job in jobs] if isinstance(jobs, list) else []
+
+def clear_interrupted_jobs(base_dir):
+    """중단 작업 기록 삭제 (사용자에게 알림을 보인 뒤 호출)."""
+    try: os.remove(os.path.join(base_dir, constants.INTERRUPTED_JOBS_FILENAME))
+    except FileNotFoundError: pass
+    except OSError as e: print(f"WARN: 중단된 작업 기록 삭제 실패: {e}")
+
+def _read_generation_queue_file(path):
+    """대기열 파일 하나 읽기. 형식이 맞지 않으면 예외 (JSONDecodeError/OSError/ValueError)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("jobs"), list):
+        raise ValueError("대기열 형식이 아닙니다.")
+    return data
+
+def load_generation_queue(base_dir):
+    """생성 작업 대기열 파일 로드 (파일은 바꾸지 않음). {"paused": bool, "jobs": [...], "corrupt": bool} (없으면 빈 대기열).
+    대기열 파일이 손상되었으면 직전 저장본(.bak) 내용을 반환하고 corrupt=True (손상된 파일 보존은 저장 시 처리)."""
+    queue_path = os.path.join(base_dir, constants.GENERATION_QUEUE_FILENAME)
+    corrupt = False
+    for path in (queue_path, f"{queue_path}.bak"):
+        if not os.path.isfile(path): continue
+        try:
+            data = _read_generation_queue_file(path)
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            print(f"WARN: 생성 작업 대기열 로드 실패 ({os.path.basename(path)}): {e}")
+            if path == queue_path: corrupt = True
+            continue
+        if path != queue_path: print(f"ℹ️ 생성 작업 대기열을 백업에서 복원: {path}")
+        data["jobs"] = [job for job in data["jobs"] if isinstance(job, dict) and job.get("id")]
+        data["corrupt"] = corrupt
+        return data
+    return {"paused": False, "jobs": [], "corrupt": corrupt}
+
+def save_generation_queue(base_dir, queue_data):
+    """생성 작업 대기열을 원자적으로 기록 (직전 저장본은 .bak으로 남김). 성공 시 True.
+    기존 파일이 손상되었으면 .bak 대신 '.corrupt'로 옮겨 보존 (정상 백업을 손상본으로 덮어쓰지 않도록)."""
+    queue_path = os.path.join(base_dir, constants.GENERATION_QUEUE_FILENAME)
+    try:
+        if os.path.isfile(queue_path):
+            try:
+                _read_generation_queue_file(queue_path)
+                shutil.copyfile(queue_path, f"{queue_path}.bak")
+            except (json.JSONDecodeError, ValueError) as e:
+                print(f"WARN: 손상된 생성 작업 대기열 파일을 '.corrupt'로 보존: {e}")
+                os.replace(queue_path, f"{queue_path}.corrupt")
+        _atomic_write_json(queue_path, queue_data)
+        return True
+    except Exception as e:
+        print(f"❌ 생성 작업 대기열 저장 실패: {e}")
+        return False
+
+# --- 장면 버전 기록 (내용 주소 기반 보관소) ---
+# 내용: <소설>/.history/objects/<해시 앞 2자>/<sha256> (zstd 압축, 동일 내용은 한 번만 저장)
+# 목록: <챕터>/.history/NNN.json -> {"version": 1, "versions": [{hash, timestamp, length, settings, token_info}, ...]}
+_history_lock = threading.RLock()
+
+def _get_history_object_path(novel_dir, digest):
+    return os.path.join(novel_dir, constants.HISTORY_DIR_NAME, "objects", digest[:2], digest)
+
+def _get_scene_version_list_path(chapter_dir, scene_number):
+    return os.path.join(chapter_dir, constants.HISTORY_DIR_NAME, constants.SCENE_VERSION_LIST_FILENAME_FORMAT.format(scene_number))
+
+def _store_history_blob(novel_dir, text):
+    """텍스트를 보관소에 저장하고 해시 반환. 이미 있으면 쓰지 않음 (중복 제거)."""
+    data = (text or "").encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    object_path = _get_history_object_path(novel_dir, digest)
+    if os.path.isfile(object_path):
+        try: os.utime(object_path) # 재사용 시각 갱신 (기록 정리가 막 참조될 내용을 지우지 않도록)
+        except OSError: pass
+        return digest
+    if zstandard is not None:
+        data = zstandard.ZstdCompressor(level=constants.ZSTD_COMPRESSION_LEVEL).compress(data)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, object_path)
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+    return digest
+
+def _load_history_blob(novel_dir, digest):
+    """보관소에서 해시에 해당하는 텍스트 반환. 오류 시 예외 전파."""
+    with open(_get_history_object_path(novel_dir, digest), 'rb') as f:
+        return _decode_scene_bytes(f.read(), novel_dir)
+
+def _read_scene_version_list(chapter_dir, scene_number):
+    """장면 버전 목록 로드 (없거나 손상 시 빈 목록)."""
+    list_path = _get_scene_version_list_path(chapter_dir, scene_number)
+    if not os.path.isfile(list_path):
+        return []
+    try:
+        with open(list_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        versions = data.get("versions", []) if isinstance(data, dict) else []
+        return [v for v in versions if isinstance(v, dict) and v.get("hash")]
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"WARN: 장면 버전 목록 로드 실패 ({list_path}): {e}")
+        return []
+
+def _remove_scene_version_list(chapter_dir, scene_number):
+    list_path = _get_scene_version_list_path(chapter_dir, scene_number)
+    try:
+        if os.path.isfile(list_path): os.remove(list_path)
+    except OSError as e:
+        print(f"WARN: 장면 버전 목록 삭제 실패 ({list_path}): {e}")
+
+def record_scene_version(chapter_dir, scene_number, content=None, settings=None):
+    """현재 장면 내용/설정을 버전 기록에 추가. content/settings 생략 시 디스크에서 읽음.
+    직전 버전과 내용/설정이 같으면 추가하지 않음. 성공(또는 변경 없음) 시 True."""
+    if is_pack_path(chapter_dir) or not isinstance(scene_number, int) or scene_number < 1:
+        return False
+    novel_dir = os.path.dirname(chapter_dir)
+    try:
+        if content is None:
+            content = _read_scene_file_text(os.path.join(chapter_dir, constants.SCENE_FILENAME_FORMAT.format(scene_number)))
+        snapshot = normalize_scene_settings(settings if settings is not None else load_scene_settings(chapter_dir, scene_number))
+        token_info = snapshot.pop(constants.TOKEN_INFO_KEY, {})
+
+        with _history_lock:
+            digest = _store_history_blob(novel_dir, content)
+            versions = _read_scene_version_list(chapter_dir, scene_number)
+            if versions and versions[-1].get("hash") == digest and versions[-1].get("settings") == snapshot:
+                return True # 변경 없음
+            versions.append({"hash": digest, "timestamp": time.time(), "length": len(content),
+                             "settings": snapshot, "token_info": token_info})
+            if constants.SCENE_VERSION_HISTORY_LIMIT > 0:
+                versions = versions[-constants.SCENE_VERSION_HISTORY_LIMIT:]
+            _atomic_write_json(_get_scene_version_list_path(chapter_dir, scene_number),
+                               {"version": constants.SCENE_VERSION_LIST_VERSION, "versions": versions})
+        print(f"✅ 장면 버전 기록: {os.path.basename(chapter_dir)}/{scene_number:03d} (v{len(versions)}, {digest[:10]})")
+        return True
+    except Exception as e:
+        print(f"❌ 장면 버전 기록 실패 ({chapter_dir}, {scene_number}): {e}")
+        traceback.print_exc()
+        return False
+
+def list_scene_versions(chapter_dir, scene_number):
+    """장면 버전 목록 반환 (오래된 것부터). 각 항목에 'index' 추가. 내용은 읽지 않음."""
+    if is_pack_path(chapter_dir): return []
+    versions = _read_scene_version_list(chapter_dir, scene_number)
+    for index, version in enumerate(versions):
+        version["index"] = index
+    return versions
+
+def load_scene_version_content(chapter_dir, scene_number, index):
+    """특정 버전의 장면 내용 반환. 실패 시 None."""
+    versions = _read_scene_version_list(chapter_dir, scene_number)
+    if not (0 <= index < len(versions)): return None
+    try:
+        return _load_history_blob(os.path.dirname(chapter_dir), versions[index]["hash"])
+    except Exception as e:
+        print(f"❌ 장면 버전 내용 로드 실패 (v{index + 1}): {e}")
+        return None
+
+def diff_scene_versions(chapter_dir, scene_number, index_a, index_b=None):
+    """두 버전의 unified diff 텍스트 반환 (index_b가 None이면 현재 파일과 비교). 실패 시 None."""
+    old_text = load_scene_version_content(chapter_dir, scene_number, index_a)
+    if index_b is None:
+        new_label = "현재"
+        try: new_text = _read_scene_file_text(os.path.join(chapter_dir, constants.SCENE_FILENAME_FORMAT.format(scene_number)))
+        except OSError: new_text = ""
+    else:
+        new_label = f"v{index_b + 1}"
+        new_text = load_scene_version_content(chapter_dir, scene_number, index_b)
+    if old_text is None or new_text is None:
+        return None
+    diff = difflib.unified_diff(old_text.splitlines(), new_text.splitlines(), f"v{index_a + 1}", new_label, lineterm="")
+    return "\n".join(diff)
+
+def restore_scene_version(chapter_dir, scene_number, index):
+    """특정 버전의 내용/설정으로 장면 복원 (복원 결과도 새 버전으로 기록). (bool, 메시지) 반환."""
+    if is_pack_path(chapter_dir):
+        return False, "읽기 전용 소설 팩의 장면은 복원할 수 없습니다."
+    versions = _read_scene_version_list(chapter_dir, scene_number)
+    if not (0 <= index < len(versions)):
+        return False, f"버전 v{index + 1}을(를) 찾을 수 없습니다."
+    content = load_scene_version_content(chapter_dir, scene_number, index)
+    if content is None:
+        return False, f"버전 v{index + 1}의 내용을 보관소에서 읽을 수 없습니다."
+    settings = dict(versions[index].get("settings", {}))
+    settings[constants.TOKEN_INFO_KEY] = versions[index].get("token_info", {})
+    if not save_scene_content(chapter_dir, scene_number, content) or not save_scene_settings(chapter_dir, scene_number, settings):
+        return False, "복원한 내용을 저장하지 못했습니다."
+    record_scene_version(chapter_dir, scene_number, content, settings)
+    return True, f"장면 {scene_number:03d}을(를) v{index + 1} 버전으로 복원했습니다."
+
+class _HistoryScanError(Exception):
+    """기록 정리 중 참조 목록을 끝까지 읽지 못함 (이번 정리는 건너뜀)."""
+
+def _collect_history_refs(root_dir, reachable):
+    """root_dir 아래 모든 .history 폴더의 버전 목록/찾아 바꾸기 기록이 참조하는 해시를 reachable에 추가.
+    폴더가 사라지거나 목록을 읽을 수 없으면 _HistoryScanError (참조를 놓친 채 지우지 않도록)."""
+    def _on_walk_error(error):
+        raise _HistoryScanError(f"폴더 읽기 실패: {error}")
+    for dir_path, dir_names, file_names in os.walk(root_dir, onerror=_on_walk_error):
+        if os.path.basename(dir_path) != constants.HISTORY_DIR_NAME: continue
+        dir_names[:] = [] # 내용 보관소(objects)는 건너뜀
+        for file_name in file_names:
+            if not file_name.endswith('.json'): continue
+            list_path = os.path.join(dir_path, file_name)
+            try:
+                with open(list_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                raise _HistoryScanError(f"기록 목록 읽기 실패 ({list_path}): {e}")
+            if not isinstance(data, dict): continue
+            reachable.update(v["hash"] for v in data.get("versions", []) if isinstance(v, dict) and v.get("hash"))
+            files = data.get("files")
+            if isinstance(files, dict):
+                reachable.update(entry["before"] for entry in files.values() if isinstance(entry, dict) and entry.get("before"))
+
+def _collect_novel_history_garbage(novel_dir, base_dir, cutoff):
+    """소설 보관소에서 어떤 버전 목록(브랜치, 휴지통의 모든 항목 포함)이나 찾아 바꾸기 기록도 참조하지 않는 내용 삭제.
+    삭제한 개수 반환."""
+    objects_dir = os.path.join(novel_dir, constants.HISTORY_DIR_NAME, "objects")
+    if not os.path.isdir(objects_dir):
+        return 0
+    removed = 0
+    with _trash_lock, _history_lock:
+        reachable = set()
+        try:
+            _collect_history_refs(novel_dir, reachable)
+            # 휴지통의 모든 항목을 참조로 간주 (삭제 후 소설 이름이 바뀌어도 복원할 장면/챕터의 기록을 지우지 않도록)
+            trash_dir = _get_trash_dir(base_dir)
+            if os.path.isdir(trash_dir): _collect_history_refs(trash_dir, reachable)
+        except _HistoryScanError as e:
+            print(f"WARN: 기록 정리 건너뜀 ({os.path.basename(novel_dir)}): {e}")
+            return 0
+    # 실제 삭제는 잠금 밖에서: 그 사이 저장/재사용된 내용은 수정 시각이 갱신되어 남음
+    with os.scandir(objects_dir) as prefix_entries:
+        prefix_dirs = [entry.path for entry in prefix_entries if entry.is_dir()]
+    for prefix_dir in prefix_dirs:
+        with os.scandir(prefix_dir) as object_entries:
+            candidates = [entry for entry in object_entries if entry.is_file() and entry.name not in reachable]
+        for entry in candidates:
+            try:
+                if entry.stat().st_mtime > cutoff: continue
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                print(f"WARN: 보관소 내용 삭제 실패 ({entry.path}): {e}")
+    return removed
+
+def collect_history_garbage(base_dir, min_age_s=constants.HISTORY_GC_MIN_AGE_S):
+    """모든 소설의 버전 기록 보관소에서 참조가 없는 내용 삭제 (버전 수 제한으로 밀려난 버전, 비운 휴지통의 장면 등).
+    삭제한 개수 반환. 오래 걸릴 수 있으므로 백그라운드 스레드에서 호출 권장."""
+    if not os.path.isdir(base_dir):
+        return 0
+    cutoff = time.time() - min_age_s
+    removed = 0
+    try:
+        with os.scandir(base_dir) as novel_entries:
+            novel_dirs = [entry.path for entry in novel_entries if entry.is_dir() and not entry.name.startswith('.')]
+        for novel_dir in novel_dirs:
+            removed += _collect_novel_history_garbage(novel_dir, base_dir, cutoff)
+    except OSError as e:
+        print(f"WARN: 기록 정리 중 오류: {e}")
+    if removed:
+        print(f"✅ 버전 기록 정리: 참조 없는 내용 {removed}개 삭제")
+    return removed
+
+# --- 소설 전체 찾아 바꾸기 ---
+# 장면 내용과 설정의 글 항목(소설 설정, 챕터 아크, 장면 플롯)만 바꿈. 토큰 정보/모델명 등은 건드리지 않음.
+# 쓰기 전에 바뀌는 파일의 원본을 버전 기록 보관소에 저장하고 기록(journal)을 남겨, 한 번에 되돌릴 수 있음.
+_replace_lock = threading.Lock()
+
+def _get_replace_journal_path(novel_dir):
+    return os.path.join(novel_dir, constants.HISTORY_DIR_NAME, constants.REPLACE_JOURNAL_FILENAME)
+
+def _list_replace_targets(novel_dir):
+    """찾아 바꾸기 대상 파일 [(경로, 종류)] (숨김 폴더 제외). 종류: scene, novel_settings, chapter_settings, scene_settings"""
+    targets = []
+    novel_settings_path = os.path.join(novel_dir, constants.NOVEL_SETTINGS_FILENAME)
+    if os.path.isfile(novel_settings_path):
+        targets.append((novel_settings_path, "novel_settings"))
+    with os.scandir(novel_dir) as novel_entries:
+        chapter_dirs = sorted(entry.path for entry in novel_entries if entry.is_dir() and _pack_chapter_pattern.match(entry.name))
+    for chapter_dir in chapter_dirs:
+        with os.scandir(chapter_dir) as chapter_entries:
+            for entry in sorted(chapter_entries, key=lambda e: e.name):
+                if not entry.is_file(): continue
+                if _archive_scene_file_pattern.match(entry.name):
+                    targets.append((entry.path, "scene"))
+                elif entry.name == constants.CHAPTER_SETTINGS_FILENAME:
+                    targets.append((entry.path, "chapter_settings"))
+                elif entry.name == constants.CHAPTER_MANIFEST_FILENAME or _legacy_scene_settings_pattern.match(entry.name):
+                    targets.append((entry.path, "scene_settings"))
+    return targets
+
+def _replace_in_settings(data, keys, find_text, replace_text):
+    """설정 dict의 글 항목에서 바꾸기 (제자리 수정). 바뀐 횟수 반환."""
+    count = 0
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, str) and find_text in value:
+            count += value.count(find_text)
+            data[key] = value.replace(find_text, replace_text)
+    return count
+
+def _compute_replacement(path, kind, find_text, replace_text):
+    """파일 하나의 (원본 텍스트, 바뀐 텍스트 또는 None, 바뀐 횟수). 오류 시 예외 전파.
+    설정(JSON) 파일은 파싱한 값에서 찾음 (따옴표/줄바꿈 등은 파일에 이스케이프되어 있어 원문 비교로는 못 찾음)."""
+    original_text = _read_scene_file_text(path)
+    if kind == "scene":
+        if find_text not in original_text: return original_text, None, 0
+        return original_text, original_text.replace(find_text, replace_text), original_text.count(find_text)
+
+    data = json.loads(original_text)
+    if not isinstance(data, dict): return original_text, None, 0
+    if kind == "novel_settings":
+        count = _replace_in_settings(data, constants.NOVEL_LEVEL_SETTINGS, find_text, replace_text)
+    elif kind == "chapter_settings":
+        count = _replace_in_settings(data, constants.CHAPTER_LEVEL_SETTINGS, find_text, replace_text)
+    elif os.path.basename(path) == constants.CHAPTER_MANIFEST_FILENAME:
+        count = sum(_replace_in_settings(scene_data, constants.SCENE_SPECIFIC_SETTINGS, find_text, replace_text)
+                    for scene_data in data.get("scenes", {}).values() if isinstance(scene_data, dict))
+    else:
+        count = _replace_in_settings(data, constants.SCENE_SPECIFIC_SETTINGS, find_text, replace_text)
+    return original_text, (_serialize_json(data) if count else None), count
+
+def _compute_replacements(targets, find_text, replace_text):
+    """대상 파일들을 병렬로 읽어 바꾸기 결과 계산. [(경로, 종류, 원본, 바뀐 텍스트, 횟수)] (바뀌는 파일만, 경로순)"""
+    def _compute(target):
+        path, kind = target
+        try:
+            return (path, kind) + _compute_replacement(path, kind, find_text, replace_text)
+        except Exception as e:
+            print(f"WARN: 찾아 바꾸기 - 파일 읽기 실패 ({path}): {e}")
+            return None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=constants.REPLACE_READ_WORKERS, thread_name_prefix="novel-replace") as executor:
+        results = list(executor.map(_compute, targets))
+    return sorted((result for result in results if result and result[3] is not None), key=lambda result: result[0])
+
+def preview_novel_replace(novel_dir, find_text, candidate_paths=None):
+    """찾아 바꾸기 미리보기 (파일은 바꾸지 않음). [{"path", "kind", "count"}] 반환.
+    candidate_paths: 검색 색인이 알려준 후보 경로 (없으면 소설 전체 파일을 병렬로 읽음)."""
+    if not find_text or is_pack_path(novel_dir) or not os.path.isdir(novel_dir): return []
+    flush_pending_writes() # 대기 중인 자동 저장 내용까지 반영
+    targets = _list_replace_targets(novel_dir)
+    if candidate_paths is not None:
+        candidates = {os.path.normcase(os.path.abspath(path)) for path in candidate_paths}
+        targets = [target for target in targets if os.path.normcase(os.path.abspath(target[0])) in candidates]
+    return [{"path": path, "kind": kind, "count": count}
+            for path, kind, _, _, count in _compute_replacements(targets, find_text, "")]
+
+def replace_in_novel(novel_dir, find_text, replace_text, paths=None):
+    """소설 전체 찾아 바꾸기. paths가 있으면 해당 파일만 (미리보기 결과).
+    성공 시 (True, 메시지, 바뀐 경로 목록), 실패 시 (False, 메시지, 바뀐 경로 목록) 반환."""
+    if is_pack_path(novel_dir):
+        return False, "오류: 읽기 전용 소설 팩은 바꿀 수 없습니다.", []
+    if not find_text or find_text == replace_text:
+        return False, "오류: 찾을 내용이 비어 있거나 바꿀 내용과 같습니다.", []
+    if not os.path.isdir(novel_dir):
+        return False, f"오류: 소설 폴더 경로 유효하지 않음:\n'{novel_dir}'", []
+
+    flush_pending_writes()
+    with _replace_lock, _manifest_lock:
+        targets = _list_replace_targets(novel_dir)
+        if paths is not None:
+            selected = {os.path.normcase(os.path.abspath(path)) for path in paths}
+            targets = [target for target in targets if os.path.normcase(os.path.abspath(target[0])) in selected]
+        changes = _compute_replacements(targets, find_text, replace_text)
+        if not changes:
+            return True, f"'{find_text}'을(를) 찾지 못했습니다.", []
+
+        # 1. 원본을 보관소에 저장하고 기록을 먼저 남김 (중간에 실패해도 되돌릴 수 있도록)
+        try:
+            journal = {"version": constants.REPLACE_JOURNAL_VERSION, "created_at": time.time(),
+                       "find": find_text, "replace": replace_text, "files": {}}
+            for path, kind, original_text, new_text, count in changes:
+                journal["files"][os.path.relpath(path, novel_dir)] = {
+                    "kind": kind, "before": _store_history_blob(novel_dir, original_text), "after": _content_hash(new_text), "count": count}
+            _atomic_write_json(_get_replace_journal_path(novel_dir), journal)
+        except Exception as e:
+            msg = f"오류: 찾아 바꾸기 기록 저장 실패 (파일은 바뀌지 않음):\n{e}"
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg, []
+
+        # 2. 압축 보관된 챕터는 먼저 해제 (일반 저장과 동일)
+        for chapter_dir in {os.path.dirname(path) for path, kind, *_ in changes if kind == "scene"}:
+            if is_chapter_archived(chapter_dir): unarchive_chapter(chapter_dir)
+
+        # 3. 원자적 쓰기(파일별 fsync 생략) 후 모든 파일과 폴더를 한꺼번에 fsync (해시 캐시/검색 색인은 쓰기 함수에서 갱신)
+        #    도중에 중단돼도 1단계의 기록으로 되돌릴 수 있음
+        written_paths, written_dirs = [], set()
+        total_count = 0
+        try:
+            for path, kind, original_text, new_text, count in changes:
+                _atomic_write_text(path, new_text, sync=False)
+                written_paths.append(path)
+                written_dirs.add(os.path.dirname(path))
+                total_count += count
+        except Exception as e:
+            msg = f"오류: 찾아 바꾸기 중 파일 쓰기 실패 ({len(written_paths)}/{len(changes)}개 완료):\n{e}\n\n'되돌리기'로 원래대로 복원할 수 있습니다."
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg, written_paths
+        finally:
+            _fsync_files(written_paths)
+            for dir_path in written_dirs:
+                _fsync_directory(dir_path)
+
+    msg = f"'{find_text}' -> '{replace_text}': 파일 {len(written_paths)}개에서 {total_count}곳을 바꿨습니다."
+    print(f"✅ {msg}")
+    return True, msg, written_paths
+
+def get_last_novel_replace(novel_dir):
+    """되돌릴 수 있는 마지막 찾아 바꾸기 기록 요약 {"find", "replace", "created_at", "file_count"} 또는 None."""
+    if not isinstance(novel_dir, str) or is_pack_path(novel_dir): return None
+    journal_path = _get_replace_journal_path(novel_dir)
+    if not os.path.isfile(journal_path): return None
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+        return {"find": journal["find"], "replace": journal["replace"], "created_at": journal.get("created_at", 0), "file_count": len(journal["files"])}
+    except (json.JSONDecodeError, OSError, KeyError, TypeError) as e:
+        print(f"WARN: 찾아 바꾸기 기록 로드 실패 ({journal_path}): {e}")
+        return None
+
+def undo_last_novel_replace(novel_dir):
+    """마지막 찾아 바꾸기 되돌리기. 그 뒤에 다시 편집된 파일은 건너뜀.
+    성공 시 (True, 메시지, 복원된 경로 목록), 실패 시 (False, 메시지, 복원된 경로 목록) 반환."""
+    journal_path = _get_replace_journal_path(novel_dir)
+    flush_pending_writes()
+    with _replace_lock, _manifest_lock:
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                journal = json.load(f)
+            files = journal["files"]
+        except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+            return False, f"되돌릴 찾아 바꾸기 기록이 없습니다.\n({e})", []
+
+        restored_paths, skipped = [], []
+        written_dirs = set()
+        try:
+            for rel_path, entry in sorted(files.items()):
+                path = os.path.join(novel_dir, rel_path)
+                current_text = _read_scene_file_text(path) if os.path.isfile(path) else None
+                current_hash = _content_hash(current_text) if current_text is not None else None
+                if current_hash == entry["before"]: continue # 아직 바뀌지 않은 파일 (중간 실패)
+                if current_hash != entry["after"]:
+                    skipped.append(rel_path) # 이후 다시 편집/삭제됨 -> 덮어쓰지 않음
+                    continue
+                if entry.get("kind") == "scene" and is_chapter_archived(os.path.dirname(path)):
+                    unarchive_chapter(os.path.dirname(path))
+                _atomic_write_text(path, _load_history_blob(novel_dir, entry["before"]), sync=False)
+                restored_paths.append(path)
+                written_dirs.add(os.path.dirname(path))
+        except Exception as e:
+            msg = f"오류: 되돌리기 중 오류 발생 ({len(restored_paths)}개 복원됨):\n{e}"
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg, restored_paths
+        finally:
+            _fsync_files(restored_paths)
+            for dir_path in written_dirs:
+                _fsync_directory(dir_path)
+        try: os.remove(journal_path) # 되돌리기는 한 번만
+        except OSError as e: print(f"WARN: 찾아 바꾸기 기록 삭제 실패: {e}")
+
+    msg = f"찾아 바꾸기('{journal['find']}' -> '{journal['replace']}') 되돌리기: 파일 {len(restored_paths)}개 복원."
+    if skipped:
+        msg += f"\n이후 다시 편집된 파일 {len(skipped)}개는 건너뜀: {', '.join(skipped[:5])}{' ...' if len(skipped) > 5 else ''}"
+    print(f"✅ {msg}")
+    return True, msg, restored_paths
+
+# --- 챕터 브랜치 ---
+# 챕터 폴더에는 항상 '활성' 브랜치의 장면이 있고, 공유 구간(1..shared_upto) 이후의 장면은 브랜치별로 소유.
+# 비활성 브랜치의 장면은 <챕터>/.branches/<브랜치>/ 에 보관 (장면 설정은 scene_settings.json, 버전 목록은 .history/).
+# 브랜치 전환은 파일 이동(이름 변경)만 수행하며, 공유 구간 장면 파일은 그대로 두어 모든 브랜치가 함께 사용.
+_branch_lock = threading.RLock()
+
+def _get_branches_dir(chapter_dir):
+    return os.path.join(chapter_dir, constants.BRANCHES_DIR_NAME)
+
+def _get_branch_dir(chapter_dir, branch_name):
+    return os.path.join(_get_branches_dir(chapter_dir), branch_name)
+
+def load_chapter_branches(chapter_dir):
+    """챕터 브랜치 정보 로드. 브랜치가 없으면 None."""
+    if not isinstance(chapter_dir, str) or is_pack_path(chapter_dir): return None
+    branches_path = os.path.join(_get_branches_dir(chapter_dir), constants.BRANCHES_MANIFEST_FILENAME)
+    if not os.path.isfile(branches_path): return None
+    try:
+        with open(branches_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get("branches"), dict) and data.get("active") in data["branches"]:
+            return data
+        print(f"WARN: 챕터 브랜치 정보 구조 오류: {branches_path}")
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"WARN: 챕터 브랜치 정보 로드 실패 ({branches_path}): {e}")
+    return None
+
+def _save_chapter_branches(chapter_dir, data):
+    data["version"] = constants.BRANCHES_MANIFEST_VERSION
+    _atomic_write_json(os.path.join(_get_branches_dir(chapter_dir), constants.BRANCHES_MANIFEST_FILENAME), data)
+
+def get_active_branch_name(chapter_dir):
+    """활성 브랜치 이름 (브랜치가 없으면 None)."""
+    data = load_chapter_branches(chapter_dir)
+    return data["active"] if data else None
+
+def list_chapter_branches(chapter_dir):
+    """(활성 브랜치 이름, [{name, base_scene, created_at, scene_count}]) 반환. 브랜치가 없으면 (None, [])."""
+    data = load_chapter_branches(chapter_dir)
+    if not data: return None, []
+    result = []
+    for name, info in sorted(data["branches"].items(), key=lambda item: item[1].get("created_at", 0)):
+        scene_dir = chapter_dir if name == data["active"] else _get_branch_dir(chapter_dir, name)
+        scene_count = len(_list_scene_numbers_in(scene_dir)) if os.path.isdir(scene_dir) else 0
+        result.append({"name": name, "base_scene": info.get("base_scene", 0), "created_at": info.get("created_at", 0), "scene_count": scene_count})
+    return data["active"], result
+
+def _list_scene_numbers_in(dir_path):
+    numbers = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            match = _archive_scene_file_pattern.match(entry.name) if entry.is_file() else None
+            if match: numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+def _read_branch_scene_settings(branch_dir):
+    settings_path = os.path.join(branch_dir, constants.BRANCH_SCENE_SETTINGS_FILENAME)
+    if not os.path.isfile(settings_path): return {}
+    with open(settings_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _transfer_branch_scenes(chapter_dir, branch_dir, scene_numbers, move):
+    """챕터 폴더의 장면들(내용/설정/버전 목록)을 브랜치 보관 폴더로 이동(move=True) 또는 공유 복제(move=False)."""
+    os.makedirs(os.path.join(branch_dir, constants.HISTORY_DIR_NAME), exist_ok=True)
+    stored_settings = _read_branch_scene_settings(branch_dir)
+    for scene_num in scene_numbers:
+        scene_filename = constants.SCENE_FILENAME_FORMAT.format(scene_num)
+        source_path = os.path.join(chapter_dir, scene_filename)
+        if not os.path.isfile(source_path): continue
+        stored_settings[str(scene_num)] = load_scene_settings(chapter_dir, scene_num)
+        version_list = _get_scene_version_list_path(chapter_dir, scene_num)
+        version_target = os.path.join(branch_dir, constants.HISTORY_DIR_NAME, os.path.basename(version_list))
+        with _history_lock: # 옮기는 도중 기록 정리가 버전 목록을 놓치지 않도록
+            if move:
+                os.replace(source_path, os.path.join(branch_dir, scene_filename))
+                if os.path.isfile(version_list): os.replace(version_list, version_target)
+                _remove_scene_from_manifest(chapter_dir, scene_num)
+                legacy_settings = os.path.join(chapter_dir, constants.SCENE_SETTINGS_FILENAME_FORMAT.format(scene_num))
+                if os.path.isfile(legacy_settings): os.remove(legacy_settings)
+            else:
+                _link_or_copy_file(source_path, os.path.join(branch_dir, scene_filename))
+                if os.path.isfile(version_list): shutil.copy2(version_list, version_target)
+    _atomic_write_json(os.path.join(branch_dir, constants.BRANCH_SCENE_SETTINGS_FILENAME), stored_settings)
+
+def _restore_branch_scenes(chapter_dir, branch_dir):
+    """브랜치 보관 폴더의 장면들을 챕터 폴더로 이동 (설정은 챕터 저장 방식에 맞게 다시 저장)."""
+    if not os.path.isdir(branch_dir): return
+    stored_settings = _read_branch_scene_settings(branch_dir)
+    for scene_num in _list_scene_numbers_in(branch_dir):
+        scene_filename = constants.SCENE_FILENAME_FORMAT.format(scene_num)
+        os.replace(os.path.join(branch_dir, scene_filename), os.path.join(chapter_dir, scene_filename))
+        version_list = os.path.join(branch_dir, constants.HISTORY_DIR_NAME, constants.SCENE_VERSION_LIST_FILENAME_FORMAT.format(scene_num))
+        if os.path.isfile(version_list):
+            target = _get_scene_version_list_path(chapter_dir, scene_num)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with _history_lock:
+                os.replace(version_list, target)
+        if str(scene_num) in stored_settings:
+            save_scene_settings(chapter_dir, scene_num, stored_settings[str(scene_num)])
+    shutil.rmtree(branch_dir, ignore_errors=True)
+
+def _switch_active_branch(chapter_dir, data, target_name):
+    """활성 브랜치 장면을 보관하고 대상 브랜치 장면을 챕터 폴더로 가져옴."""
+    shared_upto = data["shared_upto"]
+    active_scenes = [n for n in _list_scene_numbers_in(chapter_dir) if n > shared_upto]
+    _transfer_branch_scenes(chapter_dir, _get_branch_dir(chapter_dir, data["active"]), active_scenes, move=True)
+    _restore_branch_scenes(chapter_dir, _get_branch_dir(chapter_dir, target_name))
+    data["active"] = target_name
+    _notify_content_change(chapter_dir)
+
+def create_chapter_branch(chapter_dir, branch_name_input, base_scene):
+    """장면 base_scene 이후를 새 브랜치로 분기하고 활성화 (1..base_scene은 공유).
+    성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    if is_pack_path(chapter_dir) or not os.path.isdir(chapter_dir):
+        return False, "오류: 브랜치를 만들 수 없는 챕터입니다. (소설 팩은 읽기 전용)"
+    branch_name = sanitize_filename(branch_name_input)
+    if not branch_name:
+        return False, f"오류: 유효한 브랜치 이름이 아닙니다: '{branch_name_input}'"
+    if not isinstance(base_scene, int) or base_scene < 0:
+        return False, f"오류: 유효하지 않은 분기 장면 번호: {base_scene}"
+
+    flush_pending_writes()
+    with _branch_lock:
+        try:
+            data = load_chapter_branches(chapter_dir) or {
+                "active": constants.DEFAULT_BRANCH_NAME, "shared_upto": base_scene,
+                "branches": {constants.DEFAULT_BRANCH_NAME: {"base_scene": base_scene, "created_at": time.time()}}}
+            if branch_name in data["branches"]:
+                return False, f"오류: 같은 이름의 브랜치 '{branch_name}'이(가) 이미 있습니다."
+
+            shared_upto = data["shared_upto"]
+            existing_scenes = _list_scene_numbers_in(chapter_dir)
+            if base_scene < shared_upto:
+                # 공유 구간이 줄어듦: base_scene+1..shared_upto 장면을 비활성 브랜치들도 각자 소유하도록 공유 복제
+                newly_owned = [n for n in existing_scenes if base_scene < n <= shared_upto]
+                for name in data["branches"]:
+                    if name != data["active"]:
+                        _transfer_branch_scenes(chapter_dir, _get_branch_dir(chapter_dir, name), newly_owned, move=False)
+                data["shared_upto"] = shared_upto = base_scene
+            new_branch_dir = _get_branch_dir(chapter_dir, branch_name)
+            # 새 브랜치는 공유 구간 이후 ~ 분기 지점까지의 장면을 활성 브랜치와 공유 복제로 시작
+            _transfer_branch_scenes(chapter_dir, new_branch_dir, [n for n in existing_scenes if shared_upto < n <= base_scene], move=False)
+            data["branches"][branch_name] = {"base_scene": base_scene, "created_at": time.time()}
+            _switch_active_branch(chapter_dir, data, branch_name)
+            _save_chapter_branches(chapter_dir, data)
+        except Exception as e:
+            msg = f"오류: 브랜치 생성 중 오류 발생:\n{e}"
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg
+    msg = f"브랜치 '{branch_name}' 생성 및 전환 완료 ({base_scene}장면까지 공유)."
+    print(f"✅ {msg}")
+    return True, msg
+
+def switch_chapter_branch(chapter_dir, branch_name):
+    """활성 브랜치 전환. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    flush_pending_writes()
+    with _branch_lock:
+        data = load_chapter_branches(chapter_dir)
+        if not data or branch_name not in data["branches"]:
+            return False, f"오류: 브랜치 '{branch_name}'을(를) 찾을 수 없습니다."
+        if data["active"] == branch_name:
+            return True, f"이미 '{branch_name}' 브랜치입니다."
+        try:
+            _switch_active_branch(chapter_dir, data, branch_name)
+            _save_chapter_branches(chapter_dir, data)
+        except Exception as e:
+            msg = f"오류: 브랜치 전환 중 오류 발생:\n{e}"
+            print(f"❌ {msg}")
+            traceback.print_exc()
+            return False, msg
+    msg = f"'{os.path.basename(chapter_dir)}' 브랜치를 '{branch_name}'(으)로 전환했습니다."
+    print(f"✅ {msg}")
+    return True, msg
+
+def _restore_trashed_branch_entry(chapter_dir, branch_name, branch_info):
+    """휴지통에서 되돌린 브랜치 폴더를 챕터 브랜치 목록에 다시 등록."""
+    with _branch_lock:
+        data = load_chapter_branches(chapter_dir)
+        if not data:
+            print(f"WARN: 챕터 브랜치 목록이 없어 복원한 브랜치를 등록하지 못함: {chapter_dir} / {branch_name}")
+            return
+        data["branches"].setdefault(branch_name, {"base_scene": data["shared_upto"], "created_at": time.time(), **branch_info})
+        _save_chapter_branches(chapter_dir, data)
+
+def delete_chapter_branch(chapter_dir, branch_name):
+    """비활성 브랜치 삭제. 성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환."""
+    with _branch_lock:
+        data = load_chapter_branches(chapter_dir)
+        if not data or branch_name not in data["branches"]:
+            return False, f"오류: 브랜치 '{branch_name}'을(를) 찾을 수 없습니다."
+        if data["active"] == branch_name:
+            return False, "현재 활성 브랜치는 삭제할 수 없습니다. 다른 브랜치로 전환한 뒤 삭제해주세요."
+        try:
+            # 브랜치 장면/설정/버전 목록을 통째로 휴지통으로 (버전 기록 내용은 휴지통을 비울 때까지 유지)
+            branch_dir = _get_branch_dir(chapter_dir, branch_name)
+            if os.path.isdir(branch_dir):
+                _move_to_trash(branch_dir, "branch", os.path.dirname(os.path.dirname(chapter_dir)),
+                               info_extra={"branch_info": data["branches"][branch_name]})
+            del data["branches"][branch_name]
+            _save_chapter_branches(chapter_dir, data)
+        except Exception as e:
+            msg = f"오류: 브랜치 삭제 중 오류 발생:\n{e}"
+            print(f"❌ {msg}")
+            return False, msg
+    msg = f"브랜치 '{branch_name}'을(를) 휴지통으로 이동했습니다."
+    print(f"✅ {msg}")
+    return True, msg
+
 # --- END OF FILE file_handler.py ---
\ No newline at end of file
@@ -0,0 +1,237 @@
+# generation_queue.py
+"""
+장면 생성 작업 대기열 (저장 폴더의 JSON 파일에 보관).
+- 작업마다 입력(소설/챕터/장면 번호/플롯/모델 설정), 상태, 시도 횟수, 마지막 오류를 기록
+- 상태: queued(대기) -> running(실행 중) -> done(완료) / failed(실패), 그 밖에 paused(일시 정지), cancelled(취소)
+- 같은 챕터의 작업은 대기열 순서대로 하나씩 실행 (앞 작업이 끝나야 다음 장면의 이전 내용이 갖춰짐)
+- 비정상 종료로 running 상태가 남은 작업은 다음 실행 때 queued로 되돌려 이어서 진행
+- 챕터 자동 집필 실행 기록(runs): 실행에 속한 작업, 체크포인트 간격, 단계별 소요 시간(계획/생성/저장/요약)
+- 메인 스레드 전용: 변경할 때마다 바로 파일에 기록
+"""
+import time
+import uuid
+
+import constants
+import file_handler
+
+KIND_NEW_SCENE = "new_scene"
+KIND_REGENERATE = "regenerate"
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+STATE_LABELS = {
+    STATE_QUEUED: "대기", STATE_RUNNING: "실행 중", STATE_PAUSED: "일시 정지",
+    STATE_DONE: "완료", STATE_FAILED: "실패", STATE_CANCELLED: "취소",
+}
+FINISHED_STATES = (STATE_DONE, STATE_CANCELLED)
+
+
+def describe_job(job):
+    """작업 표시 이름 ('소설/Chapter_012/004 새 장면')"""
+    kind_label = "새 장면" if job.get("kind") == KIND_NEW_SCENE else "재생성"
+    return f"{job.get('novel_name', '?')}/{job.get('chapter_folder', '?')}/{job.get('scene_number', 0):03d} {kind_label}"
+
+
+class GenerationQueue:
+    """디스크에 보관되는 장면 생성 작업 대기열"""
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        data = file_handler.load_generation_queue(base_dir)
+        self.paused = bool(data.get("paused", False))
+        self.jobs = data["jobs"]
+        self.runs = [run for run in data.get("runs", []) if isinstance(run, dict) and run.get("id")]
+        if data.get("corrupt"):
+            # 손상된 파일은 저장 시 .corrupt로 옮겨지므로, 복원한 내용으로 바로 다시 기록
+            print(f"WARN: 생성 대기열 파일이 손상되어 백업 내용(작업 {len(self.jobs)}개)으로 복원합니다.")
+            self.save()
+        # 지난 실행 중 끝나지 않은 작업은 다시 대기 상태로 (시도 횟수는 유지)
+        self.recovered_count = 0
+        for job in self.jobs:
+            if job.get("state") == STATE_RUNNING:
+                job["state"] = STATE_QUEUED
+                self.recovered_count += 1
+        if self.recovered_count:
+            print(f"ℹ️ 생성 대기열: 중단된 작업 {self.recovered_count}개를 다시 대기 상태로 전환.")
+            self.save()
+
+    def save(self):
+        return file_handler.save_generation_queue(self.base_dir, {"paused": self.paused, "jobs": self.jobs, "runs": self.runs})
+
+    def get(self, job_id):
+        return next((job for job in self.jobs if job["id"] == job_id), None)
+
+    def add_jobs(self, job_inputs):
+        """작업 입력 목록을 대기열 끝에 추가. 추가된 작업 목록 반환.
+        입력: kind, novel_name, chapter_folder, scene_number, api_type, scene_settings(플롯 포함)"""
+        now = time.time()
+        added = []
+        for inputs in job_inputs:
+            job = dict(inputs)
+            job.update({"id": uuid.uuid4().hex[:12], "state": STATE_QUEUED, "attempts": 0,
+                        "last_error": "", "not_before": 0, "created_at": now, "updated_at": now})
+            self.jobs.append(job)
+            added.append(job)
+        self.save()
+        return added
+
+    def active_jobs(self):
+        """완료/취소되지 않은 작업 목록 (대기열 순서)"""
+        return [job for job in self.jobs if job["state"] not in FINISHED_STATES]
+
+    def count_waiting(self):
+        return sum(1 for job in self.jobs if job["state"] == STATE_QUEUED)
+
+    def next_new_scene_number(self, novel_name, chapter_folder):
+        """챕터에 대기 중인 새 장면 작업의 마지막 번호 + 1 (없으면 0)"""
+        numbers = [job["scene_number"] for job in self.active_jobs()
+                   if job["kind"] == KIND_NEW_SCENE and job["novel_name"] == novel_name and job["chapter_folder"] == chapter_folder]
+        return max(numbers) + 1 if numbers else 0
+
+    def renumber_new_scenes(self, novel_name, chapter_folder, first_number):
+        """챕터에 남은 새 장면 작업의 장면 번호를 first_number부터 차례로 다시 배정
+        (대기하는 동안 '새 장면' 버튼 등으로 같은 번호의 장면이 먼저 만들어진 경우)"""
+        number = first_number
+        for job in self.active_jobs():
+            if job["kind"] == KIND_NEW_SCENE and job["novel_name"] == novel_name and job["chapter_folder"] == chapter_folder:
+                job["scene_number"] = number
+                number += 1
+        self.save()
+
+    def get_runnable(self, is_chapter_busy):
+        """지금 시작할 수 있는 작업 목록 (대기열 순서, 챕터당 하나).
+        같은 챕터에서 앞선 작업이 끝나지 않았으면(실패/일시 정지 포함) 뒤 작업은 기다림."""
+        if self.paused: return []
+        now = time.time()
+        seen_chapters = set()
+        runnable = []
+        for job in self.jobs:
+            if job["state"] in FINISHED_STATES: continue
+            chapter_key = (job["novel_name"], job["chapter_folder"])
+            if chapter_key in seen_chapters: continue
+            seen_chapters.add(chapter_key)
+            if job["state"] == STATE_QUEUED and job.get("not_before", 0) <= now and not is_chapter_busy(job):
+                runnable.append(job)
+        return runnable
+
+    def _update(self, job, **changes):
+        job.update(changes)
+        job["updated_at"] = time.time()
+        self.save()
+
+    def mark_started(self, job_id):
+        job = self.get(job_id)
+        if job: self._update(job, state=STATE_RUNNING, attempts=job.get("attempts", 0) + 1)
+
+    def finish_job(self, job_id, success, error="", retry=True):
+        """실행 결과 기록. 실패 시 시도 횟수가 남았으면 잠시 뒤 재시도하도록 다시 대기 상태로."""
+        job = self.get(job_id)
+        if not job or job["state"] != STATE_RUNNING: return
+        if success:
+            self._update(job, state=STATE_DONE, last_error="")
+        elif retry and job.get("attempts", 0) < constants.GENERATION_QUEUE_MAX_ATTEMPTS:
+            delay = constants.GENERATION_QUEUE_RETRY_DELAY_S * job.get("attempts", 1)
+            self._update(job, state=STATE_QUEUED, last_error=error, not_before=time.time() + delay)
+        else:
+            self._update(job, state=STATE_FAILED, last_error=error)
+
+    def pause_job(self, job_id):
+        job = self.get(job_id)
+        if job and job["state"] in (STATE_QUEUED, STATE_RUNNING): self._update(job, state=STATE_PAUSED)
+
+    def requeue_job(self, job_id):
+        """실행 중 중단된 작업을 다시 대기 상태로 (종료 시 취소한 경우, 다음 실행 때 이어서 진행)"""
+        job = self.get(job_id)
+        if job and job["state"] == STATE_RUNNING: self._update(job, state=STATE_QUEUED)
+
+    def resume_job(self, job_id):
+        """일시 정지/실패 작업을 다시 대기 상태로 (실패 작업은 시도 횟수 초기화)"""
+        job = self.get(job_id)
+        if not job: return
+        if job["state"] == STATE_PAUSED: self._update(job, state=STATE_QUEUED, not_before=0)
+        elif job["state"] == STATE_FAILED: self._update(job, state=STATE_QUEUED, attempts=0, not_before=0)
+
+    def cancel_job(self, job_id):
+        job = self.get(job_id)
+        if job and job["state"] not in FINISHED_STATES: self._update(job, state=STATE_CANCELLED)
+
+    def move_job(self, job_id, offset):
+        """작업 순서 변경 (offset: -1 위로, 1 아래로). 변경 시 True."""
+        job = self.get(job_id)
+        if not job: return False
+        index = self.jobs.index(job)
+        new_index = index + offset
+        if new_index < 0 or new_index >= len(self.jobs): return False
+        self.jobs[index], self.jobs[new_index] = self.jobs[new_index], self.jobs[index]
+        self.save()
+        return True
+
+    def clear_finished(self):
+        """완료/취소된 작업을 목록에서 제거 (보고 전인 자동 집필 실행의 작업은 유지). 제거한 개수 반환."""
+        before = len(self.jobs)
+        open_run_ids = {run["id"] for run in self.runs if not run.get("reported")}
+        self.jobs = [job for job in self.jobs if job["state"] not in FINISHED_STATES or job.get("run_id") in open_run_ids]
+        self.runs = [run for run in self.runs if run["id"] in open_run_ids]
+        if len(self.jobs) != before: self.save()
+        return before - len(self.jobs)
+
+    def set_job_plot(self, job_id, plot):
+        """시작 전 작업의 장면 플롯 수정. 수정 시 True."""
+        job = self.get(job_id)
+        if not job or job["state"] in (STATE_RUNNING,) + FINISHED_STATES: return False
+        scene_settings = dict(job.get("scene_settings") or {})
+        scene_settings[constants.SCENE_PLOT_KEY] = plot
+        self._update(job, scene_settings=scene_settings)
+        return True
+
+    # --- 챕터 자동 집필 실행 기록 ---
+    def add_run(self, novel_name, chapter_folder, job_inputs, checkpoint_every, plan_seconds):
+        """자동 집필 실행 기록과 그 장면 작업들을 추가. (실행 기록, 작업 목록) 반환."""
+        run = {"id": uuid.uuid4().hex[:12], "novel_name": novel_name, "chapter_folder": chapter_folder,
+               "checkpoint_every": checkpoint_every, "created_at": time.time(), "reported": False,
+               "timings": {"plan": [plan_seconds], "generate": [], "save": [], "summary": []}}
+        self.runs.append(run)
+        jobs = self.add_jobs([dict(inputs, run_id=run["id"]) for inputs in job_inputs])
+        return run, jobs
+
+    def get_run(self, run_id):
+        return next((run for run in self.runs if run["id"] == run_id), None)
+
+    def get_run_jobs(self, run_id):
+        return [job for job in self.jobs if job.get("run_id") == run_id]
+
+    def get_open_runs(self, novel_name):
+        """소설의 보고 전 자동 집필 실행 목록"""
+        return [run for run in self.runs if run["novel_name"] == novel_name and not run.get("reported")]
+
+    def record_run_timing(self, run_id, stage, seconds):
+        run = self.get_run(run_id)
+        if not run: return
+        run["timings"].setdefault(stage, []).append(round(seconds, 3))
+        self.save()
+
+    def is_run_finished(self, run_id):
+        """실행의 모든 작업이 끝났는지 (완료/실패/취소)"""
+        return all(job["state"] in FINISHED_STATES + (STATE_FAILED,) for job in self.get_run_jobs(run_id))
+
+    def pause_next_in_run(self, run_id):
+        """체크포인트: 실행의 다음 대기 작업을 일시 정지. 멈춘 작업 반환 (없으면 None)."""
+        job = next((job for job in self.get_run_jobs(run_id) if job["state"] == STATE_QUEUED), None)
+        if job: self._update(job, state=STATE_PAUSED)
+        return job
+
+    def mark_run_reported(self, run_id):
+        run = self.get_run(run_id)
+        if run:
+            run["reported"] = True
+            run["finished_at"] = time.time()
+            self.save()
+
+    def set_paused(self, paused):
+        self.paused = bool(paused)
+        self.save()
@@ -1,8 +1,9 @@
 # gui_dialogs.py
 import tkinter as tk
-from tkinter import ttk, colorchooser, simpledialog, messagebox
+from tkinter import ttk, colorchooser, simpledialog, messagebox, filedialog
 import constants
 import os # For getenv
+import time
 
 # --- Helper Functions ---
 def _grab_and_wait(dialog_window):
@@ -337,11 +338,13 @@ def show_new_chapter_folder_dialog(parent_root, current_novel_name):
     return result if "title" in result and result["title"] is not None else None
 
 
-def show_scene_plot_dialog(parent_root, current_plot="", title="🎬 장면 플롯 입력"):
-    """장면 플롯 입력 대화상자. 확인 시 플롯 문자열, 취소 시 None 반환."""
+def show_scene_plot_dialog(parent_root, current_plot="", title="🎬 장면 플롯 입력", candidate_choices=None, default_choice=None):
+    """장면 플롯 입력 대화상자. 확인 시 플롯 문자열, 취소 시 None 반환.
+    candidate_choices([(API 타입, 모델)]) 지정 시 후보 수/모델 선택 영역을 추가하고
+    {'plot', 'candidate_count', 'candidate_models'} 반환 (모델 미선택 시 default_choice 사용)."""
     dialog = tk.Toplevel(parent_root)
     dialog.title(title)
-    dialog.geometry("550x350")
+    dialog.geometry("550x350" if candidate_choices is None else "550x500")
     dialog.transient(parent_root)
 
     result = {"plot": None} # Use dict to handle confirmation vs cancellation
@@ -369,11 +372,32 @@ def show_scene_plot_dialog(parent_root, current_plot="", title="🎬 장면 플
         plot_text.mark_set(tk.INSERT, "1.0") # Move cursor to beginning
         plot_text.see(tk.INSERT) # Ensure start is visible
 
-    btn_frame = ttk.Frame(frame); btn_frame.grid(row=2, column=0, pady=(10, 0), sticky='e')
+    if candidate_choices is not None:
+        candidate_frame = ttk.LabelFrame(frame, text="🎲 후보 여러 개 생성 (동시에 생성 후 비교해 하나 선택)", padding=(10, 5))
+        candidate_frame.grid(row=2, column=0, sticky='ew')
+        candidate_frame.columnconfigure(1, weight=1)
+        count_var = tk.StringVar(value="1")
+        ttk.Label(candidate_frame, text="후보 수:").grid(row=0, column=0, sticky='w')
+        ttk.Spinbox(candidate_frame, from_=1, to=constants.SCENE_CANDIDATE_MAX_COUNT, textvariable=count_var, width=4).grid(row=0, column=1, sticky='w', padx=(5, 0))
+        ttk.Label(candidate_frame, text="사용할 모델 (여러 개 선택 시 후보마다 번갈아 배정):").grid(row=1, column=0, columnspan=2, sticky='w', pady=(5, 2))
+        model_listbox = tk.Listbox(candidate_frame, selectmode=tk.MULTIPLE, height=min(4, max(1, len(candidate_choices))), exportselection=False)
+        model_listbox.grid(row=2, column=0, columnspan=2, sticky='ew')
+        for index, (api_type, model_name) in enumerate(candidate_choices):
+            model_listbox.insert(tk.END, f"{api_type.capitalize()} / {model_name}")
+            if (api_type, model_name) == default_choice: model_listbox.selection_set(index)
+
+    btn_frame = ttk.Frame(frame); btn_frame.grid(row=3, column=0, pady=(10, 0), sticky='e')
 
     def on_confirm():
         result["plot"] = plot_text.get("1.0", "end-1c").strip()
         # Plot can be empty, validation happens elsewhere if needed
+        if candidate_choices is not None:
+            try: candidate_count = int(count_var.get())
+            except ValueError: candidate_count = 0
+            if not 1 <= candidate_count <= constants.SCENE_CANDIDATE_MAX_COUNT:
+                messagebox.showwarning("입력 오류", f"후보 수는 1 ~ {constants.SCENE_CANDIDATE_MAX_COUNT} 사이여야 합니다.", parent=dialog); return
+            candidate_models = [candidate_choices[index] for index in model_listbox.curselection()] or [default_choice]
+            result["plot"] = {"plot": result["plot"], "candidate_count": candidate_count, "candidate_models": candidate_models}
         dialog.destroy()
 
     def on_cancel():
@@ -391,12 +415,663 @@ def show_scene_plot_dialog(parent_root, current_plot="", title="🎬 장면 플
     return result["plot"]
 
 
+def show_scene_candidates_dialog(parent_root, title, poll_callback):
+    """장면 후보 비교 대화상자: 후보를 나란히 표시하고 생성되는 대로 갱신. 선택한 후보 번호, 취소 시 None 반환.
+    poll_callback() -> 후보 행 목록 (작업이 사라졌으면 None). 행: {"label", "state", "text", "running", "selectable"}"""
+    rows = poll_callback() or []
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(title)
+    dialog.geometry(f"{min(1400, 360 * max(1, len(rows)))}x560")
+    dialog.transient(parent_root)
+
+    result = {"index": None}
+    refresh = {"after_id": None}
+
+    frame = ttk.Frame(dialog, padding=(10, 10))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.columnconfigure(0, weight=1); frame.rowconfigure(0, weight=1)
+
+    paned = ttk.PanedWindow(frame, orient=tk.HORIZONTAL)
+    paned.grid(row=0, column=0, sticky='nsew')
+    columns = []
+    for index, row in enumerate(rows):
+        column = ttk.Frame(paned, padding=(3, 0))
+        column.columnconfigure(0, weight=1); column.rowconfigure(2, weight=1)
+        ttk.Label(column, text=row["label"]).grid(row=0, column=0, sticky='w')
+        state_label = ttk.Label(column, text=row["state"])
+        state_label.grid(row=1, column=0, sticky='w', pady=(0, 3))
+        text_frame, text_widget = _create_text_area(column, height=20, state=tk.DISABLED)
+        text_frame.grid(row=2, column=0, sticky='nsew')
+        choose_btn = ttk.Button(column, text="✅ 이 후보 선택", state=tk.DISABLED, command=lambda i=index: on_choose(i))
+        choose_btn.grid(row=3, column=0, pady=(5, 0), sticky='e')
+        paned.add(column, weight=1)
+        columns.append({"state_label": state_label, "text": text_widget, "button": choose_btn, "shown": ""})
+
+    bottom_frame = ttk.Frame(frame); bottom_frame.grid(row=1, column=0, pady=(10, 0), sticky='ew')
+    ttk.Label(bottom_frame, text="선택하지 않은 후보는 장면 버전 기록에 보관됩니다.").pack(side=tk.LEFT)
+    ttk.Button(bottom_frame, text="⛔ 모두 취소", command=lambda: on_cancel()).pack(side=tk.RIGHT)
+
+    def show_rows(current_rows):
+        for column, row in zip(columns, current_rows):
+            column["state_label"].config(text=row["state"])
+            column["button"].config(state=tk.NORMAL if row["selectable"] else tk.DISABLED)
+            text = row["text"] or ""
+            if text == column["shown"]: continue
+            text_widget = column["text"]
+            text_widget.config(state=tk.NORMAL)
+            if text.startswith(column["shown"]): # 스트리밍: 새로 받은 부분만 이어 붙임
+                text_widget.insert(tk.END, text[len(column["shown"]):])
+            else:
+                text_widget.delete("1.0", tk.END); text_widget.insert("1.0", text)
+            text_widget.config(state=tk.DISABLED)
+            column["shown"] = text
+
+    def periodic_refresh():
+        refresh["after_id"] = None
+        if not dialog.winfo_exists(): return
+        current_rows = poll_callback()
+        if current_rows is None: # 작업이 다른 곳에서 취소됨
+            on_cancel(); return
+        show_rows(current_rows)
+        refresh["after_id"] = dialog.after(constants.SCENE_CANDIDATE_POLL_MS, periodic_refresh)
+
+    def close():
+        if refresh["after_id"]:
+            try: dialog.after_cancel(refresh["after_id"])
+            except tk.TclError: pass
+            refresh["after_id"] = None
+        dialog.destroy()
+
+    def on_choose(index):
+        result["index"] = index
+        close()
+
+    def on_cancel():
+        if dialog.winfo_exists() and any(row["running"] for row in (poll_callback() or [])):
+            if not messagebox.askyesno("취소 확인", "모든 후보 생성을 취소하시겠습니까?", parent=dialog): return
+        result["index"] = None
+        close()
+
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    dialog.bind("<Escape>", lambda event: on_cancel())
+    periodic_refresh()
+    _grab_and_wait(dialog)
+    return result["index"]
+
+
 def show_rename_dialog(parent_root, title, prompt, initial_value):
     """간단한 이름 변경 simpledialog 래퍼"""
     # simpledialog handles modality and return value automatically
     return simpledialog.askstring(title, prompt, initialvalue=initial_value, parent=parent_root)
 
 
+def show_save_file_dialog(parent_root, title, default_ext, filetypes, initial_file="", initial_dir=None):
+    """저장 파일 경로 선택 filedialog 래퍼. 취소 시 빈 문자열 반환."""
+    return filedialog.asksaveasfilename(title=title, defaultextension=default_ext, filetypes=filetypes,
+                                        initialfile=initial_file, initialdir=initial_dir, parent=parent_root)
+
+
+def show_open_file_dialog(parent_root, title, filetypes):
+    """열 파일 경로 선택 filedialog 래퍼. 취소 시 빈 문자열 반환."""
+    return filedialog.askopenfilename(title=title, filetypes=filetypes, parent=parent_root)
+
+
+def show_scene_history_dialog(parent_root, scene_label, versions, diff_callback):
+    """장면 버전 기록 대화상자. 복원 선택 시 버전 index, 닫기 시 None 반환.
+    diff_callback(index_a, index_b)는 diff 텍스트를 반환 (index_b=None이면 현재 내용과 비교)."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(f"🕘 버전 기록 - {scene_label}")
+    dialog.geometry("760x520")
+    dialog.transient(parent_root)
+
+    result = {"index": None}
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.rowconfigure(1, weight=1); frame.columnconfigure(0, weight=1)
+
+    columns = ("version", "time", "model", "length", "tokens")
+    version_tree = ttk.Treeview(frame, columns=columns, show="headings", height=8, selectmode="browse")
+    for col, heading, width in (("version", "버전", 60), ("time", "저장 시각", 150), ("model", "모델", 200),
+                                ("length", "글자 수", 80), ("tokens", "토큰 (입력/출력)", 140)):
+        version_tree.heading(col, text=heading)
+        version_tree.column(col, width=width, anchor='w')
+    version_tree.grid(row=0, column=0, sticky='ew')
+
+    for version in reversed(versions): # 최신 버전이 위로
+        token_info = version.get("token_info", {})
+        version_tree.insert("", "end", iid=str(version["index"]), values=(
+            f"v{version['index'] + 1}",
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(version.get("timestamp", 0))),
+            version.get("settings", {}).get("selected_model", ""),
+            f"{version.get('length', 0):,}",
+            f"{token_info.get(constants.INPUT_TOKEN_KEY, 0):,} / {token_info.get(constants.OUTPUT_TOKEN_KEY, 0):,}"))
+
+    diff_frame, diff_text = _create_text_area(frame, height=14, state=tk.DISABLED)
+    diff_frame.grid(row=1, column=0, pady=(10, 0), sticky='nsew')
+    diff_text.config(wrap=tk.NONE, font=("Consolas", 9))
+    diff_text.tag_configure("added", foreground="#1a7f37")
+    diff_text.tag_configure("removed", foreground="#cf222e")
+
+    def get_selected_index():
+        selected = version_tree.focus()
+        return int(selected) if selected else None
+
+    def show_diff(compare_with_previous):
+        index = get_selected_index()
+        if index is None:
+            messagebox.showinfo("선택 필요", "비교할 버전을 선택해주세요.", parent=dialog); return
+        if compare_with_previous:
+            if index == 0:
+                messagebox.showinfo("비교 불가", "첫 번째 버전입니다.", parent=dialog); return
+            diff = diff_callback(index - 1, index)
+        else:
+            diff = diff_callback(index, None)
+        diff_text.config(state=tk.NORMAL)
+        diff_text.delete("1.0", tk.END)
+        if diff is None:
+            diff_text.insert("1.0", "버전 내용을 읽을 수 없습니다.")
+        elif not diff:
+            diff_text.insert("1.0", "차이 없음.")
+        else:
+            for line in diff.splitlines():
+                tag = "added" if line.startswith("+") else "removed" if line.startswith("-") else ()
+                diff_text.insert(tk.END, line + "\n", tag)
+        diff_text.config(state=tk.DISABLED)
+
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=2, column=0, pady=(15, 0), sticky='ew')
+    ttk.Button(btn_frame, text="현재와 비교", command=lambda: show_diff(False)).pack(side=tk.LEFT)
+    ttk.Button(btn_frame, text="이전 버전과 비교", command=lambda: show_diff(True)).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="닫기", command=lambda: on_cancel()).pack(side=tk.RIGHT)
+    ttk.Button(btn_frame, text="이 버전으로 복원", command=lambda: on_restore()).pack(side=tk.RIGHT, padx=(0, 5))
+
+    def on_restore():
+        index = get_selected_index()
+        if index is None:
+            messagebox.showinfo("선택 필요", "복원할 버전을 선택해주세요.", parent=dialog); return
+        if messagebox.askyesno("버전 복원", f"v{index + 1} 버전으로 장면 내용과 설정을 복원하시겠습니까?\n(현재 내용도 기록에 남아 있습니다.)", parent=dialog):
+            result["index"] = index
+            dialog.destroy()
+
+    def on_cancel():
+        result["index"] = None
+        dialog.destroy()
+
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    if versions:
+        latest_id = str(versions[-1]["index"])
+        version_tree.selection_set(latest_id); version_tree.focus(latest_id)
+    version_tree.focus_set()
+    _grab_and_wait(dialog)
+    return result["index"]
+
+
+def show_trash_dialog(parent_root, items, retention_days):
+    """휴지통 대화상자. ("restore"|"purge", 항목 ID) 또는 ("empty", None), 닫기 시 None 반환."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title("🗑️ 휴지통")
+    dialog.geometry("640x380")
+    dialog.transient(parent_root)
+
+    result = {"action": None}
+    kind_labels = {"novel": "소설", "pack": "소설 팩", "chapter": "챕터", "scene": "장면", "branch": "브랜치"}
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.rowconfigure(1, weight=1); frame.columnconfigure(0, weight=1)
+
+    ttk.Label(frame, text=f"삭제한 항목은 {retention_days}일 동안 보관된 후 자동으로 영구 삭제됩니다.").grid(row=0, column=0, sticky='w', pady=(0, 8))
+
+    columns = ("kind", "path", "deleted")
+    item_tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="browse")
+    for col, heading, width in (("kind", "종류", 70), ("path", "원래 위치", 360), ("deleted", "삭제 시각", 150)):
+        item_tree.heading(col, text=heading)
+        item_tree.column(col, width=width, anchor='w')
+    item_tree.grid(row=1, column=0, sticky='nsew')
+    for item in items:
+        item_tree.insert("", "end", iid=item["id"], values=(
+            kind_labels.get(item.get("kind"), item.get("kind", "")), item.get("original_path", item.get("name", "")),
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(item.get("deleted_at", 0)))))
+
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=2, column=0, pady=(15, 0), sticky='ew')
+    ttk.Button(btn_frame, text="♻️ 복원", command=lambda: on_item_action("restore")).pack(side=tk.LEFT)
+    ttk.Button(btn_frame, text="영구 삭제", command=lambda: on_item_action("purge")).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="닫기", command=lambda: on_cancel()).pack(side=tk.RIGHT)
+    empty_btn = ttk.Button(btn_frame, text="휴지통 비우기", command=lambda: on_empty())
+    empty_btn.pack(side=tk.RIGHT, padx=(0, 5))
+    if not items: empty_btn.config(state=tk.DISABLED)
+
+    def on_item_action(action):
+        item_id = item_tree.focus()
+        if not item_id:
+            messagebox.showinfo("선택 필요", "항목을 선택해주세요.", parent=dialog); return
+        if action == "purge" and not messagebox.askyesno("영구 삭제", "선택한 항목을 영구 삭제하시겠습니까?\n⚠️ 이 작업은 복구할 수 없습니다!", icon='warning', parent=dialog):
+            return
+        result["action"] = (action, item_id)
+        dialog.destroy()
+
+    def on_empty():
+        if messagebox.askyesno("휴지통 비우기", f"휴지통의 항목 {len(items)}개를 모두 영구 삭제하시겠습니까?\n⚠️ 이 작업은 복구할 수 없습니다!", icon='warning', parent=dialog):
+            result["action"] = ("empty", None)
+            dialog.destroy()
+
+    def on_cancel():
+        result["action"] = None
+        dialog.destroy()
+
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    item_tree.focus_set()
+    _grab_and_wait(dialog)
+    return result["action"]
+
+
+def show_branch_dialog(parent_root, chapter_label, active_branch, branches, trash_notice=""):
+    """챕터 브랜치 대화상자. ("switch"|"delete", 브랜치 이름), 닫기 시 None 반환."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(f"🌿 브랜치 - {chapter_label}")
+    dialog.geometry("520x320")
+    dialog.transient(parent_root)
+
+    result = {"action": None}
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.rowconfigure(1, weight=1); frame.columnconfigure(0, weight=1)
+
+    ttk.Label(frame, text=f"현재 브랜치: {active_branch}  (분기 지점까지의 장면은 모든 브랜치가 공유)").grid(row=0, column=0, sticky='w', pady=(0, 8))
+
+    columns = ("name", "base", "scenes", "created")
+    branch_tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="browse")
+    for col, heading, width in (("name", "브랜치", 150), ("base", "분기 지점", 80), ("scenes", "장면 수", 70), ("created", "생성 시각", 150)):
+        branch_tree.heading(col, text=heading)
+        branch_tree.column(col, width=width, anchor='w')
+    branch_tree.grid(row=1, column=0, sticky='nsew')
+    for branch in branches:
+        name = branch["name"]
+        branch_tree.insert("", "end", iid=name, values=(
+            f"{name} ✔" if name == active_branch else name, f"{branch.get('base_scene', 0)}장면 이후", branch.get("scene_count", 0),
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(branch.get("created_at", 0)))))
+
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=2, column=0, pady=(15, 0), sticky='ew')
+    ttk.Button(btn_frame, text="🔀 전환", command=lambda: on_action("switch")).pack(side=tk.LEFT)
+    ttk.Button(btn_frame, text="🗑️ 삭제", command=lambda: on_action("delete")).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="닫기", command=lambda: on_cancel()).pack(side=tk.RIGHT)
+
+    def on_action(action):
+        name = branch_tree.focus()
+        if not name:
+            messagebox.showinfo("선택 필요", "브랜치를 선택해주세요.", parent=dialog); return
+        if action == "delete" and not messagebox.askyesno("브랜치 삭제", f"브랜치 '{name}'의 고유 장면을 삭제하시겠습니까?\n\n{trash_notice}", icon='warning', parent=dialog):
+            return
+        result["action"] = (action, name)
+        dialog.destroy()
+
+    def on_cancel():
+        result["action"] = None
+        dialog.destroy()
+
+    branch_tree.bind("<Double-1>", lambda e: on_action("switch"))
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    branch_tree.focus_set()
+    _grab_and_wait(dialog)
+    return result["action"]
+
+
+def show_find_replace_dialog(parent_root, novel_name, preview_callback):
+    """소설 전체 찾아 바꾸기 대화상자. 미리보기 후 (찾을 내용, 바꿀 내용, 대상 경로 목록), 취소 시 None 반환.
+    preview_callback(찾을 내용, 완료 콜백): 백그라운드에서 찾고 메인 스레드에서 완료 콜백([{"path", "label", "count"}]) 호출"""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(f"🔁 찾아 바꾸기 - {novel_name}")
+    dialog.geometry("560x440")
+    dialog.transient(parent_root)
+
+    result = {"action": None}
+    preview = {"find": None, "rows": []}
+    find_var = tk.StringVar()
+    replace_var = tk.StringVar()
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.rowconfigure(3, weight=1); frame.columnconfigure(1, weight=1)
+
+    ttk.Label(frame, text="찾을 내용:").grid(row=0, column=0, sticky='w', pady=(0, 5))
+    find_entry = ttk.Entry(frame, textvariable=find_var)
+    find_entry.grid(row=0, column=1, sticky='ew', pady=(0, 5))
+    ttk.Label(frame, text="바꿀 내용:").grid(row=1, column=0, sticky='w', pady=(0, 5))
+    ttk.Entry(frame, textvariable=replace_var).grid(row=1, column=1, sticky='ew', pady=(0, 5))
+    summary_label = ttk.Label(frame, text="'미리보기'로 바뀔 곳을 먼저 확인하세요. (대소문자 구분, 장면 내용 및 설정의 글 항목 대상)")
+    summary_label.grid(row=2, column=0, columnspan=2, sticky='w', pady=(5, 5))
+
+    columns = ("item", "count")
+    preview_tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="none")
+    preview_tree.heading("item", text="항목"); preview_tree.column("item", width=400, anchor='w')
+    preview_tree.heading("count", text="바뀔 곳"); preview_tree.column("count", width=80, anchor='e')
+    preview_tree.grid(row=3, column=0, columnspan=2, sticky='nsew')
+
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=4, column=0, columnspan=2, pady=(15, 0), sticky='ew')
+    preview_btn = ttk.Button(btn_frame, text="🔍 미리보기", command=lambda: on_preview())
+    preview_btn.pack(side=tk.LEFT)
+    ttk.Button(btn_frame, text="취소", command=lambda: on_cancel()).pack(side=tk.RIGHT)
+    replace_btn = ttk.Button(btn_frame, text="🔁 모두 바꾸기", command=lambda: on_replace(), state=tk.DISABLED)
+    replace_btn.pack(side=tk.RIGHT, padx=(0, 5))
+
+    def on_find_changed(*args):
+        # 찾을 내용이 바뀌면 미리보기를 다시 해야 바꾸기 가능
+        if find_var.get() != preview["find"]: replace_btn.config(state=tk.DISABLED)
+    find_var.trace_add('write', on_find_changed)
+
+    def on_preview():
+        find_text = find_var.get()
+        if not find_text:
+            messagebox.showinfo("입력 필요", "찾을 내용을 입력해주세요.", parent=dialog); return
+        dialog.config(cursor="watch")
+        preview_btn.config(state=tk.DISABLED); replace_btn.config(state=tk.DISABLED)
+        summary_label.config(text=f"'{find_text}' 찾는 중...")
+        preview_callback(find_text, lambda rows: show_preview(find_text, rows))
+
+    def show_preview(find_text, rows):
+        if not dialog.winfo_exists(): return # 결과가 오기 전에 닫힘
+        dialog.config(cursor=""); preview_btn.config(state=tk.NORMAL)
+        preview_tree.delete(*preview_tree.get_children())
+        for index, row in enumerate(rows):
+            preview_tree.insert("", "end", iid=str(index), values=(row["label"], row["count"]))
+        preview["find"], preview["rows"] = find_text, rows
+        total = sum(row["count"] for row in rows)
+        summary_label.config(text=f"'{find_text}': {len(rows)}개 항목에서 {total}곳 발견." if rows else f"'{find_text}'을(를) 찾지 못했습니다.")
+        replace_btn.config(state=tk.NORMAL if rows and find_var.get() == find_text else tk.DISABLED)
+
+    def on_replace():
+        if preview["find"] != find_var.get() or not preview["rows"]: return
+        total = sum(row["count"] for row in preview["rows"])
+        if not messagebox.askyesno("찾아 바꾸기 확인", f"'{preview['find']}'을(를) '{replace_var.get()}'(으)로 {total}곳 바꾸시겠습니까?\n(저장소 메뉴의 '마지막 찾아 바꾸기 되돌리기'로 되돌릴 수 있습니다.)", parent=dialog):
+            return
+        result["action"] = (preview["find"], replace_var.get(), [row["path"] for row in preview["rows"]])
+        dialog.destroy()
+
+    def on_cancel():
+        result["action"] = None
+        dialog.destroy()
+
+    find_entry.bind("<Return>", lambda e: on_preview())
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    find_entry.focus_set()
+    _grab_and_wait(dialog)
+    return result["action"]
+
+
+def show_queue_scenes_dialog(parent_root, chapter_label, start_scene_number, initial_plots=None, title_prefix="📋 장면 일괄 생성"):
+    """새 장면 일괄 생성 대기열 추가 대화상자. 확인 시 장면 플롯 목록, 취소 시 None 반환.
+    플롯은 '---' 줄로 구분 (start_scene_number부터 차례로 배정). initial_plots: 미리 채울 플롯 목록 (자동 집필 계획 확인용)."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(f"{title_prefix} - {chapter_label}")
+    dialog.geometry("600x440")
+    dialog.transient(parent_root)
+
+    result = {"plots": None}
+    separator = constants.GENERATION_QUEUE_PLOT_SEPARATOR
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.columnconfigure(0, weight=1); frame.rowconfigure(1, weight=1)
+
+    ttk.Label(frame, text=f"장면 플롯을 '{separator}' 줄로 구분해 입력하세요. {start_scene_number:03d} 장면부터 순서대로 생성됩니다.").grid(row=0, column=0, pady=(0, 5), sticky='w')
+    initial_text = f"\n{separator}\n".join(initial_plots) if initial_plots else ""
+    text_frame, plots_text = _create_text_area(frame, height=14, initial_text=initial_text)
+    text_frame.grid(row=1, column=0, pady=(0, 5), sticky='nsew')
+    count_label = ttk.Label(frame, text="")
+    count_label.grid(row=2, column=0, sticky='w')
+
+    def parse_plots():
+        plots, current = [], []
+        for line in plots_text.get("1.0", "end-1c").splitlines():
+            if line.strip() == separator:
+                plots.append("\n".join(current).strip()); current = []
+            else: current.append(line)
+        plots.append("\n".join(current).strip())
+        return [plot for plot in plots if plot]
+
+    def on_text_changed(event=None):
+        plots_text.edit_modified(False)
+        plot_count = len(parse_plots())
+        if plot_count: count_label.config(text=f"장면 {plot_count}개: {start_scene_number:03d} ~ {start_scene_number + plot_count - 1:03d}")
+        else: count_label.config(text="")
+    plots_text.bind("<<Modified>>", on_text_changed)
+    on_text_changed()
+
+    btn_frame = ttk.Frame(frame); btn_frame.grid(row=3, column=0, pady=(10, 0), sticky='e')
+
+    def on_confirm():
+        plots = parse_plots()
+        if not plots:
+            messagebox.showinfo("입력 필요", "장면 플롯을 하나 이상 입력해주세요.", parent=dialog); return
+        result["plots"] = plots
+        dialog.destroy()
+
+    def on_cancel():
+        result["plots"] = None
+        dialog.destroy()
+
+    ttk.Button(btn_frame, text="대기열에 추가", command=on_confirm).pack(side=tk.RIGHT, padx=(5, 0))
+    ttk.Button(btn_frame, text="취소", command=on_cancel).pack(side=tk.RIGHT)
+
+    dialog.bind("<Escape>", lambda event: on_cancel())
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    plots_text.focus_set()
+    _grab_and_wait(dialog)
+    return result["plots"]
+
+
+def show_autopilot_dialog(parent_root, chapter_label, start_scene_number):
+    """챕터 자동 집필 설정 대화상자. 확인 시 {'scene_count', 'checkpoint_every'}, 취소 시 None 반환.
+    checkpoint_every: 장면 N개마다 대기열 일시 정지 (0이면 없음)."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title(f"🤖 챕터 자동 집필 - {chapter_label}")
+    dialog.geometry("460x220")
+    dialog.transient(parent_root)
+
+    result = {"options": None}
+    max_count = constants.AUTOPILOT_MAX_SCENE_COUNT
+    count_var = tk.StringVar(value=str(constants.AUTOPILOT_DEFAULT_SCENE_COUNT))
+    checkpoint_var = tk.StringVar(value="0")
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.columnconfigure(1, weight=1)
+
+    ttk.Label(frame, text=f"챕터 아크 노트를 바탕으로 장면 플롯을 계획한 뒤 {start_scene_number:03d} 장면부터 차례로 생성합니다.",
+              wraplength=420, justify=tk.LEFT).grid(row=0, column=0, columnspan=2, sticky='w', pady=(0, 10))
+    ttk.Label(frame, text="생성할 장면 수:").grid(row=1, column=0, sticky='w', pady=(0, 5))
+    ttk.Spinbox(frame, from_=1, to=max_count, textvariable=count_var, width=6).grid(row=1, column=1, sticky='w', pady=(0, 5))
+    ttk.Label(frame, text="체크포인트 (장면 N개마다 정지, 0=없음):").grid(row=2, column=0, sticky='w', pady=(0, 5))
+    ttk.Spinbox(frame, from_=0, to=max_count, textvariable=checkpoint_var, width=6).grid(row=2, column=1, sticky='w', pady=(0, 5))
+
+    btn_frame = ttk.Frame(frame); btn_frame.grid(row=3, column=0, columnspan=2, pady=(15, 0), sticky='e')
+
+    def on_confirm():
+        try:
+            scene_count = int(count_var.get()); checkpoint_every = int(checkpoint_var.get())
+        except ValueError:
+            messagebox.showwarning("입력 오류", "숫자를 입력해주세요.", parent=dialog); return
+        if not 1 <= scene_count <= max_count or checkpoint_every < 0:
+            messagebox.showwarning("입력 오류", f"장면 수는 1 ~ {max_count}, 체크포인트는 0 이상이어야 합니다.", parent=dialog); return
+        result["options"] = {"scene_count": scene_count, "checkpoint_every": checkpoint_every}
+        dialog.destroy()
+
+    def on_cancel():
+        result["options"] = None
+        dialog.destroy()
+
+    ttk.Button(btn_frame, text="계획 생성", command=on_confirm).pack(side=tk.RIGHT, padx=(5, 0))
+    ttk.Button(btn_frame, text="취소", command=on_cancel).pack(side=tk.RIGHT)
+
+    dialog.bind("<Return>", lambda event: on_confirm())
+    dialog.bind("<Escape>", lambda event: on_cancel())
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    _grab_and_wait(dialog)
+    return result["options"]
+
+
+def show_generation_queue_dialog(parent_root, action_callback):
+    """생성 작업 대기열 관리 대화상자 (닫을 때까지 유지).
+    action_callback(동작, 작업 ID, 값=None) -> (행 목록, 대기열 일시 정지 여부).
+    동작: refresh/pause/resume/up/down/cancel/clear/toggle_queue/edit_plot(값: 새 플롯)
+    행: {"id", "label", "state", "attempts", "error", "plot", "editable"}"""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title("📋 생성 작업 대기열")
+    dialog.geometry("720x400")
+    dialog.transient(parent_root)
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.rowconfigure(1, weight=1); frame.columnconfigure(0, weight=1)
+
+    status_label = ttk.Label(frame, text="")
+    status_label.grid(row=0, column=0, sticky='w', pady=(0, 8))
+
+    columns = ("job", "state", "attempts", "error")
+    job_tree = ttk.Treeview(frame, columns=columns, show="headings", selectmode="browse")
+    for col, heading, width in (("job", "작업", 300), ("state", "상태", 80), ("attempts", "시도", 50), ("error", "마지막 오류", 250)):
+        job_tree.heading(col, text=heading)
+        job_tree.column(col, width=width, anchor='w')
+    job_tree.grid(row=1, column=0, sticky='nsew')
+
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=2, column=0, pady=(15, 0), sticky='ew')
+    ttk.Button(btn_frame, text="⬆", width=3, command=lambda: on_action("up")).pack(side=tk.LEFT)
+    ttk.Button(btn_frame, text="⬇", width=3, command=lambda: on_action("down")).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="⏸ 일시 정지", command=lambda: on_action("pause")).pack(side=tk.LEFT, padx=(10, 0))
+    ttk.Button(btn_frame, text="▶ 재개", command=lambda: on_action("resume")).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="⛔ 취소", command=lambda: on_action("cancel")).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="✏️ 플롯 수정", command=lambda: on_edit_plot()).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(btn_frame, text="닫기", command=lambda: on_close()).pack(side=tk.RIGHT)
+    queue_btn = ttk.Button(btn_frame, text="", command=lambda: apply_action("toggle_queue", None))
+    queue_btn.pack(side=tk.RIGHT, padx=(0, 5))
+    ttk.Button(btn_frame, text="완료 항목 정리", command=lambda: apply_action("clear", None)).pack(side=tk.RIGHT, padx=(0, 5))
+
+    refresh = {"after_id": None}
+    rows_by_id = {}
+
+    def show_rows(rows, queue_paused):
+        rows_by_id.clear()
+        rows_by_id.update((row["id"], row) for row in rows)
+        selected = job_tree.focus()
+        job_tree.delete(*job_tree.get_children())
+        for row in rows:
+            job_tree.insert("", "end", iid=row["id"], values=(row["label"], row["state"], row["attempts"], row["error"]))
+        if selected and job_tree.exists(selected):
+            job_tree.focus(selected); job_tree.selection_set(selected)
+        status_label.config(text=f"작업 {len(rows)}개" + (" - ⏸ 대기열 일시 정지됨" if queue_paused else ""))
+        queue_btn.config(text="▶ 대기열 재개" if queue_paused else "⏸ 대기열 일시 정지")
+
+    def apply_action(action, job_id, value=None):
+        rows, queue_paused = action_callback(action, job_id, value)
+        show_rows(rows, queue_paused)
+
+    def on_edit_plot():
+        # 자동 집필 체크포인트 등에서 시작 전 작업의 플롯 수정
+        row = rows_by_id.get(job_tree.focus())
+        if not row:
+            messagebox.showinfo("선택 필요", "작업을 선택해주세요.", parent=dialog); return
+        if not row["editable"]:
+            messagebox.showinfo("수정 불가", "실행 중이거나 끝난 작업의 플롯은 수정할 수 없습니다.", parent=dialog); return
+        new_plot = show_scene_plot_dialog(dialog, current_plot=row["plot"], title=f"✏️ 플롯 수정 - {row['label']}")
+        try: dialog.grab_set() # 플롯 대화상자가 가져간 입력 제어를 되찾음
+        except tk.TclError: pass
+        if new_plot is not None: apply_action("edit_plot", row["id"], new_plot)
+
+    def on_action(action):
+        job_id = job_tree.focus()
+        if not job_id:
+            messagebox.showinfo("선택 필요", "작업을 선택해주세요.", parent=dialog); return
+        if action == "cancel" and not messagebox.askyesno("작업 취소", "선택한 작업을 취소하시겠습니까?\n(실행 중이면 생성을 중단합니다.)", parent=dialog):
+            return
+        apply_action(action, job_id)
+
+    def periodic_refresh():
+        # 대기열은 대화상자가 열려 있는 동안에도 계속 진행되므로 주기적으로 상태 갱신
+        apply_action("refresh", None)
+        refresh["after_id"] = dialog.after(1000, periodic_refresh)
+
+    def on_close():
+        if refresh["after_id"]:
+            try: dialog.after_cancel(refresh["after_id"])
+            except tk.TclError: pass
+        dialog.destroy()
+
+    dialog.protocol("WM_DELETE_WINDOW", on_close)
+    periodic_refresh()
+    job_tree.focus_set()
+    _grab_and_wait(dialog)
+
+
+def show_import_manuscript_dialog(parent_root):
+    """원고 가져오기 대화상자. 확인 시 {'source', 'name', 'chapter_pattern', 'scene_separator', 'summarize'}, 취소 시 None 반환."""
+    dialog = tk.Toplevel(parent_root)
+    dialog.title("📥 원고 가져오기")
+    dialog.geometry("620x300")
+    dialog.transient(parent_root)
+
+    result = {"action": None}
+    source_var = tk.StringVar()
+    name_var = tk.StringVar()
+    chapter_var = tk.StringVar(value=constants.IMPORT_CHAPTER_PATTERN_DEFAULT)
+    scene_var = tk.StringVar(value=constants.IMPORT_SCENE_SEPARATOR_DEFAULT)
+    summarize_var = tk.BooleanVar(value=False)
+
+    frame = ttk.Frame(dialog, padding=(15, 15))
+    frame.pack(fill=tk.BOTH, expand=True)
+    frame.columnconfigure(1, weight=1)
+
+    def set_source(path):
+        if not path: return
+        source_var.set(path)
+        if not name_var.get().strip():
+            name_var.set(os.path.splitext(os.path.basename(os.path.normpath(path)))[0])
+
+    ttk.Label(frame, text="원고 파일/폴더:").grid(row=0, column=0, sticky='w', pady=(0, 5))
+    ttk.Entry(frame, textvariable=source_var).grid(row=0, column=1, sticky='ew', pady=(0, 5))
+    source_btn_frame = ttk.Frame(frame); source_btn_frame.grid(row=0, column=2, padx=(5, 0), pady=(0, 5))
+    ttk.Button(source_btn_frame, text="파일...", width=6,
+               command=lambda: set_source(filedialog.askopenfilename(title="원고 파일 선택", filetypes=constants.IMPORT_SOURCE_FILETYPES, parent=dialog))).pack(side=tk.LEFT)
+    ttk.Button(source_btn_frame, text="폴더...", width=6,
+               command=lambda: set_source(filedialog.askdirectory(title="챕터 원고 폴더 선택", parent=dialog))).pack(side=tk.LEFT, padx=(3, 0))
+
+    ttk.Label(frame, text="새 소설 이름:").grid(row=1, column=0, sticky='w', pady=(0, 5))
+    ttk.Entry(frame, textvariable=name_var).grid(row=1, column=1, columnspan=2, sticky='ew', pady=(0, 5))
+    ttk.Label(frame, text="챕터 제목 줄 (정규식):").grid(row=2, column=0, sticky='w', pady=(0, 5))
+    ttk.Entry(frame, textvariable=chapter_var).grid(row=2, column=1, columnspan=2, sticky='ew', pady=(0, 5))
+    ttk.Label(frame, text="장면 구분 줄 (정규식):").grid(row=3, column=0, sticky='w', pady=(0, 5))
+    ttk.Entry(frame, textvariable=scene_var).grid(row=3, column=1, columnspan=2, sticky='ew', pady=(0, 5))
+    ttk.Label(frame, text="폴더를 고르면 항목 이름의 숫자 순서대로, 파일은 챕터로 나누고 하위 폴더는 챕터 하나(안의 파일 = 장면)로 가져옵니다.",
+              wraplength=580, justify=tk.LEFT).grid(row=4, column=0, columnspan=3, sticky='w', pady=(5, 5))
+    ttk.Checkbutton(frame, text="가져온 뒤 이전 줄거리 요약 생성 (백그라운드)", variable=summarize_var).grid(row=5, column=0, columnspan=3, sticky='w')
+
+    def on_confirm():
+        if not source_var.get().strip() or not name_var.get().strip():
+            messagebox.showwarning("입력 필요", "원고 경로와 새 소설 이름을 입력해주세요.", parent=dialog); return
+        result["action"] = {"source": source_var.get().strip(), "name": name_var.get().strip(),
+                            "chapter_pattern": chapter_var.get() or None, "scene_separator": scene_var.get() or None,
+                            "summarize": summarize_var.get()}
+        dialog.destroy()
+
+    def on_cancel():
+        result["action"] = None
+        dialog.destroy()
+
+    btn_frame = ttk.Frame(frame); btn_frame.grid(row=6, column=0, columnspan=3, pady=(15, 0), sticky='e')
+    ttk.Button(btn_frame, text="가져오기", command=on_confirm).pack(side=tk.RIGHT, padx=(5, 0))
+    ttk.Button(btn_frame, text="취소", command=on_cancel).pack(side=tk.RIGHT)
+
+    dialog.bind("<Escape>", lambda event: on_cancel())
+    dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+    _grab_and_wait(dialog)
+    return result["action"]
+
+
 def show_api_key_dialog(parent_root, current_ask_pref):
     """API 키 관리 및 '다시 묻지 않기' 설정 대화상자."""
     dialog = tk.Toplevel(parent_root)
@@ -18,6 +18,7 @@ class GuiManager:
         print("GUI: GuiManager 초기화 시작...")
         self.root = root
         self.app_core = app_core # AppCore 참조 저장
+        self.suppress_dialogs = False # 종료 준비 중에는 메시지 창 대신 로그만 (창이 종료를 막지 않도록)
 
         # 기본 폰트 설정 (utils 사용)
         self.base_font_family, self.base_font_size = utils.get_platform_font()
@@ -96,6 +97,26 @@ class GuiManager:
         settings_menu.add_separator()
         settings_menu.add_command(label="소설 저장 폴더 열기", command=self.app_core.handle_open_save_directory)
 
+        storage_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="🗄️ 저장소", menu=storage_menu)
+        storage_menu.add_command(label="SQLite DB로 내보내기...", command=self.app_core.handle_export_sqlite_request)
+        storage_menu.add_command(label="SQLite DB에서 가져오기...", command=self.app_core.handle_import_sqlite_request)
+        storage_menu.add_separator()
+        storage_menu.add_command(label="현재 소설을 소설 팩(.novelpack)으로 내보내기...", command=self.app_core.handle_export_novel_pack_request)
+        storage_menu.add_command(label="📤 현재 소설 원고 내보내기 (TXT / Markdown / EPUB)...", command=self.app_core.handle_export_manuscript_request)
+        storage_menu.add_command(label="📥 원고 가져오기 (텍스트 파일 / 챕터 폴더)...", command=self.app_core.handle_import_manuscript_request)
+        storage_menu.add_separator()
+        storage_menu.add_command(label="현재 소설 토큰 사용량", command=self.app_core.handle_token_totals_request)
+        storage_menu.add_separator()
+        storage_menu.add_command(label="🔁 현재 소설에서 찾아 바꾸기...", command=self.app_core.handle_find_replace_request)
+        storage_menu.add_command(label="↩️ 마지막 찾아 바꾸기 되돌리기", command=self.app_core.handle_undo_replace_request)
+        storage_menu.add_separator()
+        storage_menu.add_command(label="🗑️ 휴지통...", command=self.app_core.handle_trash_request)
+
+        queue_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="📋 작업", menu=queue_menu)
+        queue_menu.add_command(label="생성 작업 대기열...", command=self.app_core.handle_generation_queue_request)
+
     # --- AppCore에서 호출하는 GUI 업데이트 메소드 ---
 
     def set_window_title(self, title):
@@ -195,6 +216,8 @@ class GuiManager:
 
     def show_message(self, msg_type, title, message):
         """메시지 박스 표시 래퍼"""
+        if self.suppress_dialogs:
+            print(f"GUI: [{msg_type}] {title}: {message}"); return
         if self.root and self.root.winfo_exists(): # 루트 윈도우가 있을 때만
             if msg_type == "info":
                 messagebox.showinfo(title, message, parent=self.root)
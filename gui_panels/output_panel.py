@@ -2,6 +2,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import constants
+import utils
 
 class OutputPanel(ttk.Frame):
     """출력 영역 GUI (좌측 하단)"""
@@ -114,11 +115,51 @@ class OutputPanel(ttk.Frame):
                 self.update_char_count_display(text)
             except tk.TclError: pass
 
+    def append_streamed_text(self, text):
+        """생성 중 수신한 텍스트를 끝에 이어 붙여 표시 (수정 플래그는 건드리지 않음)"""
+        widget = self.widgets.get('output_text')
+        if not text or not widget or not widget.winfo_exists(): return
+        try:
+            current_state = widget.cget('state')
+            at_bottom = widget.yview()[1] >= 1.0
+            widget.config(state=tk.NORMAL)
+            widget.insert(tk.END, text)
+            widget.edit_modified(False)
+            widget.config(state=current_state)
+            if at_bottom: widget.see(tk.END) # 사용자가 위로 스크롤한 경우에는 위치 유지
+            self.update_char_count_display(self.get_content())
+        except tk.TclError: pass
+
+    def highlight_search_hit(self, line_no, query):
+        """검색 결과 줄로 이동하고 해당 줄의 검색어 강조 (내용을 다시 표시하면 강조도 사라짐)"""
+        widget = self.widgets.get('output_text')
+        if not widget or not widget.winfo_exists(): return
+        try:
+            widget.tag_remove('search_hit', "1.0", tk.END)
+            widget.tag_config('search_hit', background=constants.SEARCH_HIT_HIGHLIGHT_BG)
+            line_end = f"{line_no}.end"
+            for term in (query or "").split():
+                start = f"{line_no}.0"
+                while True:
+                    pos = widget.search(term, start, stopindex=line_end, nocase=True)
+                    if not pos: break
+                    start = f"{pos}+{len(term)}c"
+                    widget.tag_add('search_hit', pos, start)
+            widget.mark_set(tk.INSERT, f"{line_no}.0")
+            widget.see(f"{line_no}.0")
+        except tk.TclError: pass
+
     def clear_content(self):
         """텍스트 내용 비우기"""
         self.display_content("")
         self.update_token_display(None)
 
+    def show_loading_message(self, message):
+        """로드 중 안내 문구 표시 (글자 수/토큰 표시는 비움)"""
+        self.display_content(message)
+        self.update_token_display(None)
+        self.update_char_count_display("")
+
     def get_content(self):
         """현재 텍스트 위젯 내용 반환"""
         widget = self.widgets.get('output_text')
@@ -163,7 +204,7 @@ class OutputPanel(ttk.Frame):
             except tk.TclError: pass
 
     def update_ui_state(self, is_busy: bool, scene_loaded: bool, output_modified: bool):
-        """AppCore 상태에 따라 버튼 활성화/비활성화"""
+        """AppCore 상태에 따라 버튼 활성화/비활성화 (상태가 실제로 바뀐 위젯만 재설정)"""
         save_btn = self.widgets.get('save_button')
         if save_btn and save_btn.winfo_exists():
             # Check combined settings modification flag from SettingsPanel
@@ -185,20 +226,20 @@ class OutputPanel(ttk.Frame):
             # Save is enabled if not busy AND any relevant modification exists
             can_save = not is_busy and (can_save_scene_related or can_save_chapter_arc_only or can_save_novel_only)
 
-            save_btn.config(state=tk.NORMAL if can_save else tk.DISABLED)
+            utils.set_widget_state(save_btn, tk.NORMAL if can_save else tk.DISABLED)
 
+        output_widget = self.widgets.get('output_text')
         copy_btn = self.widgets.get('copy_button')
         if copy_btn and copy_btn.winfo_exists():
-            has_content = bool(self.get_content())
+            # 내용 전체를 꺼내지 않고 비어 있는지만 확인
+            try: has_content = output_widget.compare("end-1c", "!=", "1.0")
+            except (tk.TclError, AttributeError): has_content = False
             # Copy is possible if not busy and there is content (regardless of scene loaded)
             can_copy = not is_busy and has_content
-            copy_btn.config(state=tk.NORMAL if can_copy else tk.DISABLED)
+            utils.set_widget_state(copy_btn, tk.NORMAL if can_copy else tk.DISABLED)
 
-        # Text widget editability
-        output_widget = self.widgets.get('output_text')
-        if output_widget and output_widget.winfo_exists():
-             # Enable editing only if a scene is loaded and not busy
-             output_widget.config(state=tk.NORMAL if (scene_loaded and not is_busy) else tk.DISABLED)
+        # Text widget editability (Enable editing only if a scene is loaded and not busy)
+        utils.set_widget_state(output_widget, tk.NORMAL if (scene_loaded and not is_busy) else tk.DISABLED)
 
 
     def reset_modified_flag(self):
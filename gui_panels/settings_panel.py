@@ -191,10 +191,13 @@ class SettingsPanel(ttk.Frame):
         btn_new_scene.grid(row=0, column=2, padx=constants.PAD_X//2, ipady=constants.PAD_Y//2)
         btn_regenerate = ttk.Button(button_frame, text=" 🔄 장면 재생성", command=self.app_core.handle_regenerate_request)
         btn_regenerate.grid(row=0, column=3, padx=constants.PAD_X//2, ipady=constants.PAD_Y//2)
+        btn_cancel = ttk.Button(button_frame, text=" ⛔ 취소", command=self.app_core.handle_cancel_request, state=tk.DISABLED)
+        btn_cancel.grid(row=0, column=4, padx=constants.PAD_X//2, ipady=constants.PAD_Y//2)
         self.widgets['new_novel_button'] = btn_new_novel
         self.widgets['new_chapter_folder_button'] = btn_new_chapter_folder
         self.widgets['new_scene_button'] = btn_new_scene
         self.widgets['regenerate_button'] = btn_regenerate
+        self.widgets['cancel_button'] = btn_cancel
 
         # === 2-7. 상태 표시줄 ===
         status_label = ttk.Label(self.settings_frame_outer, text="초기화 중...", style='Status.TLabel', anchor=tk.W, wraplength=450)
@@ -433,45 +436,39 @@ class SettingsPanel(ttk.Frame):
         wrapper = self.novel_settings_wrapper
         if not wrapper or not wrapper.winfo_exists(): return
         should_be_visible = self.settings_area_visible and self.novel_settings_widget_visible and not force_hide
+        utils.set_grid_visible(wrapper, should_be_visible)
         if should_be_visible:
-            wrapper.grid()
-            if widget and widget.winfo_exists():
-                is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
-                # Novel settings editable only if novel is loaded and not busy
-                widget.config(state=tk.DISABLED if (is_busy or not self.app_core.current_novel_dir) else tk.NORMAL)
+            is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
+            # Novel settings editable only if novel is loaded and not busy
+            utils.set_widget_state(widget, tk.DISABLED if (is_busy or not self.app_core.current_novel_dir) else tk.NORMAL)
         else:
-            wrapper.grid_remove()
-            if widget and widget.winfo_exists(): widget.config(state=tk.DISABLED)
+            utils.set_widget_state(widget, tk.DISABLED)
 
     def _update_chapter_arc_notes_visibility(self, force_hide=False):
         widget = self.widgets.get('chapter_arc_notes_text')
         wrapper = self.chapter_arc_notes_wrapper
         if not wrapper or not wrapper.winfo_exists(): return
         should_be_visible = self.settings_area_visible and self.chapter_arc_notes_widget_visible and not force_hide
+        utils.set_grid_visible(wrapper, should_be_visible)
         if should_be_visible:
-            wrapper.grid()
-            if widget and widget.winfo_exists():
-                 is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
-                 # Editable only if a chapter folder is loaded and not busy
-                 widget.config(state=tk.DISABLED if (is_busy or not self.app_core.current_chapter_arc_dir) else tk.NORMAL)
+            is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
+            # Editable only if a chapter folder is loaded and not busy
+            utils.set_widget_state(widget, tk.DISABLED if (is_busy or not self.app_core.current_chapter_arc_dir) else tk.NORMAL)
         else:
-            wrapper.grid_remove()
-            if widget and widget.winfo_exists(): widget.config(state=tk.DISABLED)
+            utils.set_widget_state(widget, tk.DISABLED)
 
     def _update_scene_plot_visibility(self, force_hide=False):
         widget = self.widgets.get('scene_plot_text')
         wrapper = self.scene_plot_wrapper
         if not wrapper or not wrapper.winfo_exists(): return
         should_be_visible = self.settings_area_visible and self.scene_plot_widget_visible and not force_hide
+        utils.set_grid_visible(wrapper, should_be_visible)
         if should_be_visible:
-            wrapper.grid()
-            if widget and widget.winfo_exists():
-                 is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
-                 # Editable only if a scene is loaded and not busy
-                 widget.config(state=tk.DISABLED if (is_busy or not self.app_core.current_scene_path) else tk.NORMAL)
+            is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False
+            # Editable only if a scene is loaded and not busy
+            utils.set_widget_state(widget, tk.DISABLED if (is_busy or not self.app_core.current_scene_path) else tk.NORMAL)
         else:
-            wrapper.grid_remove()
-            if widget and widget.winfo_exists(): widget.config(state=tk.DISABLED)
+            utils.set_widget_state(widget, tk.DISABLED)
 
     # --- 새 메소드: 동적 레이블 업데이트 ---
     def _update_dynamic_labels(self):
@@ -502,30 +499,22 @@ class SettingsPanel(ttk.Frame):
     # --- AppCore에서 호출하는 메소드 ---
 
     def update_ui_state(self, is_busy: bool, novel_loaded: bool, chapter_loaded: bool, scene_loaded: bool):
-        """AppCore의 상태에 따라 위젯 활성화/비활성화"""
+        """AppCore의 상태에 따라 위젯 활성화/비활성화 (상태가 실제로 바뀐 위젯만 재설정)"""
         # is_busy = self.app_core.is_busy() if hasattr(self.app_core, 'is_busy') else False # Use the provided flag or check directly
         gen_state = tk.DISABLED if is_busy else tk.NORMAL
         combo_state = tk.DISABLED if is_busy else 'readonly'
 
-        # API 타입 콤보박스
-        api_combo = self.widgets.get('api_type_combobox')
-        if api_combo and api_combo.winfo_exists():
-            # 사용 가능한 API가 2개 이상일 때만 활성화
-            num_available_apis = sum(1 for models in self.app_core.available_models_by_type.values() if models)
-            api_combo.config(state=tk.DISABLED if (is_busy or num_available_apis < 2) else 'readonly')
+        # API 타입 콤보박스 (사용 가능한 API가 2개 이상일 때만 활성화)
+        num_available_apis = sum(1 for models in self.app_core.available_models_by_type.values() if models)
+        utils.set_widget_state(self.widgets.get('api_type_combobox'), tk.DISABLED if (is_busy or num_available_apis < 2) else 'readonly')
 
-        # 모델 콤보박스
-        model_combo = self.widgets.get('model_combobox')
-        if model_combo and model_combo.winfo_exists():
-            # 현재 선택된 API 타입에 모델이 있을 때만 활성화
-            current_api_models = self.app_core.available_models_by_type.get(self.app_core.current_api_type, [])
-            model_combo.config(state=tk.DISABLED if (is_busy or not current_api_models) else 'readonly')
+        # 모델 콤보박스 (현재 선택된 API 타입에 모델이 있을 때만 활성화)
+        current_api_models = self.app_core.available_models_by_type.get(self.app_core.current_api_type, [])
+        utils.set_widget_state(self.widgets.get('model_combobox'), tk.DISABLED if (is_busy or not current_api_models) else 'readonly')
 
         # 온도 스케일 & 길이 콤보박스 (장면 생성 옵션)
-        temp_scale = self.widgets.get('temperature_scale')
-        if temp_scale and temp_scale.winfo_exists(): temp_scale.config(state=gen_state)
-        length_combo = self.widgets.get('length_combobox')
-        if length_combo and length_combo.winfo_exists(): length_combo.config(state=combo_state)
+        utils.set_widget_state(self.widgets.get('temperature_scale'), gen_state)
+        utils.set_widget_state(self.widgets.get('length_combobox'), combo_state)
 
         # 소설 설정 텍스트 (소설 로드 시 & 토글 켜졌을 때 편집 가능)
         self._update_novel_settings_visibility() # Visibility update handles state based on loaded status
@@ -538,26 +527,18 @@ class SettingsPanel(ttk.Frame):
 
         # 토글 버튼들
         for key in ['novel_settings_toggle_button', 'chapter_arc_notes_toggle_button', 'scene_plot_toggle_button', 'toggle_settings_button']:
-            btn = self.widgets.get(key)
-            if btn and btn.winfo_exists(): btn.config(state=gen_state)
+            utils.set_widget_state(self.widgets.get(key), gen_state)
 
         # 액션 버튼들
-        btn_new_novel = self.widgets.get('new_novel_button')
-        if btn_new_novel and btn_new_novel.winfo_exists(): btn_new_novel.config(state=gen_state)
-
-        btn_new_chapter_folder = self.widgets.get('new_chapter_folder_button')
-        if btn_new_chapter_folder and btn_new_chapter_folder.winfo_exists():
-            btn_new_chapter_folder.config(state=tk.DISABLED if (is_busy or not novel_loaded) else tk.NORMAL)
-
-        btn_new_scene = self.widgets.get('new_scene_button')
-        if btn_new_scene and btn_new_scene.winfo_exists():
-            # 새 장면은 챕터 폴더가 로드되어 있어야 가능
-            btn_new_scene.config(state=tk.DISABLED if (is_busy or not chapter_loaded) else tk.NORMAL)
-
-        btn_regenerate = self.widgets.get('regenerate_button')
-        if btn_regenerate and btn_regenerate.winfo_exists():
-            # 재생성은 장면 파일이 로드되어 있어야 가능
-            btn_regenerate.config(state=tk.DISABLED if (is_busy or not scene_loaded) else tk.NORMAL)
+        utils.set_widget_state(self.widgets.get('new_novel_button'), gen_state)
+        utils.set_widget_state(self.widgets.get('new_chapter_folder_button'), tk.DISABLED if (is_busy or not novel_loaded) else tk.NORMAL)
+        # 새 장면은 챕터 폴더가 로드되어 있어야 가능
+        utils.set_widget_state(self.widgets.get('new_scene_button'), tk.DISABLED if (is_busy or not chapter_loaded) else tk.NORMAL)
+        # 재생성은 장면 파일이 로드되어 있어야 가능
+        utils.set_widget_state(self.widgets.get('regenerate_button'), tk.DISABLED if (is_busy or not scene_loaded) else tk.NORMAL)
+        # 취소는 AI 생성/요약/장면 계획 진행 중에만 가능
+        api_running = self.app_core.is_generating or self.app_core.is_summarizing or self.app_core.is_planning_scenes()
+        utils.set_widget_state(self.widgets.get('cancel_button'), tk.NORMAL if api_running else tk.DISABLED)
 
 
     def populate_widgets(self, novel_settings_data, chapter_arc_settings_data, scene_settings_data):
@@ -694,7 +675,7 @@ class SettingsPanel(ttk.Frame):
         # 로드 후 UI 상태 재조정 및 수정 플래그 리셋
         self.reset_chapter_modified_flag() # Combined flag reset
         self.reset_novel_modified_flag() # Reset novel flag too
-        self.update_ui_state(is_busy, novel_loaded, chapter_loaded, scene_loaded)
+        self.app_core.update_ui_state() # 이벤트 루프 한 턴에 한 번만 적용
 
 
     def get_settings(self):
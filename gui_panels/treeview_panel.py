@@ -6,6 +6,7 @@ import re # 폴더/파일명 파싱용
 import platform
 import constants
 import utils # format_chapter_display_name 등 사용
+import file_handler # 소설 팩(.novelpack) 목록 조회
 
 class TreeviewPanel(ttk.Frame):
     """트리뷰 영역 GUI (우측)"""
@@ -16,6 +17,8 @@ class TreeviewPanel(ttk.Frame):
         self.heading_font = heading_font
 
         self.widgets = {}
+        self._filter_after_id = None
+        self._item_badges = set() # 생성 작업 진행 표시를 붙일 항목 ID (새로고침 후에도 유지)
         self._create_widgets()
         self.treeview = self.widgets['treeview']
 
@@ -25,15 +28,30 @@ class TreeviewPanel(ttk.Frame):
 
         tree_frame = ttk.LabelFrame(self, text="📚 소설 / 챕터 / 장면", padding=(constants.PAD_X, constants.PAD_Y))
         tree_frame.grid(row=0, column=0, sticky='nsew')
-        tree_frame.rowconfigure(0, weight=1)
+        tree_frame.rowconfigure(1, weight=1)
         tree_frame.columnconfigure(0, weight=1)
 
+        # 검색 필터 (전체 소설 본문/설정 검색, 입력 후 잠시 뒤 자동 검색)
+        filter_frame = ttk.Frame(tree_frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, constants.PAD_Y))
+        filter_frame.columnconfigure(1, weight=1)
+        ttk.Label(filter_frame, text="🔍").grid(row=0, column=0, padx=(0, constants.PAD_X // 2))
+        filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=filter_var)
+        filter_entry.grid(row=0, column=1, sticky='ew')
+        ttk.Button(filter_frame, text="✕", width=3, command=self.clear_filter).grid(row=0, column=2, padx=(constants.PAD_X // 2, 0))
+        filter_var.trace_add('write', self._on_filter_changed)
+        filter_entry.bind("<Return>", lambda e: self._run_filter())
+        filter_entry.bind("<Escape>", lambda e: self.clear_filter())
+        self.widgets['filter_var'] = filter_var
+        self.widgets['filter_entry'] = filter_entry
+
         # Treeview 생성
         tree = ttk.Treeview(tree_frame, selectmode='browse', style="Treeview")
-        tree.grid(row=0, column=0, sticky='nsew')
+        tree.grid(row=1, column=0, sticky='nsew')
         # 스크롤바
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-        scrollbar.grid(row=0, column=1, sticky='ns')
+        scrollbar.grid(row=1, column=1, sticky='ns')
         tree.config(yscrollcommand=scrollbar.set)
         tree.heading('#0', text='소설/챕터/장면', anchor='w')
         self.widgets['treeview'] = tree
@@ -53,6 +71,7 @@ class TreeviewPanel(ttk.Frame):
         # 소설 폴더용
         self.tree_novel_context_menu = tk.Menu(tree, tearoff=0)
         self.tree_novel_context_menu.add_command(label="✏️ 소설 이름 변경", command=self._request_rename_novel)
+        self.tree_novel_context_menu.add_command(label="🍴 소설 포크...", command=self._request_fork_novel)
         self.tree_novel_context_menu.add_separator()
         self.tree_novel_context_menu.add_command(label="🗑️ 소설 삭제", command=self._request_delete_novel)
 
@@ -60,15 +79,47 @@ class TreeviewPanel(ttk.Frame):
         self.tree_chapter_context_menu = tk.Menu(tree, tearoff=0)
         self.tree_chapter_context_menu.add_command(label="✏️ 챕터 제목 변경", command=self._request_rename_chapter)
         # self.tree_chapter_context_menu.add_command(label="➕ 새 장면 추가", command=self._request_new_scene) # 필요 시 추가
+        self.tree_chapter_context_menu.add_command(label="🗜️ 챕터 압축 보관", command=self._request_archive_chapter)
+        self.tree_chapter_context_menu.add_command(label="📂 챕터 압축 해제", command=self._request_unarchive_chapter)
+        self.tree_chapter_context_menu.add_command(label="🌿 브랜치...", command=self._request_chapter_branches)
+        self.tree_chapter_context_menu.add_command(label="📋 장면 일괄 생성 (대기열)...", command=self._request_queue_new_scenes)
+        self.tree_chapter_context_menu.add_command(label="🤖 챕터 자동 집필...", command=self._request_chapter_autopilot)
         self.tree_chapter_context_menu.add_separator()
         self.tree_chapter_context_menu.add_command(label="🗑️ 챕터 폴더 삭제", command=self._request_delete_chapter)
 
         # 장면(Scene) 파일용
         self.tree_scene_context_menu = tk.Menu(tree, tearoff=0)
         # self.tree_scene_context_menu.add_command(label="✏️ 장면 번호 변경", command=self._request_rename_scene) # 구현 복잡성 높음
+        self.tree_scene_context_menu.add_command(label="🕘 버전 기록...", command=self._request_scene_history)
+        self.tree_scene_context_menu.add_command(label="🌿 이 장면부터 새 브랜치...", command=self._request_create_branch)
+        self.tree_scene_context_menu.add_command(label="📋 재생성 대기열에 추가...", command=self._request_queue_regenerate)
+        self.tree_scene_context_menu.add_separator()
         self.tree_scene_context_menu.add_command(label="🗑️ 장면 삭제", command=self._request_delete_scene)
 
 
+    # --- 검색 필터 ---
+
+    def _on_filter_changed(self, *args):
+        """검색어 입력 시 잠시 기다렸다가 검색 (연속 입력은 마지막 것만)"""
+        if self._filter_after_id:
+            self.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.after(constants.SEARCH_FILTER_DELAY_MS, self._run_filter)
+
+    def _run_filter(self):
+        if self._filter_after_id:
+            self.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        self.app_core.handle_search_request(self.get_filter_text())
+
+    def get_filter_text(self):
+        """현재 검색어 (앞뒤 공백 제거)"""
+        return self.widgets['filter_var'].get().strip()
+
+    def clear_filter(self):
+        """검색어를 지우고 전체 트리 표시"""
+        self.widgets['filter_var'].set("")
+        self._run_filter()
+
     # --- Treeview 이벤트 핸들러 ---
 
     def _on_tree_select(self, event=None):
@@ -76,6 +127,9 @@ class TreeviewPanel(ttk.Frame):
         selected_id = self.treeview.focus() # iid는 경로 (소설명, 챕터경로, 장면경로)
         if selected_id:
             tags = self.treeview.item(selected_id, 'tags')
+            if 'search_hit' in tags: # 검색 결과 줄은 해당 항목을 선택한 것으로 처리
+                selected_id = self.treeview.parent(selected_id)
+                tags = self.treeview.item(selected_id, 'tags')
             self.app_core.handle_tree_selection(selected_id, tags)
         else: # 선택 해제 시
              self.app_core.handle_tree_selection(None, [])
@@ -85,6 +139,11 @@ class TreeviewPanel(ttk.Frame):
         selected_id = self.treeview.focus() # iid는 경로
         if selected_id:
             tags = self.treeview.item(selected_id, 'tags')
+            if 'search_hit' in tags: # 검색 결과 줄: 해당 항목을 로드하고 그 줄로 이동
+                parent_id = self.treeview.parent(selected_id)
+                line_no = int(self.treeview.item(selected_id, 'values')[0])
+                self.app_core.handle_search_hit_request(parent_id, self.treeview.item(parent_id, 'tags'), line_no, self.get_filter_text())
+                return
             # 소설, 챕터, 장면 모두 로드 요청 가능하도록 AppCore에 전달
             self.app_core.handle_tree_load_request(selected_id, tags)
 
@@ -107,6 +166,12 @@ class TreeviewPanel(ttk.Frame):
 
     # --- 컨텍스트 메뉴 액션 요청 ---
 
+    def _request_fork_novel(self):
+        """소설 포크 AppCore 요청"""
+        selected_id = self.treeview.focus() # 소설 이름
+        if selected_id and 'novel' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_fork_novel_request(selected_id)
+
     def _request_rename_novel(self):
         """소설 이름 변경 AppCore 요청"""
         selected_id = self.treeview.focus() # 소설 이름
@@ -131,6 +196,54 @@ class TreeviewPanel(ttk.Frame):
         if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
             self.app_core.handle_delete_chapter_request(selected_id)
 
+    def _request_archive_chapter(self):
+        """챕터 압축 보관 AppCore 요청"""
+        selected_id = self.treeview.focus() # 챕터 폴더 경로
+        if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_archive_chapter_request(selected_id)
+
+    def _request_unarchive_chapter(self):
+        """챕터 압축 해제 AppCore 요청"""
+        selected_id = self.treeview.focus() # 챕터 폴더 경로
+        if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_unarchive_chapter_request(selected_id)
+
+    def _request_chapter_branches(self):
+        """챕터 브랜치 관리 AppCore 요청"""
+        selected_id = self.treeview.focus() # 챕터 폴더 경로
+        if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_branch_dialog_request(selected_id)
+
+    def _request_queue_new_scenes(self):
+        """챕터 새 장면 일괄 생성 대기열 추가 AppCore 요청"""
+        selected_id = self.treeview.focus() # 챕터 폴더 경로
+        if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_queue_new_scenes_request(selected_id)
+
+    def _request_chapter_autopilot(self):
+        """챕터 자동 집필(장면 계획 후 대기열 생성) AppCore 요청"""
+        selected_id = self.treeview.focus() # 챕터 폴더 경로
+        if selected_id and 'chapter' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_chapter_autopilot_request(selected_id)
+
+    def _request_queue_regenerate(self):
+        """장면 재생성 대기열 추가 AppCore 요청"""
+        selected_id = self.treeview.focus() # 장면 파일(.txt) 경로
+        if selected_id and 'scene' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_queue_regenerate_request(selected_id)
+
+    def _request_create_branch(self):
+        """선택한 장면부터 새 브랜치 생성 AppCore 요청"""
+        selected_id = self.treeview.focus() # 장면 파일(.txt) 경로
+        if selected_id and 'scene' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_create_branch_request(selected_id)
+
+    def _request_scene_history(self):
+        """장면 버전 기록 AppCore 요청"""
+        selected_id = self.treeview.focus() # 장면 파일(.txt) 경로
+        if selected_id and 'scene' in self.treeview.item(selected_id, 'tags'):
+            self.app_core.handle_scene_history_request(selected_id)
+
     def _request_delete_scene(self):
         """장면 파일 삭제 AppCore 요청"""
         selected_id = self.treeview.focus() # 장면 파일(.txt) 경로
@@ -166,6 +279,8 @@ class TreeviewPanel(ttk.Frame):
         try:
             # Scan for novel folders (directories in base_dir)
             novel_folders = sorted([d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d)) and not d.startswith('.')])
+            # Scan for novel pack files (read-only single-file novels)
+            novel_packs = sorted([f for f in os.listdir(base_dir) if f.lower().endswith(constants.NOVEL_PACK_EXTENSION) and os.path.isfile(os.path.join(base_dir, f))])
         except OSError as e:
             print(f"GUI ERROR: 소설 폴더 목록 읽기 실패: {e}")
             return
@@ -201,6 +316,9 @@ class TreeviewPanel(ttk.Frame):
             for chap_num, chapter_path, chapter_folder_name in chapters:
                  # Chapter node iid is the chapter FOLDER path
                  chapter_display_name = utils.format_chapter_display_name(chapter_folder_name)
+                 if file_handler.is_chapter_archived(chapter_path): chapter_display_name += " 🗜️" # 압축 보관 표시
+                 active_branch = file_handler.get_active_branch_name(chapter_path)
+                 if active_branch: chapter_display_name += f" 🌿{active_branch}" # 활성 브랜치 표시
                  try:
                      chapter_node_id_tree = self.treeview.insert(novel_node_id_tree, 'end', iid=chapter_path, text=chapter_display_name, open=(chapter_path in open_nodes), tags=('chapter',))
                  except tk.TclError as e:
@@ -231,6 +349,9 @@ class TreeviewPanel(ttk.Frame):
                          print(f"GUI WARN: 장면 노드({os.path.basename(scene_path)}) 삽입 실패: {e}. 이 챕터의 나머지 장면 건너<0xEB><0x9C><0x84.")
                          break # 다음 챕터로
 
+        for pack_name in novel_packs:
+            self._insert_novel_pack_nodes(base_dir, pack_name, open_nodes)
+
         # Restore selection if it still exists
         if selected_id and self.treeview.exists(selected_id):
              self.select_item(selected_id)
@@ -244,9 +365,68 @@ class TreeviewPanel(ttk.Frame):
                   if self.treeview.exists(parent_novel):
                       self.select_item(parent_novel)
 
+        self._apply_item_badges()
         print("GUI Treeview: 새로고침 완료.")
 
 
+    def show_search_results(self, results):
+        """검색 결과만 트리에 표시 (소설 > 챕터 > 장면 > 일치한 줄). 항목 iid는 일반 트리와 동일."""
+        selected_id = self.treeview.focus()
+        for item in self.treeview.get_children(''):
+            self.treeview.delete(item)
+
+        base_dir = constants.BASE_SAVE_DIR
+        settings_labels = {"novel_settings": "⚙️ 소설 설정", "chapter_settings": "⚙️ 챕터 아크", "scene_settings": "⚙️ 장면 플롯"}
+        for result in results:
+            path, kind = result["path"], result["kind"]
+            rel_parts = os.path.relpath(path, base_dir).split(os.sep)
+            try:
+                parent_id = self._ensure_search_node('', rel_parts[0], f"📁 {rel_parts[0]}", ('novel',))
+                if kind != "novel_settings":
+                    chapter_path = os.path.join(base_dir, rel_parts[0], rel_parts[1])
+                    chapter_display_name = utils.format_chapter_display_name(rel_parts[1])
+                    parent_id = self._ensure_search_node(parent_id, chapter_path, chapter_display_name, ('chapter',))
+                if kind == "scene":
+                    scene_num = int(os.path.splitext(rel_parts[2])[0])
+                    parent_id = self._ensure_search_node(parent_id, path, f"🎬 {scene_num:03d} 장면", ('scene',))
+                label = settings_labels.get(kind)
+                for line_no, snippet in result["hits"]:
+                    text = f"{label} {line_no}: {snippet}" if label else f"{line_no}: {snippet}"
+                    self.treeview.insert(parent_id, 'end', iid=f"{path}#L{line_no}", text=text, values=(line_no,), tags=('search_hit',))
+            except (tk.TclError, ValueError, IndexError) as e:
+                print(f"GUI WARN: 검색 결과 노드 삽입 실패 ({path}): {e}")
+
+        if selected_id and self.treeview.exists(selected_id):
+            self.select_item(selected_id)
+        self._apply_item_badges()
+
+    def _ensure_search_node(self, parent_id, item_id, text, tags):
+        """검색 결과 트리의 상위 노드 (없으면 펼친 상태로 생성)"""
+        if not self.treeview.exists(item_id):
+            self.treeview.insert(parent_id, 'end', iid=item_id, text=text, open=True, tags=tags)
+        return item_id
+
+    def _insert_novel_pack_nodes(self, base_dir, pack_name, open_nodes):
+        """소설 팩 노드 삽입 (iid 규칙은 폴더와 동일: 팩 이름 / 팩 경로/챕터 / 팩 경로/챕터/NNN.txt)"""
+        pack_path = os.path.join(base_dir, pack_name)
+        display_name = pack_name[:-len(constants.NOVEL_PACK_EXTENSION)]
+        try:
+            novel_node = self.treeview.insert('', 'end', iid=pack_name, text=f"📦 {display_name} (읽기 전용)", open=(pack_name in open_nodes), tags=('novel', 'pack'))
+        except tk.TclError as e:
+            print(f"GUI WARN: 소설 팩 노드({pack_name}) 삽입 실패: {e}")
+            return
+
+        for chap_num, chapter_folder_name, scene_numbers in file_handler.list_novel_pack_contents(pack_path):
+            chapter_path = os.path.join(pack_path, chapter_folder_name)
+            try:
+                chapter_node = self.treeview.insert(novel_node, 'end', iid=chapter_path, text=utils.format_chapter_display_name(chapter_folder_name), open=(chapter_path in open_nodes), tags=('chapter',))
+                for scene_num in scene_numbers:
+                    scene_path = os.path.join(chapter_path, constants.SCENE_FILENAME_FORMAT.format(scene_num))
+                    self.treeview.insert(chapter_node, 'end', iid=scene_path, text=f"🎬 {scene_num:03d} 장면", tags=('scene',))
+            except tk.TclError as e:
+                print(f"GUI WARN: 소설 팩 챕터 노드({chapter_folder_name}) 삽입 실패: {e}")
+                break
+
     def select_item(self, item_id):
         """특정 ID의 아이템 선택 및 포커스"""
         if self.treeview.exists(item_id):
@@ -291,8 +471,34 @@ class TreeviewPanel(ttk.Frame):
         pass
 
     def get_item_text(self, item_id):
-        """주어진 ID의 트리뷰 아이템 표시 텍스트 반환"""
+        """주어진 ID의 트리뷰 아이템 표시 텍스트 반환 (상태 표시 제외)"""
         if self.treeview.exists(item_id):
-             try: return self.treeview.item(item_id, 'text')
+             try: return self._strip_badge(self.treeview.item(item_id, 'text'))
              except tk.TclError: return ""
-        return ""
\ No newline at end of file
+        return ""
+
+    # --- 항목 상태 표시 (생성 중) ---
+
+    def set_generating_items(self, item_ids):
+        """생성 작업이 진행 중인 항목 목록 갱신 (바뀐 항목만 다시 표시)"""
+        item_ids = set(item_ids)
+        changed = self._item_badges ^ item_ids
+        self._item_badges = item_ids
+        for item_id in changed:
+            self._apply_item_badge(item_id)
+
+    def _apply_item_badges(self):
+        for item_id in self._item_badges:
+            self._apply_item_badge(item_id)
+
+    def _apply_item_badge(self, item_id):
+        if not self.treeview.exists(item_id): return
+        try:
+            text = self.treeview.item(item_id, 'text')
+            new_text = self._strip_badge(text) + (constants.TREE_GENERATING_BADGE if item_id in self._item_badges else "")
+            if new_text != text: self.treeview.item(item_id, text=new_text)
+        except tk.TclError: pass
+
+    @staticmethod
+    def _strip_badge(text):
+        return text[:-len(constants.TREE_GENERATING_BADGE)] if text.endswith(constants.TREE_GENERATING_BADGE) else text
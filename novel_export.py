@@ -0,0 +1,232 @@
+# novel_export.py
+"""
+원고 내보내기 (TXT / Markdown / EPUB).
+- file_handler.iter_novel_scenes로 장면을 하나씩 읽어 곧바로 출력 파일에 기록 (책 전체를 메모리에 올리지 않음)
+- TXT/Markdown은 장면 원본 바이트(mmap)를 그대로 이어 쓰고, EPUB은 챕터별 XHTML 항목을 zip에 순차 기록
+- 임시 파일에 기록 후 완료 시 원자적으로 교체
+"""
+import os
+import re
+import time
+import uuid
+import html
+import zipfile
+import traceback
+
+import constants
+import file_handler
+import novel_import
+import utils
+
+_EPUB_CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+_EPUB_STYLE_CSS = """body { line-height: 1.8; }
+h1, h2 { text-align: center; margin: 2em 0 1.5em; }
+p { margin: 0; text-indent: 1em; }
+hr { border: none; text-align: center; margin: 1.5em 0; }
+hr::after { content: "* * *"; }
+"""
+
+_EPUB_XHTML_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" xml:lang="{lang}" lang="{lang}">
+<head><meta charset="UTF-8"/><title>{title}</title><link rel="stylesheet" type="text/css" href="style.css"/></head>
+<body>
+"""
+_EPUB_XHTML_TAIL = "</body>\n</html>\n"
+
+
+def get_export_format(output_path):
+    """출력 파일 확장자로 내보내기 형식 결정. 지원하지 않는 확장자면 None."""
+    return constants.EXPORT_FORMAT_EXTENSIONS.get(os.path.splitext(output_path)[1].lower())
+
+def get_chapter_title(chapter_name):
+    """챕터 폴더명 -> 원고용 챕터 제목 (트리뷰 표시명에서 아이콘 제거)."""
+    return utils.format_chapter_display_name(chapter_name).replace("📁", "", 1).strip()
+
+def _get_novel_title(novel_dir):
+    name = os.path.basename(os.path.normpath(novel_dir))
+    if name.lower().endswith(constants.NOVEL_PACK_EXTENSION):
+        name = name[:-len(constants.NOVEL_PACK_EXTENSION)]
+    return name
+
+def _scene_bytes(scene_content):
+    """장면 내용(memoryview 또는 str) -> 줄바꿈 정규화 및 앞뒤 공백 제거된 UTF-8 바이트."""
+    if isinstance(scene_content, str):
+        return scene_content.strip().encode('utf-8')
+    data = bytes(scene_content)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.strip()
+
+def _scene_text(scene_content):
+    if isinstance(scene_content, str):
+        return scene_content.strip()
+    return str(scene_content, 'utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n').strip()
+
+def _iter_export_chapters(novel_dir, use_mmap, stats):
+    """(챕터 폴더명, 장면 내용 생성기)를 챕터 순서대로 생성. 빈 파일은 건너뛰고 읽기 오류는 stats에 집계."""
+    scenes = file_handler.iter_novel_scenes(novel_dir, use_mmap=use_mmap)
+    pending = next(scenes, None)
+    while pending is not None:
+        chap_num = pending[0]
+        chapter_name = os.path.basename(os.path.dirname(pending[2]))
+
+        def _chapter_scenes():
+            nonlocal pending
+            while pending is not None and pending[0] == chap_num:
+                scene_content = pending[3]
+                if scene_content is None:
+                    stats["errors"] += 1
+                elif len(scene_content):
+                    yield scene_content
+                pending = next(scenes, None)
+
+        stats["chapters"] += 1
+        yield chapter_name, _chapter_scenes()
+        while pending is not None and pending[0] == chap_num: # 호출자가 다 읽지 않은 장면 건너뛰기
+            pending = next(scenes, None)
+
+def _write_plain(novel_dir, tmp_path, markdown, stats):
+    """TXT/Markdown 기록: 제목/챕터 제목/장면 구분선만 추가하고 장면 바이트를 그대로 이어 씀."""
+    separator = f"\n\n{constants.EXPORT_SCENE_SEPARATOR}\n\n".encode('utf-8')
+    novel_title = _get_novel_title(novel_dir)
+    with open(tmp_path, 'wb', buffering=constants.EXPORT_WRITE_BUFFER_SIZE) as f:
+        f.write((f"# {novel_title}\n" if markdown else f"{novel_title}\n").encode('utf-8'))
+        for chapter_name, chapter_scenes in _iter_export_chapters(novel_dir, True, stats):
+            chapter_title = get_chapter_title(chapter_name)
+            f.write((f"\n\n## {chapter_title}\n\n" if markdown else f"\n\n\n{chapter_title}\n\n").encode('utf-8'))
+            first = True
+            for scene_content in chapter_scenes:
+                data = _scene_bytes(scene_content)
+                if not data: continue
+                if first: stats["filled_chapters"] += 1
+                else: f.write(separator)
+                f.write(data)
+                first = False
+                stats["scenes"] += 1
+        f.write(b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _check_round_trip(output_path, stats):
+    """내보낸 TXT/Markdown을 가져오기 기본 규칙으로 다시 나눠 챕터/장면 수 비교. 다르면 경고 문구, 같으면 None."""
+    with open(output_path, 'r', encoding='utf-8') as f:
+        parsed = novel_import.split_manuscript(f.read(),
+                                               re.compile(constants.IMPORT_CHAPTER_PATTERN_DEFAULT, re.MULTILINE | re.IGNORECASE),
+                                               re.compile(constants.IMPORT_SCENE_SEPARATOR_DEFAULT, re.MULTILINE))
+    chapters, scenes = len(parsed), sum(len(chapter_scenes) for _, chapter_scenes in parsed)
+    if (chapters, scenes) == (stats["filled_chapters"], stats["scenes"]): return None
+    return (f"다시 가져오면 챕터 {chapters}개, 장면 {scenes}개로 나뉩니다 "
+            f"(원본: 챕터 {stats['filled_chapters']}개, 장면 {stats['scenes']}개). 장면 본문에 챕터 제목/구분선 모양의 줄이 있는지 확인해주세요.")
+
+def _scene_to_xhtml(scene_text):
+    """장면 텍스트 -> 문단(<p>) XHTML. 빈 줄은 문단 구분으로만 사용."""
+    return "".join(f"<p>{html.escape(line, quote=False)}</p>\n" for line in scene_text.split('\n') if line.strip())
+
+def _write_epub(novel_dir, tmp_path, stats):
+    """EPUB 3 기록: 챕터마다 XHTML 항목 하나를 열어 장면 단위로 흘려 쓰고, 목차/패키지 문서는 마지막에 기록."""
+    novel_title = _get_novel_title(novel_dir)
+    lang = constants.EXPORT_EPUB_LANGUAGE
+    chapters = [] # (항목 파일명, 챕터 제목)
+    with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=constants.EXPORT_EPUB_COMPRESS_LEVEL) as zf:
+        zf.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED) # 첫 항목, 무압축 필수
+        zf.writestr("META-INF/container.xml", _EPUB_CONTAINER_XML)
+        zf.writestr("OEBPS/style.css", _EPUB_STYLE_CSS)
+
+        for chapter_name, chapter_scenes in _iter_export_chapters(novel_dir, False, stats):
+            chapter_title = get_chapter_title(chapter_name)
+            item_name = f"chapter_{len(chapters) + 1:04d}.xhtml"
+            with zf.open(f"OEBPS/{item_name}", 'w') as entry:
+                entry.write(_EPUB_XHTML_HEAD.format(lang=lang, title=html.escape(chapter_title)).encode('utf-8'))
+                entry.write(f"<section epub:type=\"chapter\">\n<h2>{html.escape(chapter_title)}</h2>\n".encode('utf-8'))
+                first = True
+                for scene_content in chapter_scenes:
+                    scene_text = _scene_text(scene_content)
+                    if not scene_text: continue
+                    if not first: entry.write(b"<hr/>\n")
+                    entry.write(_scene_to_xhtml(scene_text).encode('utf-8'))
+                    first = False
+                    stats["scenes"] += 1
+                entry.write(("</section>\n" + _EPUB_XHTML_TAIL).encode('utf-8'))
+            chapters.append((item_name, chapter_title))
+
+        nav_items = "".join(f'      <li><a href="{item}">{html.escape(title)}</a></li>\n' for item, title in chapters)
+        zf.writestr("OEBPS/nav.xhtml",
+                    _EPUB_XHTML_HEAD.format(lang=lang, title=html.escape(novel_title))
+                    + f'<nav epub:type="toc" id="toc">\n  <h1>{html.escape(novel_title)}</h1>\n  <ol>\n{nav_items}  </ol>\n</nav>\n'
+                    + _EPUB_XHTML_TAIL)
+
+        manifest_items = "".join(f'    <item id="c{i}" href="{item}" media-type="application/xhtml+xml"/>\n' for i, (item, _) in enumerate(chapters, 1))
+        spine_items = "".join(f'    <itemref idref="c{i}"/>\n' for i in range(1, len(chapters) + 1))
+        modified = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        zf.writestr("OEBPS/content.opf", f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id" xml:lang="{lang}">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="book-id">urn:uuid:{uuid.uuid4()}</dc:identifier>
+    <dc:title>{html.escape(novel_title)}</dc:title>
+    <dc:language>{lang}</dc:language>
+    <meta property="dcterms:modified">{modified}</meta>
+  </metadata>
+  <manifest>
+    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>
+    <item id="css" href="style.css" media-type="text/css"/>
+{manifest_items}  </manifest>
+  <spine>
+{spine_items}  </spine>
+</package>
+""")
+    with open(tmp_path, 'rb+') as f: # zip 닫힌 뒤 디스크 반영
+        os.fsync(f.fileno())
+
+def export_novel(novel_dir, output_path, export_format=None):
+    """
+    소설을 TXT / Markdown / EPUB 원고 파일로 내보내기 (형식 미지정 시 확장자로 결정).
+    성공 시 (True, 메시지), 실패 시 (False, 메시지) 반환.
+    """
+    export_format = export_format or get_export_format(output_path)
+    if export_format not in (constants.EXPORT_FORMAT_TXT, constants.EXPORT_FORMAT_MARKDOWN, constants.EXPORT_FORMAT_EPUB):
+        return False, f"오류: 지원하지 않는 내보내기 형식입니다: '{os.path.basename(output_path)}'\n(.txt, .md, .epub 중 선택)"
+    if not file_handler.is_pack_path(novel_dir) and not os.path.isdir(novel_dir):
+        return False, f"오류: 소설 폴더 없음: '{novel_dir}'"
+
+    file_handler.flush_pending_writes()
+    novel_title = _get_novel_title(novel_dir)
+    stats = {"chapters": 0, "filled_chapters": 0, "scenes": 0, "errors": 0}
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    start_time = time.time()
+    try:
+        if export_format == constants.EXPORT_FORMAT_EPUB:
+            _write_epub(novel_dir, tmp_path, stats)
+        else:
+            _write_plain(novel_dir, tmp_path, export_format == constants.EXPORT_FORMAT_MARKDOWN, stats)
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        msg = f"오류: 원고 내보내기 실패:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg
+    finally:
+        if os.path.exists(tmp_path):
+            try: os.remove(tmp_path)
+            except OSError: pass
+
+    round_trip_warning = None
+    if export_format != constants.EXPORT_FORMAT_EPUB:
+        try: round_trip_warning = _check_round_trip(output_path, stats)
+        except (OSError, UnicodeDecodeError) as e: print(f"WARN: 내보낸 원고 재분할 확인 실패: {e}")
+
+    msg = f"'{novel_title}' 원고 내보내기 완료 ({export_format.upper()}, 챕터 {stats['chapters']}개, 장면 {stats['scenes']}개)."
+    if stats["errors"]:
+        msg += f"\n읽기 실패로 제외된 장면: {stats['errors']}개"
+    if round_trip_warning:
+        print(f"WARN: {round_trip_warning}")
+        msg += f"\n{round_trip_warning}"
+    print(f"✅ {msg} -> {output_path} ({time.time() - start_time:.2f}초)")
+    return True, msg
@@ -0,0 +1,141 @@
+# novel_import.py
+"""
+원고 일괄 가져오기 (기존 원고 -> Chapter_XXX/NNN.txt 구조의 새 소설).
+- 단일 텍스트 파일: 챕터 제목 줄과 장면 구분 줄(정규식, 설정 가능)로 나눔
+- 폴더: 항목 이름의 숫자 순서대로, 파일은 위와 같이 나누고(제목 줄이 없으면 파일 하나 = 챕터 하나),
+  하위 폴더는 챕터 하나(안의 파일들 = 장면들)로 취급
+- 실제 기록은 file_handler.create_novel_from_chapters (챕터 병렬 기록, 임시 폴더 후 일괄 이름 변경)
+"""
+import os
+import re
+import time
+
+import constants
+import file_handler
+
+_natural_key_pattern = re.compile(r"(\d+)")
+# 챕터 제목 줄에서 번호 부분 제거: '제 3 화: 만남' -> '만남', 'Chapter 3 - Title' -> 'Title'
+_heading_number_pattern = re.compile(r"^(?:제\s*\d+\s*[화장]|chapter\s+\d+|\d+\s*[화장])\s*[.:)\-_]?\s*", re.IGNORECASE)
+# 파일/폴더 이름에서 번호 부분 제거: '003_만남.txt' -> '만남', '제3화 만남' -> '만남'
+_name_number_pattern = re.compile(r"^(?:제\s*\d+\s*[화장]|chapter\s*\d+|\d+\s*[화장]|\d+(?=[\s.:)\-_]|$))\s*[.:)\-_]?\s*", re.IGNORECASE)
+
+
+def _natural_sort_key(name):
+    """'2화' < '10화' 가 되도록 숫자 부분을 정수로 비교."""
+    return [int(part) if part.isdigit() else part.lower() for part in _natural_key_pattern.split(name)]
+
+def _read_source_text(path):
+    """원고 파일 읽기 (UTF-8 -> CP949 순서로 시도, 줄바꿈 정규화)."""
+    last_error = None
+    for encoding in constants.IMPORT_SOURCE_ENCODINGS:
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                return f.read()
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise ValueError(f"텍스트 인코딩을 알 수 없습니다 ({os.path.basename(path)}): {last_error}")
+
+def _clean_chapter_title(heading_match):
+    """챕터 제목 줄 -> 제목 (번호/마크다운 기호 제거). 'title' 그룹이 있으면 그 값 사용."""
+    if 'title' in heading_match.re.groupindex:
+        return (heading_match.group('title') or "").strip()
+    title = heading_match.group(0).strip().lstrip('#').strip()
+    return _heading_number_pattern.sub("", title, count=1).strip()
+
+def split_scenes(text, scene_pattern):
+    """본문을 장면 구분 줄로 나눠 비어있지 않은 장면 목록 반환."""
+    scenes, start = [], 0
+    for match in scene_pattern.finditer(text):
+        scenes.append(text[start:match.start()])
+        start = match.end()
+    scenes.append(text[start:])
+    return [scene.strip() for scene in scenes if scene.strip()]
+
+def split_manuscript(text, chapter_pattern, scene_pattern):
+    """
+    원고 텍스트 -> [(챕터 제목, [장면 텍스트])]. 첫 제목 줄 앞의 내용은 제목 없는 챕터로 유지하되,
+    한 줄짜리면 책 제목(내보낸 TXT 원고의 첫 줄 등)으로 보고 버림.
+    장면이 하나도 없는 챕터(예: '# 책 제목' 줄)는 제외. 제목 줄이 하나도 없으면 (None, 장면들) 하나만 반환.
+    """
+    chapters = []
+    title, start = None, 0
+    for match in chapter_pattern.finditer(text):
+        chapters.append((title, split_scenes(text[start:match.start()], scene_pattern)))
+        title, start = _clean_chapter_title(match), match.end()
+    chapters.append((title, split_scenes(text[start:], scene_pattern)))
+    if len(chapters) > 1 and chapters[0][0] is None:
+        preface = chapters[0][1] # 제목 줄 앞의 서문
+        if len(preface) == 1 and '\n' not in preface[0]: preface = [] # 한 줄 = 책 제목
+        chapters[0] = ("", preface)
+    return [(chapter_title, scenes) for chapter_title, scenes in chapters if scenes]
+
+def _collect_folder_chapters(folder_path, chapter_pattern, scene_pattern):
+    """폴더 원고 -> [(챕터 제목, [장면 텍스트])] (항목 이름의 숫자 순서)."""
+    chapters = []
+    with os.scandir(folder_path) as entries:
+        items = sorted((entry for entry in entries if not entry.name.startswith('.')), key=lambda e: _natural_sort_key(e.name))
+    for entry in items:
+        if entry.is_dir():
+            scenes = []
+            with os.scandir(entry.path) as scene_entries:
+                scene_files = sorted((e for e in scene_entries if e.is_file() and e.name.lower().endswith(constants.IMPORT_SOURCE_EXTENSIONS)),
+                                     key=lambda e: _natural_sort_key(e.name))
+            for scene_entry in scene_files:
+                scenes.extend(split_scenes(_read_source_text(scene_entry.path), scene_pattern))
+            if scenes:
+                chapters.append((_name_number_pattern.sub("", entry.name, count=1).strip(), scenes))
+        elif entry.is_file() and entry.name.lower().endswith(constants.IMPORT_SOURCE_EXTENSIONS):
+            file_title = _name_number_pattern.sub("", os.path.splitext(entry.name)[0], count=1).strip()
+            for chapter_title, scenes in split_manuscript(_read_source_text(entry.path), chapter_pattern, scene_pattern):
+                chapters.append((file_title if chapter_title is None else chapter_title, scenes))
+    return chapters
+
+def _chapter_folder_name(chap_num, chapter_title):
+    """챕터 폴더명 'Chapter_NNN[_제목]' (제목은 IMPORT_CHAPTER_TITLE_MAX_CHARS 글자까지)."""
+    folder_name = f"Chapter_{chap_num:03d}"
+    title = file_handler.sanitize_filename(chapter_title[:constants.IMPORT_CHAPTER_TITLE_MAX_CHARS]) if chapter_title else ""
+    return f"{folder_name}_{title}" if title and title != "Untitled" else folder_name
+
+def _unique_novel_dir(base_dir, novel_name):
+    """같은 이름의 소설이 있으면 '이름_2', '이름_3' ... 중 비어 있는 경로 반환."""
+    novel_dir, suffix = os.path.join(base_dir, novel_name), 2
+    while os.path.exists(novel_dir):
+        novel_dir = os.path.join(base_dir, f"{novel_name}_{suffix}")
+        suffix += 1
+    return novel_dir
+
+def import_manuscript(source_path, novel_name_input, chapter_pattern=None, scene_separator=None, base_dir=None):
+    """
+    원고 파일/폴더를 새 소설로 가져오기. 패턴 미지정 시 constants의 기본 챕터/장면 구분 정규식 사용.
+    이름이 비어 있으면 원고 파일/폴더 이름을 쓰고, 같은 이름의 소설이 있으면 뒤에 번호를 붙임.
+    성공 시 (True, 메시지, 새 소설 경로), 실패 시 (False, 메시지, None) 반환.
+    """
+    start_time = time.time()
+    if not (novel_name_input or "").strip():
+        novel_name_input = os.path.splitext(os.path.basename(os.path.normpath(source_path)))[0]
+    novel_dir = _unique_novel_dir(base_dir or constants.BASE_SAVE_DIR, file_handler.sanitize_filename(novel_name_input))
+    try:
+        chapter_re = re.compile(chapter_pattern or constants.IMPORT_CHAPTER_PATTERN_DEFAULT, re.MULTILINE | re.IGNORECASE)
+        scene_re = re.compile(scene_separator or constants.IMPORT_SCENE_SEPARATOR_DEFAULT, re.MULTILINE)
+    except re.error as e:
+        return False, f"오류: 구분 정규식이 올바르지 않습니다:\n{e}", None
+
+    try:
+        if os.path.isdir(source_path):
+            parsed = _collect_folder_chapters(source_path, chapter_re, scene_re)
+        elif os.path.isfile(source_path):
+            parsed = split_manuscript(_read_source_text(source_path), chapter_re, scene_re)
+        else:
+            return False, f"오류: 가져올 원고 경로가 없습니다:\n'{source_path}'", None
+    except (OSError, ValueError) as e:
+        msg = f"오류: 원고 읽기 실패:\n{e}"
+        print(f"❌ {msg}")
+        return False, msg, None
+
+    chapters = []
+    for chap_num, (chapter_title, scenes) in enumerate(parsed, 1):
+        chapters.append((_chapter_folder_name(chap_num, chapter_title), {}, scenes))
+
+    success, message, novel_dir = file_handler.create_novel_from_chapters(novel_dir, {}, chapters)
+    if success: print(f"ℹ️ 원고 가져오기 소요: {time.time() - start_time:.2f}초 ({os.path.basename(source_path)})")
+    return success, message, novel_dir
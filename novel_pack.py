@@ -0,0 +1,141 @@
+# novel_pack.py
+"""
+단일 파일 소설 팩(.novelpack) 형식.
+
+구조: [매직 8바이트] [항목 데이터들...] [색인 JSON] [푸터: 색인 오프셋(8) + 색인 길이(8) + 매직(8)]
+- 항목 이름은 소설 폴더 기준 상대 경로 ('novel_settings.json', 'Chapter_001/001.txt' 등)
+- 읽기는 mmap 사용: 특정 장면을 읽을 때 해당 구간만 접근
+"""
+import os
+import json
+import mmap
+import struct
+import threading
+
+PACK_MAGIC = b"NOVELPK1"
+PACK_VERSION = 1
+_FOOTER_STRUCT = struct.Struct("<QQ8s") # 색인 오프셋, 색인 길이, 매직
+
+
+class NovelPackError(Exception):
+    """소설 팩 형식 오류"""
+    pass
+
+
+class NovelPackWriter:
+    """소설 팩 순차 기록기. 임시 파일에 쓰고 close() 시 원자적으로 교체."""
+
+    def __init__(self, pack_path, novel_name):
+        self.pack_path = pack_path
+        self.novel_name = novel_name
+        self._tmp_path = f"{pack_path}.{os.getpid()}.tmp"
+        self._entries = {} # 이름 -> [오프셋, 길이]
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(PACK_MAGIC)
+
+    def add_bytes(self, name, data):
+        """항목 추가 (같은 이름은 나중 값이 유효)."""
+        offset = self._file.tell()
+        self._file.write(data)
+        self._entries[name] = [offset, len(data)]
+
+    def add_text(self, name, text):
+        self.add_bytes(name, (text or "").encode('utf-8'))
+
+    def add_json(self, name, data):
+        self.add_bytes(name, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def close(self):
+        """색인과 푸터를 기록하고 팩 파일을 완성."""
+        index = {"version": PACK_VERSION, "novel_name": self.novel_name, "entries": self._entries}
+        index_bytes = json.dumps(index, ensure_ascii=False).encode('utf-8')
+        index_offset = self._file.tell()
+        self._file.write(index_bytes)
+        self._file.write(_FOOTER_STRUCT.pack(index_offset, len(index_bytes), PACK_MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.pack_path)
+
+    def abort(self):
+        """기록 중단 및 임시 파일 제거."""
+        try: self._file.close()
+        except OSError: pass
+        if os.path.exists(self._tmp_path):
+            try: os.remove(self._tmp_path)
+            except OSError: pass
+
+
+class NovelPack:
+    """읽기 전용 소설 팩 (mmap). 여러 스레드에서 동시에 읽어도 안전."""
+
+    def __init__(self, pack_path):
+        self.pack_path = pack_path
+        self._lock = threading.Lock()
+        self._file = open(pack_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # 빈 파일
+            self._file.close()
+            raise NovelPackError("빈 파일입니다.")
+        try:
+            self._load_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _load_index(self):
+        size = len(self._mm)
+        if size < len(PACK_MAGIC) + _FOOTER_STRUCT.size or self._mm[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise NovelPackError("소설 팩 형식이 아닙니다.")
+        index_offset, index_length, magic = _FOOTER_STRUCT.unpack(self._mm[size - _FOOTER_STRUCT.size:])
+        if magic != PACK_MAGIC or index_offset + index_length > size - _FOOTER_STRUCT.size:
+            raise NovelPackError("소설 팩 색인이 손상되었습니다.")
+        index = json.loads(self._mm[index_offset:index_offset + index_length].decode('utf-8'))
+        self.novel_name = index.get("novel_name", "")
+        self._entries = index.get("entries", {})
+        # 챕터별 장면 번호 목록 구성 ('Chapter_XXX/NNN.txt')
+        self._chapters = {}
+        for name in self._entries:
+            chapter_name, _, file_name = name.partition('/')
+            if not file_name: continue
+            scenes = self._chapters.setdefault(chapter_name, [])
+            stem, ext = os.path.splitext(file_name)
+            if ext.lower() == '.txt' and stem.isdigit():
+                scenes.append(int(stem))
+        for scenes in self._chapters.values(): scenes.sort()
+
+    def has_entry(self, name):
+        return name in self._entries
+
+    def read_bytes(self, name):
+        """항목 바이트 반환 (없으면 None). 해당 구간만 읽음."""
+        entry = self._entries.get(name)
+        if entry is None: return None
+        offset, length = entry
+        with self._lock:
+            return self._mm[offset:offset + length]
+
+    def read_text(self, name):
+        data = self.read_bytes(name)
+        return data.decode('utf-8', errors='replace') if data is not None else None
+
+    def read_json(self, name):
+        data = self.read_bytes(name)
+        return json.loads(data.decode('utf-8')) if data is not None else None
+
+    def list_chapters(self):
+        """챕터 폴더명 목록 (이름순)."""
+        return sorted(self._chapters)
+
+    def list_scenes(self, chapter_name):
+        """챕터 내 장면 번호 목록 (번호순)."""
+        return list(self._chapters.get(chapter_name, []))
+
+    def close(self):
+        with self._lock:
+            try:
+                if getattr(self, '_mm', None) is not None: self._mm.close()
+            finally:
+                self._mm = None
+                self._file.close()
@@ -0,0 +1,402 @@
+# search_index.py
+"""
+전체 소설 전문 검색 색인 (SQLite).
+- 형태소 분석기 없이 문자 2-gram 역색인 사용: 조사/어미가 붙은 한국어도 부분 문자열로 검색됨
+- 색인 대상: 장면 내용(NNN.txt), 소설 설정, 챕터 아크 설정, 장면 플롯 (숨김 폴더/소설 팩 제외)
+- file_handler 변경 알림으로 바뀐 경로만 백그라운드에서 갱신, 시작 시 수정 시각/크기 비교로 동기화
+"""
+import os
+import re
+import json
+import sqlite3
+import threading
+import traceback
+import unicodedata
+
+import constants
+import file_handler
+
+DOC_KIND_SCENE = "scene"
+DOC_KIND_NOVEL_SETTINGS = "novel_settings"
+DOC_KIND_CHAPTER_SETTINGS = "chapter_settings"
+DOC_KIND_SCENE_SETTINGS = "scene_settings"
+
+_chapter_folder_pattern = re.compile(r"^Chapter_(\d+)(?:_.*)?$", re.IGNORECASE)
+_scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
+_scene_settings_pattern = re.compile(r"^(\d+)_settings\.json$", re.IGNORECASE)
+
+
+def normalize_text(text):
+    """검색용 정규화: NFC (자모 분리 입력 통합) + 대소문자 무시."""
+    return unicodedata.normalize('NFC', text or "").casefold()
+
+
+def _text_grams(normalized_text):
+    """문자 2-gram 집합. 공백으로 시작하는 gram은 제외하고, 끝에 줄바꿈을 붙여 모든 글자가 gram의 첫 글자가 되도록 함."""
+    padded = normalized_text + "\n"
+    return {padded[i:i + 2] for i in range(len(padded) - 1) if not padded[i].isspace()}
+
+
+def get_doc_kind(base_dir, path):
+    """색인 대상 파일이면 문서 종류, 아니면 None."""
+    rel_parts = os.path.relpath(path, base_dir).split(os.sep)
+    if rel_parts[0] == os.pardir or any(part.startswith('.') for part in rel_parts): return None
+    if len(rel_parts) == 2 and rel_parts[1] == constants.NOVEL_SETTINGS_FILENAME: return DOC_KIND_NOVEL_SETTINGS
+    if len(rel_parts) != 3 or not _chapter_folder_pattern.match(rel_parts[1]): return None
+    file_name = rel_parts[2]
+    if _scene_file_pattern.match(file_name): return DOC_KIND_SCENE
+    if file_name == constants.CHAPTER_SETTINGS_FILENAME: return DOC_KIND_CHAPTER_SETTINGS
+    if file_name == constants.CHAPTER_MANIFEST_FILENAME or _scene_settings_pattern.match(file_name): return DOC_KIND_SCENE_SETTINGS
+    return None
+
+
+def _read_doc_text(path, kind):
+    """문서 원문 (설정 파일은 검색 대상 키의 값만 줄 단위로)."""
+    if kind == DOC_KIND_SCENE:
+        return file_handler.read_scene_file_text(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict): return ""
+    if kind == DOC_KIND_NOVEL_SETTINGS:
+        keys = constants.NOVEL_LEVEL_SETTINGS
+    elif kind == DOC_KIND_CHAPTER_SETTINGS:
+        keys = constants.CHAPTER_LEVEL_SETTINGS
+    elif os.path.basename(path) == constants.CHAPTER_MANIFEST_FILENAME:
+        # 매니페스트: 장면별 플롯 앞에 장면 번호 표시
+        lines = []
+        for scene_key, scene_data in sorted(data.get("scenes", {}).items(), key=lambda item: int(item[0]) if item[0].isdigit() else 0):
+            for key in constants.SCENE_SPECIFIC_SETTINGS:
+                value = scene_data.get(key) if isinstance(scene_data, dict) else None
+                if isinstance(value, str) and value.strip():
+                    lines.extend(f"[{scene_key}장면] {line}" for line in value.splitlines())
+        return "\n".join(lines)
+    else:
+        keys = constants.SCENE_SPECIFIC_SETTINGS
+    return "\n".join(data[key] for key in keys if isinstance(data.get(key), str))
+
+
+class SearchIndex:
+    """저장 폴더 전체에 대한 문자 2-gram 역색인. 검색은 여러 스레드에서 호출 가능."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS docs (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            grams TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            gram TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            PRIMARY KEY (gram, doc_id)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, base_dir, db_path=None):
+        self.base_dir_arg = base_dir # 결과 경로는 트리뷰 iid와 같은 형식 (base_dir 기준 경로)
+        self.base_dir = os.path.abspath(base_dir)
+        self.db_path = db_path or os.path.join(self.base_dir, constants.SEARCH_INDEX_FILENAME)
+        self._lock = threading.RLock()
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._reset_if_outdated()
+        self._conn.executescript(self._SCHEMA)
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(constants.SEARCH_INDEX_VERSION),))
+        self._conn.commit()
+
+        self._pending_paths = set()
+        self._pending_full_sync = False
+        self._condition = threading.Condition()
+        self._worker = None
+        self._busy = False
+        self._closed = False
+        print(f"✅ 검색 색인 열림: {self.db_path}")
+
+    def _reset_if_outdated(self):
+        """색인 형식 버전이 다르면 전체 재구축 (색인은 원본에서 언제든 다시 만들 수 있음)."""
+        try:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.OperationalError:
+            return # 새 DB
+        if row and row[0] == str(constants.SEARCH_INDEX_VERSION): return
+        print("ℹ️ 검색 색인 형식 변경 -> 재구축")
+        self._conn.executescript("DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS meta;")
+
+    # --- 백그라운드 갱신 ---
+    def start(self):
+        """변경 알림 등록 및 백그라운드 갱신 스레드 시작 (시작 시 전체 동기화 1회)."""
+        file_handler.add_content_change_listener(self.notify_changed)
+        with self._condition:
+            self._pending_full_sync = True
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._worker_loop, name="SearchIndexWorker", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def notify_changed(self, path):
+        """파일/폴더 변경 알림 (file_handler에서 호출). 실제 갱신은 백그라운드에서."""
+        abs_path = os.path.abspath(path)
+        try:
+            if os.path.commonpath([abs_path, self.base_dir]) != self.base_dir: return
+        except ValueError: # 다른 드라이브 (Windows)
+            return
+        with self._condition:
+            self._pending_paths.add(abs_path)
+            self._condition.notify()
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self._pending_paths and not self._pending_full_sync:
+                    self._condition.wait()
+                if self._closed: return
+                full_sync = self._pending_full_sync
+                paths = self._pending_paths
+                self._pending_full_sync = False
+                self._pending_paths = set()
+                self._busy = True
+            try:
+                if full_sync:
+                    self.sync_all()
+                for path in sorted(paths):
+                    self.update_path(path)
+            except Exception as e:
+                print(f"ERROR: 검색 색인 갱신 오류: {e}")
+                traceback.print_exc()
+            finally:
+                with self._condition:
+                    self._busy = False
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        with self._lock:
+            self._conn.close()
+
+    # --- 색인 갱신 ---
+    def update_path(self, path):
+        """경로 하나 갱신: 파일이면 다시 색인, 폴더면 하위 동기화, 없으면 해당 경로(하위 포함) 색인 제거."""
+        abs_path = os.path.abspath(path)
+        if os.path.isdir(abs_path):
+            self._sync_tree(abs_path)
+        elif os.path.isfile(abs_path):
+            kind = get_doc_kind(self.base_dir, abs_path)
+            if kind: self._index_file(abs_path, kind, os.stat(abs_path))
+        else:
+            with self._lock:
+                rel_path = self._rel(abs_path)
+                rows = self._conn.execute("SELECT id, grams FROM docs WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                                          (rel_path, self._like_prefix(rel_path))).fetchall()
+                for doc_id, grams in rows:
+                    self._remove_doc(doc_id, grams)
+                self._conn.commit()
+
+    def sync_all(self):
+        """저장 폴더 전체를 색인과 비교해 바뀐 파일만 갱신."""
+        indexed, removed = self._sync_tree(self.base_dir)
+        print(f"✅ 검색 색인 동기화 완료 (갱신 {indexed}개, 제거 {removed}개)")
+
+    def _sync_tree(self, root_dir):
+        """root_dir 하위 파일을 수정 시각/크기로 비교해 갱신. (갱신 수, 제거 수) 반환."""
+        found = {}
+        for dir_path, dir_names, file_names in os.walk(root_dir):
+            dir_names[:] = [d for d in dir_names if not d.startswith('.')] # 휴지통/기록/브랜치 보관 폴더 제외
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                kind = get_doc_kind(self.base_dir, path)
+                if kind: found[self._rel(path)] = kind
+
+        with self._lock:
+            if root_dir == self.base_dir:
+                rows = self._conn.execute("SELECT id, path, mtime_ns, size, grams FROM docs").fetchall()
+            else:
+                rows = self._conn.execute("SELECT id, path, mtime_ns, size, grams FROM docs WHERE path LIKE ? ESCAPE '\\'",
+                                          (self._like_prefix(self._rel(root_dir)),)).fetchall()
+        known = {path: (mtime_ns, size) for _, path, mtime_ns, size, _ in rows}
+
+        removed = 0
+        with self._lock:
+            for doc_id, path, _, _, grams in rows:
+                if path not in found:
+                    self._remove_doc(doc_id, grams)
+                    removed += 1
+            self._conn.commit()
+
+        indexed = 0
+        for rel_path, kind in found.items():
+            try:
+                stat_result = os.stat(os.path.join(self.base_dir, rel_path))
+            except OSError:
+                continue
+            if known.get(rel_path) == (stat_result.st_mtime_ns, stat_result.st_size): continue
+            if self._index_file(os.path.join(self.base_dir, rel_path), kind, stat_result): indexed += 1
+        return indexed, removed
+
+    def _index_file(self, path, kind, stat_result):
+        """파일 하나를 읽어 색인 (바뀐 gram만 추가/제거). 성공 시 True."""
+        try:
+            content = unicodedata.normalize('NFC', _read_doc_text(path, kind))
+        except Exception as e:
+            print(f"WARN: 검색 색인 - 파일 읽기 실패 ({path}): {e}")
+            return False
+        new_grams = _text_grams(normalize_text(content))
+        path = self._rel(path)
+        with self._lock:
+            row = self._conn.execute("SELECT id, grams FROM docs WHERE path = ?", (path,)).fetchone()
+            if row:
+                doc_id, old_grams_text = row
+                old_grams = self._split_grams(old_grams_text)
+                self._conn.executemany("DELETE FROM postings WHERE gram = ? AND doc_id = ?", ((gram, doc_id) for gram in old_grams - new_grams))
+                self._conn.executemany("INSERT OR IGNORE INTO postings (gram, doc_id) VALUES (?, ?)", ((gram, doc_id) for gram in sorted(new_grams - old_grams)))
+                self._conn.execute("UPDATE docs SET kind = ?, mtime_ns = ?, size = ?, content = ?, grams = ? WHERE id = ?",
+                                   (kind, stat_result.st_mtime_ns, stat_result.st_size, content, "".join(new_grams), doc_id))
+            else:
+                cursor = self._conn.execute("INSERT INTO docs (path, kind, mtime_ns, size, content, grams) VALUES (?, ?, ?, ?, ?, ?)",
+                                            (path, kind, stat_result.st_mtime_ns, stat_result.st_size, content, "".join(new_grams)))
+                doc_id = cursor.lastrowid
+                self._conn.executemany("INSERT OR IGNORE INTO postings (gram, doc_id) VALUES (?, ?)", ((gram, doc_id) for gram in sorted(new_grams))) # 정렬 삽입: B-tree 지역성
+            self._conn.commit()
+        return True
+
+    def _remove_doc(self, doc_id, grams_text):
+        self._conn.executemany("DELETE FROM postings WHERE gram = ? AND doc_id = ?", ((gram, doc_id) for gram in self._split_grams(grams_text)))
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def _rel(self, abs_path):
+        """색인에 저장하는 경로 (저장 폴더 기준 상대 경로, 저장 폴더를 옮겨도 색인 유지)."""
+        return os.path.relpath(abs_path, self.base_dir)
+
+    @staticmethod
+    def _split_grams(grams_text):
+        return {grams_text[i:i + 2] for i in range(0, len(grams_text), 2)}
+
+    @staticmethod
+    def _like_prefix(dir_path):
+        escaped = dir_path.rstrip(os.sep).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + ('\\\\' if os.sep == '\\' else os.sep) + '%'
+
+    # --- 검색 ---
+    def _candidate_doc_ids(self, term):
+        """검색어(정규화됨) 하나를 포함할 수 있는 문서 ID 집합 (gram 교집합, 적은 목록부터).
+        공백으로 시작하는 gram은 색인하지 않으므로 검색어에서도 제외."""
+        grams = {term[i:i + 2] for i in range(len(term) - 1) if not term[i].isspace()}
+        if not grams: # 한 글자 (또는 '글자+공백'): 그 글자로 시작하는 모든 gram
+            first_char = term.strip()[:1]
+            rows = self._conn.execute("SELECT DISTINCT doc_id FROM postings WHERE gram >= ? AND gram < ?",
+                                      (first_char, first_char + "\U0010ffff")).fetchall()
+            return {row[0] for row in rows}
+        posting_sets = []
+        for gram in grams:
+            posting_sets.append({row[0] for row in self._conn.execute("SELECT doc_id FROM postings WHERE gram = ?", (gram,))})
+            if not posting_sets[-1]: return set()
+        posting_sets.sort(key=len)
+        return set.intersection(*posting_sets)
+
+    def candidate_paths(self, text, under_dir):
+        """under_dir 아래에서 text(공백 포함 가능)를 포함할 수 있는 문서 경로 목록 (찾아 바꾸기 후보).
+        색인에 없는 파일은 포함되지 않으므로, 동기화가 끝난 색인에서만 사용."""
+        term = normalize_text(text)
+        if not term.strip(): return None
+        prefix = self._rel(os.path.abspath(under_dir))
+        with self._lock:
+            doc_ids = list(self._candidate_doc_ids(term))
+            rows = []
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start:start + 500]
+                rows.extend(self._conn.execute(f"SELECT path, content FROM docs WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        return [os.path.join(self.base_dir_arg, path) for path, content in rows
+                if path.startswith(prefix + os.sep) and term in normalize_text(content)]
+
+    def is_synced(self):
+        """시작 동기화와 대기 중인 갱신이 모두 끝났는지."""
+        with self._condition:
+            return self._worker is not None and not self._pending_full_sync and not self._pending_paths and not self._busy
+
+    def search(self, query, max_line_hits=None):
+        """검색어(공백으로 구분된 단어 모두 포함)가 있는 문서와 줄 목록.
+        [{"path", "kind", "hits": [(줄 번호, 미리보기)]}] 를 경로순으로 반환."""
+        max_line_hits = max_line_hits or constants.SEARCH_MAX_LINE_HITS
+        terms = [term for term in normalize_text(query).split() if term]
+        if not terms: return []
+        # 대소문자 구분이 없는 단어(한글/숫자 등)는 원문에서 바로 찾을 수 있으므로 SQL에서 걸러냄
+        caseless_terms = [term for term in terms if term.upper() == term]
+        needs_casefold = len(caseless_terms) < len(terms)
+
+        with self._lock:
+            doc_ids = None
+            for term in sorted(terms, key=len, reverse=True): # 긴 단어일수록 후보가 적음
+                term_ids = self._candidate_doc_ids(term)
+                doc_ids = term_ids if doc_ids is None else doc_ids & term_ids
+                if not doc_ids: return []
+            rows = []
+            doc_id_list = list(doc_ids)
+            instr_sql = "".join(" AND instr(content, ?) > 0" for _ in caseless_terms)
+            for start in range(0, len(doc_id_list), 500): # SQLite 변수 개수 제한
+                chunk = doc_id_list[start:start + 500]
+                rows.extend(self._conn.execute(f"SELECT path, kind, content FROM docs WHERE id IN ({','.join('?' * len(chunk))}){instr_sql}",
+                                               chunk + caseless_terms).fetchall())
+
+        results = []
+        line_hit_count = 0
+        for path, kind, content in sorted(rows):
+            search_text = normalize_text(content) if needs_casefold else content
+            if needs_casefold and not all(term in search_text for term in terms): continue # gram 후보 중 실제 포함 문서만
+            hits = self._find_hit_lines(content, search_text, terms, max_line_hits - line_hit_count)
+            line_hit_count += len(hits)
+            results.append({"path": os.path.join(self.base_dir_arg, path), "kind": kind, "hits": hits})
+            if line_hit_count >= max_line_hits:
+                print(f"ℹ️ 검색 결과 줄 수 제한({max_line_hits}) 도달. 나머지 생략.")
+                break
+        return results
+
+    def _find_hit_lines(self, content, search_text, terms, limit):
+        """일치 위치가 있는 줄만 찾아 [(줄 번호, 미리보기)] 반환 (줄 단위 전체 정규화 없이)."""
+        if len(search_text) != len(content): # 정규화로 길이가 바뀐 드문 경우: 줄 단위로 비교
+            hits = []
+            for line_no, line in enumerate(content.split("\n"), start=1):
+                normalized_line = normalize_text(line)
+                if any(term in normalized_line for term in terms):
+                    hits.append((line_no, self._make_snippet(line, normalized_line, terms)))
+                    if len(hits) >= limit: break
+            return hits
+
+        positions = set()
+        for term in terms:
+            pos = search_text.find(term)
+            while pos >= 0:
+                positions.add(pos)
+                pos = search_text.find(term, pos + 1)
+        hits = []
+        line_no, counted_upto, last_line_start = 1, 0, -1
+        for pos in sorted(positions):
+            line_no += content.count("\n", counted_upto, pos)
+            counted_upto = pos
+            line_start = content.rfind("\n", 0, pos) + 1
+            if line_start == last_line_start: continue # 같은 줄의 다른 일치
+            last_line_start = line_start
+            line_end = content.find("\n", pos)
+            if line_end < 0: line_end = len(content)
+            hits.append((line_no, self._make_snippet(content[line_start:line_end], search_text[line_start:line_end], terms)))
+            if len(hits) >= limit: break
+        return hits
+
+    @staticmethod
+    def _make_snippet(line, normalized_line, terms):
+        """첫 일치 위치 주변의 줄 미리보기."""
+        length = constants.SEARCH_SNIPPET_LENGTH
+        text = line.strip()
+        if len(text) <= length: return text
+        positions = [normalized_line.strip().find(term) for term in terms]
+        first = min((pos for pos in positions if pos >= 0), default=0)
+        start = max(0, min(first - length // 3, len(text) - length))
+        return ("…" if start > 0 else "") + text[start:start + length] + ("…" if start + length < len(text) else "")
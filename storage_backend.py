@@ -0,0 +1,466 @@
+# storage_backend.py
+"""
+소설 데이터 저장소 인터페이스 및 구현.
+- FolderStorage: 기존 novels_data/<소설>/Chapter_XXX/NNN.txt 폴더 구조 (file_handler 위임)
+- SQLiteStorage: 단일 SQLite DB 파일 (WAL 모드, 소설/챕터/장면 인덱스)
+두 저장소 간 가져오기/내보내기는 copy_novel() 로 처리.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import traceback
+import contextlib
+
+import constants
+import file_handler
+
+STORAGE_BACKEND_FOLDER = "folder"
+STORAGE_BACKEND_SQLITE = "sqlite"
+COPY_STAGING_SUFFIX = "_copying" # 저장소 복사 중인 소설의 임시 이름 접미사 (끝까지 쓴 뒤 원래 이름으로 교체)
+
+_chapter_folder_pattern = re.compile(r"^Chapter_(\d+)(?:_.*)?$", re.IGNORECASE)
+_scene_file_pattern = re.compile(r"^(\d+)\.txt$", re.IGNORECASE)
+
+
+def _get_chapter_number(chapter_name):
+    """챕터 폴더명(Chapter_XXX[_제목])에서 번호 추출. 실패 시 0."""
+    match = _chapter_folder_pattern.match(chapter_name or "")
+    return int(match.group(1)) if match else 0
+
+def check_entry_name(name, kind="이름"):
+    """소설/챕터 이름이 폴더 하나로 쓸 수 있는 이름인지 확인 (경로 구분자, '..', 숨김/빈 이름 거부). 아니면 ValueError."""
+    if (not isinstance(name, str) or not name.strip() or name.startswith('.') or '\0' in name
+            or '/' in name or '\\' in name or (os.altsep and os.altsep in name) or os.path.isabs(name)):
+        raise ValueError(f"폴더로 쓸 수 없는 {kind}: {name!r}")
+    return name
+
+
+class NovelStorage:
+    """소설 저장소 공통 인터페이스. 챕터는 폴더명(Chapter_XXX[_제목]), 장면은 번호(int)로 식별."""
+
+    backend_type = None
+
+    def list_novels(self):
+        """소설 이름 목록 (이름순)."""
+        raise NotImplementedError
+
+    def list_chapters(self, novel_name):
+        """[(챕터 번호, 챕터 폴더명)] 목록 (번호순)."""
+        raise NotImplementedError
+
+    def list_scenes(self, novel_name, chapter_name):
+        """장면 번호 목록 (번호순)."""
+        raise NotImplementedError
+
+    def load_novel_settings(self, novel_name):
+        raise NotImplementedError
+
+    def save_novel_settings(self, novel_name, settings_data):
+        raise NotImplementedError
+
+    def load_chapter_settings(self, novel_name, chapter_name):
+        raise NotImplementedError
+
+    def save_chapter_settings(self, novel_name, chapter_name, settings_data):
+        raise NotImplementedError
+
+    def load_scene(self, novel_name, chapter_name, scene_number):
+        """(장면 내용, 장면 설정 dict) 반환."""
+        raise NotImplementedError
+
+    def save_scene(self, novel_name, chapter_name, scene_number, content, settings_data):
+        """장면 내용과 설정을 함께 저장. 성공 시 True."""
+        raise NotImplementedError
+
+    def delete_scene(self, novel_name, chapter_name, scene_number):
+        raise NotImplementedError
+
+    def delete_novel(self, novel_name):
+        """소설 하나의 모든 챕터/장면 삭제."""
+        raise NotImplementedError
+
+    def replace_novel(self, staged_name, novel_name):
+        """staged_name 소설을 novel_name으로 바꿔 넣음 (기존 novel_name은 삭제). 덮어쓰기 복사의 마지막 단계. 실패 시 예외."""
+        raise NotImplementedError
+
+    def get_token_totals(self, novel_name):
+        """소설 전체 토큰 합계 {'scenes': n, input_tokens: n, output_tokens: n} 반환."""
+        totals = {'scenes': 0, constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
+        for _, chapter_name in self.list_chapters(novel_name):
+            for scene_number in self.list_scenes(novel_name, chapter_name):
+                _, settings = self.load_scene(novel_name, chapter_name, scene_number)
+                token_info = settings.get(constants.TOKEN_INFO_KEY, {})
+                totals['scenes'] += 1
+                totals[constants.INPUT_TOKEN_KEY] += token_info.get(constants.INPUT_TOKEN_KEY, 0)
+                totals[constants.OUTPUT_TOKEN_KEY] += token_info.get(constants.OUTPUT_TOKEN_KEY, 0)
+        return totals
+
+    def close(self):
+        pass
+
+
+class FolderStorage(NovelStorage):
+    """기존 폴더/파일 구조 저장소 (file_handler 함수 위임)."""
+
+    backend_type = STORAGE_BACKEND_FOLDER
+
+    def __init__(self, base_dir=constants.BASE_SAVE_DIR):
+        self.base_dir = base_dir
+
+    def _novel_dir(self, novel_name):
+        return os.path.join(self.base_dir, check_entry_name(novel_name, "소설 이름"))
+
+    def _chapter_dir(self, novel_name, chapter_name):
+        return os.path.join(self._novel_dir(novel_name), check_entry_name(chapter_name, "챕터 이름"))
+
+    def list_novels(self):
+        if not os.path.isdir(self.base_dir): return []
+        with os.scandir(self.base_dir) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and not entry.name.startswith('.')) # .trash 등 숨김 폴더 제외
+
+    def list_chapters(self, novel_name):
+        novel_dir = self._novel_dir(novel_name)
+        if file_handler.is_pack_path(novel_dir): # 읽기 전용 소설 팩
+            return [(chap_num, chapter_name) for chap_num, chapter_name, _ in file_handler.list_novel_pack_contents(novel_dir)]
+        if not os.path.isdir(novel_dir): return []
+        chapters = []
+        with os.scandir(novel_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and _chapter_folder_pattern.match(entry.name):
+                    chapters.append((_get_chapter_number(entry.name), entry.name))
+        return sorted(chapters)
+
+    def list_scenes(self, novel_name, chapter_name):
+        chapter_dir = self._chapter_dir(novel_name, chapter_name)
+        if file_handler.is_pack_path(chapter_dir):
+            for _, pack_chapter_name, scene_numbers in file_handler.list_novel_pack_contents(self._novel_dir(novel_name)):
+                if pack_chapter_name == chapter_name: return scene_numbers
+            return []
+        if not os.path.isdir(chapter_dir): return []
+        scenes = []
+        with os.scandir(chapter_dir) as entries:
+            for entry in entries:
+                match = _scene_file_pattern.match(entry.name) if entry.is_file() else None
+                if match: scenes.append(int(match.group(1)))
+        return sorted(scenes)
+
+    def load_novel_settings(self, novel_name):
+        return file_handler.load_novel_settings(self._novel_dir(novel_name))
+
+    def save_novel_settings(self, novel_name, settings_data):
+        return file_handler.save_novel_settings(self._novel_dir(novel_name), settings_data)
+
+    def load_chapter_settings(self, novel_name, chapter_name):
+        return file_handler.load_chapter_settings(self._chapter_dir(novel_name, chapter_name))
+
+    def save_chapter_settings(self, novel_name, chapter_name, settings_data):
+        return file_handler.save_chapter_settings(self._chapter_dir(novel_name, chapter_name), settings_data)
+
+    def load_scene(self, novel_name, chapter_name, scene_number):
+        chapter_dir = self._chapter_dir(novel_name, chapter_name)
+        return (file_handler.load_scene_content(chapter_dir, scene_number),
+                file_handler.load_scene_settings(chapter_dir, scene_number))
+
+    def save_scene(self, novel_name, chapter_name, scene_number, content, settings_data):
+        # 폴더 구조에서는 파일 간 트랜잭션이 없으므로 내용 -> 설정 순서로 저장
+        chapter_dir = self._chapter_dir(novel_name, chapter_name)
+        if not file_handler.save_scene_content(chapter_dir, scene_number, content):
+            return False
+        return file_handler.save_scene_settings(chapter_dir, scene_number, settings_data)
+
+    def delete_scene(self, novel_name, chapter_name, scene_number):
+        return file_handler.delete_scene_files(self._chapter_dir(novel_name, chapter_name), scene_number)
+
+    def delete_novel(self, novel_name):
+        success, message = file_handler.delete_novel_folder(self._novel_dir(novel_name)) # 휴지통으로 이동
+        if not success: raise OSError(message)
+        return True
+
+    def replace_novel(self, staged_name, novel_name):
+        success, message = file_handler.replace_novel_folder(self._novel_dir(staged_name), self._novel_dir(novel_name)) # 기존은 휴지통으로
+        if not success: raise OSError(message)
+        return True
+
+    def get_token_totals(self, novel_name):
+        # 챕터 매니페스트를 한 번씩만 읽어 합산 (장면 내용은 읽지 않음)
+        totals = {'scenes': 0, constants.INPUT_TOKEN_KEY: 0, constants.OUTPUT_TOKEN_KEY: 0}
+        for _, chapter_name in self.list_chapters(novel_name):
+            chapter_dir = self._chapter_dir(novel_name, chapter_name)
+            all_settings = file_handler.load_chapter_scene_settings_all(chapter_dir)
+            for scene_number in self.list_scenes(novel_name, chapter_name):
+                token_info = all_settings.get(scene_number, {}).get(constants.TOKEN_INFO_KEY, {})
+                totals['scenes'] += 1
+                totals[constants.INPUT_TOKEN_KEY] += token_info.get(constants.INPUT_TOKEN_KEY, 0)
+                totals[constants.OUTPUT_TOKEN_KEY] += token_info.get(constants.OUTPUT_TOKEN_KEY, 0)
+        return totals
+
+
+class SQLiteStorage(NovelStorage):
+    """단일 SQLite DB 저장소. WAL 모드, 장면 내용+설정은 한 트랜잭션으로 저장."""
+
+    backend_type = STORAGE_BACKEND_SQLITE
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS novels (
+            name TEXT PRIMARY KEY,
+            settings_json TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE TABLE IF NOT EXISTS chapters (
+            novel TEXT NOT NULL REFERENCES novels(name) ON DELETE CASCADE ON UPDATE CASCADE,
+            name TEXT NOT NULL,
+            number INTEGER NOT NULL,
+            settings_json TEXT NOT NULL DEFAULT '{}',
+            PRIMARY KEY (novel, name)
+        );
+        CREATE TABLE IF NOT EXISTS scenes (
+            novel TEXT NOT NULL,
+            chapter TEXT NOT NULL,
+            number INTEGER NOT NULL,
+            content TEXT NOT NULL DEFAULT '',
+            settings_json TEXT NOT NULL DEFAULT '{}',
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (novel, chapter, number),
+            FOREIGN KEY (novel, chapter) REFERENCES chapters(novel, name) ON DELETE CASCADE ON UPDATE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS idx_chapters_novel_number ON chapters(novel, number);
+        CREATE INDEX IF NOT EXISTS idx_scenes_novel ON scenes(novel);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir: os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self._SCHEMA)
+        self._conn.commit()
+        print(f"✅ SQLite 저장소 열림: {db_path}")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """여러 쓰기를 하나의 트랜잭션으로 묶음 (예외 시 롤백)."""
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _ensure_chapter(self, conn, novel_name, chapter_name):
+        conn.execute("INSERT OR IGNORE INTO novels (name) VALUES (?)", (novel_name,))
+        conn.execute("INSERT OR IGNORE INTO chapters (novel, name, number) VALUES (?, ?, ?)",
+                     (novel_name, chapter_name, _get_chapter_number(chapter_name)))
+
+    def list_novels(self):
+        return [row[0] for row in self._query("SELECT name FROM novels ORDER BY name")]
+
+    def list_chapters(self, novel_name):
+        return [(row[0], row[1]) for row in self._query(
+            "SELECT number, name FROM chapters WHERE novel = ? ORDER BY number, name", (novel_name,))]
+
+    def list_scenes(self, novel_name, chapter_name):
+        return [row[0] for row in self._query(
+            "SELECT number FROM scenes WHERE novel = ? AND chapter = ? ORDER BY number", (novel_name, chapter_name))]
+
+    def load_novel_settings(self, novel_name):
+        rows = self._query("SELECT settings_json FROM novels WHERE name = ?", (novel_name,))
+        data = json.loads(rows[0][0]) if rows else {}
+        return {key: data.get(key, "") for key in constants.NOVEL_LEVEL_SETTINGS}
+
+    def save_novel_settings(self, novel_name, settings_data):
+        data = {key: settings_data.get(key, "") for key in constants.NOVEL_SETTING_KEYS_TO_SAVE}
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO novels (name, settings_json) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET settings_json = excluded.settings_json",
+                         (novel_name, json.dumps(data, ensure_ascii=False)))
+        return True
+
+    def load_chapter_settings(self, novel_name, chapter_name):
+        rows = self._query("SELECT settings_json FROM chapters WHERE novel = ? AND name = ?", (novel_name, chapter_name))
+        data = json.loads(rows[0][0]) if rows else {}
+        return {key: data.get(key, "") for key in constants.CHAPTER_LEVEL_SETTINGS}
+
+    def save_chapter_settings(self, novel_name, chapter_name, settings_data):
+        data = {key: settings_data.get(key, "") for key in constants.CHAPTER_SETTING_KEYS_TO_SAVE}
+        with self.transaction() as conn:
+            self._ensure_chapter(conn, novel_name, chapter_name)
+            conn.execute("UPDATE chapters SET settings_json = ? WHERE novel = ? AND name = ?",
+                         (json.dumps(data, ensure_ascii=False), novel_name, chapter_name))
+        return True
+
+    def load_scene(self, novel_name, chapter_name, scene_number):
+        rows = self._query("SELECT content, settings_json FROM scenes WHERE novel = ? AND chapter = ? AND number = ?",
+                           (novel_name, chapter_name, scene_number))
+        if not rows:
+            return "", file_handler.normalize_scene_settings(None)
+        return rows[0][0], file_handler.normalize_scene_settings(json.loads(rows[0][1]))
+
+    def _write_scene(self, conn, novel_name, chapter_name, scene_number, content, settings_data):
+        settings = file_handler.normalize_scene_settings(settings_data)
+        token_info = settings[constants.TOKEN_INFO_KEY]
+        conn.execute(
+            "INSERT INTO scenes (novel, chapter, number, content, settings_json, input_tokens, output_tokens, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(novel, chapter, number) DO UPDATE SET content = excluded.content, "
+            "settings_json = excluded.settings_json, input_tokens = excluded.input_tokens, "
+            "output_tokens = excluded.output_tokens, updated_at = excluded.updated_at",
+            (novel_name, chapter_name, scene_number, content if content is not None else "",
+             json.dumps(settings, ensure_ascii=False), token_info[constants.INPUT_TOKEN_KEY],
+             token_info[constants.OUTPUT_TOKEN_KEY], time.time()))
+
+    def save_scene(self, novel_name, chapter_name, scene_number, content, settings_data):
+        with self.transaction() as conn:
+            self._ensure_chapter(conn, novel_name, chapter_name)
+            self._write_scene(conn, novel_name, chapter_name, scene_number, content, settings_data)
+        return True
+
+    def save_scenes(self, novel_name, chapter_name, scenes):
+        """여러 장면 [(번호, 내용, 설정)]을 하나의 트랜잭션으로 저장."""
+        with self.transaction() as conn:
+            self._ensure_chapter(conn, novel_name, chapter_name)
+            for scene_number, content, settings_data in scenes:
+                self._write_scene(conn, novel_name, chapter_name, scene_number, content, settings_data)
+        return True
+
+    def delete_scene(self, novel_name, chapter_name, scene_number):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM scenes WHERE novel = ? AND chapter = ? AND number = ?",
+                         (novel_name, chapter_name, scene_number))
+        return True
+
+    def delete_novel(self, novel_name):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM scenes WHERE novel = ?", (novel_name,))
+            conn.execute("DELETE FROM chapters WHERE novel = ?", (novel_name,))
+            conn.execute("DELETE FROM novels WHERE name = ?", (novel_name,))
+        return True
+
+    def replace_novel(self, staged_name, novel_name):
+        # 기존 소설 삭제와 이름 변경을 한 트랜잭션으로 (챕터/장면은 ON UPDATE CASCADE로 함께 바뀜)
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM scenes WHERE novel = ?", (novel_name,))
+            conn.execute("DELETE FROM chapters WHERE novel = ?", (novel_name,))
+            conn.execute("DELETE FROM novels WHERE name = ?", (novel_name,))
+            conn.execute("UPDATE novels SET name = ? WHERE name = ?", (novel_name, staged_name))
+        return True
+
+    def get_token_totals(self, novel_name):
+        rows = self._query("SELECT COUNT(*), COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0) "
+                           "FROM scenes WHERE novel = ?", (novel_name,))
+        count, input_tokens, output_tokens = rows[0]
+        return {'scenes': count, constants.INPUT_TOKEN_KEY: input_tokens, constants.OUTPUT_TOKEN_KEY: output_tokens}
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+                print(f"ℹ️ SQLite 저장소 닫힘: {self.db_path}")
+            except sqlite3.Error as e:
+                print(f"WARN: SQLite 저장소 닫기 오류 (무시): {e}")
+
+
+def open_storage(backend_type, location=None):
+    """저장소 생성. folder: location=기본 폴더(기본 BASE_SAVE_DIR), sqlite: location=DB 파일 경로."""
+    if backend_type == STORAGE_BACKEND_SQLITE:
+        return SQLiteStorage(location)
+    if backend_type == STORAGE_BACKEND_FOLDER:
+        return FolderStorage(location or constants.BASE_SAVE_DIR)
+    raise ValueError(f"지원하지 않는 저장소 유형: {backend_type}")
+
+
+def _check_target_names(target, novel_name, chapters):
+    """폴더 저장소로 복사할 때 소설/챕터 이름이 폴더로 쓸 수 있는지 확인. 아니면 ValueError."""
+    if isinstance(target, FolderStorage):
+        check_entry_name(novel_name, "소설 이름")
+        for _, chapter_name in chapters:
+            check_entry_name(chapter_name, "챕터 이름")
+
+def copy_novel(source, target, novel_name, target_name=None):
+    """소설 하나를 source 저장소에서 target 저장소로 복사 (target_name 지정 시 그 이름으로). 복사한 장면 수 반환.
+    폴더 저장소로 복사할 때 소설/챕터 이름이 폴더로 쓸 수 없으면 아무것도 쓰기 전에 ValueError.
+    저장에 실패하면 OSError (실패한 복사를 완료로 세지 않도록)."""
+    source_name, novel_name = novel_name, target_name or novel_name
+    chapters = source.list_chapters(source_name)
+    _check_target_names(target, novel_name, chapters)
+    if not target.save_novel_settings(novel_name, source.load_novel_settings(source_name)):
+        raise OSError(f"'{novel_name}' 소설 설정 저장 실패")
+    scene_count = 0
+    for _, chapter_name in chapters:
+        if not target.save_chapter_settings(novel_name, chapter_name, source.load_chapter_settings(source_name, chapter_name)):
+            raise OSError(f"'{novel_name}/{chapter_name}' 챕터 설정 저장 실패")
+        scenes = []
+        for scene_number in source.list_scenes(source_name, chapter_name):
+            content, settings = source.load_scene(source_name, chapter_name, scene_number)
+            scenes.append((scene_number, content, settings))
+        if isinstance(target, SQLiteStorage):
+            target.save_scenes(novel_name, chapter_name, scenes) # 챕터 단위 트랜잭션 (실패 시 예외)
+        else:
+            for scene_number, content, settings in scenes:
+                if not target.save_scene(novel_name, chapter_name, scene_number, content, settings):
+                    raise OSError(f"'{novel_name}/{chapter_name}' 장면 {scene_number} 저장 실패")
+        scene_count += len(scenes)
+    return scene_count
+
+
+def copy_novels(source, target, novel_names=None, skip_existing=True):
+    """
+    여러 소설을 저장소 간 복사 (가져오기/내보내기 공용).
+    (성공 여부, 메시지) 반환. skip_existing=True 이면 대상에 이미 있는 소설은 건너뛰고,
+    False 이면 대상의 같은 소설을 새로 쓴 내용으로 교체 (원본에서 사라진 챕터/장면이 남지 않도록).
+    임시 이름으로 끝까지 쓴 뒤에만 교체하므로, 도중에 실패해도 대상의 기존 소설은 그대로 남음.
+    이름이 폴더로 쓸 수 없는 소설은 건너뜀.
+    """
+    try:
+        names = novel_names if novel_names is not None else source.list_novels()
+        existing = set(target.list_novels())
+        copied, skipped, invalid, total_scenes = [], [], [], 0
+        for novel_name in names:
+            if novel_name in existing and skip_existing:
+                print(f"ℹ️ 대상 저장소에 이미 있는 소설 건너뜀: {novel_name}")
+                skipped.append(novel_name)
+                continue
+            try:
+                _check_target_names(target, novel_name, source.list_chapters(novel_name)) # 아무것도 쓰기 전에 확인
+            except ValueError as e:
+                print(f"WARN: 소설 건너뜀 ({e})")
+                invalid.append(novel_name)
+                continue
+            # 임시 이름(대상에 없는 이름)으로 끝까지 쓴 뒤 교체
+            staged_name, suffix_num = f"{novel_name}{COPY_STAGING_SUFFIX}", 1
+            while staged_name in existing:
+                suffix_num += 1
+                staged_name = f"{novel_name}{COPY_STAGING_SUFFIX}{suffix_num}"
+            try:
+                scene_count = copy_novel(source, target, novel_name, staged_name)
+                target.replace_novel(staged_name, novel_name)
+            except Exception:
+                try: target.delete_novel(staged_name) # 쓰다 만 임시 소설 정리 (기존 소설은 그대로)
+                except Exception as cleanup_error: print(f"WARN: 임시 복사본 정리 실패 ({staged_name}): {cleanup_error}")
+                raise
+            total_scenes += scene_count
+            copied.append(novel_name)
+        msg = f"소설 {len(copied)}개 (장면 {total_scenes}개) 복사 완료."
+        if skipped:
+            msg += f"\n이미 존재하여 건너뜀: {', '.join(skipped)}"
+        if invalid:
+            msg += f"\n폴더로 쓸 수 없는 이름이 있어 건너뜀: {', '.join(repr(name) for name in invalid)}"
+        print(f"✅ {msg}")
+        return True, msg
+    except Exception as e:
+        msg = f"오류: 저장소 복사 중 오류 발생:\n{e}"
+        print(f"❌ {msg}")
+        traceback.print_exc()
+        return False, msg
@@ -0,0 +1,84 @@
+# ui_dispatch.py
+"""
+작업 스레드 -> Tk 메인 스레드 UI 이벤트 전달.
+- 작업 스레드는 root.after()를 직접 호출하지 않고 post()/post_text()로 대기열에 넣기만 함 (Tk 호출 없음)
+- 메인 루프가 일정 간격(프레임)마다 대기열을 한 번에 비우며 실행
+- 같은 key의 이벤트는 프레임당 최신 것 하나만 실행, 같은 key의 텍스트 조각은 이어 붙여 한 번에 전달
+"""
+import itertools
+import threading
+import traceback
+import collections
+
+import constants
+
+
+class UiDispatcher:
+    """스레드 안전 UI 이벤트 대기열 (메인 루프에서 주기적으로 비움)."""
+
+    def __init__(self, interval_ms=constants.UI_DISPATCH_INTERVAL_MS):
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._events = collections.OrderedDict() # key -> [func, args, 텍스트 조각 목록 | None]
+        self._seq = itertools.count()
+        self._root = None
+        self._after_id = None
+
+    def start(self, root):
+        """메인 스레드에서 호출: 주기적 처리 시작."""
+        self._root = root
+        self._schedule()
+
+    def stop(self):
+        """주기적 처리 중지 (남은 이벤트는 실행하지 않음)."""
+        root, self._root = self._root, None
+        if root is not None and self._after_id is not None:
+            try: root.after_cancel(self._after_id)
+            except Exception: pass
+        self._after_id = None
+
+    def post(self, func, *args, key=None):
+        """func(*args)를 메인 스레드에서 실행하도록 예약 (어느 스레드에서든 호출 가능).
+        key 지정 시 아직 실행되지 않은 같은 key의 이벤트는 이번 것으로 교체."""
+        with self._lock:
+            if key is None:
+                key = ('_event', next(self._seq))
+            else:
+                self._events.pop(key, None) # 최신 이벤트를 뒤쪽 순서로
+            self._events[key] = [func, args, None]
+
+    def post_text(self, key, func, text):
+        """텍스트 조각 전달 예약: 같은 프레임에 쌓인 같은 key의 조각은 합쳐서 func(합친 텍스트) 한 번만 호출."""
+        if not text: return
+        with self._lock:
+            entry = self._events.get(key)
+            if entry is not None and entry[2] is not None:
+                entry[2].append(text)
+            else:
+                self._events[key] = [func, (), [text]]
+
+    def _schedule(self):
+        if self._root is None: return
+        try:
+            self._after_id = self._root.after(self.interval_ms, self._drain)
+        except Exception: # 창이 닫힘
+            self._root = None
+            self._after_id = None
+
+    def _drain(self):
+        self._after_id = None
+        self.run_pending()
+        self._schedule()
+
+    def run_pending(self):
+        """메인 스레드: 지금까지 쌓인 이벤트를 순서대로 실행 (실행 중 새로 들어온 이벤트는 다음 차례).
+        주기적 처리 외에 종료 직전 남은 결과를 처리할 때도 호출."""
+        with self._lock:
+            events, self._events = self._events, collections.OrderedDict()
+        for func, args, chunks in events.values():
+            try:
+                if chunks is not None: func("".join(chunks))
+                else: func(*args)
+            except Exception as e:
+                print(f"ERROR: UI 이벤트 처리 중 오류 ({getattr(func, '__name__', func)}): {e}")
+                traceback.print_exc()
@@ -106,6 +106,24 @@ def configure_ttk_styles(style_obj, base_font_family, base_font_size):
          print(f"UTILS ERROR: ttk 스타일 설정 중 오류: {e}")
 
 
+def set_widget_state(widget, state):
+    """위젯 state가 실제로 달라질 때만 재설정 (같은 값으로 다시 config 하지 않음). 변경 시 True."""
+    if not widget or not widget.winfo_exists(): return False
+    try:
+        if str(widget.cget('state')) == str(state): return False
+        widget.config(state=state)
+        return True
+    except tk.TclError:
+        return False
+
+def set_grid_visible(widget, visible):
+    """grid 배치 위젯 표시/숨김 (이미 그 상태면 아무것도 하지 않음)"""
+    if not widget or not widget.winfo_exists(): return
+    is_gridded = widget.winfo_manager() == 'grid'
+    if visible and not is_gridded: widget.grid()
+    elif not visible and is_gridded: widget.grid_remove()
+
+
 def format_chapter_display_name(folder_name):
     """챕터 폴더명을 Treeview 표시용 문자열로 변환 (폴더 아이콘 포함)"""
     match = re.match(r"^Chapter_(\d+)", folder_name, re.IGNORECASE)
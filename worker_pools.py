@@ -0,0 +1,231 @@
+# worker_pools.py
+"""
+작업 스레드 풀 (API / 파일 I/O / CPU).
+- 풀마다 실행 스레드 수와 대기열 크기를 제한: 가득 차면 submit()이 PoolFullError (UI 스레드는 막히지 않음)
+- 작업마다 이름을 붙여 두고, 종료 시 대기 중인 작업은 취소, 실행 중인 작업은 제한 시간까지 기다린 뒤
+  끝나지 않은 작업 목록을 돌려줌 (AppCore가 다음 실행 때 알리도록 기록)
+- 작업 스레드는 데몬 스레드: 응답 없는 API 호출이 있어도 창을 닫은 뒤 프로세스 종료를 막지 않음
+- API 풀은 우선순위 풀: 대화형(새 장면/재생성) > 요약 > 일괄 작업 순으로 시작하고, 제공자별 동시 호출 수를 제한
+"""
+import time
+import queue
+import itertools
+import threading
+import concurrent.futures
+
+import constants
+
+# API 작업 우선순위 (작을수록 먼저)
+PRIORITY_INTERACTIVE = 0 # 사용자가 누른 새 장면/재생성
+PRIORITY_SUMMARY = 1 # 줄거리 요약
+PRIORITY_BULK = 2 # 생성 작업 대기열 등 일괄 작업
+
+
+class PoolFullError(RuntimeError):
+    """작업 대기열이 가득 참"""
+    pass
+
+
+class WorkerPool:
+    """이름 있는 작업 스레드 풀 (대기열 크기 제한, 정상 종료 지원). submit()은 concurrent.futures.Future 반환."""
+
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._jobs = {} # Future -> 작업 이름 (대기 중 + 실행 중)
+        self._closed = False
+        self._init_queue(max_queue)
+        self._threads = [threading.Thread(target=self._worker_loop, name=f"novel-{name}-{i}", daemon=True) for i in range(max_workers)]
+        for thread in self._threads: thread.start()
+
+    def submit(self, job_name, fn, *args, priority=None, slot_key=None, **kwargs):
+        """작업 제출. 대기열이 가득 차면 PoolFullError, 종료 후에는 RuntimeError.
+        priority/slot_key는 우선순위 풀에서만 사용 (일반 풀은 제출 순서대로 실행)."""
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"'{self.name}' 작업 풀이 종료되었습니다.")
+            try:
+                self._enqueue((future, fn, args, kwargs, (priority, slot_key)))
+            except queue.Full:
+                raise PoolFullError(f"'{self.name}' 작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.") from None
+            self._jobs[future] = job_name
+        future.add_done_callback(self._forget_job)
+        return future
+
+    def _forget_job(self, future):
+        with self._lock:
+            self._jobs.pop(future, None)
+
+    # --- 대기열 (우선순위 풀에서 재정의) ---
+    def _init_queue(self, max_queue):
+        self._queue = queue.Queue(maxsize=max_queue)
+
+    def _enqueue(self, item):
+        self._queue.put_nowait(item)
+
+    def _dequeue(self):
+        return self._queue.get()
+
+    def _task_done(self, item):
+        pass
+
+    def _stop_workers(self):
+        # 남은 대기열 비우고 작업 스레드에 종료 신호
+        while True:
+            try: self._queue.get_nowait()
+            except queue.Empty: break
+        for _ in self._threads:
+            try: self._queue.put_nowait(None)
+            except queue.Full: break
+
+    def _worker_loop(self):
+        while True:
+            item = self._dequeue()
+            if item is None: return # 종료 신호
+            future, fn, args, kwargs, _ = item
+            try:
+                if not future.set_running_or_notify_cancel(): continue # 시작 전에 취소됨
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    print(f"WARN: '{self.name}' 작업 풀 작업 오류: {e}")
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                self._task_done(item)
+
+    def pending_jobs(self):
+        """아직 끝나지 않은 작업 이름 목록."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, timeout=None):
+        """
+        새 작업을 받지 않고, 대기 중인 작업은 취소하고, 실행 중인 작업은 timeout초까지 기다림.
+        [(작업 이름, 상태)] 반환: 상태는 'cancelled'(시작 전 취소) 또는 'running'(제한 시간 내 끝나지 않음).
+        """
+        with self._lock:
+            self._closed = True
+            jobs = dict(self._jobs)
+        unfinished = []
+        running = []
+        for future, job_name in jobs.items():
+            if future.cancel():
+                unfinished.append((job_name, 'cancelled'))
+            elif not future.done():
+                running.append(future)
+        if running:
+            print(f"ℹ️ '{self.name}' 작업 풀: 실행 중인 작업 {len(running)}개 완료 대기...")
+            _, not_done = concurrent.futures.wait(running, timeout=timeout)
+            unfinished.extend((jobs[future], 'running') for future in not_done)
+        self._stop_workers()
+        return unfinished
+
+
+class PriorityWorkerPool(WorkerPool):
+    """
+    우선순위 작업 풀 (AI 호출용).
+    - 시작 순서: 우선순위(대화형 > 요약 > 일괄) - 기다린 시간 / aging_s 가 작은 작업부터 (같으면 제출 순)
+    - slot_key(API 제공자)별 동시 실행 수를 slot_limits로 제한
+    - 요약/일괄 작업은 제공자별, 전체 모두 reserved_slots 자리를 남겨 두고 실행: 대화형 요청은 백그라운드 작업에 밀려 기다리지 않음
+    - 시작할 수 없는 작업은 스레드를 차지하지 않고 대기열에 남음
+    """
+
+    def __init__(self, name, max_workers, max_queue, slot_limits=None, reserved_slots=0, aging_s=60):
+        self._slot_limits = dict(slot_limits or {})
+        self._reserved_slots = reserved_slots
+        self._aging_s = aging_s
+        super().__init__(name, max_workers, max_queue)
+
+    def _init_queue(self, max_queue):
+        self._max_queue = max_queue
+        self._cond = threading.Condition()
+        self._pending = [] # [(제출 순번, 제출 시각, 작업)]
+        self._seq = itertools.count()
+        self._running_by_slot = {} # slot_key -> 실행 중 수
+        self._running_background = 0 # 실행 중인 요약/일괄 작업 수
+        self._stopped = False
+
+    def _enqueue(self, item):
+        priority = item[4][0]
+        with self._cond:
+            background_waiting = sum(1 for _, _, pending in self._pending if not self._is_interactive(pending[4][0]))
+            if not self._is_interactive(priority) and background_waiting >= self._max_queue:
+                raise queue.Full
+            self._pending.append((next(self._seq), time.monotonic(), item))
+            self._cond.notify_all()
+
+    @staticmethod
+    def _is_interactive(priority):
+        return priority is None or priority <= PRIORITY_INTERACTIVE
+
+    def _can_start(self, priority, slot_key):
+        limit = self._slot_limits.get(slot_key, self.max_workers)
+        running = self._running_by_slot.get(slot_key, 0)
+        if self._is_interactive(priority): return running < limit
+        return (running < limit - self._reserved_slots
+                and self._running_background < self.max_workers - self._reserved_slots)
+
+    def _dequeue(self):
+        with self._cond:
+            while True:
+                if self._stopped: return None
+                self._pending = [entry for entry in self._pending if not entry[2][0].cancelled()] # 시작 전에 취소된 작업 제거
+                now = time.monotonic()
+                best_rank = best_entry = None
+                for entry in self._pending:
+                    seq, submitted_at, item = entry
+                    priority, slot_key = item[4]
+                    if not self._can_start(priority, slot_key): continue
+                    base_priority = PRIORITY_INTERACTIVE if priority is None else priority
+                    rank = (base_priority - (now - submitted_at) / self._aging_s, seq)
+                    if best_rank is None or rank < best_rank:
+                        best_rank, best_entry = rank, entry
+                if best_entry is not None:
+                    self._pending.remove(best_entry)
+                    item = best_entry[2]
+                    priority, slot_key = item[4]
+                    self._running_by_slot[slot_key] = self._running_by_slot.get(slot_key, 0) + 1
+                    if not self._is_interactive(priority): self._running_background += 1
+                    return item
+                self._cond.wait()
+
+    def _task_done(self, item):
+        priority, slot_key = item[4]
+        with self._cond:
+            self._running_by_slot[slot_key] = max(0, self._running_by_slot.get(slot_key, 0) - 1)
+            if not self._is_interactive(priority): self._running_background = max(0, self._running_background - 1)
+            self._cond.notify_all()
+
+    def _stop_workers(self):
+        with self._cond:
+            self._pending.clear()
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class WorkerPools:
+    """앱 전체 작업 스레드 풀 묶음: api(AI 호출, 우선순위), io(파일 읽기/검색/휴지통), cpu(압축/내보내기/가져오기)."""
+
+    def __init__(self):
+        self.api = PriorityWorkerPool("api", constants.API_WORKER_COUNT, constants.API_QUEUE_SIZE,
+                                      slot_limits=constants.API_PROVIDER_MAX_CONCURRENT_CALLS,
+                                      reserved_slots=constants.API_INTERACTIVE_RESERVED_SLOTS,
+                                      aging_s=constants.API_PRIORITY_AGING_S)
+        self.io = WorkerPool("io", constants.IO_WORKER_COUNT, constants.IO_QUEUE_SIZE)
+        self.cpu = WorkerPool("cpu", constants.CPU_WORKER_COUNT, constants.CPU_QUEUE_SIZE)
+
+    def pending_jobs(self):
+        return self.api.pending_jobs() + self.io.pending_jobs() + self.cpu.pending_jobs()
+
+    def shutdown(self, timeout=constants.WORKER_SHUTDOWN_TIMEOUT_S):
+        """모든 풀 종료 (제한 시간은 전체 합계). 끝나지 않은 [(풀 이름, 작업 이름, 상태)] 반환."""
+        deadline = time.time() + timeout if timeout is not None else None
+        unfinished = []
+        for pool in (self.api, self.cpu, self.io): # 결과를 저장하는 작업이 있는 풀부터
+            remaining = max(0, deadline - time.time()) if deadline is not None else None
+            unfinished.extend((pool.name, job_name, state) for job_name, state in pool.shutdown(remaining))
+        return unfinished